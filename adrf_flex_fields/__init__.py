@@ -13,12 +13,14 @@ OMIT_PARAM = "omit"
 WILDCARD_VALUES = ["*", "~all"]
 MAXIMUM_EXPANSION_DEPTH = None
 RECURSIVE_EXPANSION_PERMITTED = True
+# Compiled row functions are opt-in per serializer (``compiled_read = True``)
+COMPILED_READ = False
 
 
 def _load_settings():
     """Load configuration from Django settings if available."""
     global EXPAND_PARAM, FIELDS_PARAM, OMIT_PARAM, WILDCARD_VALUES
-    global MAXIMUM_EXPANSION_DEPTH, RECURSIVE_EXPANSION_PERMITTED
+    global MAXIMUM_EXPANSION_DEPTH, RECURSIVE_EXPANSION_PERMITTED, COMPILED_READ
 
     try:
         from django.conf import settings
@@ -34,6 +36,7 @@ def _load_settings():
         RECURSIVE_EXPANSION_PERMITTED = _user_settings.get(
             "RECURSIVE_EXPANSION_PERMITTED", RECURSIVE_EXPANSION_PERMITTED
         )
+        COMPILED_READ = _user_settings.get("COMPILED_READ", COMPILED_READ)
     except (ImportError, RuntimeError):
         # Django not available or not configured yet
         pass
@@ -72,6 +75,7 @@ __all__ = [
     "WILDCARD_VALUES",
     "MAXIMUM_EXPANSION_DEPTH",
     "RECURSIVE_EXPANSION_PERMITTED",
+    "COMPILED_READ",
     # Serializers
     "FlexFieldsSerializerMixin",
     "FlexFieldsModelSerializer",
@@ -17,6 +17,7 @@ from adrf_flex_fields import (
     OMIT_PARAM,
     WILDCARD_VALUES
 )
+from adrf_flex_fields.query_plan import build_query_plan
 from adrf_flex_fields.serializers import (
     FlexFieldsModelSerializer,
     FlexFieldsSerializerMixin,
@@ -197,8 +198,10 @@ class FlexFieldsFilterBackend(FlexFieldsDocsFilterBackend):
     """
     Filter backend for automatic query optimization.
 
-    Analyzes requested fields and applies select_related/prefetch_related
-    and only() to optimize database queries.
+    Walks the full expand tree of the requested fields and applies the
+    minimal select_related chain, Prefetch objects (with their own nested
+    plan) and only() at every level. Plans are compiled once per serializer
+    and expand/fields/omit signature (see ``adrf_flex_fields.query_plan``).
     """
 
     def filter_queryset(
@@ -229,73 +232,22 @@ class FlexFieldsFilterBackend(FlexFieldsDocsFilterBackend):
         )
         required_query_fields = list(getattr(view, "required_query_fields", []))
 
-        # Create serializer and apply flex fields to analyze what's needed
+        # Flex options of the request (expand already restricted to permitted_expands)
         serializer = view.get_serializer(
             context=view.get_serializer_context()
         )
-
-        serializer.apply_flex_fields(
-            serializer.fields, serializer._flex_options_rep_only
+        options = serializer._flex_options_all
+
+        plan = build_query_plan(
+            type(serializer),
+            queryset.model,
+            expand=options["expand"],
+            fields=options["fields"],
+            omit=options["omit"],
+            required_fields=required_query_fields,
+        )
+        return plan.apply(
+            queryset,
+            select_related=auto_select_related_on_query,
+            restrict_fields=auto_remove_fields_from_query,
         )
-        serializer._flex_fields_rep_applied = True
-
-        # Analyze fields to determine model fields and nested fields
-        model_fields = []
-        nested_model_fields = []
-
-        for field in serializer.fields.values():
-            model_field = self._get_field(field.source, queryset.model)
-            if model_field:
-                model_fields.append(model_field)
-                # Check if field is expanded or is a relation
-                if (field.field_name in serializer.expanded_fields or
-                    (model_field.is_relation and not model_field.many_to_one) or
-                    (model_field.is_relation and model_field.many_to_one and
-                     not model_field.concrete)):
-                    nested_model_fields.append(model_field)
-
-        # Apply only() for sparse fields
-        if auto_remove_fields_from_query:
-            only_fields = required_query_fields + [
-                model_field.name
-                for model_field in model_fields
-                if (not model_field.is_relation or
-                    (model_field.many_to_one and model_field.concrete))
-            ]
-            queryset = queryset.only(*only_fields)
-
-        # Apply select_related and prefetch_related
-        if auto_select_related_on_query and nested_model_fields:
-            # select_related for ForeignKey
-            select_related_fields = [
-                model_field.name
-                for model_field in nested_model_fields
-                if (model_field.is_relation and
-                    model_field.many_to_one and
-                    model_field.concrete)
-            ]
-            if select_related_fields:
-                queryset = queryset.select_related(*select_related_fields)
-
-            # prefetch_related for ManyToMany and reverse ForeignKey
-            prefetch_fields = [
-                model_field.name
-                for model_field in nested_model_fields
-                if ((model_field.is_relation and not model_field.many_to_one) or
-                    (model_field.is_relation and model_field.many_to_one and
-                     not model_field.concrete))
-            ]
-            if prefetch_fields:
-                queryset = queryset.prefetch_related(*prefetch_fields)
-
-        return queryset
-
-    @staticmethod
-    @lru_cache()
-    def _get_field(field_name: str, model: models.Model) -> Optional[models.Field]:
-        """Get field from model by name."""
-        try:
-            return model._meta.get_field(field_name)
-        except FieldDoesNotExist:
-            return None
-
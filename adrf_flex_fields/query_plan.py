@@ -0,0 +1,231 @@
+"""
+Query planning from the expand tree of a flex fields serializer.
+
+The planner walks the serializer and its expanded nested serializers level by
+level, mirroring what they will read at serialization time, and produces:
+- the ``select_related`` chain for forward FK / one-to-one paths;
+- ``Prefetch`` objects for reverse FK and M2M paths, their queryset being
+  planned recursively (its own ``select_related``, ``only()``...);
+- ``only()`` at every level, including the FK back to the parent of a
+  prefetched queryset.
+
+A level whose serializer reads attributes the planner cannot see (method
+fields, properties...) is loaded entirely. Plans are cached per serializer
+class and expand/fields/omit signature, so the query count of a request does
+not depend on the expansion depth.
+"""
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch, QuerySet
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, RelatedField
+
+from adrf_flex_fields.serializers import import_lazy_serializer
+from adrf_flex_fields.utils import split_levels
+
+QUERY_PLAN_CACHE_SIZE = 512
+_query_plans: Dict[tuple, "QueryPlan"] = {}
+_query_plans_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class PrefetchPlan:
+    path: str
+    model: type
+    plan: "QueryPlan"
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    # None: no column restriction at this level
+    only: Optional[Tuple[str, ...]]
+    select_related: Tuple[str, ...]
+    prefetches: Tuple[PrefetchPlan, ...]
+
+    def apply(self, queryset: QuerySet, select_related: bool = True,
+              restrict_fields: bool = True) -> QuerySet:
+        if select_related:
+            if self.select_related:
+                queryset = queryset.select_related(*self.select_related)
+            for prefetch in self.prefetches:
+                inner = prefetch.plan.apply(prefetch.model._default_manager.all())
+                queryset = queryset.prefetch_related(Prefetch(prefetch.path, queryset=inner))
+        if restrict_fields and self.only is not None:
+            queryset = queryset.only(*self.only)
+        return queryset
+
+
+@dataclass
+class _Level:
+    """Accumulator while walking one queryset (a prefetch starts a new one)."""
+    only: List[str]
+    select_related: List[str]
+    prefetches: List[PrefetchPlan]
+    opaque: bool = False
+
+    def freeze(self) -> QueryPlan:
+        return QueryPlan(
+            only=None if self.opaque else tuple(dict.fromkeys(self.only)),
+            select_related=tuple(dict.fromkeys(self.select_related)),
+            prefetches=tuple(self.prefetches),
+        )
+
+
+def _contains_wildcard(values) -> bool:
+    from adrf_flex_fields import WILDCARD_VALUES
+
+    return bool(WILDCARD_VALUES) and bool(set(values) & set(WILDCARD_VALUES))
+
+
+def _expandable_fields(serializer_class) -> dict:
+    meta = getattr(serializer_class, "Meta", None)
+    if meta is not None and hasattr(meta, "expandable_fields"):
+        return meta.expandable_fields
+    return getattr(serializer_class, "expandable_fields", {}) or {}
+
+
+def _resolve_expansion(options) -> Tuple[type, dict]:
+    if isinstance(options, tuple):
+        serializer_class, settings = options[0], (options[1] if len(options) > 1 else {})
+    else:
+        serializer_class, settings = options, {}
+    if isinstance(serializer_class, str):
+        serializer_class = import_lazy_serializer(serializer_class)
+    return serializer_class, settings
+
+
+def _model_field(model, name: str):
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+
+def _output_names(serializer_class, model) -> List[str]:
+    """Field names a ModelSerializer outputs (before flex options)."""
+    meta = serializer_class.Meta
+    declared = list(getattr(serializer_class, "_declared_fields", {}))
+    fields = getattr(meta, "fields", None)
+    exclude = set(getattr(meta, "exclude", None) or ())
+
+    if fields in (None, serializers.ALL_FIELDS):
+        names = [field.name for field in model._meta.concrete_fields]
+        names += [field.name for field in model._meta.many_to_many]
+        names += [name for name in declared if name not in names]
+    else:
+        names = list(fields)
+    return [name for name in names if name not in exclude]
+
+
+def _keep(name, sparse, omit, next_omit) -> bool:
+    if name in omit and name not in next_omit:
+        return False
+    if sparse and not _contains_wildcard(sparse) and name not in sparse:
+        return False
+    return True
+
+
+def _pk_prefetch(path: str, model_field) -> PrefetchPlan:
+    """Prefetch of the related primary keys only (many=True PK fields)."""
+    related = model_field.related_model
+    only = [related._meta.pk.name]
+    if model_field.one_to_many or (model_field.one_to_one and not model_field.concrete):
+        # FK back to the parent rows, needed to dispatch the prefetch
+        only.append(model_field.field.name)
+    return PrefetchPlan(path=path, model=related, plan=QueryPlan(tuple(only), (), ()))
+
+
+def _plan_serializer(serializer_class, model, expand, fields, omit, level: _Level, prefix: str) -> None:
+    """Adds what ``serializer_class`` reads on ``model`` to ``level`` under ``prefix``."""
+    if not hasattr(serializer_class, "Meta") or getattr(serializer_class.Meta, "model", None) is None:
+        level.opaque = True
+        return
+
+    expand_names, next_expand = split_levels(expand)
+    sparse, next_sparse = split_levels(fields)
+    omit_names, next_omit = split_levels(omit)
+
+    expandable = _expandable_fields(serializer_class)
+    if _contains_wildcard(expand_names):
+        expand_names = list(expandable)
+    expanded = {
+        name for name in expand_names
+        if name in expandable and _keep(name, sparse, omit_names, next_omit)
+    }
+
+    level.only.append(prefix + model._meta.pk.name)
+    declared = getattr(serializer_class, "_declared_fields", {})
+
+    for name in _output_names(serializer_class, model):
+        if name in expanded or not _keep(name, sparse, omit_names, next_omit):
+            continue
+        field = declared.get(name)
+        source = (getattr(field, "source", None) or name) if field is not None else name
+        model_field = _model_field(model, source) if "." not in source and source != "*" else None
+
+        if model_field is None:
+            # Method field, property... : the planner cannot see what it reads
+            level.opaque = True
+        elif not model_field.is_relation:
+            level.only.append(prefix + source)
+        elif model_field.concrete and (model_field.many_to_one or model_field.one_to_one):
+            level.only.append(prefix + source)
+        elif field is None or isinstance(field, (ManyRelatedField, RelatedField)):
+            # Reverse / M2M primary keys
+            level.prefetches.append(_pk_prefetch(prefix + source, model_field))
+        else:
+            level.opaque = True
+
+    for name in expanded:
+        nested_class, settings = _resolve_expansion(expandable[name])
+        source = settings.get("source", name)
+        model_field = _model_field(model, source) if "." not in source else None
+        if model_field is None or not model_field.is_relation:
+            level.opaque = True
+            continue
+
+        nested = (next_expand.get(name, []), next_sparse.get(name, []), next_omit.get(name, []))
+        if model_field.many_to_one or model_field.one_to_one:
+            if model_field.concrete:
+                level.only.append(prefix + source)
+            level.select_related.append(prefix + source)
+            child = _Level([], [], [])
+            _plan_serializer(nested_class, model_field.related_model, *nested, child, prefix + source + "__")
+            # A level loaded entirely simply contributes no column restriction
+            if not child.opaque:
+                level.only.extend(child.only)
+            level.select_related.extend(child.select_related)
+            level.prefetches.extend(child.prefetches)
+        else:
+            inner = _Level([], [], [])
+            if model_field.one_to_many:
+                # FK back to the parent rows, needed to dispatch the prefetch
+                inner.only.append(model_field.field.name)
+            _plan_serializer(nested_class, model_field.related_model, *nested, inner, "")
+            level.prefetches.append(PrefetchPlan(
+                path=prefix + source, model=model_field.related_model, plan=inner.freeze()
+            ))
+
+
+def build_query_plan(serializer_class, model, expand=(), fields=(), omit=(),
+                     required_fields=()) -> QueryPlan:
+    """Compiled (cached) query plan for a serializer and its flex options."""
+    key = (serializer_class, model, tuple(expand), tuple(fields), tuple(omit), tuple(required_fields))
+    plan = _query_plans.get(key)
+    if plan is None:
+        level = _Level(list(required_fields), [], [])
+        _plan_serializer(serializer_class, model, list(expand), list(fields), list(omit), level, "")
+        plan = level.freeze()
+        with _query_plans_lock:
+            if len(_query_plans) >= QUERY_PLAN_CACHE_SIZE:
+                _query_plans.clear()
+            _query_plans[key] = plan
+    return plan
+
+
+def clear_query_plans() -> None:
+    with _query_plans_lock:
+        _query_plans.clear()
@@ -0,0 +1,151 @@
+"""
+Compiled read path for flat, read-only serializers.
+
+ADRF serializes every field of every row through two ``sync_to_async`` hops
+(``get_attribute`` then ``to_representation``). When all the readable fields
+of a serializer map to model columns (or to primary keys of related rows),
+they are compiled once per serializer instance into a row function that:
+- reads every column from the instance ``__dict__`` in a single call;
+- converts only the values whose representation differs from the column
+  value (dates, decimals, choices...), with the field's own converter.
+
+Any other field (method field, nested or many related serializer, dotted or
+callable source, custom attribute lookup...) disables the compiled path and
+the serializer keeps the regular ADRF path. A row whose columns were not
+loaded (``only()`` / ``defer()``) also falls back to it, so the output is
+always the one of the regular path.
+"""
+import operator
+from typing import Callable, Optional
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import fields as drf_fields
+from rest_framework import relations
+from rest_framework.serializers import BaseSerializer
+
+# Field classes whose representation of a matching column is the value itself
+_IDENTITY_FIELDS = {
+    drf_fields.CharField: (models.CharField, models.TextField),
+    drf_fields.EmailField: (models.CharField,),
+    drf_fields.SlugField: (models.CharField,),
+    drf_fields.URLField: (models.CharField,),
+    drf_fields.IntegerField: (models.IntegerField,),
+    drf_fields.BooleanField: (models.BooleanField,),
+    drf_fields.ReadOnlyField: (models.Field,),
+}
+
+# Marker of a field DRF leaves out of the output (SkipField)
+_SKIP = object()
+
+
+class RowNotLoaded(Exception):
+    """A column or relation read by the row function is not loaded."""
+
+
+def _compile_column(field, model_field):
+    """(attname, converter) of a field reading a concrete column."""
+    if type(field).get_attribute is not drf_fields.Field.get_attribute:
+        return None
+    if model_field.is_relation:
+        return None
+
+    identity_columns = _IDENTITY_FIELDS.get(type(field))
+    if identity_columns is not None and isinstance(model_field, identity_columns):
+        return model_field.attname, None
+    return model_field.attname, field.to_representation
+
+
+def _compile_primary_key(field, model_field):
+    """(attname or reader, converter) of a non-many PrimaryKeyRelatedField."""
+    convert = field.pk_field.to_representation if field.pk_field is not None else None
+
+    if model_field.concrete and (model_field.many_to_one or model_field.one_to_one):
+        return model_field.attname, convert
+
+    if model_field.one_to_one:
+        # Reverse one-to-one: related row loaded by select_related / prefetch
+        cache_name = model_field.cache_name
+        missing = None if field.allow_null else _SKIP
+
+        def read_reverse(instance):
+            try:
+                related = instance._state.fields_cache[cache_name]
+            except KeyError:
+                raise RowNotLoaded(cache_name)
+            return missing if related is None else related.pk
+
+        return read_reverse, convert
+    return None
+
+
+def _compile_field(field, model):
+    if isinstance(field, (BaseSerializer, relations.ManyRelatedField)):
+        return None
+    if len(field.source_attrs) != 1:
+        return None
+    try:
+        model_field = model._meta.get_field(field.source_attrs[0])
+    except FieldDoesNotExist:
+        # Property, method or annotation: unknown cost and type
+        return None
+
+    if type(field) is relations.PrimaryKeyRelatedField:
+        return _compile_primary_key(field, model_field)
+    if isinstance(field, relations.RelatedField) or not model_field.concrete:
+        return None
+    return _compile_column(field, model_field)
+
+
+def compile_row_function(serializer) -> Optional[Callable]:
+    """
+    Row function of a serializer instance (flex options already applied).
+
+    Returns:
+        A callable ``instance -> dict`` raising ``RowNotLoaded`` when the
+        instance lacks a column, or None if a field cannot be compiled.
+    """
+    model = getattr(getattr(serializer, "Meta", None), "model", None)
+    if model is None:
+        return None
+
+    names, attnames, readers, conversions = [], [], [], []
+    for position, field in enumerate(serializer._readable_fields):
+        compiled = _compile_field(field, model)
+        if compiled is None:
+            return None
+        source, convert = compiled
+        names.append(field.field_name)
+        if callable(source):
+            readers.append((position, source))
+        else:
+            attnames.append(source)
+        if convert is not None:
+            conversions.append((position, convert))
+
+    if not names:
+        return None
+
+    read_columns = operator.itemgetter(*attnames) if attnames else None
+    single_column = len(attnames) == 1
+
+    def row(instance) -> dict:
+        if read_columns is None:
+            values = []
+        else:
+            try:
+                columns = read_columns(instance.__dict__)
+            except KeyError as e:
+                raise RowNotLoaded(str(e))
+            values = [columns] if single_column else list(columns)
+        for position, read in readers:
+            values.insert(position, read(instance))
+        for position, convert in conversions:
+            value = values[position]
+            if value is not None and value is not _SKIP:
+                values[position] = convert(value)
+        if readers and _SKIP in values:
+            return {name: value for name, value in zip(names, values) if value is not _SKIP}
+        return dict(zip(names, values))
+
+    return row
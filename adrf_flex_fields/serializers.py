@@ -1,13 +1,101 @@
 """
 Async serializer mixins and classes for flexible field handling.
 """
-from typing import Optional
+import copy
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from django.db import models
 
 from adrf_flex_fields import (
     EXPAND_PARAM,
     FIELDS_PARAM,
     OMIT_PARAM,
 )
+from adrf_flex_fields.row_serializer import RowNotLoaded, compile_row_function
+
+# Compiled field plans, keyed by serializer class and normalized options
+FIELD_PLAN_CACHE_SIZE = 1024
+_field_plans: Dict[tuple, "FieldPlan"] = {}
+_field_plans_lock = threading.Lock()
+
+# Lazy serializer references ("app.serializers.Name") resolved once
+_lazy_serializers: Dict[str, type] = {}
+
+# Row function not compiled yet (None: serializer not eligible)
+_NOT_COMPILED = object()
+
+
+@dataclass(frozen=True)
+class ExpansionPlan:
+    """Resolved expansion of one field: serializer class and constructor options."""
+    name: str
+    serializer_class: type
+    settings: dict
+    is_serializer: bool
+    is_flex: bool
+    nested_options: dict
+
+
+@dataclass(frozen=True)
+class FieldPlan:
+    """Fields to remove and fields to expand for one request shape."""
+    to_remove: Tuple[str, ...]
+    expansions: Tuple[ExpansionPlan, ...]
+
+
+def _import_serializer_class(path: str, class_name: str):
+    """Import a class from a module path; returns (class, error_message)."""
+    import importlib
+
+    try:
+        module = importlib.import_module(path)
+    except ImportError:
+        return (
+            None,
+            f"No module found at path: {path} when trying to import {class_name}",
+        )
+
+    try:
+        return getattr(module, class_name), None
+    except AttributeError:
+        return None, f"No class {class_name} found in module {path}"
+
+
+def import_lazy_serializer(full_lazy_path: str) -> type:
+    """
+    Resolve a lazy serializer reference ('app.serializers.Name' or
+    'app.Name'), importing it only the first time.
+    """
+    cached = _lazy_serializers.get(full_lazy_path)
+    if cached is not None:
+        return cached
+
+    path_parts = full_lazy_path.split(".")
+    class_name = path_parts.pop()
+    path = ".".join(path_parts)
+
+    # Try full path first
+    serializer_class, error = _import_serializer_class(path, class_name)
+
+    # If failed and path doesn't end with .serializers, try adding it
+    if error and not path.endswith(".serializers"):
+        serializer_class, error = _import_serializer_class(
+            path + ".serializers", class_name
+        )
+
+    if serializer_class:
+        _lazy_serializers[full_lazy_path] = serializer_class
+        return serializer_class
+
+    raise Exception(error)
+
+
+def clear_field_plans() -> None:
+    """Empties the field plan cache (tests, code reload)."""
+    with _field_plans_lock:
+        _field_plans.clear()
 
 
 class FlexFieldsSerializerMixin:
@@ -25,6 +113,7 @@ class FlexFieldsSerializerMixin:
     expandable_fields = {}
     maximum_expansion_depth: Optional[int] = None
     recursive_expansion_permitted: Optional[bool] = None
+    compiled_read: Optional[bool] = None
 
     def __init__(self, *args, **kwargs):
         """
@@ -46,6 +135,7 @@ class FlexFieldsSerializerMixin:
         self.parent = parent
         self.expanded_fields = []
         self._flex_fields_rep_applied = False
+        self._row_function = _NOT_COMPILED
 
         # Store flex options for different application phases
         # _flex_options_base: options passed directly to serializer constructor
@@ -118,6 +208,7 @@ class FlexFieldsSerializerMixin:
 
         This is the core method that modifies the fields dict based on the
         flex options. It handles field removal (omit/sparse) and field expansion.
+        The work is compiled once per request shape into a ``FieldPlan``.
 
         Args:
             fields: The fields dict to modify
@@ -126,6 +217,45 @@ class FlexFieldsSerializerMixin:
         Returns:
             The modified fields dict
         """
+        if not any(flex_options.values()):
+            return fields
+
+        plan = self.get_field_plan(fields, flex_options)
+
+        for field_name in plan.to_remove:
+            fields.pop(field_name, None)
+
+        for expansion in plan.expansions:
+            self.expanded_fields.append(expansion.name)
+            fields[expansion.name] = self._build_expanded_field(expansion)
+
+        return fields
+
+    def get_field_plan(self, fields, flex_options) -> FieldPlan:
+        """
+        Return the compiled plan for these options, building it on first use.
+
+        The key covers everything the plan depends on: serializer class,
+        current field names and the normalized expand/fields/omit lists
+        (expand is already restricted to ``permitted_expands``).
+        """
+        key = (
+            type(self),
+            tuple(fields),
+            tuple(flex_options["expand"]),
+            tuple(flex_options["fields"]),
+            tuple(flex_options["omit"]),
+        )
+        plan = _field_plans.get(key)
+        if plan is None:
+            plan = self._compile_field_plan(fields, flex_options)
+            with _field_plans_lock:
+                if len(_field_plans) >= FIELD_PLAN_CACHE_SIZE:
+                    _field_plans.clear()
+                _field_plans[key] = plan
+        return plan
+
+    def _compile_field_plan(self, fields, flex_options) -> FieldPlan:
         from adrf_flex_fields.utils import split_levels
 
         # Split field paths by level for nested handling
@@ -134,23 +264,18 @@ class FlexFieldsSerializerMixin:
         omit_fields, next_omit_fields = split_levels(flex_options["omit"])
 
         # Remove fields based on omit and sparse fields rules
-        for field_name in self._get_fields_names_to_remove(
+        to_remove = self._get_fields_names_to_remove(
             fields, omit_fields, sparse_fields, next_omit_fields
-        ):
-            fields.pop(field_name)
+        )
 
         # Expand fields
-        for name in self._get_expanded_field_names(
-            expand_fields, omit_fields, sparse_fields, next_omit_fields
-        ):
-            self.expanded_fields.append(name)
-
-            fields[name] = self._make_expanded_field_serializer(
-                name, next_expand_fields, next_sparse_fields, next_omit_fields
+        expansions = [
+            self._plan_expansion(name, next_expand_fields, next_sparse_fields, next_omit_fields)
+            for name in self._get_expanded_field_names(
+                expand_fields, omit_fields, sparse_fields, next_omit_fields
             )
-
-        return fields
-
+        ]
+        return FieldPlan(to_remove=tuple(to_remove), expansions=tuple(expansions))
 
     async def ato_representation(self, instance):
         """
@@ -166,13 +291,57 @@ class FlexFieldsSerializerMixin:
         Returns:
             The serialized representation as a dict
         """
+        self._apply_flex_fields_rep()
+
+        # Flat read-only field sets skip the per-field ADRF machinery
+        row = self._get_row_function()
+        if row is not None and isinstance(instance, models.Model):
+            try:
+                return row(instance)
+            except RowNotLoaded:
+                pass
+
+        # Call parent's async to_representation
+        return await super().ato_representation(instance)
+
+    def to_representation(self, instance):
+        """Synchronous counterpart of ``ato_representation``."""
+        self._apply_flex_fields_rep()
+
+        row = self._get_row_function()
+        if row is not None and isinstance(instance, models.Model):
+            try:
+                return row(instance)
+            except RowNotLoaded:
+                pass
+
+        return super().to_representation(instance)
+
+    def _apply_flex_fields_rep(self) -> None:
         # Apply flex fields from query params if not already applied
         if not self._flex_fields_rep_applied:
             self.apply_flex_fields(self.fields, self._flex_options_rep_only)
             self._flex_fields_rep_applied = True
 
-        # Call parent's async to_representation
-        return await super().ato_representation(instance)
+    def _get_row_function(self):
+        """
+        Compiled row function of this serializer, or None.
+
+        Compiled once per instance (a list serializer shares its child),
+        after the flex options are applied. Serializers overriding the
+        representation methods always keep the regular path.
+        """
+        if self._row_function is _NOT_COMPILED:
+            row = None
+            cls = type(self)
+            if (
+                self.get_compiled_read()
+                and cls.to_representation is FlexFieldsSerializerMixin.to_representation
+                and cls.ato_representation is FlexFieldsSerializerMixin.ato_representation
+            ):
+                row = compile_row_function(self)
+            self._row_function = row
+        return self._row_function
 
 
     def _get_fields_names_to_remove(
@@ -324,22 +493,10 @@ class FlexFieldsSerializerMixin:
 
         return self.expandable_fields
 
-    def _make_expanded_field_serializer(
-        self, name, nested_expand, nested_fields, nested_omit
-    ):
+    def _plan_expansion(self, name, nested_expand, nested_fields, nested_omit) -> ExpansionPlan:
         """
-        Create an instance of the expanded field serializer.
-
-        Args:
-            name: Name of the field to expand
-            nested_expand: Dict of nested expand options
-            nested_fields: Dict of nested fields options
-            nested_omit: Dict of nested omit options
-
-        Returns:
-            Instance of the expanded serializer
+        Resolve the serializer class and constructor options of an expanded field.
         """
-        import copy
         from rest_framework import serializers
 
         field_options = self._expandable_fields[name]
@@ -358,24 +515,61 @@ class FlexFieldsSerializerMixin:
                 serializer_class
             )
 
+        # Flex options passed to nested FlexFields serializers
+        nested_options = {}
+        is_flex = issubclass(serializer_class, FlexFieldsSerializerMixin)
+        if is_flex:
+            if name in nested_expand:
+                nested_options[EXPAND_PARAM] = nested_expand[name]
+
+            if name in nested_fields:
+                nested_options[FIELDS_PARAM] = nested_fields[name]
+
+            if name in nested_omit:
+                nested_options[OMIT_PARAM] = nested_omit[name]
+
+        return ExpansionPlan(
+            name=name,
+            serializer_class=serializer_class,
+            settings=settings,
+            is_serializer=issubclass(serializer_class, serializers.Serializer),
+            is_flex=is_flex,
+            nested_options=nested_options,
+        )
+
+    def _build_expanded_field(self, expansion: ExpansionPlan):
+        """Instantiate an expanded field from its plan (per-request context)."""
+        settings = dict(expansion.settings)
+
         # Pass context to all serializers
-        if issubclass(serializer_class, serializers.Serializer):
+        if expansion.is_serializer:
             settings["context"] = self.context
 
         # Pass flex options to FlexFields serializers
-        if issubclass(serializer_class, FlexFieldsSerializerMixin):
+        if expansion.is_flex:
             settings["parent"] = self
+            settings.update(expansion.nested_options)
 
-            if name in nested_expand:
-                settings[EXPAND_PARAM] = nested_expand[name]
+        return expansion.serializer_class(**settings)
 
-            if name in nested_fields:
-                settings[FIELDS_PARAM] = nested_fields[name]
+    def _make_expanded_field_serializer(
+        self, name, nested_expand, nested_fields, nested_omit
+    ):
+        """
+        Create an instance of the expanded field serializer.
 
-            if name in nested_omit:
-                settings[OMIT_PARAM] = nested_omit[name]
+        Args:
+            name: Name of the field to expand
+            nested_expand: Dict of nested expand options
+            nested_fields: Dict of nested fields options
+            nested_omit: Dict of nested omit options
 
-        return serializer_class(**settings)
+        Returns:
+            Instance of the expanded serializer
+        """
+        return self._build_expanded_field(
+            self._plan_expansion(name, nested_expand, nested_fields, nested_omit)
+        )
 
     def _get_serializer_class_from_lazy_string(self, full_lazy_path: str):
         """
@@ -393,23 +587,7 @@ class FlexFieldsSerializerMixin:
         Raises:
             Exception: If serializer cannot be imported
         """
-        path_parts = full_lazy_path.split(".")
-        class_name = path_parts.pop()
-        path = ".".join(path_parts)
-
-        # Try full path first
-        serializer_class, error = self._import_serializer_class(path, class_name)
-
-        # If failed and path doesn't end with .serializers, try adding it
-        if error and not path.endswith(".serializers"):
-            serializer_class, error = self._import_serializer_class(
-                path + ".serializers", class_name
-            )
-
-        if serializer_class:
-            return serializer_class
-
-        raise Exception(error)
+        return import_lazy_serializer(full_lazy_path)
 
     def _import_serializer_class(self, path: str, class_name: str):
         """
@@ -422,22 +600,7 @@ class FlexFieldsSerializerMixin:
         Returns:
             Tuple of (class, error_message) - one will be None
         """
-        import importlib
-
-        try:
-            module = importlib.import_module(path)
-        except ImportError:
-            return (
-                None,
-                f"No module found at path: {path} when trying to import {class_name}",
-            )
-
-        try:
-            return getattr(module, class_name), None
-        except AttributeError:
-            return None, f"No class {class_name} found in module {path}"
-
-
+        return _import_serializer_class(path, class_name)
 
     def get_maximum_expansion_depth(self) -> Optional[int]:
         """
@@ -449,6 +612,19 @@ class FlexFieldsSerializerMixin:
         from adrf_flex_fields import MAXIMUM_EXPANSION_DEPTH
         return self.maximum_expansion_depth or MAXIMUM_EXPANSION_DEPTH
 
+    def get_compiled_read(self) -> bool:
+        """
+        Get whether the compiled read path is enabled from serializer or settings.
+
+        Returns:
+            True if flat read-only field sets may use a compiled row function
+        """
+        from adrf_flex_fields import COMPILED_READ
+
+        if self.compiled_read is not None:
+            return self.compiled_read
+        return COMPILED_READ
+
     def get_recursive_expansion_permitted(self) -> bool:
         """
         Get whether recursive expansion is permitted from serializer or settings.
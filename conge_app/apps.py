@@ -4,3 +4,23 @@ from django.apps import AppConfig
 class CongeAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'conge_app'
+
+    def ready(self):
+        # Extension btree_gist requise par la contrainte d'exclusion des demandes
+        from django.db.models.signals import post_delete, post_save, pre_migrate, pre_save
+        from conge_app.services.working_days import clear_calendars, ensure_btree_gist_extension
+        pre_migrate.connect(ensure_btree_gist_extension, sender=self, dispatch_uid='conge_app_btree_gist')
+
+        # Calendriers des jours ouvrés recalculés à chaque modification des jours fériés
+        from conge_app.models import demande_conge, jour_ferie
+        post_save.connect(clear_calendars, sender=jour_ferie, dispatch_uid='working_calendar_save')
+        post_delete.connect(clear_calendars, sender=jour_ferie, dispatch_uid='working_calendar_delete')
+
+        # Calendriers d'équipe invalidés par portée (service, groupe)
+        from conge_app.services.team_calendar import on_demande_change, on_employe_change, remember_poste
+        from user_app.models import employe
+        post_save.connect(on_demande_change, sender=demande_conge, dispatch_uid='team_calendar_demande_save')
+        post_delete.connect(on_demande_change, sender=demande_conge, dispatch_uid='team_calendar_demande_delete')
+        pre_save.connect(remember_poste, sender=employe, dispatch_uid='team_calendar_employe_pre_save')
+        post_save.connect(on_employe_change, sender=employe, dispatch_uid='team_calendar_employe_save')
+        post_delete.connect(on_employe_change, sender=employe, dispatch_uid='team_calendar_employe_delete')
@@ -1,7 +1,25 @@
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateRangeField, RangeBoundary, RangeOperators
 from django.db import models
 from user_app.models import employe, Base_model, ServiceGroup
 
 
+class DateRange(models.Func):
+    """daterange(debut, fin, bornes) PostgreSQL"""
+    function = 'DATERANGE'
+    output_field = DateRangeField()
+
+
+def periode_demande(debut='date_debut', fin='date_fin'):
+    """Période d'une demande, bornes incluses: [date_debut, date_fin]"""
+    return DateRange(debut, fin, RangeBoundary(inclusive_lower=True, inclusive_upper=True))
+
+
+# Statuts pour lesquels deux demandes d'un employé ne peuvent se chevaucher
+STATUTS_ACTIFS = ['PENDING', 'APPROVED']
+CONTRAINTE_CHEVAUCHEMENT = 'cg_demande_conge_sans_chevauchement'
+
+
 
 # *******************************************************************************************************
 # TYPE DE CONGÉ     TYPE DE CONGÉ     TYPE DE CONGÉ     TYPE DE CONGÉ     TYPE DE CONGÉ
@@ -50,6 +68,21 @@ class demande_conge(Base_model):
 
     class Meta:
         db_table = 'cg_demande_conge'
+        indexes = [
+            # Requêtes de plage du calendrier d'équipe (demandes approuvées)
+            models.Index(fields=['statut', 'date_debut', 'date_fin']),
+        ]
+        constraints = [
+            # Index GiST (employe, période): un chevauchement = une recherche indexée
+            ExclusionConstraint(
+                name=CONTRAINTE_CHEVAUCHEMENT,
+                expressions=[
+                    ('employe_id', RangeOperators.EQUAL),
+                    (periode_demande(), RangeOperators.OVERLAPS),
+                ],
+                condition=models.Q(statut__in=STATUTS_ACTIFS),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.employe_id.full_name} - {self.type_conge_id.nom} ({self.date_debut} à {self.date_fin})"
@@ -96,3 +129,23 @@ class historique_conge(Base_model):
 
     def __str__(self):
         return f"Validation {self.demande_conge_id}"
+
+
+
+# *****************************************************************************************************************
+# JOUR FERIE              JOUR FERIE                      JOUR FERIE              JOUR FERIE       JOUR FERIE
+# *****************************************************************************************************************
+
+class jour_ferie(Base_model):
+    """Jour férié d'un pays (exclu du décompte des jours ouvrés)"""
+    date = models.DateField()
+    libelle = models.CharField(max_length=255)
+    pays = models.CharField(max_length=100, default='Burundi')
+    recurrent = models.BooleanField(default=False)  # même jour et même mois chaque année
+
+    class Meta:
+        unique_together = ['date', 'pays']
+        db_table = 'cg_jour_ferie'
+
+    def __str__(self):
+        return f"{self.date} - {self.libelle} ({self.pays})"
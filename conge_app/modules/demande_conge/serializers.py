@@ -1,10 +1,13 @@
 from rest_framework import serializers
-from conge_app.models import demande_conge
+from conge_app.models import demande_conge, periode_demande, CONTRAINTE_CHEVAUCHEMENT, STATUTS_ACTIFS
+from conge_app.services.working_days import WorkingDayCalendar
 from adrf_flex_fields import FlexFieldsModelSerializer
 from user_app.modules.employe.serializers import J_employeSerializers
 from conge_app.modules.type_conge.serializers import I_type_congeSerializers
 
 class J_demande_congeSerializers(FlexFieldsModelSerializer):
+    # Chemin de lecture compilé (mesuré par benchmark_serializers)
+    compiled_read = True
     employe_id = serializers.PrimaryKeyRelatedField(read_only=True)
     type_conge_id = serializers.PrimaryKeyRelatedField(read_only=True)
     approuve_par_id = serializers.PrimaryKeyRelatedField(read_only=True)
@@ -17,7 +20,61 @@ class J_demande_congeSerializers(FlexFieldsModelSerializer):
           'approuve_par_id': J_employeSerializers,
         }
 
+def demande_chevauchante(employe, debut, fin, exclude_id=None):
+    """Identifiant d'une demande active de l'employé qui chevauche [debut, fin], ou None."""
+    # Même expression que la contrainte d'exclusion: recherche sur l'index GiST
+    chevauchement = demande_conge.objects.alias(periode=periode_demande()).filter(
+        employe_id=employe,
+        statut__in=STATUTS_ACTIFS,
+        periode__overlap=periode_demande(debut, fin),
+    )
+    if exclude_id is not None:
+        chevauchement = chevauchement.exclude(id=exclude_id)
+    return chevauchement.values_list('id', flat=True).first()
+
+
+def chevauchement_error(existante=None):
+    if existante is None:
+        return serializers.ValidationError({'date_debut': "La période chevauche une autre demande de congé"})
+    return serializers.ValidationError({'date_debut': f"La période chevauche la demande de congé {existante}"})
+
+
+def is_chevauchement_violation(exc):
+    """IntegrityError levée par la contrainte d'exclusion (insertion concurrente)."""
+    diag = getattr(exc.__cause__, 'diag', None)
+    return getattr(diag, 'constraint_name', None) == CONTRAINTE_CHEVAUCHEMENT or CONTRAINTE_CHEVAUCHEMENT in str(exc)
+
+
 class I_demande_congeSerializers(FlexFieldsModelSerializer):
     class Meta:
         model=demande_conge
-        fields="__all__"
\ No newline at end of file
+        fields="__all__"
+        # Transitions via les actions approve / reject / cancel (soldes);
+        # nb_jours_total est calculé sur le calendrier des jours ouvrés
+        read_only_fields = ['statut', 'approuve_par_id', 'date_approbation', 'nb_jours_total']
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        # Une demande traitée est imputée sur le solde: seules les demandes
+        # en attente sont modifiables (revérifié sous verrou à l'écriture)
+        if self.instance is not None and self.instance.statut != 'PENDING':
+            raise serializers.ValidationError(
+                {'statut': "Seule une demande en attente peut être modifiée"}
+            )
+        employe = attrs.get('employe_id', getattr(self.instance, 'employe_id', None))
+        debut = attrs.get('date_debut', getattr(self.instance, 'date_debut', None))
+        fin = attrs.get('date_fin', getattr(self.instance, 'date_fin', None))
+        if employe is None or debut is None or fin is None:
+            return attrs
+
+        if fin < debut:
+            raise serializers.ValidationError({'date_fin': "La date de fin précède la date de début"})
+
+        existante = demande_chevauchante(employe, debut, fin, getattr(self.instance, 'id', None))
+        if existante is not None:
+            raise chevauchement_error(existante)
+
+        attrs['nb_jours_total'] = WorkingDayCalendar.count(employe.pays, debut, fin)
+        if attrs['nb_jours_total'] == 0:
+            raise serializers.ValidationError({'date_fin': "La période ne contient aucun jour ouvré"})
+        return attrs
\ No newline at end of file
@@ -1,8 +1,26 @@
+import datetime
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 from conge_app.models import demande_conge
+from conge_app.services import LeaveBalanceService, TeamCalendarService
+from conge_app.services.team_calendar import month_bounds
 from adrf.viewsets import ModelViewSet
-from .serializers import J_demande_congeSerializers, I_demande_congeSerializers
+from user_app.modules.permission.permissions import HasSpecificPermission
+from user_app.modules.permission.services import PermissionService
+from utilities.auth import AsyncJWTAuthentication
+from utilities.response_cache import ConditionalGetMixin
+from adrf_flex_fields.views import FlexFieldsMixin, SerializerMethodMixin
+from .serializers import (
+    J_demande_congeSerializers, I_demande_congeSerializers,
+    chevauchement_error, demande_chevauchante, is_chevauchement_violation,
+)
 
-class demande_congeAPIView(ModelViewSet):
+class demande_congeAPIView(ConditionalGetMixin, FlexFieldsMixin, SerializerMethodMixin, ModelViewSet):
     queryset = demande_conge.objects.all().order_by('-id')
     serializer_class_read = J_demande_congeSerializers
     serializer_class_write = I_demande_congeSerializers
@@ -20,10 +38,143 @@ class demande_congeAPIView(ModelViewSet):
     permit_list_expands = [
     'employe_id',
     'employe_id.poste_id',
-    'employe_id.poste_id.service_id',
+    'employe_id.poste_id.service',
 
     'approuve_par_id',
     'approuve_par_id.poste_id',
-    'approuve_par_id.poste_id.service_id',
+    'approuve_par_id.poste_id.service',
     'type_conge_id'
     ]
+
+    authentication_classes = [AsyncJWTAuthentication]
+
+    # Droit RBAC (matrice compilée) exigé pour approuver ou refuser une demande
+    required_permission = ('leave', 'approve')
+
+    def get_permissions(self):
+        if self.action in ('approve', 'reject'):
+            return [HasSpecificPermission()]
+        if self.action == 'cancel':
+            return [IsAuthenticated()]
+        return super().get_permissions()
+
+    @staticmethod
+    def _is_own(request, demande):
+        """Vrai si la demande appartient à l'employé de l'utilisateur connecté."""
+        employe_id = getattr(request.user, 'employe_id_id', None)
+        return employe_id is not None and employe_id == demande.employe_id_id
+
+    async def _transition(self, request, demande, method, **kwargs):
+        """Applique une transition de statut et la mise à jour du solde associée."""
+        try:
+            result = await sync_to_async(method)(
+                demande.id, commentaire=request.data.get('commentaire', ''), **kwargs
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'success': True, **result})
+
+    async def _decide(self, request, method):
+        """Approbation ou refus: jamais par le demandeur lui-même."""
+        demande = await self.aget_object()
+        if self._is_own(request, demande):
+            return Response(
+                {'error': 'Impossible de traiter sa propre demande de congé'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return await self._transition(
+            request, demande, method, approuve_par_id=request.user.employe_id_id
+        )
+
+    @action(detail=True, methods=['post'])
+    async def approve(self, request, pk=None):
+        """Approuve une demande et impute ses jours sur le solde."""
+        return await self._decide(request, LeaveBalanceService.approve)
+
+    @action(detail=True, methods=['post'])
+    async def reject(self, request, pk=None):
+        """Refuse une demande en attente."""
+        return await self._decide(request, LeaveBalanceService.reject)
+
+    @action(detail=True, methods=['post'])
+    async def cancel(self, request, pk=None):
+        """
+        Annule une demande; les jours d'une demande approuvée sont restitués.
+
+        Réservé au demandeur et aux titulaires du droit d'approbation.
+        """
+        demande = await self.aget_object()
+        if not self._is_own(request, demande) and not await PermissionService.check_permission(
+            request.user, *self.required_permission
+        ):
+            return Response(
+                {'error': "Vous n'avez pas le droit d'annuler cette demande"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return await self._transition(request, demande, LeaveBalanceService.cancel)
+
+    @action(detail=False, methods=['get'])
+    async def calendar(self, request):
+        """
+        Absences approuvées d'un service ou d'un groupe, par jour.
+
+        Paramètres: service ou group, date_debut et date_fin (mois en cours
+        par défaut).
+        """
+        scope = 'service' if 'service' in request.query_params else 'group'
+        try:
+            scope_id = int(request.query_params[scope])
+            today = datetime.date.today()
+            debut, fin = month_bounds(today.year, today.month)
+            if 'date_debut' in request.query_params:
+                debut = datetime.date.fromisoformat(request.query_params['date_debut'])
+            if 'date_fin' in request.query_params:
+                fin = datetime.date.fromisoformat(request.query_params['date_fin'])
+        except KeyError:
+            return Response({'error': 'Paramètre service ou group requis'}, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError:
+            return Response({'error': 'Paramètres invalides (dates au format AAAA-MM-JJ)'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            data = await sync_to_async(TeamCalendarService.absences)(scope, scope_id, debut, fin)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(data)
+
+    @staticmethod
+    def _save(serializer, pending_only=False):
+        """
+        Enregistre la demande; un chevauchement inséré en concurrence depuis
+        la validation (contrainte d'exclusion) donne la même erreur 400.
+        """
+        try:
+            with transaction.atomic():
+                if pending_only:
+                    try:
+                        LeaveBalanceService.lock_pending(serializer.instance.id)
+                    except ValueError as e:
+                        raise serializers.ValidationError({'statut': str(e)}) from e
+                serializer.save()
+        except IntegrityError as e:
+            if not is_chevauchement_violation(e):
+                raise
+            data = serializer.validated_data
+            instance = serializer.instance
+            existante = demande_chevauchante(
+                data.get('employe_id', getattr(instance, 'employe_id', None)),
+                data.get('date_debut', getattr(instance, 'date_debut', None)),
+                data.get('date_fin', getattr(instance, 'date_fin', None)),
+                getattr(instance, 'id', None),
+            )
+            raise chevauchement_error(existante) from e
+
+    async def perform_acreate(self, serializer):
+        await sync_to_async(self._save)(serializer)
+
+    async def perform_aupdate(self, serializer):
+        # Seule une demande en attente est modifiable (verrou sur la ligne)
+        await sync_to_async(self._save)(serializer, pending_only=True)
+
+    async def perform_adestroy(self, instance):
+        # Restitution au solde et suppression dans une seule transaction
+        await sync_to_async(LeaveBalanceService.delete)(instance.id)
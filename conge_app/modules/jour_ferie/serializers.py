@@ -0,0 +1,7 @@
+from conge_app.models import jour_ferie
+from adrf_flex_fields import FlexFieldsModelSerializer
+
+class I_jour_ferieSerializers(FlexFieldsModelSerializer):
+    class Meta:
+        model=jour_ferie
+        fields="__all__"
@@ -0,0 +1,10 @@
+from conge_app.models import jour_ferie
+from .serializers import I_jour_ferieSerializers
+from adrf.viewsets import ModelViewSet
+from utilities.response_cache import CachedListMixin, ConditionalGetMixin
+
+class jour_ferieAPIView(ConditionalGetMixin, CachedListMixin, ModelViewSet):
+    queryset = jour_ferie.objects.all().order_by('date')
+    serializer_class = I_jour_ferieSerializers
+    filterset_fields = ['pays', 'recurrent']
+    cache_list = True
@@ -5,6 +5,8 @@ from user_app.modules.employe.serializers import J_employeSerializers
 from conge_app.modules.type_conge.serializers import I_type_congeSerializers
 
 class J_solde_congeSerializers(FlexFieldsModelSerializer):
+    # Chemin de lecture compilé (mesuré par benchmark_serializers)
+    compiled_read = True
     employe_id = serializers.PrimaryKeyRelatedField(read_only=True)
     type_conge_id = serializers.PrimaryKeyRelatedField(read_only=True)
     class Meta:
@@ -18,4 +20,15 @@ class J_solde_congeSerializers(FlexFieldsModelSerializer):
 class I_solde_congeSerializers(FlexFieldsModelSerializer):
     class Meta:
         model=solde_conge
-        fields="__all__"
\ No newline at end of file
+        fields="__all__"
+        # Maintenus par conge_app.services.leave_balance
+        read_only_fields = ['utilise', 'restant', 'reporte']
+
+    def validate(self, attrs):
+        """Le restant suit l'allocation saisie: alloue + reporte - utilise."""
+        attrs = super().validate(attrs)
+        if 'alloue' in attrs:
+            reporte = self.instance.reporte if self.instance else 0
+            utilise = self.instance.utilise if self.instance else 0
+            attrs['restant'] = attrs['alloue'] + reporte - utilise
+        return attrs
\ No newline at end of file
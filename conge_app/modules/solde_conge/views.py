@@ -1,8 +1,10 @@
 from conge_app.models import solde_conge
 from adrf.viewsets import ModelViewSet
+from utilities.response_cache import ConditionalGetMixin
+from adrf_flex_fields.views import FlexFieldsMixin, SerializerMethodMixin
 from .serializers import J_solde_congeSerializers, I_solde_congeSerializers
 
-class solde_congeAPIView(ModelViewSet):
+class solde_congeAPIView(ConditionalGetMixin, FlexFieldsMixin, SerializerMethodMixin, ModelViewSet):
     queryset = solde_conge.objects.all().order_by('-id')
     serializer_class_read = J_solde_congeSerializers
     serializer_class_write = I_solde_congeSerializers
@@ -16,6 +18,6 @@ class solde_congeAPIView(ModelViewSet):
     permit_list_expands = [
     'employe_id',
     'employe_id.poste_id',
-    'employe_id.poste_id.service_id',
+    'employe_id.poste_id.service',
     'type_conge_id'
     ]
@@ -1,8 +1,10 @@
 from conge_app.models import type_conge
 from .serializers import I_type_congeSerializers
 from adrf.viewsets import ModelViewSet
+from utilities.response_cache import CachedListMixin, ConditionalGetMixin
 
-class type_congeAPIView(ModelViewSet):
+class type_congeAPIView(ConditionalGetMixin, CachedListMixin, ModelViewSet):
     queryset = type_conge.objects.all().order_by('-id')
     serializer_class = I_type_congeSerializers
+    cache_list = True
 
@@ -0,0 +1,12 @@
+"""
+Services métier pour la gestion des congés.
+"""
+from .leave_balance import LeaveBalanceService
+from .team_calendar import TeamCalendarService
+from .working_days import WorkingDayCalendar
+
+__all__ = [
+    'LeaveBalanceService',
+    'TeamCalendarService',
+    'WorkingDayCalendar',
+]
@@ -0,0 +1,287 @@
+"""
+Moteur de soldes de congé.
+
+Les soldes (solde_conge) sont matérialisés: une ligne par employé, type de
+congé et année, lue en O(1). Ils sont dérivés des demandes approuvées et
+des règles du type de congé (nb_jours_max_par_an, report_autorise):
+
+- alloue  = nb_jours_max_par_an du type à la création de la ligne;
+- reporte = jours restants de l'année précédente si le report est autorisé;
+- utilise = somme des nb_jours_total des demandes approuvées de l'année;
+- restant = alloue + reporte - utilise.
+
+Chaque approbation ou annulation met à jour la ligne du solde de façon
+incrémentale (F()) dans la même transaction que le changement de statut.
+Une demande est imputée sur l'année de sa date de début. Le report annuel
+est calculé pour tous les employés en une seule requête SQL.
+"""
+import logging
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from conge_app.models import demande_conge, historique_conge, solde_conge, type_conge
+from user_app.models import employe
+from utilities.resource_versions import ResourceVersions
+
+logger = logging.getLogger('paie_app.services')
+
+LEAVE_BALANCE = {
+    'MAX_CARRY_OVER': None,
+    'ALLOW_NEGATIVE': False,
+    **getattr(settings, 'LEAVE_BALANCE', {}),
+}
+
+SOLDE_RESOURCE = 'conge_app.solde_conge'
+
+
+def solde_as_dict(solde: solde_conge) -> Dict:
+    return {
+        'id': solde.id,
+        'annee': solde.annee,
+        'alloue': solde.alloue,
+        'utilise': solde.utilise,
+        'restant': solde.restant,
+        'reporte': solde.reporte,
+    }
+
+
+class LeaveBalanceService:
+    """Service de calcul et de maintenance des soldes de congé"""
+
+    # ------------------------------------------------------------------
+    # Lecture / initialisation
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def get_balance(cls, employe_id: int, type_conge_id: int, annee: int) -> solde_conge:
+        """
+        Retourne le solde de l'année, créé à partir du type de congé s'il
+        n'existe pas encore (le report est renseigné par le rollover).
+        """
+        solde = solde_conge.objects.filter(
+            employe_id_id=employe_id, type_conge_id_id=type_conge_id, annee=annee
+        ).first()
+        if solde is not None:
+            return solde
+
+        allocation = type_conge.objects.values_list('nb_jours_max_par_an', flat=True).get(id=type_conge_id)
+        solde, _ = solde_conge.objects.get_or_create(
+            employe_id_id=employe_id,
+            type_conge_id_id=type_conge_id,
+            annee=annee,
+            defaults={'alloue': allocation, 'restant': allocation},
+        )
+        return solde
+
+    @classmethod
+    def _lock_balance(cls, demande: demande_conge) -> solde_conge:
+        solde = cls.get_balance(demande.employe_id_id, demande.type_conge_id_id, demande.date_debut.year)
+        return solde_conge.objects.select_for_update().get(id=solde.id)
+
+    @classmethod
+    def _lock_demande(cls, demande_id: int) -> demande_conge:
+        try:
+            return demande_conge.objects.select_for_update().get(id=demande_id)
+        except demande_conge.DoesNotExist as e:
+            raise ValueError(f"Demande de congé {demande_id} non trouvée") from e
+
+    @classmethod
+    def _apply(cls, solde: solde_conge, jours: int) -> solde_conge:
+        """Impute (jours > 0) ou restitue (jours < 0) des jours sur un solde verrouillé."""
+        solde_conge.objects.filter(id=solde.id).update(
+            utilise=F('utilise') + jours,
+            restant=F('restant') - jours,
+            updated_at=timezone.now(),
+        )
+        # update() ne déclenche pas post_save
+        ResourceVersions.bump_for_write(SOLDE_RESOURCE)
+        solde.refresh_from_db(fields=['utilise', 'restant', 'updated_at'])
+        return solde
+
+    # ------------------------------------------------------------------
+    # Transitions de statut
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def approve(cls, demande_id: int, approuve_par_id: Optional[int] = None, commentaire: str = '') -> Dict:
+        """
+        Approuve une demande en attente et impute ses jours sur le solde,
+        dans la même transaction.
+        """
+        with transaction.atomic():
+            demande = cls._lock_demande(demande_id)
+            if demande.statut != 'PENDING':
+                raise ValueError("Seule une demande en attente peut être approuvée")
+
+            solde = cls._lock_balance(demande)
+            limite = type_conge.objects.values_list('nb_jours_max_par_an', flat=True).get(id=demande.type_conge_id_id)
+            if limite and not LEAVE_BALANCE['ALLOW_NEGATIVE'] and solde.restant < demande.nb_jours_total:
+                raise ValueError(
+                    f"Solde insuffisant: {solde.restant} jour(s) restant(s), {demande.nb_jours_total} demandé(s)"
+                )
+
+            demande.statut = 'APPROVED'
+            demande.approuve_par_id_id = approuve_par_id
+            demande.date_approbation = timezone.now()
+            demande.save(update_fields=['statut', 'approuve_par_id', 'date_approbation', 'updated_at'])
+
+            cls._apply(solde, demande.nb_jours_total)
+            cls._record_history(demande, approuve_par_id, commentaire)
+
+        logger.info(f"✅ Demande de congé {demande_id} approuvée ({demande.nb_jours_total} jour(s))")
+        return {'demande_id': demande.id, 'statut': demande.statut, 'solde': solde_as_dict(solde)}
+
+    @classmethod
+    def cancel(cls, demande_id: int, commentaire: str = '') -> Dict:
+        """
+        Annule une demande en attente ou approuvée; les jours d'une demande
+        approuvée sont restitués au solde dans la même transaction.
+        """
+        with transaction.atomic():
+            demande = cls._lock_demande(demande_id)
+            if demande.statut not in ('PENDING', 'APPROVED'):
+                raise ValueError("Seule une demande en attente ou approuvée peut être annulée")
+
+            solde = None
+            if demande.statut == 'APPROVED':
+                solde = cls._apply(cls._lock_balance(demande), -demande.nb_jours_total)
+
+            demande.statut = 'CANCELLED'
+            demande.save(update_fields=['statut', 'updated_at'])
+            cls._record_history(demande, None, commentaire)
+
+        logger.info(f"✅ Demande de congé {demande_id} annulée")
+        return {
+            'demande_id': demande.id,
+            'statut': demande.statut,
+            'solde': solde_as_dict(solde) if solde is not None else None,
+        }
+
+    @classmethod
+    def reject(cls, demande_id: int, approuve_par_id: Optional[int] = None, commentaire: str = '') -> Dict:
+        """Refuse une demande en attente (le solde n'est pas modifié)."""
+        with transaction.atomic():
+            demande = cls._lock_demande(demande_id)
+            if demande.statut != 'PENDING':
+                raise ValueError("Seule une demande en attente peut être refusée")
+
+            demande.statut = 'REJECTED'
+            demande.save(update_fields=['statut', 'updated_at'])
+            cls._record_history(demande, approuve_par_id, commentaire)
+
+        logger.info(f"✅ Demande de congé {demande_id} refusée")
+        return {'demande_id': demande.id, 'statut': demande.statut, 'solde': None}
+
+    @classmethod
+    def lock_pending(cls, demande_id: int) -> demande_conge:
+        """
+        Verrouille une demande avant sa modification, dans la transaction de
+        l'appelant: seule une demande en attente (non imputée) est modifiable.
+        """
+        demande = cls._lock_demande(demande_id)
+        if demande.statut != 'PENDING':
+            raise ValueError("Seule une demande en attente peut être modifiée")
+        return demande
+
+    @classmethod
+    def delete(cls, demande_id: int) -> None:
+        """
+        Supprime une demande; les jours d'une demande approuvée sont restitués
+        au solde dans la même transaction.
+        """
+        with transaction.atomic():
+            demande = cls._lock_demande(demande_id)
+            if demande.statut == 'APPROVED':
+                cls.cancel(demande_id)
+                demande.refresh_from_db(fields=['statut', 'updated_at'])
+            demande.delete()
+
+        logger.info(f"✅ Demande de congé {demande_id} supprimée")
+
+    @classmethod
+    def _record_history(cls, demande: demande_conge, employe_id: Optional[int], commentaire: str) -> None:
+        poste_id = None
+        if employe_id is not None:
+            poste_id = employe.objects.filter(id=employe_id).values_list('poste_id', flat=True).first()
+        historique_conge.objects.create(
+            demande_conge_id=demande,
+            poste_valideur_id_id=poste_id,
+            commentaire=commentaire or f"Statut: {demande.statut}",
+        )
+
+    # ------------------------------------------------------------------
+    # Recalcul et report annuel
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def recompute(cls, employe_id: int, type_conge_id: int, annee: int) -> solde_conge:
+        """
+        Recalcule un solde à partir des demandes approuvées (réparation
+        d'un solde modifié hors du moteur).
+        """
+        with transaction.atomic():
+            solde = cls.get_balance(employe_id, type_conge_id, annee)
+            solde = solde_conge.objects.select_for_update().get(id=solde.id)
+            utilise = demande_conge.objects.filter(
+                employe_id_id=employe_id,
+                type_conge_id_id=type_conge_id,
+                statut='APPROVED',
+                date_debut__year=annee,
+            ).aggregate(total=Sum('nb_jours_total'))['total'] or 0
+
+            solde.utilise = utilise
+            solde.restant = solde.alloue + solde.reporte - utilise
+            solde.save(update_fields=['utilise', 'restant', 'updated_at'])
+        return solde
+
+    @classmethod
+    def rollover(cls, annee: int) -> int:
+        """
+        Ouvre les soldes de l'année annee + 1 pour tous les employés actifs
+        et tous les types de congé, avec le report des jours restants de
+        l'année annee (types avec report_autorise, plafonné par
+        MAX_CARRY_OVER).
+
+        Une seule instruction INSERT ... SELECT ... ON CONFLICT: les soldes
+        déjà ouverts (demandes approuvées avant le rollover) gardent leurs
+        jours utilisés; rejouer le rollover est idempotent.
+
+        Returns:
+            Nombre de soldes créés ou mis à jour
+        """
+        report = 'GREATEST(COALESCE(s.restant, 0), 0)'
+        params = {'annee': annee, 'suivante': annee + 1}
+        if LEAVE_BALANCE['MAX_CARRY_OVER'] is not None:
+            report = f'LEAST({report}, %(plafond)s)'
+            params['plafond'] = LEAVE_BALANCE['MAX_CARRY_OVER']
+
+        sql = f"""
+            INSERT INTO {solde_conge._meta.db_table}
+                (employe_id_id, type_conge_id_id, annee, alloue, utilise, restant, reporte, created_at, updated_at)
+            SELECT
+                e.id, t.id, %(suivante)s, t.nb_jours_max_par_an, 0,
+                t.nb_jours_max_par_an + r.reporte, r.reporte, NOW(), NOW()
+            FROM {employe._meta.db_table} e
+            CROSS JOIN {type_conge._meta.db_table} t
+            LEFT JOIN {solde_conge._meta.db_table} s
+                ON s.employe_id_id = e.id AND s.type_conge_id_id = t.id AND s.annee = %(annee)s
+            CROSS JOIN LATERAL (
+                SELECT CASE WHEN t.report_autorise THEN {report} ELSE 0 END AS reporte
+            ) r
+            WHERE e.statut_emploi = 'ACTIVE'
+            ON CONFLICT (employe_id_id, type_conge_id_id, annee) DO UPDATE SET
+                reporte = EXCLUDED.reporte,
+                restant = {solde_conge._meta.db_table}.alloue + EXCLUDED.reporte - {solde_conge._meta.db_table}.utilise,
+                updated_at = NOW()
+        """
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            count = cursor.rowcount
+            ResourceVersions.bump_for_write(SOLDE_RESOURCE)
+
+        logger.info(f"✅ Report des soldes de congé {annee} -> {annee + 1}: {count} solde(s)")
+        return count
@@ -0,0 +1,241 @@
+"""
+Calendrier des absences d'une équipe (service ou groupe).
+
+Pour une période, retourne une matrice compacte employé x jour construite à
+partir des demandes approuvées, sans sérialiser les fiches employés:
+
+    {
+        "date_debut": "2025-03-01", "date_fin": "2025-03-31", "nb_jours": 31,
+        "types": ["CA", "CM"],
+        "employes": [{"id": 7, "nom": "Doe", "prenom": "John", "jours": [0, 0, 1, 1, ...]}],
+        "absents_par_jour": [0, 0, 1, 1, ...]
+    }
+
+où ``jours[i]`` vaut 0 (présent) ou le rang (à partir de 1) du code du
+type de congé dans ``types``.
+
+Les absences sont lues par mois: les mois absents du cache sont chargés
+ensemble par une seule requête de plage (index statut, date_debut,
+date_fin), puis mis en cache par (portée, mois) sous la version de la
+portée et celles des référentiels (utilities.resource_versions).
+
+La version d'une portée (un service, un groupe) n'est incrémentée que par
+les écritures qui la concernent: demande approuvée ou annulée d'un de ses
+employés, modification d'un de ses employés (nom, changement de poste).
+Une approbation dans un service n'invalide donc pas les calendriers des
+autres services.
+"""
+import datetime
+import logging
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from conge_app.models import demande_conge
+from user_app.models import ServiceGroup, employe
+from utilities.resource_versions import ResourceVersions
+
+logger = logging.getLogger('paie_app.services')
+
+TEAM_CALENDAR = {
+    'MAX_DAYS': 366,
+    'CACHE_TTL': 3600,
+    **getattr(settings, 'TEAM_CALENDAR', {}),
+}
+
+SCOPES = {
+    'service': 'employe_id__poste_id__service',
+    'group': 'employe_id__poste_id__group',
+}
+
+# Référentiels lus (écritures rares): toute écriture change les clés du cache
+CALENDAR_RESOURCES = (
+    'conge_app.type_conge',
+    'user_app.servicegroup',
+)
+
+# Statuts d'une demande dont l'écriture modifie le calendrier (l'annulation
+# retire une demande approuvée)
+CALENDAR_STATUTS = ('APPROVED', 'CANCELLED')
+
+Absence = Tuple[int, str, str, str, datetime.date, datetime.date]
+
+
+def scope_label(scope: str, scope_id) -> str:
+    """Ressource versionnée d'une portée (service ou groupe)."""
+    return f"conge_app.calendar.{scope}:{scope_id}"
+
+
+def _scope_labels(rows) -> List[str]:
+    labels = set()
+    for service_id, group_id in rows:
+        if service_id is not None:
+            labels.add(scope_label('service', service_id))
+        if group_id is not None:
+            labels.add(scope_label('group', group_id))
+    return sorted(labels)
+
+
+def month_bounds(annee: int, mois: int) -> Tuple[datetime.date, datetime.date]:
+    debut = datetime.date(annee, mois, 1)
+    suivant = datetime.date(annee + mois // 12, mois % 12 + 1, 1)
+    return debut, suivant - datetime.timedelta(days=1)
+
+
+def months_between(debut: datetime.date, fin: datetime.date) -> List[Tuple[int, int]]:
+    months = []
+    annee, mois = debut.year, debut.month
+    while (annee, mois) <= (fin.year, fin.month):
+        months.append((annee, mois))
+        annee, mois = annee + mois // 12, mois % 12 + 1
+    return months
+
+
+class TeamCalendarService:
+    """Service de calcul du calendrier des absences d'une équipe"""
+
+    @classmethod
+    def _load(cls, scope: str, scope_id: int, debut: datetime.date, fin: datetime.date) -> List[Absence]:
+        """Demandes approuvées de la portée qui recoupent [debut, fin]: une requête."""
+        return list(
+            demande_conge.objects.filter(
+                statut='APPROVED',
+                date_debut__lte=fin,
+                date_fin__gte=debut,
+                **{SCOPES[scope]: scope_id},
+            ).order_by(
+                'employe_id__nom', 'employe_id__prenom', 'employe_id', 'date_debut'
+            ).values_list(
+                'employe_id', 'employe_id__nom', 'employe_id__prenom',
+                'type_conge_id__code', 'date_debut', 'date_fin',
+            )
+        )
+
+    @classmethod
+    def invalidate_employes(cls, *employe_ids: int) -> None:
+        """Invalide les calendriers du service et du groupe des employés."""
+        rows = employe.objects.filter(id__in=employe_ids).values_list(
+            'poste_id__service_id', 'poste_id__group_id'
+        )
+        ResourceVersions.bump_for_write(*_scope_labels(rows))
+
+    @classmethod
+    def invalidate_postes(cls, *poste_ids: int) -> None:
+        """Invalide les calendriers du service et du groupe des postes."""
+        rows = ServiceGroup.objects.filter(id__in=poste_ids).values_list('service_id', 'group_id')
+        ResourceVersions.bump_for_write(*_scope_labels(rows))
+
+    @classmethod
+    def _absences_by_month(cls, scope: str, scope_id: int, months: List[Tuple[int, int]]) -> Dict:
+        labels = (*CALENDAR_RESOURCES, scope_label(scope, scope_id))
+        versions = ResourceVersions.get_many(labels)
+        suffix = ':'.join(str(versions[label]) for label in labels)
+        keys = {month: f"calendar:absences:{scope}:{scope_id}:{month[0]}-{month[1]:02d}:{suffix}" for month in months}
+
+        try:
+            found = cache.get_many(list(keys.values()))
+        except Exception as e:
+            logger.error(f"❌ Calendrier d'équipe {scope} {scope_id}: lecture du cache impossible ({e})")
+            found = {}
+        by_month = {month: found[key] for month, key in keys.items() if key in found}
+
+        missing = [month for month in months if month not in by_month]
+        if missing:
+            debut, _ = month_bounds(*missing[0])
+            _, fin = month_bounds(*missing[-1])
+            rows = cls._load(scope, scope_id, debut, fin)
+            for month in missing:
+                premier, dernier = month_bounds(*month)
+                by_month[month] = [row for row in rows if row[4] <= dernier and row[5] >= premier]
+            try:
+                cache.set_many({keys[month]: by_month[month] for month in missing}, TEAM_CALENDAR['CACHE_TTL'])
+            except Exception as e:
+                logger.error(f"❌ Calendrier d'équipe {scope} {scope_id}: écriture du cache impossible ({e})")
+        return by_month
+
+    @classmethod
+    def absences(cls, scope: str, scope_id: int, debut: datetime.date, fin: datetime.date) -> Dict:
+        """
+        Matrice des absences approuvées d'un service ou d'un groupe.
+
+        Raises:
+            ValueError: portée inconnue ou période invalide
+        """
+        if scope not in SCOPES:
+            raise ValueError(f"Portée inconnue: {scope} (service ou group)")
+        if fin < debut:
+            raise ValueError("La date de fin précède la date de début")
+        nb_jours = (fin - debut).days + 1
+        if nb_jours > TEAM_CALENDAR['MAX_DAYS']:
+            raise ValueError(f"Période limitée à {TEAM_CALENDAR['MAX_DAYS']} jours")
+
+        by_month = cls._absences_by_month(scope, scope_id, months_between(debut, fin))
+
+        types: List[str] = []
+        employes: Dict[int, Dict] = {}
+        absents = [0] * nb_jours
+        seen = set()
+        for rows in by_month.values():
+            for row in rows:
+                # Une demande sur plusieurs mois figure dans chacun d'eux
+                if row in seen:
+                    continue
+                seen.add(row)
+                employe_id, nom, prenom, code, date_debut, date_fin = row
+                if date_debut > fin or date_fin < debut:
+                    continue
+                if code not in types:
+                    types.append(code)
+                entry = employes.setdefault(
+                    employe_id, {'id': employe_id, 'nom': nom, 'prenom': prenom, 'jours': [0] * nb_jours}
+                )
+                rang = types.index(code) + 1
+                jours = entry['jours']
+                for index in range((max(date_debut, debut) - debut).days, (min(date_fin, fin) - debut).days + 1):
+                    if not jours[index]:
+                        absents[index] += 1
+                    jours[index] = rang
+
+        return {
+            'date_debut': debut.isoformat(),
+            'date_fin': fin.isoformat(),
+            'nb_jours': nb_jours,
+            'types': types,
+            'employes': sorted(employes.values(), key=lambda entry: (entry['nom'], entry['prenom'], entry['id'])),
+            'absents_par_jour': absents,
+        }
+
+
+# ----------------------------------------------------------------------
+# Receveurs (connectés dans conge_app.apps)
+# ----------------------------------------------------------------------
+
+def on_demande_change(sender, instance, raw=False, **kwargs) -> None:
+    """post_save / post_delete de demande_conge: seules les absences approuvées comptent."""
+    if raw or instance.statut not in CALENDAR_STATUTS:
+        return
+    try:
+        TeamCalendarService.invalidate_employes(instance.employe_id_id)
+    except Exception as e:
+        logger.error(f"❌ Calendrier d'équipe: invalidation impossible ({e})")
+
+
+def remember_poste(sender, instance, raw=False, **kwargs) -> None:
+    """pre_save de employe: poste avant modification (changement de service)."""
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._calendar_poste_id = employe.objects.filter(pk=instance.pk).values_list('poste_id', flat=True).first()
+
+
+def on_employe_change(sender, instance, raw=False, **kwargs) -> None:
+    """post_save / post_delete de employe: portées de l'ancien et du nouveau poste."""
+    if raw:
+        return
+    postes = {instance.poste_id_id, getattr(instance, '_calendar_poste_id', None)} - {None}
+    if not postes:
+        return
+    try:
+        TeamCalendarService.invalidate_postes(*postes)
+    except Exception as e:
+        logger.error(f"❌ Calendrier d'équipe: invalidation impossible ({e})")
@@ -0,0 +1,164 @@
+"""
+Calendrier des jours ouvrés par pays et par année.
+
+Chaque (pays, année) est précalculé une fois: un bitmap compact des jours
+ouvrés (un bit par jour, 46 octets par an; hors week-end et jours fériés
+de jour_ferie) et le cumul des jours ouvrés depuis le 1er janvier. Le
+nombre de jours ouvrés entre deux dates est alors une soustraction de deux
+cumuls, en O(1) par année couverte.
+
+Les calendriers sont gardés en mémoire du processus (L1) et leur bitmap
+dans Redis (L2), sous une clé qui inclut la version de jour_ferie
+(utilities.resource_versions): un jour férié ajouté ou supprimé invalide
+les calendriers de tous les processus après au plus L1_TTL secondes.
+"""
+import datetime
+import logging
+from array import array
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from conge_app.models import jour_ferie
+from utilities.auth_cache import LocalTTLCache
+from utilities.resource_versions import ResourceVersions
+
+logger = logging.getLogger('paie_app.services')
+
+WORKING_CALENDAR = {
+    'DEFAULT_COUNTRY': 'Burundi',
+    'WEEKEND': (5, 6),          # datetime.weekday(): samedi, dimanche
+    'L1_TTL': 300,
+    'L1_MAX_ENTRIES': 256,
+    'L2_TTL': 30 * 24 * 3600,
+    **getattr(settings, 'WORKING_CALENDAR', {}),
+}
+
+HOLIDAY_RESOURCE = 'conge_app.jour_ferie'
+
+_calendars = LocalTTLCache(WORKING_CALENDAR['L1_TTL'], WORKING_CALENDAR['L1_MAX_ENTRIES'])
+
+
+def normalize_country(pays: Optional[str]) -> str:
+    return (pays or WORKING_CALENDAR['DEFAULT_COUNTRY']).strip().lower()
+
+
+class YearCalendar:
+    """Jours ouvrés d'une année: bitmap et cumul (index 0 = 1er janvier)."""
+
+    __slots__ = ('annee', 'bitmap', 'cumul')
+
+    def __init__(self, annee: int, bitmap: bytes):
+        self.annee = annee
+        self.bitmap = bitmap
+        days = (datetime.date(annee + 1, 1, 1) - datetime.date(annee, 1, 1)).days
+        cumul = array('H', [0]) * (days + 1)
+        for index in range(days):
+            cumul[index + 1] = cumul[index] + ((bitmap[index >> 3] >> (index & 7)) & 1)
+        self.cumul = cumul
+
+    def _index(self, jour: datetime.date) -> int:
+        return jour.timetuple().tm_yday - 1
+
+    def is_working_day(self, jour: datetime.date) -> bool:
+        index = self._index(jour)
+        return bool((self.bitmap[index >> 3] >> (index & 7)) & 1)
+
+    def count(self, debut: datetime.date, fin: datetime.date) -> int:
+        """Jours ouvrés de debut à fin inclus (dates de la même année)."""
+        return self.cumul[self._index(fin) + 1] - self.cumul[self._index(debut)]
+
+    @property
+    def total(self) -> int:
+        return self.cumul[-1]
+
+
+def build_bitmap(pays: str, annee: int) -> bytes:
+    """Bitmap des jours ouvrés d'une année: une requête sur jour_ferie."""
+    premier = datetime.date(annee, 1, 1)
+    days = (datetime.date(annee + 1, 1, 1) - premier).days
+    weekend = set(WORKING_CALENDAR['WEEKEND'])
+
+    feries = set()
+    rows = jour_ferie.objects.filter(pays__iexact=pays).filter(
+        Q(date__year=annee) | Q(recurrent=True)
+    ).values_list('date', 'recurrent')
+    for date, recurrent in rows:
+        if recurrent and date.year != annee:
+            try:
+                date = date.replace(year=annee)
+            except ValueError:  # 29 février d'une année non bissextile
+                continue
+        feries.add(date)
+
+    bitmap = bytearray((days + 7) // 8)
+    for index in range(days):
+        jour = premier + datetime.timedelta(days=index)
+        if jour.weekday() not in weekend and jour not in feries:
+            bitmap[index >> 3] |= 1 << (index & 7)
+    return bytes(bitmap)
+
+
+class WorkingDayCalendar:
+    """Décompte des jours ouvrés par pays (calendriers précalculés par année)"""
+
+    @classmethod
+    def year(cls, pays: Optional[str], annee: int) -> YearCalendar:
+        pays = normalize_country(pays)
+        calendar = _calendars.get((pays, annee))
+        if calendar is not None:
+            return calendar
+
+        version = ResourceVersions.get_many([HOLIDAY_RESOURCE])[HOLIDAY_RESOURCE]
+        key = f"calendar:workdays:{pays}:{annee}:v{version}"
+        bitmap = None
+        try:
+            bitmap = cache.get(key)
+        except Exception as e:
+            logger.error(f"❌ Calendrier {pays} {annee}: lecture du cache impossible ({e})")
+        if bitmap is None:
+            bitmap = build_bitmap(pays, annee)
+            try:
+                cache.set(key, bitmap, WORKING_CALENDAR['L2_TTL'])
+            except Exception as e:
+                logger.error(f"❌ Calendrier {pays} {annee}: écriture du cache impossible ({e})")
+
+        calendar = YearCalendar(annee, bitmap)
+        _calendars.set((pays, annee), calendar)
+        return calendar
+
+    @classmethod
+    def count(cls, pays: Optional[str], debut: datetime.date, fin: datetime.date) -> int:
+        """Nombre de jours ouvrés entre debut et fin inclus."""
+        if fin < debut:
+            return 0
+        total = 0
+        for annee in range(debut.year, fin.year + 1):
+            total += cls.year(pays, annee).count(
+                max(debut, datetime.date(annee, 1, 1)),
+                min(fin, datetime.date(annee, 12, 31)),
+            )
+        return total
+
+    @classmethod
+    def is_working_day(cls, pays: Optional[str], jour: datetime.date) -> bool:
+        return cls.year(pays, jour.year).is_working_day(jour)
+
+
+def clear_calendars(sender=None, **kwargs) -> None:
+    """Vide le niveau mémoire (écriture sur jour_ferie, tests)."""
+    _calendars.clear()
+
+
+def ensure_btree_gist_extension(sender=None, using='default', **kwargs) -> None:
+    """Receveur pre_migrate: installe btree_gist (égalité sur employe_id dans
+    la contrainte d'exclusion des demandes de congé)."""
+    from django.db import connections
+
+    target = connections[using]
+    if target.vendor != 'postgresql':
+        return
+    with target.cursor() as cursor:
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
@@ -0,0 +1,33 @@
+"""
+Tâches Celery pour la gestion des congés.
+"""
+from celery import shared_task
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True)
+def rollover_leave_balances(self, annee=None):
+    """
+    Ouvre les soldes de congé de l'année avec le report de l'année
+    précédente (planifiée le 1er janvier par celery beat).
+
+    Args:
+        annee: Année clôturée (par défaut l'année précédente)
+    """
+    annee = annee or timezone.now().year - 1
+    try:
+        from conge_app.services.leave_balance import LeaveBalanceService
+
+        count = LeaveBalanceService.rollover(annee)
+        return {
+            'status': 'success',
+            'annee': annee,
+            'soldes': count
+        }
+
+    except Exception as exc:
+        logger.error(f"Error rolling over leave balances for {annee}: {exc}")
+        raise self.retry(exc=exc, countdown=300)
@@ -0,0 +1,3 @@
+"""
+Tests pour la gestion des congés.
+"""
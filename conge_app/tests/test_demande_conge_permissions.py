@@ -0,0 +1,118 @@
+"""
+Tests des contrôles d'accès sur l'approbation, le refus et l'annulation des demandes de congé.
+"""
+import datetime
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from user_app.models import Group, GroupPermission, Permission, UserGroup, employe
+from user_app.modules.permission.matrix import PermissionMatrix
+from conge_app.models import demande_conge, type_conge
+from utilities.jwt_utils import generate_token
+
+User = get_user_model()
+
+
+def _employe(nom, numero):
+    return employe.objects.create(
+        nom=nom,
+        prenom='John',
+        date_naissance='1990-01-01',
+        sexe='M',
+        statut_matrimonial='S',
+        nationalite='Burundaise',
+        banque='Test Bank',
+        numero_compte=f'12345{numero}',
+        niveau_etude='Universitaire',
+        numero_inss=f'INSS{numero}',
+        email_personnel=f'{nom.lower()}@example.com',
+        telephone_personnel=f'+2577900000{numero}',
+        adresse_ligne1='123 Test Street',
+        ville='Bujumbura',
+        province='Bujumbura',
+        pays='Burundi',
+        date_embauche='2020-01-01',
+    )
+
+
+@pytest.mark.django_db
+class TestDemandeCongePermissions(TestCase):
+    """Tests des permissions des transitions de statut"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.demandeur = _employe('Doe', 1)
+        self.chef = _employe('Ndayishimiye', 2)
+        self.demandeur_user = User.objects.create_user(
+            email='demandeur@example.com', password='testpass123', employe_id=self.demandeur
+        )
+        self.chef_user = User.objects.create_user(
+            email='chef@example.com', password='testpass123', employe_id=self.chef
+        )
+        self.autre_user = User.objects.create_user(email='autre@example.com', password='testpass123')
+
+        approve = Permission.objects.create(
+            codename='leave.approve', name='Approve Leave',
+            content_type=ContentType.objects.get_for_model(demande_conge),
+            resource='leave', action='UPDATE'
+        )
+        groupe = Group.objects.create(code='CS', name='Chef de service')
+        GroupPermission.objects.create(group=groupe, permission=approve)
+        UserGroup.objects.create(user=self.chef_user, group=groupe)
+        UserGroup.objects.create(user=self.demandeur_user, group=groupe)
+        PermissionMatrix.invalidate()
+
+        annuel = type_conge.objects.create(nom='Congé annuel', code='CA', nb_jours_max_par_an=20)
+        self.demande = demande_conge.objects.create(
+            employe_id=self.demandeur,
+            type_conge_id=annuel,
+            date_debut=datetime.date(2025, 3, 3),
+            date_fin=datetime.date(2025, 3, 5),
+            nb_jours_total=3,
+            raison='Vacances',
+        )
+
+    def _post(self, action, user=None):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {generate_token(user, "access")}'} if user else {}
+        return self.client.post(f'/api/demande_conge/{self.demande.id}/{action}/', {}, format='json', **headers)
+
+    def test_anonymous_cannot_change_status(self):
+        """Un client anonyme ne peut ni approuver, ni refuser, ni annuler"""
+        for action in ('approve', 'reject', 'cancel'):
+            self.assertIn(self._post(action).status_code, (401, 403), action)
+
+        self.demande.refresh_from_db()
+        self.assertEqual(self.demande.statut, 'PENDING')
+
+    def test_approval_requires_rbac_permission(self):
+        """Sans le droit leave.approve, l'approbation est refusée"""
+        self.assertEqual(self._post('approve', self.autre_user).status_code, 403)
+
+        response = self._post('approve', self.chef_user)
+
+        self.assertEqual(response.status_code, 200)
+        self.demande.refresh_from_db()
+        self.assertEqual(self.demande.statut, 'APPROVED')
+        self.assertEqual(self.demande.approuve_par_id, self.chef)
+
+    def test_requester_cannot_approve_own_request(self):
+        """Le demandeur ne peut pas approuver sa propre demande, même avec le droit"""
+        response = self._post('approve', self.demandeur_user)
+
+        self.assertEqual(response.status_code, 403)
+        self.demande.refresh_from_db()
+        self.assertEqual(self.demande.statut, 'PENDING')
+
+    def test_cancel_by_requester_or_approver_only(self):
+        """Seuls le demandeur et les approbateurs peuvent annuler"""
+        self.assertEqual(self._post('cancel', self.autre_user).status_code, 403)
+
+        response = self._post('cancel', self.demandeur_user)
+
+        self.assertEqual(response.status_code, 200)
+        self.demande.refresh_from_db()
+        self.assertEqual(self.demande.statut, 'CANCELLED')
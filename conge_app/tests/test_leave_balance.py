@@ -0,0 +1,162 @@
+"""
+Tests unitaires pour le moteur de soldes de congé.
+"""
+import datetime
+
+from django.test import TestCase
+from rest_framework.exceptions import ValidationError
+
+from user_app.models import employe
+from conge_app.models import demande_conge, historique_conge, solde_conge, type_conge
+from conge_app.services import LeaveBalanceService
+from conge_app.modules.demande_conge.serializers import I_demande_congeSerializers
+from conge_app.modules.demande_conge.views import demande_congeAPIView
+
+
+class LeaveBalanceServiceTest(TestCase):
+    """Tests pour LeaveBalanceService"""
+
+    def setUp(self):
+        """Configuration des données de test"""
+        self.employe = employe.objects.create(
+            nom='Doe',
+            prenom='John',
+            date_naissance='1990-01-01',
+            sexe='M',
+            statut_matrimonial='S',
+            nationalite='Burundaise',
+            banque='Test Bank',
+            numero_compte='123456789',
+            niveau_etude='Universitaire',
+            numero_inss='INSS123456',
+            email_personnel='john.doe@example.com',
+            telephone_personnel='+25779000000',
+            adresse_ligne1='123 Test Street',
+            ville='Bujumbura',
+            province='Bujumbura',
+            pays='Burundi',
+            date_embauche='2020-01-01',
+        )
+        self.annuel = type_conge.objects.create(nom='Congé annuel', code='CA', nb_jours_max_par_an=20, report_autorise=True)
+        self.maladie = type_conge.objects.create(nom='Congé maladie', code='CM', nb_jours_max_par_an=10)
+
+    def _demande(self, jours, type_conge_id=None, annee=2025, mois=3):
+        # Un mois différent par demande: pas de chevauchement
+        debut = datetime.date(annee, mois, 3)
+        return demande_conge.objects.create(
+            employe_id=self.employe,
+            type_conge_id=type_conge_id or self.annuel,
+            date_debut=debut,
+            date_fin=debut + datetime.timedelta(days=jours - 1),
+            nb_jours_total=jours,
+            raison='Vacances',
+        )
+
+    def _solde(self, type_conge_id=None, annee=2025):
+        return solde_conge.objects.get(employe_id=self.employe, type_conge_id=type_conge_id or self.annuel, annee=annee)
+
+    def test_approve_debits_balance(self):
+        """L'approbation impute les jours sur le solde de l'année"""
+        demande = self._demande(5)
+
+        result = LeaveBalanceService.approve(demande.id)
+
+        solde = self._solde()
+        self.assertEqual((solde.alloue, solde.utilise, solde.restant), (20, 5, 15))
+        self.assertEqual(result['solde']['restant'], 15)
+        demande.refresh_from_db()
+        self.assertEqual(demande.statut, 'APPROVED')
+        self.assertIsNotNone(demande.date_approbation)
+        self.assertTrue(historique_conge.objects.filter(demande_conge_id=demande).exists())
+
+    def test_cancel_credits_approved_days(self):
+        """L'annulation d'une demande approuvée restitue ses jours"""
+        demande = self._demande(5)
+        LeaveBalanceService.approve(demande.id)
+
+        LeaveBalanceService.cancel(demande.id)
+
+        solde = self._solde()
+        self.assertEqual((solde.utilise, solde.restant), (0, 20))
+        with self.assertRaises(ValueError):
+            LeaveBalanceService.cancel(demande.id)
+
+    def test_delete_credits_approved_days(self):
+        """La suppression d'une demande approuvée restitue ses jours"""
+        demande = self._demande(5)
+        LeaveBalanceService.approve(demande.id)
+
+        LeaveBalanceService.delete(demande.id)
+
+        self.assertFalse(demande_conge.objects.filter(id=demande.id).exists())
+        solde = self._solde()
+        self.assertEqual((solde.utilise, solde.restant), (0, 20))
+
+    def test_only_pending_request_can_be_modified(self):
+        """Une demande approuvée n'est plus modifiable (solde imputé)"""
+        demande = self._demande(5)
+        self.assertEqual(LeaveBalanceService.lock_pending(demande.id).id, demande.id)
+
+        LeaveBalanceService.approve(demande.id)
+        with self.assertRaises(ValueError):
+            LeaveBalanceService.lock_pending(demande.id)
+
+        demande.refresh_from_db()
+        serializer = I_demande_congeSerializers(demande, data={'date_fin': '2025-03-20'}, partial=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('statut', serializer.errors)
+
+    def test_concurrent_overlap_is_a_validation_error(self):
+        """Un chevauchement inséré après la validation donne la même erreur 400"""
+        serializer = I_demande_congeSerializers(data={
+            'employe_id': self.employe.id, 'type_conge_id': self.annuel.id,
+            'date_debut': '2025-06-02', 'date_fin': '2025-06-06', 'raison': 'Vacances',
+        })
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        concurrente = self._demande(3, mois=6)
+
+        with self.assertRaises(ValidationError) as ctx:
+            demande_congeAPIView._save(serializer)
+
+        self.assertIn(str(concurrente.id), str(ctx.exception.detail['date_debut']))
+        self.assertEqual(demande_conge.objects.filter(employe_id=self.employe).count(), 1)
+
+    def test_insufficient_balance_is_refused(self):
+        """Une demande au-delà du restant n'est pas approuvée et rien n'est modifié"""
+        demande = self._demande(25)
+
+        with self.assertRaises(ValueError):
+            LeaveBalanceService.approve(demande.id)
+
+        demande.refresh_from_db()
+        self.assertEqual(demande.statut, 'PENDING')
+        self.assertEqual(self._solde().utilise, 0)
+
+    def test_recompute_matches_approved_requests(self):
+        """Le recalcul reconstruit un solde modifié hors du moteur"""
+        LeaveBalanceService.approve(self._demande(3).id)
+        LeaveBalanceService.approve(self._demande(4, mois=4).id)
+        solde_conge.objects.filter(id=self._solde().id).update(utilise=0, restant=99)
+
+        solde = LeaveBalanceService.recompute(self.employe.id, self.annuel.id, 2025)
+
+        self.assertEqual((solde.utilise, solde.restant), (7, 13))
+
+    def test_rollover_carries_over_allowed_types(self):
+        """Le report ouvre l'année suivante pour tous les types, avec report si autorisé"""
+        LeaveBalanceService.approve(self._demande(5).id)
+        LeaveBalanceService.approve(self._demande(4, self.maladie, mois=5).id)
+        # Demande de l'année suivante approuvée avant le rollover
+        LeaveBalanceService.approve(self._demande(2, annee=2026).id)
+
+        count = LeaveBalanceService.rollover(2025)
+
+        self.assertEqual(count, 2)
+        annuel = self._solde(annee=2026)
+        self.assertEqual((annuel.alloue, annuel.reporte, annuel.utilise, annuel.restant), (20, 15, 2, 33))
+        maladie = self._solde(self.maladie, annee=2026)
+        self.assertEqual((maladie.reporte, maladie.restant), (0, 10))
+
+        # Rejouer le rollover ne change rien
+        LeaveBalanceService.rollover(2025)
+        self.assertEqual(self._solde(annee=2026).restant, 33)
@@ -0,0 +1,155 @@
+"""
+Tests pour le calendrier des absences d'équipe.
+"""
+import datetime
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from user_app.models import employe, service, Group, ServiceGroup
+from conge_app.models import demande_conge, type_conge
+from conge_app.services import LeaveBalanceService, TeamCalendarService
+from conge_app.services.team_calendar import scope_label
+from utilities.resource_versions import ResourceVersions
+
+
+class TeamCalendarServiceTest(TestCase):
+    """Tests pour TeamCalendarService"""
+
+    def setUp(self):
+        """Configuration des données de test"""
+        self.service = service.objects.create(titre='Informatique', code='IT')
+        self.autre_service = service.objects.create(titre='Finances', code='FIN')
+        self.group = Group.objects.create(code='IT', name='Informatique')
+        self.poste = ServiceGroup.objects.create(service=self.service, group=self.group)
+        self.autre_poste = ServiceGroup.objects.create(service=self.autre_service, group=self.group)
+
+        self.doe = self._employe('Doe', 'john.doe@example.com', self.poste)
+        self.smith = self._employe('Smith', 'jane.smith@example.com', self.poste)
+        self.autre = self._employe('Niyonzima', 'eric@example.com', self.autre_poste)
+        self.annuel = type_conge.objects.create(nom='Congé annuel', code='CA', nb_jours_max_par_an=20)
+        self.maladie = type_conge.objects.create(nom='Congé maladie', code='CM', nb_jours_max_par_an=10)
+
+        self._demande(self.doe, self.annuel, datetime.date(2025, 3, 3), datetime.date(2025, 3, 5))
+        self._demande(self.smith, self.maladie, datetime.date(2025, 2, 27), datetime.date(2025, 3, 4))
+        self._demande(self.smith, self.annuel, datetime.date(2025, 3, 10), datetime.date(2025, 3, 11), statut='PENDING')
+        self._demande(self.autre, self.annuel, datetime.date(2025, 3, 3), datetime.date(2025, 3, 3))
+        self._demande(self.autre, self.annuel, datetime.date(2025, 3, 17), datetime.date(2025, 3, 17), statut='PENDING')
+
+        # Clés neuves: les matrices laissées par d'autres tests ne sont pas lues
+        ResourceVersions.bump(
+            scope_label('service', self.service.id),
+            scope_label('service', self.autre_service.id),
+            scope_label('group', self.group.id),
+        )
+
+    def _employe(self, nom, email, poste):
+        return employe.objects.create(
+            nom=nom,
+            prenom='Test',
+            date_naissance='1990-01-01',
+            sexe='M',
+            statut_matrimonial='S',
+            nationalite='Burundaise',
+            banque='Test Bank',
+            numero_compte='123456789',
+            niveau_etude='Universitaire',
+            numero_inss='INSS123456',
+            email_personnel=email,
+            email_professionnel=email,
+            telephone_personnel='+25779000000',
+            adresse_ligne1='123 Test Street',
+            date_embauche='2020-01-01',
+            poste_id=poste
+        )
+
+    def _demande(self, employe_id, type_conge_id, debut, fin, statut='APPROVED'):
+        return demande_conge.objects.create(
+            employe_id=employe_id,
+            type_conge_id=type_conge_id,
+            date_debut=debut,
+            date_fin=fin,
+            nb_jours_total=(fin - debut).days + 1,
+            raison='Absence',
+            statut=statut
+        )
+
+    def test_service_matrix(self):
+        """Seules les absences approuvées du service figurent, jour par jour"""
+        data = TeamCalendarService.absences('service', self.service.id, datetime.date(2025, 3, 1), datetime.date(2025, 3, 7))
+
+        self.assertEqual(data['nb_jours'], 7)
+        self.assertEqual(sorted(data['types']), ['CA', 'CM'])
+        rows = {entry['nom']: entry['jours'] for entry in data['employes']}
+        self.assertEqual(set(rows), {'Doe', 'Smith'})
+        ca, cm = data['types'].index('CA') + 1, data['types'].index('CM') + 1
+        self.assertEqual(rows['Doe'], [0, 0, ca, ca, ca, 0, 0])
+        # Demande commencée le mois précédent: seule la partie de la période compte
+        self.assertEqual(rows['Smith'], [cm, cm, cm, cm, 0, 0, 0])
+        self.assertEqual(data['absents_par_jour'], [1, 1, 2, 2, 1, 0, 0])
+
+    def test_group_scope_spans_services(self):
+        """La portée groupe couvre tous les services du poste"""
+        data = TeamCalendarService.absences('group', self.group.id, datetime.date(2025, 3, 3), datetime.date(2025, 3, 3))
+
+        self.assertEqual(len(data['employes']), 3)
+
+    def test_months_are_cached_until_a_write(self):
+        """Un second appel est servi depuis le cache; une approbation l'invalide"""
+        debut, fin = datetime.date(2025, 3, 1), datetime.date(2025, 4, 30)
+        TeamCalendarService.absences('service', self.service.id, debut, fin)
+
+        with self.assertNumQueries(0):
+            TeamCalendarService.absences('service', self.service.id, debut, fin)
+
+        LeaveBalanceService.approve(demande_conge.objects.get(employe_id=self.smith, statut='PENDING').id)
+        data = TeamCalendarService.absences('service', self.service.id, debut, fin)
+        self.assertEqual(data['absents_par_jour'][9], 1)
+
+    def test_other_service_writes_keep_the_cache(self):
+        """Une approbation dans un autre service n'invalide que son service et le groupe"""
+        debut, fin = datetime.date(2025, 3, 1), datetime.date(2025, 3, 31)
+        TeamCalendarService.absences('service', self.service.id, debut, fin)
+
+        LeaveBalanceService.approve(demande_conge.objects.get(employe_id=self.autre, statut='PENDING').id)
+        with self.assertNumQueries(0):
+            TeamCalendarService.absences('service', self.service.id, debut, fin)
+
+        data = TeamCalendarService.absences('group', self.group.id, debut, fin)
+        self.assertEqual(data['absents_par_jour'][16], 1)
+
+    def test_employe_change_invalidates_old_and_new_service(self):
+        """Un changement de nom ou de poste invalide les services concernés"""
+        debut, fin = datetime.date(2025, 3, 1), datetime.date(2025, 3, 7)
+        TeamCalendarService.absences('service', self.service.id, debut, fin)
+        TeamCalendarService.absences('service', self.autre_service.id, debut, fin)
+
+        self.doe.nom = 'Dupont'
+        self.doe.save()
+        data = TeamCalendarService.absences('service', self.service.id, debut, fin)
+        self.assertIn('Dupont', {entry['nom'] for entry in data['employes']})
+
+        self.doe.poste_id = self.autre_poste
+        self.doe.save()
+        self.assertEqual(len(TeamCalendarService.absences('service', self.service.id, debut, fin)['employes']), 1)
+        self.assertEqual(len(TeamCalendarService.absences('service', self.autre_service.id, debut, fin)['employes']), 2)
+
+    def test_invalid_period_is_refused(self):
+        """Une période inversée ou trop longue est refusée"""
+        with self.assertRaises(ValueError):
+            TeamCalendarService.absences('service', self.service.id, datetime.date(2025, 3, 7), datetime.date(2025, 3, 1))
+        with self.assertRaises(ValueError):
+            TeamCalendarService.absences('service', self.service.id, datetime.date(2024, 1, 1), datetime.date(2025, 6, 1))
+
+    def test_calendar_endpoint(self):
+        """L'endpoint retourne la matrice et refuse une requête sans portée"""
+        client = APIClient()
+
+        response = client.get('/api/demande_conge/calendar/', {
+            'service': self.service.id, 'date_debut': '2025-03-01', 'date_fin': '2025-03-07'
+        })
+        missing = client.get('/api/demande_conge/calendar/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['employes']), 2)
+        self.assertEqual(missing.status_code, 400)
@@ -0,0 +1,115 @@
+"""
+Tests pour le calendrier des jours ouvrés et le contrôle des chevauchements.
+"""
+import datetime
+
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from user_app.models import employe
+from conge_app.models import demande_conge, jour_ferie, type_conge
+from conge_app.modules.demande_conge.serializers import I_demande_congeSerializers
+from conge_app.services.working_days import WorkingDayCalendar, clear_calendars
+from utilities.resource_versions import ResourceVersions
+
+
+class WorkingDayCalendarTest(TestCase):
+    """Tests pour WorkingDayCalendar"""
+
+    def setUp(self):
+        clear_calendars()
+        # Clés neuves: les calendriers laissés par d'autres tests ne sont pas lus
+        ResourceVersions.bump('conge_app.jour_ferie')
+
+    def test_weekends_are_not_counted(self):
+        """Une semaine complète compte cinq jours ouvrés"""
+        count = WorkingDayCalendar.count('Burundi', datetime.date(2025, 3, 3), datetime.date(2025, 3, 9))
+
+        self.assertEqual(count, 5)
+        self.assertFalse(WorkingDayCalendar.is_working_day('Burundi', datetime.date(2025, 3, 8)))
+
+    def test_holidays_are_excluded_per_country(self):
+        """Les jours fériés d'un pays ne comptent pas, ceux d'un autre pays si"""
+        jour_ferie.objects.create(date=datetime.date(2025, 3, 5), libelle='Férié', pays='Burundi')
+
+        self.assertEqual(WorkingDayCalendar.count('burundi', datetime.date(2025, 3, 3), datetime.date(2025, 3, 7)), 4)
+        self.assertEqual(WorkingDayCalendar.count('Rwanda', datetime.date(2025, 3, 3), datetime.date(2025, 3, 7)), 5)
+
+    def test_recurrent_holiday_across_years(self):
+        """Un jour férié récurrent s'applique chaque année, y compris à cheval sur deux ans"""
+        jour_ferie.objects.create(date=datetime.date(2020, 1, 1), libelle='Nouvel an', pays='Burundi', recurrent=True)
+
+        count = WorkingDayCalendar.count(None, datetime.date(2025, 12, 29), datetime.date(2026, 1, 2))
+
+        self.assertEqual(count, 4)
+
+
+class DemandeCongeValidationTest(TestCase):
+    """Tests du calcul de nb_jours_total et des chevauchements"""
+
+    def setUp(self):
+        clear_calendars()
+        ResourceVersions.bump('conge_app.jour_ferie')
+        self.employe = employe.objects.create(
+            nom='Doe',
+            prenom='John',
+            date_naissance='1990-01-01',
+            sexe='M',
+            statut_matrimonial='S',
+            nationalite='Burundaise',
+            banque='Test Bank',
+            numero_compte='123456789',
+            niveau_etude='Universitaire',
+            numero_inss='INSS123456',
+            email_personnel='john.doe@example.com',
+            telephone_personnel='+25779000000',
+            adresse_ligne1='123 Test Street',
+            pays='Burundi',
+            date_embauche='2020-01-01',
+        )
+        self.type_conge = type_conge.objects.create(nom='Congé annuel', code='CA', nb_jours_max_par_an=20)
+
+    def _serializer(self, debut, fin):
+        return I_demande_congeSerializers(data={
+            'employe_id': self.employe.id,
+            'type_conge_id': self.type_conge.id,
+            'date_debut': debut,
+            'date_fin': fin,
+            'nb_jours_total': 99,
+            'raison': 'Vacances',
+        })
+
+    def test_nb_jours_total_is_computed(self):
+        """Le nombre de jours est calculé sur le calendrier, pas repris du client"""
+        serializer = self._serializer('2025-03-03', '2025-03-16')
+
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data['nb_jours_total'], 10)
+
+    def test_overlapping_request_is_rejected(self):
+        """Une demande qui chevauche une demande active est refusée"""
+        serializer = self._serializer('2025-03-03', '2025-03-07')
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+
+        overlapping = self._serializer('2025-03-07', '2025-03-10')
+
+        self.assertFalse(overlapping.is_valid())
+        self.assertIn('date_debut', overlapping.errors)
+        self.assertTrue(self._serializer('2025-03-10', '2025-03-11').is_valid())
+
+    def test_exclusion_constraint_blocks_concurrent_overlap(self):
+        """La contrainte d'exclusion refuse un chevauchement écrit hors du serializer"""
+        values = {
+            'employe_id': self.employe,
+            'type_conge_id': self.type_conge,
+            'nb_jours_total': 1,
+            'raison': 'Vacances',
+        }
+        demande_conge.objects.create(date_debut=datetime.date(2025, 3, 3), date_fin=datetime.date(2025, 3, 7), **values)
+        demande_conge.objects.create(
+            date_debut=datetime.date(2025, 3, 4), date_fin=datetime.date(2025, 3, 5), statut='CANCELLED', **values
+        )
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            demande_conge.objects.create(date_debut=datetime.date(2025, 3, 7), date_fin=datetime.date(2025, 3, 8), **values)
@@ -0,0 +1,98 @@
+"""
+Benchmark de l'encodage JSON des réponses (renderer DRF / utilities.json_codec).
+Usage: python manage.py benchmark_json [--rows 5000] [--runs 5]
+
+Mesure le rendu et le parsing de trois charges:
+- les entrées de paie en ``values()`` (Decimal bruts, comme les statistiques);
+- les mêmes entrées sérialisées par le serializer de la vue complète;
+- une charge synthétique (Decimal, dates, UUID), disponible sans données.
+Les lignes existantes sont répétées jusqu'à --rows.
+"""
+import datetime
+import io
+import itertools
+import statistics
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from utilities import json_codec
+
+
+class Command(BaseCommand):
+    help = "Compare le renderer / parser JSON de DRF et ceux de utilities.json_codec"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5_000, help='Lignes par charge')
+        parser.add_argument('--runs', type=int, default=5, help='Exécutions par mesure')
+
+    def handle(self, *args, **options):
+        rows, runs = options['rows'], options['runs']
+        engine = 'orjson' if json_codec.ORJSON_AVAILABLE else 'json (orjson non installé)'
+
+        self.stdout.write('\n' + '=' * 60)
+        self.stdout.write(f"🧾 ENCODAGE JSON - {rows:,} lignes - {engine}")
+        self.stdout.write('=' * 60)
+
+        for label, payload in self._payloads(rows):
+            if not payload:
+                self.stdout.write(f"{label:<22} ⚠️  aucune donnée, ignoré")
+                continue
+            drf_bytes = JSONRenderer().render(payload)
+            fast_bytes = json_codec.FastJSONRenderer().render(payload)
+
+            render_drf = self._measure(lambda: JSONRenderer().render(payload), runs)
+            render_fast = self._measure(lambda: json_codec.FastJSONRenderer().render(payload), runs)
+            parse_drf = self._measure(lambda: JSONParser().parse(io.BytesIO(drf_bytes)), runs)
+            parse_fast = self._measure(lambda: json_codec.FastJSONParser().parse(io.BytesIO(fast_bytes)), runs)
+
+            self.stdout.write(
+                f"{label:<22} rendu: {render_drf:8.1f} ms -> {render_fast:7.1f} ms "
+                f"(x{render_drf / max(render_fast, 0.001):.1f}) | "
+                f"parsing: {parse_drf:7.1f} ms -> {parse_fast:7.1f} ms "
+                f"(x{parse_drf / max(parse_fast, 0.001):.1f}) | {len(fast_bytes) / 1024:,.0f} Ko"
+            )
+
+    def _payloads(self, rows):
+        from paie_app.models import entree_paie
+        from paie_app.modules.entree_paie.serializers import EntreePaieSerializer
+
+        values = list(entree_paie.objects.values()[:rows])
+        yield 'entree_paie values()', self._repeat(values, rows)
+
+        instances = list(entree_paie.objects.select_related('employe_id', 'periode_paie_id')[:rows])
+        serialized = list(EntreePaieSerializer(instances, many=True).data) if instances else []
+        yield 'entree_paie serializer', self._repeat(serialized, rows)
+
+        today = datetime.date.today()
+        yield 'synthétique', [
+            {
+                'id': index,
+                'uuid': uuid.uuid4(),
+                'periode': today,
+                'calculated_at': datetime.datetime.now(datetime.timezone.utc),
+                'salaire_base': Decimal('1250000.00') + index,
+                'salaire_brut': Decimal('1687500.50'),
+                'salaire_net': Decimal('1402318.27'),
+                'cotisations': {'inss': Decimal('52500.00'), 'ipr': Decimal('118250.75')},
+                'payslip_generated': index % 2 == 0,
+            }
+            for index in range(rows)
+        ]
+
+    @staticmethod
+    def _repeat(items, count):
+        return list(itertools.islice(itertools.cycle(items), count)) if items else []
+
+    @staticmethod
+    def _measure(func, runs):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
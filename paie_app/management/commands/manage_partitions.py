@@ -0,0 +1,71 @@
+"""
+Commande Django de gestion des partitions mensuelles (auth_audit_log, paie_alert).
+Usage: python manage.py manage_partitions [--convert] [--premake N] [--retention] [--table T] [--dry-run]
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from utilities.partitioning import PartitionManager, configured_tables
+
+
+class Command(BaseCommand):
+    help = 'Convertit, prépare et purge les tables partitionnées par mois'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--table',
+            action='append',
+            help='Table à traiter (par défaut: toutes les tables de PARTITIONING)',
+        )
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help='Convertit les tables non partitionnées (verrou exclusif, à lancer en maintenance)',
+        )
+        parser.add_argument(
+            '--premake',
+            type=int,
+            help='Nombre de mois à venir pour lesquels créer les partitions',
+        )
+        parser.add_argument(
+            '--retention',
+            action='store_true',
+            help='Détache et supprime (ou archive) les partitions hors rétention',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Affiche les partitions qui seraient supprimées sans rien modifier',
+        )
+
+    def handle(self, *args, **options):
+        tables = configured_tables()
+        selected = options.get('table') or list(tables)
+        unknown = [table for table in selected if table not in tables]
+        if unknown:
+            raise CommandError(f"Tables non configurées dans PARTITIONING: {', '.join(unknown)}")
+
+        for table in selected:
+            spec = tables[table]
+
+            if options['convert']:
+                result = PartitionManager.convert(spec)
+                self.stdout.write(self.style.SUCCESS(f"🗂️  {table}: {result['status']}"))
+
+            if not PartitionManager.is_partitioned(table):
+                self.stdout.write(
+                    self.style.WARNING(f"⚠️  {table} n'est pas partitionnée (utiliser --convert)")
+                )
+                continue
+
+            created = PartitionManager.ensure_partitions(table, options.get('premake'))
+            self.stdout.write(f"📅 {table}: {len(created)} partition(s) créée(s)")
+
+            if options['retention']:
+                dropped = PartitionManager.apply_retention(spec, dry_run=options['dry_run'])
+                verb = 'à supprimer' if options['dry_run'] else 'supprimée(s)'
+                self.stdout.write(f"🗑️  {table}: {len(dropped)} partition(s) {verb}")
+                for result in dropped:
+                    archived = f" -> {result['archived_to']}" if result['archived_to'] else ''
+                    self.stdout.write(f"  - {result['partition']}{archived}")
+
+        self.stdout.write(self.style.SUCCESS('✅ Gestion des partitions terminée'))
@@ -0,0 +1,43 @@
+"""
+Commande Django pour (re)construire les rollups analytiques de paie.
+Usage: python manage.py refresh_payroll_rollups [--periode ID] [--all-statuses]
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from paie_app.models import periode_paie
+from paie_app.services.rollup_service import PayrollRollupService
+
+
+class Command(BaseCommand):
+    help = 'Reconstruit les tables de faits mensuelles utilisées par les tendances de paie'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--periode',
+            type=int,
+            help='ID de la période à reconstruire (par défaut: toutes les périodes approuvées)',
+        )
+        parser.add_argument(
+            '--all-statuses',
+            action='store_true',
+            help='Inclut les périodes non approuvées dans le backfill',
+        )
+
+    def handle(self, *args, **options):
+        periode_id = options.get('periode')
+
+        if periode_id:
+            if not periode_paie.objects.filter(id=periode_id).exists():
+                raise CommandError(f'Période {periode_id} introuvable')
+            result = PayrollRollupService.refresh_period(periode_id)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Rollups reconstruits pour la période {periode_id}: "
+                    f"{result['salary_rows']} lignes salaires, {result['deduction_rows']} lignes retenues"
+                )
+            )
+            return
+
+        statut = None if options['all_statuses'] else 'APPROVED'
+        count = PayrollRollupService.refresh_all(statut=statut)
+        self.stdout.write(self.style.SUCCESS(f'Rollups reconstruits pour {count} période(s)'))
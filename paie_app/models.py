@@ -74,6 +74,7 @@ class Alert(Base_model):
     email_sent_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
+        # Partitionnée par mois sur created_at (voir manage_partitions)
         db_table = 'paie_alert'
         ordering = ['-created_at']
         indexes = [
@@ -294,7 +295,94 @@ class entree_paie(Base_model):
             models.Index(fields=['is_validated', 'calculated_at']),
             models.Index(fields=['payslip_generated', 'periode_paie_id']),
             models.Index(fields=['calculated_by', 'calculated_at']),
+            models.Index(fields=['created_at', 'id']),
         ]
 
     def __str__(self):
         return f"{self.employe_id.nom} {self.employe_id.prenom} - {self.periode_paie_id}"
+
+
+class rollup_paie_mensuel(models.Model):
+    """
+    Table de faits mensuelle agrégée à partir des entrées de paie.
+
+    Une ligne par (période, service, groupe, type de contrat). Rafraîchie
+    de manière incrémentale à l'approbation de chaque période.
+    """
+    periode_paie_id = models.ForeignKey(
+        periode_paie, on_delete=models.CASCADE, related_name='rollups'
+    )
+    annee = models.IntegerField()
+    mois = models.IntegerField()
+    # Index mensuel continu (annee * 12 + mois - 1) pour les filtres par plage
+    mois_index = models.IntegerField()
+
+    service_id = models.ForeignKey(
+        'user_app.service', on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='payroll_rollups'
+    )
+    group_id = models.ForeignKey(
+        'user_app.Group', on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='payroll_rollups'
+    )
+    type_contrat = models.CharField(max_length=20, default='INCONNU')
+
+    nombre_employes = models.IntegerField(default=0)
+    masse_salariale_brute = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    total_base_imposable = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    total_cotisations_patronales = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    total_cotisations_salariales = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    total_charge_salariale = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    total_net_a_payer = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'paie_rollup_mensuel'
+        indexes = [
+            models.Index(fields=['mois_index']),
+            models.Index(fields=['service_id', 'mois_index']),
+            models.Index(fields=['group_id', 'mois_index']),
+            models.Index(fields=['type_contrat', 'mois_index']),
+        ]
+
+    def __str__(self):
+        return f"Rollup {self.annee}/{self.mois:02d} - {self.service_id_id}/{self.group_id_id}/{self.type_contrat}"
+
+
+class rollup_retenue_mensuel(models.Model):
+    """
+    Table de faits mensuelle des retenues, agrégée par type de retenue.
+    """
+    periode_paie_id = models.ForeignKey(
+        periode_paie, on_delete=models.CASCADE, related_name='deduction_rollups'
+    )
+    annee = models.IntegerField()
+    mois = models.IntegerField()
+    mois_index = models.IntegerField()
+
+    service_id = models.ForeignKey(
+        'user_app.service', on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='deduction_rollups'
+    )
+    group_id = models.ForeignKey(
+        'user_app.Group', on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='deduction_rollups'
+    )
+    type_retenue = models.CharField(max_length=20)
+
+    nombre_retenues = models.IntegerField(default=0)
+    montant_total = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'paie_rollup_retenue_mensuel'
+        indexes = [
+            models.Index(fields=['mois_index']),
+            models.Index(fields=['service_id', 'mois_index']),
+            models.Index(fields=['type_retenue', 'mois_index']),
+        ]
+
+    def __str__(self):
+        return f"Rollup retenues {self.annee}/{self.mois:02d} - {self.type_retenue}"
@@ -0,0 +1,9 @@
+"""
+URLs pour l'analytique de paie.
+"""
+from django.urls import path
+from .views import PayrollTrendsView
+
+urlpatterns = [
+    path('trends/', PayrollTrendsView.as_view(), name='payroll-trends'),
+]
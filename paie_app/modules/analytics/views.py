@@ -0,0 +1,105 @@
+"""
+Vues API pour l'analytique de paie (tendances pluriannuelles).
+"""
+from datetime import date
+from asgiref.sync import sync_to_async
+from adrf.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
+from drf_spectacular.types import OpenApiTypes
+
+from paie_app.services.rollup_service import PayrollRollupService
+from utilities.permissions import IsHRManager
+
+
+def _parse_month(value, default):
+    """Parse un mois au format AAAA-MM."""
+    if not value:
+        return default
+    annee, mois = value.split('-')
+    annee, mois = int(annee), int(mois)
+    if not 1 <= mois <= 12:
+        raise ValueError(f"Mois invalide: {value}")
+    return annee, mois
+
+
+class PayrollTrendsView(APIView):
+    """Tendances mensuelles de paie servies depuis les tables de faits"""
+
+    permission_classes = [IsHRManager]
+
+    @extend_schema(
+        summary="Tendances de paie",
+        description=(
+            "Séries mensuelles (masse salariale, cotisations, net, retenues) "
+            "calculées à partir des rollups, avec variation annuelle"
+        ),
+        tags=["Analytique de paie"],
+        parameters=[
+            OpenApiParameter(
+                name='start',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Mois de début (AAAA-MM), par défaut 12 mois avant la fin'
+            ),
+            OpenApiParameter(
+                name='end',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Mois de fin (AAAA-MM), par défaut le mois courant'
+            ),
+            OpenApiParameter(
+                name='service_id',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description='Filtrer sur un service'
+            ),
+            OpenApiParameter(
+                name='group_id',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description='Filtrer sur un groupe'
+            ),
+            OpenApiParameter(
+                name='dimension',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Ventilation des séries',
+                enum=list(PayrollRollupService.DIMENSIONS)
+            ),
+        ],
+        responses={
+            200: OpenApiResponse(description="Séries de tendances"),
+            400: OpenApiResponse(description="Paramètres invalides"),
+        }
+    )
+    async def get(self, request):
+        """Récupère les tendances de paie sur une plage de mois."""
+        try:
+            today = date.today()
+            end = _parse_month(request.query_params.get('end'), (today.year, today.month))
+            start = _parse_month(request.query_params.get('start'), (end[0] - 1, end[1]))
+
+            service_id = request.query_params.get('service_id')
+            group_id = request.query_params.get('group_id')
+
+            trends = await sync_to_async(PayrollRollupService.get_trends)(
+                start=start,
+                end=end,
+                service_id=int(service_id) if service_id else None,
+                group_id=int(group_id) if group_id else None,
+                dimension=request.query_params.get('dimension') or None,
+            )
+            return Response(trends, status=status.HTTP_200_OK)
+
+        except ValueError as e:
+            return Response(
+                {'error': f'Paramètres invalides: {str(e)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except Exception as e:
+            return Response(
+                {'error': f'Erreur lors du calcul des tendances: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
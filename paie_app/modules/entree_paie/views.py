@@ -6,11 +6,13 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from adrf.viewsets import ModelViewSet
+from utilities.response_cache import ConditionalGetMixin
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 
 from paie_app.models import entree_paie
 from paie_app.services import SalaryCalculatorService, PayslipGeneratorService
+from utilities.pagination import KeysetPagination
 from utilities.permissions import (
     IsEmployee, PayrollReadPermission, PayrollWritePermission
 )
@@ -22,7 +24,7 @@ from paie_app.modules.entree_paie.serializers import (
 )
 
 
-class EntreePaieAPIView(ModelViewSet):
+class EntreePaieAPIView(ConditionalGetMixin, ModelViewSet):
     """API View pour la gestion des entrées de paie."""
 
     queryset = entree_paie.objects.all().order_by('-created_at')
@@ -35,12 +37,16 @@ class EntreePaieAPIView(ModelViewSet):
     search_fields = [
         'employe_id__nom', 'employe_id__prenom', 'employe_id__email_personnel'
     ]
-    ordering_fields = [
-        'created_at', 'calculated_at', 'salaire_base',
-        'salaire_brut', 'salaire_net'
-    ]
+    # Keyset pagination can only reverse its direction (400 otherwise)
+    ordering_fields = ['created_at']
     ordering = ['-created_at']
 
+    # Keyset pagination on (created_at, id): constant cost per page
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-created_at', '-id')
+    count_mode = 'auto'
+    query_budget = {'list': 8, 'retrieve': 6, 'default': 20}
+
     # Role-based permissions
     permission_classes = [IsAuthenticated]
 
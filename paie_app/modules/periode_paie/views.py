@@ -9,6 +9,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from adrf.viewsets import ModelViewSet
+from utilities.response_cache import ConditionalGetMixin
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 import openpyxl
@@ -29,7 +30,7 @@ from paie_app.modules.periode_paie.serializers import (
 )
 
 
-class PeriodePaieAPIView(ModelViewSet):
+class PeriodePaieAPIView(ConditionalGetMixin, ModelViewSet):
     """API View pour la gestion des périodes de paie."""
 
     queryset = periode_paie.objects.all().order_by('-created_at', '-mois')
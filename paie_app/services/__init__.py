@@ -9,7 +9,7 @@ from .validation_service import ValidationService
 from .alert_service import AlertService
 from .export_service import ExportService
 from .audit_reports_service import AuditReportsService
-from .audit_reports_service import AuditReportsService
+from .rollup_service import PayrollRollupService
 
 __all__ = [
     'SalaryCalculatorService',
@@ -20,4 +20,5 @@ __all__ = [
     'AlertService',
     'ExportService',
     'AuditReportsService',
+    'PayrollRollupService',
 ]
@@ -10,6 +10,8 @@ from datetime import datetime
 
 from paie_app.models import periode_paie, entree_paie, retenue_employe
 from user_app.models import employe, contrat
+from utilities.audit_diff import audited_bulk_update
+from utilities.resource_versions import ResourceVersions
 
 logger = logging.getLogger('paie_app.services')
 
@@ -243,7 +245,10 @@ class DatabaseOptimizer:
             entries.append(entry)
 
         # Création en lot - plus efficace que des créations individuelles
-        return entree_paie.objects.bulk_create(entries, batch_size=100)
+        created = entree_paie.objects.bulk_create(entries, batch_size=100)
+        # bulk_create n'envoie pas post_save
+        ResourceVersions.bump_for_write(entree_paie._meta.label_lower)
+        return created
 
     @classmethod
     def bulk_update_entries(cls, entries: List[entree_paie], fields: List[str]) -> None:
@@ -254,7 +259,8 @@ class DatabaseOptimizer:
             entries: Liste des entrées à mettre à jour
             fields: Liste des champs à mettre à jour
         """
-        entree_paie.objects.bulk_update(entries, fields, batch_size=100)
+        # Les champs réellement modifiés sont journalisés (patchs JSON)
+        audited_bulk_update(entree_paie, entries, fields, batch_size=100)
 
     @classmethod
     def clear_cache(cls, cache_pattern: Optional[str] = None) -> None:
@@ -6,11 +6,11 @@ import logging
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 from functools import wraps
-from django.core.cache import cache
-from django.db import connection
 from django.utils import timezone
 from contextlib import contextmanager
 
+from utilities.metrics import MetricsStore
+
 logger = logging.getLogger('paie_app.services')
 
 
@@ -19,7 +19,6 @@ class PerformanceMonitor:
 
     # Clés de cache pour les métriques
     CACHE_PREFIX = 'perf_monitor'
-    METRICS_CACHE_TIMEOUT = 300  # 5 minutes
 
     # Seuils de performance (en secondes)
     THRESHOLDS = {
@@ -75,6 +74,18 @@ class PerformanceMonitor:
                     execution_time = time.time() - start_time
 
                     cls._record_performance_metric(
+                        operation_name, execution_time, True,
+                        threshold_warning, threshold_critical
+                    )
+
+                    return result
+                except Exception as e:
+                    execution_time = time.time() - start_time
+                    cls._record_performance_metric(
+                        operation_name, execution_time, False,
+                        threshold_warning, threshold_critical
+                    )
+                    raise e
 
             # Retourner le wrapper approprié selon le type de fonction
             import asyncio
@@ -125,113 +136,63 @@ class PerformanceMonitor:
     @classmethod
     def _update_performance_cache(cls, operation_name: str, execution_time: float,
                                 success: bool, level: str) -> None:
-        """Met à jour les métriques en cache."""
-        try:
-            cache_key = f"{cls.CACHE_PREFIX}:metrics:{operation_name}"
-
-            # Récupérer les métriques existantes
-            metrics = cache.get(cache_key, {
-                'total_calls': 0,
-                'successful_calls': 0,
-                'failed_calls': 0,
-                'total_time': 0.0,
-                'min_time': float('inf'),
-                'max_time': 0.0,
-                'warning_count': 0,
-                'critical_count': 0,
-                'last_updated': timezone.now().isoformat()
-            })
-
-            # Mettre à jour les métriques
-            metrics['total_calls'] += 1
-            if success:
-                metrics['successful_calls'] += 1
-            else:
-                metrics['failed_calls'] += 1
-
-            metrics['total_time'] += execution_time
-            metrics['min_time'] = min(metrics['min_time'], execution_time)
-            metrics['max_time'] = max(metrics['max_time'], execution_time)
-
-            if level == 'WARNING':
-                metrics['warning_count'] += 1
-            elif level == 'CRITICAL':
-                metrics['critical_count'] += 1
-
-            metrics['last_updated'] = timezone.now().isoformat()
-
-            # Calculer la moyenne
-            metrics['avg_time'] = metrics['total_time'] / metrics['total_calls']
-
-            # Sauvegarder en cache
-            cache.set(cache_key, metrics, cls.METRICS_CACHE_TIMEOUT)
-
-        except Exception as e:
-            logger.error(f"Erreur lors de la mise à jour des métriques: {e}")
+        """
+        Enregistre la mesure dans le store de métriques (histogrammes par
+        fenêtre glissante, incréments atomiques: aucune mise à jour perdue
+        entre workers).
+        """
+        MetricsStore.observe(operation_name, execution_time, success=success, level=level)
 
     @classmethod
     @contextmanager
-    def measure_database_queries(cls, operation_name: str):
+    def measure_database_queries(cls, operation_name: str, query_budget: Optional[int] = None):
         """
         Context manager pour mesurer les requêtes de base de données.
 
+        S'appuie sur connection.execute_wrapper: fonctionne aussi avec DEBUG=False.
+
         Args:
             operation_name: Nom de l'opération
+            query_budget: Nombre maximal de requêtes attendu (optionnel)
         """
-        initial_queries = len(connection.queries)
-        start_time = time.time()
-
-        try:
-            yield
-        finally:
-            end_time = time.time()
-            execution_time = end_time - start_time
-            query_count = len(connection.queries) - initial_queries
-
-            # Logger les informations de requête
-            logger.info(
-                f"DB Performance: {operation_name} - {query_count} queries in {execution_time:.3f}s",
-                extra={
-                    'operation': operation_name,
-                    'query_count': query_count,
-                    'execution_time': execution_time,
-                    'queries_per_second': query_count / execution_time if execution_time > 0 else 0
-                }
-            )
+        from utilities.query_monitor import track_queries, report_collector
 
-            # Alerter si trop de requêtes
-            if query_count > 50:
-                logger.warning(
-                    f"High query count detected: {operation_name} executed {query_count} queries"
-                )
+        with track_queries(operation_name) as collector:
+            yield collector
+
+        report_collector(collector, budget=query_budget)
+
+        # Logger les informations de requête
+        logger.info(
+            f"DB Performance: {operation_name} - {collector.count} queries in {collector.duration:.3f}s",
+            extra={
+                'operation': operation_name,
+                'query_count': collector.count,
+                'execution_time': collector.duration,
+                'repeated_queries': len(collector.repeated_queries())
+            }
+        )
 
     @classmethod
-    def get_performance_metrics(cls, operation_name: str = None) -> Dict[str, Any]:
+    def get_performance_metrics(cls, operation_name: str = None,
+                                windows: int = None) -> Dict[str, Any]:
         """
         Récupère les métriques de performance.
 
         Args:
             operation_name: Nom de l'opération spécifique (optionnel)
+            windows: Nombre de fenêtres glissantes à agréger (par défaut toute la rétention)
 
         Returns:
-            Métriques de performance
+            Métriques de performance (compteurs, moyenne, p50/p95/p99)
         """
         if operation_name:
-            cache_key = f"{cls.CACHE_PREFIX}:metrics:{operation_name}"
-            return cache.get(cache_key, {})
+            return MetricsStore.summary(operation_name, windows)
 
-        # Récupérer toutes les métriques
+        # Les opérations sont découvertes dynamiquement
         all_metrics = {}
-        operations = [
-            'salary_calculation',
-            'period_processing',
-            'payslip_generation',
-            'deduction_processing'
-        ]
-
-        for op in operations:
-            cache_key = f"{cls.CACHE_PREFIX}:metrics:{op}"
-            metrics = cache.get(cache_key)
+        for op in MetricsStore.operations():
+            metrics = MetricsStore.summary(op, windows)
             if metrics:
                 all_metrics[op] = metrics
 
@@ -303,20 +264,7 @@ class PerformanceMonitor:
         Args:
             operation_name: Opération spécifique à effacer (optionnel)
         """
-        if operation_name:
-            cache_key = f"{cls.CACHE_PREFIX}:metrics:{operation_name}"
-            cache.delete(cache_key)
-        else:
-            # Effacer toutes les métriques
-            operations = [
-                'salary_calculation',
-                'period_processing',
-                'payslip_generation',
-                'deduction_processing'
-            ]
-
-            cache_keys = [f"{cls.CACHE_PREFIX}:metrics:{op}" for op in operations]
-            cache.delete_many(cache_keys)
+        MetricsStore.clear(operation_name)
 
     @classmethod
     def log_slow_query(cls, query: str, execution_time: float, params: List = None) -> None:
@@ -98,6 +98,12 @@ class PeriodProcessorService:
                             'salaire_base': salary_data['salaire_base'],
                             'salaire_brut': salary_data['salaire_brut'],
                             'salaire_net': salary_data['salaire_net'],
+                            # Snapshot lu par les rollups (JSON: montants en texte)
+                            'contrat_reference': salary_data['contrat_reference'],
+                            'retenues_diverses': {
+                                type_retenue: {**detail, 'montant': str(detail['montant'])}
+                                for type_retenue, detail in salary_data['retenues_diverses'].items()
+                            },
                             'calculated_at': timezone.now(),
                             'calculated_by_id': periode.traite_par_id
                         }
@@ -196,7 +202,25 @@ class PeriodProcessorService:
                 'statut', 'approuve_par', 'date_approbation'
             ])
 
+            await self._schedule_rollup_refresh(periode.id)
+
             return True
 
         except periode_paie.DoesNotExist as e:
             raise ValueError(f"Période {periode_id} non trouvée") from e
+
+    async def _schedule_rollup_refresh(self, periode_id: int) -> None:
+        """
+        Planifie le rafraîchissement des rollups analytiques de la période.
+
+        Passe par Celery si disponible, sinon rafraîchit en ligne. L'envoi
+        au broker est bloquant: il est fait hors de la boucle d'événements.
+        """
+        from asgiref.sync import sync_to_async
+
+        try:
+            from paie_app.tasks import refresh_payroll_rollups
+            await sync_to_async(refresh_payroll_rollups.delay)(periode_id)
+        except Exception:
+            from paie_app.services.rollup_service import PayrollRollupService
+            await sync_to_async(PayrollRollupService.refresh_period)(periode_id)
@@ -0,0 +1,323 @@
+"""
+Service de tables de faits mensuelles (rollups) pour l'analytique de paie.
+
+Les tendances pluriannuelles sont servies à partir de tables pré-agrégées
+plutôt que de balayer entree_paie à chaque requête. Chaque période est
+reconstruite de façon incrémentale lors de son approbation, à partir des
+snapshots des entrées (retenues déduites, affectation au moment du calcul).
+"""
+import logging
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from django.db import connection, transaction
+from django.db.models import BigIntegerField, Count, DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Cast, Coalesce
+
+from paie_app.models import periode_paie, entree_paie, rollup_paie_mensuel, rollup_retenue_mensuel
+from user_app.models import ServiceGroup, contrat, employe
+from utilities.resource_versions import ResourceVersions
+
+logger = logging.getLogger('paie_app.services')
+
+MONEY = DecimalField(max_digits=15, decimal_places=2)
+ZERO = Value(Decimal('0'), output_field=MONEY)
+
+
+def mois_index(annee: int, mois: int) -> int:
+    """Index mensuel continu utilisé pour filtrer les plages de périodes."""
+    return annee * 12 + (mois - 1)
+
+
+class PayrollRollupService:
+    """Service de maintenance et de lecture des rollups de paie"""
+
+    DIMENSIONS = {
+        'service': 'service_id',
+        'group': 'group_id',
+        'type_contrat': 'type_contrat',
+        'type_retenue': 'type_retenue',
+    }
+
+    METRICS = [
+        'nombre_employes',
+        'masse_salariale_brute',
+        'total_base_imposable',
+        'total_cotisations_patronales',
+        'total_cotisations_salariales',
+        'total_charge_salariale',
+        'total_net_a_payer',
+    ]
+
+    # ------------------------------------------------------------------
+    # Rafraîchissement
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def refresh_period(cls, periode_id: int) -> Dict:
+        """
+        Reconstruit les rollups d'une période (delete + insert dans une transaction).
+
+        Deux requêtes d'agrégation au total, quel que soit le nombre d'employés.
+        """
+        periode = periode_paie.objects.get(id=periode_id)
+        index = mois_index(periode.annee, periode.mois)
+
+        with transaction.atomic():
+            rollup_paie_mensuel.objects.filter(periode_paie_id=periode_id).delete()
+            rollup_retenue_mensuel.objects.filter(periode_paie_id=periode_id).delete()
+
+            salary_rows = [
+                rollup_paie_mensuel(
+                    periode_paie_id=periode,
+                    annee=periode.annee,
+                    mois=periode.mois,
+                    mois_index=index,
+                    service_id_id=row['service'],
+                    group_id_id=row['group'],
+                    type_contrat=row['type_contrat_ref'],
+                    nombre_employes=row['nombre_employes'],
+                    masse_salariale_brute=row['masse_salariale_brute'],
+                    total_base_imposable=row['total_base_imposable'],
+                    total_cotisations_patronales=row['total_cotisations_patronales'],
+                    total_cotisations_salariales=row['total_cotisations_salariales'],
+                    total_charge_salariale=row['total_charge_salariale'],
+                    total_net_a_payer=row['total_net_a_payer'],
+                )
+                for row in cls._aggregate_entries(periode_id)
+            ]
+            rollup_paie_mensuel.objects.bulk_create(salary_rows)
+
+            deduction_rows = [
+                rollup_retenue_mensuel(
+                    periode_paie_id=periode,
+                    annee=periode.annee,
+                    mois=periode.mois,
+                    mois_index=index,
+                    service_id_id=row['service'],
+                    group_id_id=row['group'],
+                    type_retenue=row['type_retenue'],
+                    nombre_retenues=row['nombre'],
+                    montant_total=row['montant'],
+                )
+                for row in cls._aggregate_deductions(periode)
+            ]
+            rollup_retenue_mensuel.objects.bulk_create(deduction_rows)
+            # bulk_create n'envoie pas post_save
+            ResourceVersions.bump_for_write(
+                rollup_paie_mensuel._meta.label_lower, rollup_retenue_mensuel._meta.label_lower
+            )
+
+        logger.info(
+            f"📊 Rollups rafraîchis pour la période {periode}: "
+            f"{len(salary_rows)} lignes salaires, {len(deduction_rows)} lignes retenues"
+        )
+
+        return {
+            'periode_id': periode_id,
+            'salary_rows': len(salary_rows),
+            'deduction_rows': len(deduction_rows),
+        }
+
+    @classmethod
+    def refresh_all(cls, statut: Optional[str] = 'APPROVED') -> int:
+        """Reconstruit les rollups de toutes les périodes (backfill initial)."""
+        periodes = periode_paie.objects.all()
+        if statut:
+            periodes = periodes.filter(statut=statut)
+
+        count = 0
+        for periode_id in periodes.order_by('annee', 'mois').values_list('id', flat=True):
+            cls.refresh_period(periode_id)
+            count += 1
+        return count
+
+    @staticmethod
+    def _aggregate_entries(periode_id: int):
+        """Agrège les entrées de paie par service, groupe et type de contrat."""
+        # Les anciennes entrées n'ont pas le type de contrat ni l'affectation
+        # dans leur snapshot: on se rabat sur le contrat et le poste actuels.
+        contrat_courant = contrat.objects.filter(
+            employe_id=OuterRef('employe_id'), statut='en_cours'
+        ).order_by('-date_debut').values('type_contrat')[:1]
+
+        return (
+            entree_paie.objects
+            .filter(periode_paie_id=periode_id)
+            .annotate(
+                service=Coalesce(
+                    Cast(KeyTextTransform('service_id', 'contrat_reference'), BigIntegerField()),
+                    F('employe_id__poste_id__service'),
+                ),
+                group=Coalesce(
+                    Cast(KeyTextTransform('group_id', 'contrat_reference'), BigIntegerField()),
+                    F('employe_id__poste_id__group'),
+                ),
+                type_contrat_ref=Coalesce(
+                    KeyTextTransform('type_contrat', 'contrat_reference'),
+                    Subquery(contrat_courant),
+                    Value('INCONNU'),
+                ),
+            )
+            .values('service', 'group', 'type_contrat_ref')
+            .annotate(
+                nombre_employes=Count('id'),
+                masse_salariale_brute=Coalesce(Sum('salaire_brut'), ZERO),
+                total_base_imposable=Coalesce(Sum('base_imposable'), ZERO),
+                total_cotisations_patronales=Coalesce(Sum(Cast(
+                    KeyTextTransform('total', 'cotisations_patronales'), MONEY
+                )), ZERO),
+                total_cotisations_salariales=Coalesce(Sum(Cast(
+                    KeyTextTransform('total', 'cotisations_salariales'), MONEY
+                )), ZERO),
+                total_charge_salariale=Coalesce(Sum('total_charge_salariale'), ZERO),
+                total_net_a_payer=Coalesce(Sum('salaire_net'), ZERO),
+            )
+            .order_by()
+        )
+
+    @staticmethod
+    def _aggregate_deductions(periode: periode_paie) -> List[Dict]:
+        """
+        Agrège les retenues effectivement déduites sur la période par
+        service, groupe et type.
+
+        La source est le snapshot de chaque entrée (``retenues_diverses``,
+        un objet par type de retenue, et l'affectation de
+        ``contrat_reference``), et non l'état courant de retenue_employe:
+        un backfill redonne les montants réellement déduits. Une seule
+        requête (jsonb_each).
+        """
+        entree_table = entree_paie._meta.db_table
+        employe_table = employe._meta.db_table
+        poste_table = ServiceGroup._meta.db_table
+        sql = f"""
+            SELECT
+                COALESCE((e.contrat_reference ->> 'service_id')::bigint, sg.service_id) AS service,
+                COALESCE((e.contrat_reference ->> 'group_id')::bigint, sg.group_id) AS "group",
+                r.key AS type_retenue,
+                COUNT(*) AS nombre,
+                SUM((r.value ->> 'montant')::numeric) AS montant
+            FROM {entree_table} e
+            JOIN {employe_table} emp ON emp.id = e.employe_id_id
+            LEFT JOIN {poste_table} sg ON sg.id = emp.poste_id_id
+            CROSS JOIN LATERAL jsonb_each(
+                CASE WHEN jsonb_typeof(e.retenues_diverses) = 'object'
+                     THEN e.retenues_diverses ELSE '{{}}'::jsonb END
+            ) r
+            WHERE e.periode_paie_id_id = %s
+              AND jsonb_typeof(r.value) = 'object'
+              AND (r.value ->> 'montant')::numeric > 0
+            GROUP BY 1, 2, 3
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [periode.id])
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def get_trends(
+        cls,
+        start: Tuple[int, int],
+        end: Tuple[int, int],
+        service_id: Optional[int] = None,
+        group_id: Optional[int] = None,
+        dimension: Optional[str] = None,
+    ) -> Dict:
+        """
+        Retourne les séries mensuelles entre start et end (inclus), avec la
+        variation sur un an lorsque le même mois de l'année précédente existe.
+
+        Args:
+            start: (annee, mois) de début
+            end: (annee, mois) de fin
+            service_id: Filtre optionnel sur le service
+            group_id: Filtre optionnel sur le groupe
+            dimension: Ventilation optionnelle (service, group, type_contrat, type_retenue)
+        """
+        if dimension and dimension not in cls.DIMENSIONS:
+            raise ValueError(f"Dimension non supportée: {dimension}")
+
+        start_index = mois_index(*start)
+        end_index = mois_index(*end)
+        if start_index > end_index:
+            raise ValueError("La date de début doit précéder la date de fin")
+
+        if dimension == 'type_retenue':
+            model = rollup_retenue_mensuel
+            metrics = {
+                'nombre_retenues': Sum('nombre_retenues'),
+                'montant_total': Sum('montant_total'),
+            }
+        else:
+            model = rollup_paie_mensuel
+            metrics = {name: Sum(name) for name in cls.METRICS}
+
+        # On charge aussi les 12 mois précédents pour la variation annuelle
+        queryset = model.objects.filter(
+            mois_index__gte=start_index - 12, mois_index__lte=end_index
+        )
+        if service_id:
+            queryset = queryset.filter(service_id=service_id)
+        if group_id:
+            queryset = queryset.filter(group_id=group_id)
+
+        group_by = ['mois_index']
+        if dimension:
+            group_by.append(cls.DIMENSIONS[dimension])
+
+        rows = queryset.values(*group_by).annotate(**metrics).order_by(*group_by)
+
+        series: Dict = {}
+        for row in rows:
+            key = row.get(cls.DIMENSIONS[dimension]) if dimension else 'total'
+            series.setdefault(key, {})[row['mois_index']] = row
+
+        primary_metric = 'montant_total' if dimension == 'type_retenue' else 'masse_salariale_brute'
+
+        return {
+            'start': cls._format_month(start_index),
+            'end': cls._format_month(end_index),
+            'dimension': dimension,
+            'series': [
+                {
+                    'key': key,
+                    'points': cls._build_points(points, start_index, primary_metric, list(metrics)),
+                }
+                for key, points in series.items()
+            ],
+        }
+
+    @classmethod
+    def _build_points(cls, points: Dict, start_index: int, primary_metric: str,
+                      metric_names: List[str]) -> List[Dict]:
+        """Construit les points d'une série avec la variation annuelle."""
+        result = []
+        for index in sorted(points):
+            if index < start_index:
+                continue
+
+            row = points[index]
+            point = {'periode': cls._format_month(index)}
+            point.update({name: row[name] for name in metric_names})
+
+            previous = points.get(index - 12)
+            if previous and previous[primary_metric]:
+                point['variation_annuelle'] = round(
+                    float((row[primary_metric] - previous[primary_metric]) / previous[primary_metric] * 100), 2
+                )
+            else:
+                point['variation_annuelle'] = None
+
+            result.append(point)
+        return result
+
+    @staticmethod
+    def _format_month(index: int) -> str:
+        """Formate un index mensuel en 'AAAA-MM'."""
+        return f"{index // 12}-{index % 12 + 1:02d}"
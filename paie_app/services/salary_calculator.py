@@ -11,7 +11,7 @@ from paie_app.constants import (
     INSS_PENSION_RATE, INSS_PENSION_CAP, INSS_RISK_RATE, INSS_RISK_CAP,
     IRE_BRACKETS, FAMILY_ALLOWANCE_SCALE
 )
-from user_app.models import employe, contrat
+from user_app.models import ServiceGroup, employe, contrat
 
 
 class SalaryCalculatorService:
@@ -208,10 +208,12 @@ class SalaryCalculatorService:
                     continue
                 montant = min(montant, restant)
 
-            retenues_detail[retenue.type_retenue] = {
+            # Plusieurs retenues du même type sont cumulées dans le détail
+            detail = retenues_detail.setdefault(retenue.type_retenue, {
                 'description': retenue.description,
-                'montant': montant
-            }
+                'montant': Decimal('0')
+            })
+            detail['montant'] += montant
             total_retenues += montant
 
         return {
@@ -292,15 +294,24 @@ class SalaryCalculatorService:
         }
         salaire_net = await self.calculate_net_salary(components)
 
+        # Affectation au moment du calcul (les rollups ne suivent pas les mutations)
+        affectation = await ServiceGroup.objects.filter(
+            id=employe_obj.poste_id_id
+        ).values('service_id', 'group_id').afirst() or {}
+
         return {
             'employe_id': employe_obj.id,
             'periode_id': periode.id,
             'contrat_reference': {
+                'type_contrat': contrat_obj.type_contrat,
                 'salaire_base': float(contrat_obj.salaire_base),
                 'indemnite_logement': float(contrat_obj.indemnite_logement),
                 'indemnite_deplacement': float(contrat_obj.indemnite_deplacement),
                 'prime_fonction': float(contrat_obj.prime_fonction),
                 'autre_avantage': float(contrat_obj.autre_avantage),
+                'poste_id': employe_obj.poste_id_id,
+                'service_id': affectation.get('service_id'),
+                'group_id': affectation.get('group_id'),
             },
             'salaire_base': contrat_obj.salaire_base,
             'indemnite_logement': indemnite_logement,
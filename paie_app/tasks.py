@@ -285,10 +285,32 @@ def export_payroll_data(self, periode_id, export_type='excel'):
         self.retry(countdown=60, max_retries=3)
 
 
+@shared_task(bind=True, max_retries=3)
+def refresh_payroll_rollups(self, periode_id):
+    """
+    Rafraîchit les tables de faits mensuelles d'une période approuvée.
+    """
+    try:
+        from paie_app.services.rollup_service import PayrollRollupService
+
+        result = PayrollRollupService.refresh_period(periode_id)
+        return {
+            'status': 'success',
+            **result
+        }
+
+    except Exception as exc:
+        logger.error(f"Error refreshing payroll rollups for period {periode_id}: {exc}")
+        raise self.retry(exc=exc, countdown=60)
+
+
 @shared_task(bind=True)
 def cleanup_old_alerts(self, days_old=30):
     """
-    Nettoie les anciennes alertes résolues.
+    Nettoie les alertes résolues depuis plus de ``days_old`` jours.
+
+    Les partitions entièrement hors rétention de paie_alert (si la table est
+    partitionnée) sont supprimées par utilities.tasks.maintain_partitions.
     """
     try:
         from paie_app.models import Alert
@@ -0,0 +1,132 @@
+"""
+Tests pour le moteur de diff d'audit.
+"""
+import pytest
+from unittest.mock import patch
+from django.test import TestCase
+
+from paie_app.models import periode_paie, retenue_employe
+from user_app.models import employe
+from utilities.audit_diff import SNAPSHOT_ATTR, audited_bulk_update, diff_snapshots, json_diff
+
+
+class TestJsonDiff(TestCase):
+    """Tests de génération des patchs JSON"""
+
+    def test_only_changed_fields(self):
+        """Seuls les champs modifiés apparaissent dans le patch"""
+        forward, inverse = diff_snapshots(
+            {'statut': 'DRAFT', 'mois': 1}, {'statut': 'APPROVED', 'mois': 1}
+        )
+
+        self.assertEqual(forward, [{'op': 'replace', 'path': '/statut', 'value': 'APPROVED'}])
+        self.assertEqual(inverse, [{'op': 'replace', 'path': '/statut', 'value': 'DRAFT'}])
+
+    def test_nested_json_fields(self):
+        """Les champs JSON sont comparés récursivement"""
+        patch_ops = json_diff(
+            {'cotisations': {'inss': 10, 'onpr': 5}},
+            {'cotisations': {'inss': 12, 'mfp': 3}},
+        )
+
+        self.assertIn({'op': 'replace', 'path': '/cotisations/inss', 'value': 12}, patch_ops)
+        self.assertIn({'op': 'remove', 'path': '/cotisations/onpr'}, patch_ops)
+        self.assertIn({'op': 'add', 'path': '/cotisations/mfp', 'value': 3}, patch_ops)
+
+
+@pytest.mark.django_db
+@patch('utilities.audit_diff.AuditPipeline')
+class TestModelDiff(TestCase):
+    """Tests de journalisation des modifications de modèles suivis"""
+
+    def _records(self, mock_pipeline, action):
+        return [
+            call.args[0] for call in mock_pipeline.enqueue.call_args_list
+            if call.args[0]['action'] == action
+        ]
+
+    def test_update_logs_changed_fields_only(self, mock_pipeline):
+        """Une sauvegarde ne journalise que les champs modifiés"""
+        periode = periode_paie.objects.create(annee=2024, mois=3)
+        periode = periode_paie.objects.get(pk=periode.pk)
+        periode.statut = 'APPROVED'
+        periode.save()
+
+        record = self._records(mock_pipeline, 'UPDATE')[0]
+        self.assertEqual(
+            record['nouvelles_valeurs'], [{'op': 'replace', 'path': '/statut', 'value': 'APPROVED'}]
+        )
+        self.assertEqual(record['type_ressource'], 'periode_paie')
+
+    def test_unchanged_save_logs_nothing(self, mock_pipeline):
+        """Une sauvegarde sans modification ne produit aucune entrée"""
+        periode = periode_paie.objects.create(annee=2024, mois=4)
+        periode_paie.objects.get(pk=periode.pk).save()
+
+        self.assertEqual(self._records(mock_pipeline, 'UPDATE'), [])
+
+    def test_bulk_update_is_audited(self, mock_pipeline):
+        """bulk_update journalise une entrée par instance modifiée"""
+        for mois in (5, 6, 7):
+            periode_paie.objects.create(annee=2024, mois=mois)
+        periodes = list(periode_paie.objects.filter(annee=2024, mois__in=(5, 6, 7)))
+        periodes[0].statut = 'APPROVED'
+        periodes[1].statut = 'APPROVED'
+
+        audited_bulk_update(periode_paie, periodes, ['statut'])
+
+        self.assertEqual(len(self._records(mock_pipeline, 'UPDATE')), 2)
+
+
+@pytest.mark.django_db
+@patch('utilities.audit_diff.AuditPipeline')
+class TestJsonFieldDiff(TestCase):
+    """Tests des champs JSON: pas de copie au chargement, référence relue en base"""
+
+    def setUp(self):
+        agent = employe.objects.create(
+            nom='Doe', prenom='John', date_naissance='1990-01-01', sexe='M',
+            statut_matrimonial='S', nationalite='Burundaise', banque='Test Bank',
+            numero_compte='123456789', niveau_etude='Universitaire', numero_inss='INSS123456',
+            email_personnel='john.doe@example.com', telephone_personnel='+25779000000',
+            adresse_ligne1='123 Test Street', ville='Bujumbura', province='Bujumbura',
+            pays='Burundi', date_embauche='2020-01-01',
+        )
+        self.retenue = retenue_employe.objects.create(
+            employe_id=agent, type_retenue='LOAN', description='Prêt',
+            montant_mensuel=100, date_debut='2024-01-01',
+            modification_history=[{'action': 'created'}],
+        )
+
+    def _updates(self, mock_pipeline):
+        return [
+            call.args[0] for call in mock_pipeline.enqueue.call_args_list
+            if call.args[0]['action'] == 'UPDATE'
+        ]
+
+    def test_load_does_not_snapshot_json_fields(self, mock_pipeline):
+        """Le chargement ne photographie que les champs non JSON"""
+        retenue = retenue_employe.objects.get(pk=self.retenue.pk)
+
+        snapshot = getattr(retenue, SNAPSHOT_ATTR)
+        self.assertNotIn('modification_history', snapshot)
+        self.assertEqual(snapshot['description'], 'Prêt')
+
+    def test_in_place_json_change_is_logged(self, mock_pipeline):
+        """Une modification en place d'un champ JSON est comparée à l'état en base"""
+        retenue = retenue_employe.objects.get(pk=self.retenue.pk)
+        retenue.modification_history.append({'action': 'updated'})
+        retenue.save()
+
+        record = self._updates(mock_pipeline)[-1]
+        self.assertEqual(
+            record['nouvelles_valeurs'],
+            [{'op': 'replace', 'path': '/modification_history',
+              'value': [{'action': 'created'}, {'action': 'updated'}]}],
+        )
+
+    def test_unchanged_json_logs_nothing(self, mock_pipeline):
+        """Un champ JSON inchangé ne produit aucune entrée"""
+        retenue_employe.objects.get(pk=self.retenue.pk).save()
+
+        self.assertEqual(self._updates(mock_pipeline), [])
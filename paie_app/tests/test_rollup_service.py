@@ -0,0 +1,171 @@
+"""
+Tests unitaires pour le service de rollups analytiques de paie.
+"""
+from decimal import Decimal
+from django.test import TestCase
+
+from user_app.models import employe, service, Group, ServiceGroup
+from paie_app.models import (
+    periode_paie, entree_paie, retenue_employe, rollup_paie_mensuel, rollup_retenue_mensuel
+)
+from paie_app.services.rollup_service import PayrollRollupService
+
+
+class PayrollRollupServiceTest(TestCase):
+    """Tests pour PayrollRollupService"""
+
+    def setUp(self):
+        """Configuration des données de test"""
+        self.service = service.objects.create(titre='Informatique', code='IT')
+        self.group = Group.objects.create(code='IT', name='Informatique')
+        self.poste = ServiceGroup.objects.create(service=self.service, group=self.group)
+
+        self.employe = employe.objects.create(
+            nom='Doe',
+            prenom='John',
+            date_naissance='1990-01-01',
+            sexe='M',
+            statut_matrimonial='S',
+            nationalite='Burundaise',
+            banque='Test Bank',
+            numero_compte='123456789',
+            niveau_etude='Universitaire',
+            numero_inss='INSS123456',
+            email_personnel='john.doe@example.com',
+            telephone_personnel='+25779000000',
+            adresse_ligne1='123 Test Street',
+            ville='Bujumbura',
+            province='Bujumbura',
+            pays='Burundi',
+            date_embauche='2020-01-01',
+            poste_id=self.poste
+        )
+
+        self.periode_2023 = periode_paie.objects.create(annee=2023, mois=1, statut='APPROVED')
+        self.periode_2024 = periode_paie.objects.create(annee=2024, mois=1, statut='APPROVED')
+
+        self._create_entry(self.periode_2023, Decimal('1000.00'))
+        self._create_entry(self.periode_2024, Decimal('1200.00'))
+
+        retenue_employe.objects.create(
+            employe_id=self.employe,
+            type_retenue='LOAN',
+            description='Prêt',
+            montant_mensuel=Decimal('25.00'),
+            date_debut='2022-01-01'
+        )
+
+    def _create_entry(self, periode, salaire_brut):
+        return entree_paie.objects.create(
+            employe_id=self.employe,
+            periode_paie_id=periode,
+            contrat_reference={'type_contrat': 'PERMANENT'},
+            salaire_base=salaire_brut,
+            salaire_brut=salaire_brut,
+            cotisations_patronales={'total': '100.00'},
+            cotisations_salariales={'total': '50.00'},
+            retenues_diverses={'LOAN': {'description': 'Prêt', 'montant': '25.00'}},
+            total_charge_salariale=salaire_brut + Decimal('100.00'),
+            base_imposable=salaire_brut - Decimal('50.00'),
+            salaire_net=salaire_brut - Decimal('200.00')
+        )
+
+    def test_refresh_period_builds_fact_rows(self):
+        """Les rollups agrègent les entrées par service, groupe et contrat"""
+        result = PayrollRollupService.refresh_period(self.periode_2024.id)
+
+        self.assertEqual(result['salary_rows'], 1)
+        self.assertEqual(result['deduction_rows'], 1)
+
+        rollup = rollup_paie_mensuel.objects.get(periode_paie_id=self.periode_2024)
+        self.assertEqual(rollup.service_id, self.service)
+        self.assertEqual(rollup.group_id, self.group)
+        self.assertEqual(rollup.type_contrat, 'PERMANENT')
+        self.assertEqual(rollup.nombre_employes, 1)
+        self.assertEqual(rollup.masse_salariale_brute, Decimal('1200.00'))
+        self.assertEqual(rollup.total_cotisations_patronales, Decimal('100.00'))
+
+        deduction = rollup_retenue_mensuel.objects.get(periode_paie_id=self.periode_2024)
+        self.assertEqual(deduction.type_retenue, 'LOAN')
+        self.assertEqual(deduction.montant_total, Decimal('25.00'))
+
+    def test_deductions_come_from_entry_snapshot(self):
+        """Les retenues agrégées sont celles déduites, pas l'état courant"""
+        # Modifications postérieures au calcul de la paie
+        retenue_employe.objects.filter(employe_id=self.employe).update(
+            est_active=False, montant_deja_deduit=Decimal('500.00')
+        )
+        retenue_employe.objects.create(
+            employe_id=self.employe, type_retenue='ADVANCE', description='Avance',
+            montant_mensuel=Decimal('100.00'), date_debut='2023-06-01'
+        )
+
+        PayrollRollupService.refresh_period(self.periode_2024.id)
+
+        rows = dict(
+            rollup_retenue_mensuel.objects.filter(periode_paie_id=self.periode_2024)
+            .values_list('type_retenue', 'montant_total')
+        )
+        self.assertEqual(rows, {'LOAN': Decimal('25.00')})
+
+    def test_rollups_keep_period_time_assignment(self):
+        """Une mutation ultérieure ne déplace pas les rollups passés"""
+        entree_paie.objects.filter(periode_paie_id=self.periode_2024).update(
+            contrat_reference={
+                'type_contrat': 'PERMANENT',
+                'service_id': self.service.id,
+                'group_id': self.group.id,
+            }
+        )
+        autre_service = service.objects.create(titre='Finances', code='FIN')
+        autre_groupe = Group.objects.create(code='FIN', name='Finances')
+        self.employe.poste_id = ServiceGroup.objects.create(service=autre_service, group=autre_groupe)
+        self.employe.save()
+
+        PayrollRollupService.refresh_period(self.periode_2024.id)
+
+        rollup = rollup_paie_mensuel.objects.get(periode_paie_id=self.periode_2024)
+        self.assertEqual(rollup.service_id, self.service)
+        self.assertEqual(rollup.group_id, self.group)
+        deduction = rollup_retenue_mensuel.objects.get(periode_paie_id=self.periode_2024)
+        self.assertEqual(deduction.service_id, self.service)
+        self.assertEqual(deduction.group_id, self.group)
+
+    def test_refresh_period_is_idempotent(self):
+        """Un second rafraîchissement remplace les lignes existantes"""
+        PayrollRollupService.refresh_period(self.periode_2024.id)
+        PayrollRollupService.refresh_period(self.periode_2024.id)
+
+        self.assertEqual(
+            rollup_paie_mensuel.objects.filter(periode_paie_id=self.periode_2024).count(), 1
+        )
+
+    def test_get_trends_with_year_over_year(self):
+        """Les tendances calculent la variation annuelle"""
+        PayrollRollupService.refresh_all()
+
+        trends = PayrollRollupService.get_trends(
+            start=(2024, 1), end=(2024, 12), service_id=self.service.id
+        )
+
+        self.assertEqual(len(trends['series']), 1)
+        points = trends['series'][0]['points']
+        self.assertEqual(len(points), 1)
+        self.assertEqual(points[0]['periode'], '2024-01')
+        self.assertEqual(points[0]['variation_annuelle'], 20.0)
+
+    def test_get_trends_by_deduction_type(self):
+        """Ventilation des tendances par type de retenue"""
+        PayrollRollupService.refresh_all()
+
+        trends = PayrollRollupService.get_trends(
+            start=(2023, 1), end=(2024, 1), dimension='type_retenue'
+        )
+
+        self.assertEqual(trends['series'][0]['key'], 'LOAN')
+        self.assertEqual(len(trends['series'][0]['points']), 2)
+
+    def test_get_trends_rejects_unknown_dimension(self):
+        """Une dimension inconnue lève une erreur"""
+        with self.assertRaises(ValueError):
+            PayrollRollupService.get_trends(start=(2024, 1), end=(2024, 2), dimension='foo')
@@ -17,6 +17,8 @@ router.register("retenue_employe", RetenueEmployeAPIView,
 urlpatterns = [
     # Audit reports URLs
     path('audit/', include('paie_app.modules.audit_reports.urls')),
+    # Analytics URLs
+    path('analytics/', include('paie_app.modules.analytics.urls')),
     # API router URLs
     path('', include(router.urls)),
 ]
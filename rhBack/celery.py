@@ -15,6 +15,10 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
+app.autodiscover_tasks(['utilities'])
+
+# Per-task SQL query instrumentation (task_prerun / task_postrun signals)
+import utilities.query_monitor  # noqa: E402,F401
 
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
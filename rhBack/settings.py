@@ -1,5 +1,6 @@
 from dotenv import load_dotenv as _env
 from datetime import timedelta
+from celery.schedules import crontab
 from pathlib import Path
 import sys
 import os
@@ -60,12 +61,15 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'utilities.middleware.CompressionMiddleware',  # brotli / gzip above HTTP_CACHE['COMPRESS_MIN_SIZE']
+    'utilities.middleware.QueryInstrumentationMiddleware',  # SQL query budgets / N+1 detection
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'utilities.middleware.JWTAuthenticationMiddleware',  # JWT auth middleware
     'utilities.middleware.AuditMiddleware',  # Audit logging middleware
+    'utilities.middleware.ResourceETagMiddleware',  # Weak ETags / 304 from resource versions
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -114,12 +118,17 @@ REST_FRAMEWORK = {
 
     'DEFAULT_RENDERER_CLASSES': (
         [
-            "rest_framework.renderers.JSONRenderer",
+            "utilities.json_codec.FastJSONRenderer",
             "rest_framework.renderers.BrowsableAPIRenderer",
         ] if DEBUG else [
-            "rest_framework.renderers.JSONRenderer",
+            "utilities.json_codec.FastJSONRenderer",
         ]
     ),
+    'DEFAULT_PARSER_CLASSES': [
+        "utilities.json_codec.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 
     'DEFAULT_SCHEMA_CLASS': "drf_spectacular.openapi.AutoSchema",
 }
@@ -441,13 +450,122 @@ CELERY_TASK_ROUTES = {
     'paie_app.tasks.generate_payslip': {'queue': 'payslips'},
     'paie_app.tasks.generate_batch_payslips': {'queue': 'payslips'},
     'paie_app.tasks.export_payroll_data': {'queue': 'exports'},
+    'paie_app.tasks.refresh_payroll_rollups': {'queue': 'payroll'},
     'utilities.audit_service.create_audit_log_async': {'queue': 'audit'},  # Queue dédiée pour l'audit
+    'utilities.tasks.drain_audit_buffer': {'queue': 'audit'},
+    'utilities.tasks.maintain_partitions': {'queue': 'audit'},
+    'conge_app.tasks.rollover_leave_balances': {'queue': 'payroll'},
 }
 
 # Celery task priorities
 CELERY_TASK_DEFAULT_PRIORITY = 5
 CELERY_TASK_PRIORITIES = {
     'utilities.audit_service.create_audit_log_async': 3,  # Priorité basse pour l'audit (ne bloque pas les autres tâches)
+    'utilities.tasks.drain_audit_buffer': 3,
+}
+
+# Periodic tasks (celery beat)
+CELERY_BEAT_SCHEDULE = {
+    'drain-audit-buffer': {
+        'task': 'utilities.tasks.drain_audit_buffer',
+        'schedule': 2.0,  # seconds
+        'options': {'expires': 10},
+    },
+    'maintain-partitions': {
+        'task': 'utilities.tasks.maintain_partitions',
+        'schedule': 24 * 60 * 60,  # daily
+    },
+    'rollover-leave-balances': {
+        'task': 'conge_app.tasks.rollover_leave_balances',
+        'schedule': crontab(minute=30, hour=0, day_of_month=1, month_of_year=1),  # yearly
+    },
+}
+
+# Monthly range partitions (see utilities.partitioning / manage_partitions)
+PARTITIONING = {
+    'TABLES': {
+        'auth_audit_log': {'column': 'timestamp', 'retention_months': 24, 'archive': True},
+        'paie_alert': {'column': 'created_at', 'retention_months': 12, 'archive': False},
+    },
+    'PREMAKE_MONTHS': 3,
+    'ARCHIVE_DIR': BASE_DIR / 'archives',
+}
+
+# Buffered audit pipeline (see utilities.audit_pipeline)
+AUDIT_PIPELINE = {
+    'BUFFER_KEY': 'rhback:audit:buffer',
+    'BATCH_SIZE': 500,          # rows per bulk INSERT
+    'SOFT_LIMIT': 50_000,       # pending events above which VIEW events are dropped
+    'HARD_LIMIT': 200_000,      # pending events above which every event is dropped
+    'FLUSH_INTERVAL': 2.0,      # seconds, in-memory fallback flusher
+    'DEAD_LETTER_KEY': 'rhback:audit:buffer:dead',
+    'DEAD_LETTER_LIMIT': 10_000,  # events kept in the dead-letter list
+    'LENGTH_REFRESH': 1.0,      # seconds a buffer length above SOFT_LIMIT is trusted
+}
+
+# Leave balance engine (see conge_app.services.leave_balance)
+LEAVE_BALANCE = {
+    'MAX_CARRY_OVER': None,     # days carried over per leave type, None = no cap
+    'ALLOW_NEGATIVE': False,    # approve requests beyond the remaining balance
+}
+
+# Working-day calendars per country and year (see conge_app.services.working_days)
+WORKING_CALENDAR = {
+    'DEFAULT_COUNTRY': 'Burundi',   # used when employe.pays is empty
+    'WEEKEND': (5, 6),              # weekday() numbers: Saturday, Sunday
+    'L1_TTL': 300,                  # seconds in process memory
+}
+
+# Team absence calendar (see conge_app.services.team_calendar)
+TEAM_CALENDAR = {
+    'MAX_DAYS': 366,            # longest period per request
+    'CACHE_TTL': 3600,          # seconds per (service or group, month); writes change the key anyway
+}
+
+# Models audited field by field (see utilities.audit_diff): only changed
+# fields are logged, as JSON patches. '__all__' or a list of field names.
+AUDIT_TRACKED_MODELS = {
+    'user_app.employe': '__all__',
+    'user_app.contrat': '__all__',
+    'paie_app.periode_paie': '__all__',
+    'paie_app.entree_paie': '__all__',
+    'paie_app.retenue_employe': '__all__',
+    'conge_app.demande_conge': '__all__',
+}
+
+# What the audit middleware captures per resource (see utilities.audit_capture).
+# mode: 'changes' (fields sent in the request only), 'full' or 'none'
+AUDIT_CAPTURE_POLICY = {
+    'DEFAULT': {'mode': 'changes', 'max_bytes': 4096},
+    # Path segments containing one of these never have their bodies captured
+    'SKIP_BODY_PATTERNS': ('export', 'bulk', 'batch', 'download', 'pdf'),
+    'RESOURCES': {
+        'documents': {'mode': 'none'},
+        'entree_paie': {'mode': 'changes', 'max_bytes': 2048},
+        'employees': {'mode': 'changes', 'max_bytes': 8192},
+        'audit': {'mode': 'none'},
+    },
+}
+
+# ****************************************************************
+# QUERY INSTRUMENTATION
+# ****************************************************************
+
+# Same SQL shape executed more than N times in one request/task -> N+1 warning
+QUERY_N_PLUS_ONE_THRESHOLD = 5
+# Queries slower than this (seconds) are reported as slow
+QUERY_SLOW_THRESHOLD = 1.0
+# Raise instead of logging when a view exceeds its query_budget (tests)
+QUERY_BUDGET_STRICT = False
+
+# Metrics store (rolling windows of log-bucketed histograms, see utilities.metrics)
+METRICS = {
+    'PREFIX': 'rhback:metrics',
+    'WINDOW_SECONDS': 60,
+    'RETENTION_WINDOWS': 60,  # 1 hour of rolling history
+    'FLUSH_INTERVAL': 1.0,      # seconds between two flushes of the in-process aggregates
+    'TOKEN': os.getenv('METRICS_TOKEN'),  # Bearer token required by /metrics/
+    'PUBLIC': False,            # serve /metrics/ without a token (development only)
 }
 
 # ****************************************************************
@@ -471,6 +589,54 @@ CACHE_TIMEOUTS = {
     'payroll_constants': 3600,  # 1 hour
     'employee_contracts': 1800,  # 30 minutes
     'period_statistics': 900,   # 15 minutes
+    'pagination_count': 30,     # 30 seconds
+    'session_seen': 900,        # one SESSION_SEEN audit event per user/IP per 15 minutes
+}
+
+# Authenticated user cache (utilities.auth_cache)
+AUTH_CACHE = {
+    'USER_L1_TTL': 5,          # in-process cache; also bounds revocation propagation
+    'USER_L2_TTL': 300,        # Redis cache, invalidated by User post_save/post_delete
+    'L1_MAX_ENTRIES': 10_000,
+}
+
+# Verified JWT payloads memoized per token until their expiry (utilities.jwt_utils)
+JWT_VERIFIED_CACHE_SIZE = 10_000
+
+# Token revocation list (utilities.revocation): Redis reference copy, local bloom filter
+TOKEN_REVOCATION = {
+    'PREFIX': 'rhback:auth:revoked',
+    'SYNC_INTERVAL': 1.0,       # seconds between two version checks per process
+    'BLOOM_CAPACITY': 100_000,
+    'BLOOM_ERROR_RATE': 0.001,  # false positives are confirmed in Redis
+    'RETRY_INTERVAL': 5.0,      # seconds before reconnecting after a Redis failure
+    'MAX_STALENESS': 60.0,      # Redis down longer than this: every token is refused (None: never)
+}
+
+# Compiled RBAC matrix (user_app.modules.permission.matrix), versioned in Redis
+RBAC_MATRIX = {
+    'VERSION_KEY': 'rbac:matrix:version',
+    'SYNC_INTERVAL': 1.0,       # seconds between two version checks per process
+}
+
+# Per-model version counters bumped on writes (utilities.resource_versions)
+RESOURCE_VERSIONS = {
+    'PREFIX': 'resource:version',
+    'APPS': ('user_app', 'paie_app', 'conge_app'),
+}
+
+# Declarative list response cache (utilities.response_cache, cache_list = True)
+RESPONSE_CACHE = {
+    'L1_TTL': 60,               # seconds in process memory
+    'L1_MAX_ENTRIES': 2_000,
+    'L2_TTL': 3600,             # seconds in Redis; writes change the key anyway
+}
+
+# Conditional GET and response compression (utilities.middleware)
+HTTP_CACHE = {
+    'ETAGS': True,
+    'COMPRESS_MIN_SIZE': 1024,  # bytes; smaller responses are sent as is
+    'BROTLI_QUALITY': 5,        # used when the optional brotli package is installed
 }
 
 
@@ -14,6 +14,7 @@ from drf_spectacular.views import (
 from user_app.urls import router as user_app_router
 from paie_app.urls import router as paie_app_router
 from conge_app.urls import router as conge_app_router
+from utilities.metrics import metrics_view
 
 # Create main ADRF router and extend with app routers
 router = routers.DefaultRouter()
@@ -24,6 +25,9 @@ router.registry.extend(conge_app_router.registry)
 urlpatterns = [
     path('admin/', admin.site.urls),
 
+    # Prometheus metrics
+    path('metrics/', metrics_view, name='metrics'),
+
     # API Documentation
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'),
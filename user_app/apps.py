@@ -4,3 +4,28 @@ from django.apps import AppConfig
 class UserAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'user_app'
+
+    def ready(self):
+        # Extension pg_trgm requise par l'index de recherche des logs d'audit
+        from django.db.models.signals import pre_migrate
+        from utilities.audit_search import ensure_trigram_extension
+        pre_migrate.connect(ensure_trigram_extension, sender=self, dispatch_uid='user_app_pg_trgm')
+
+        # Moteur de diff d'audit sur les modèles suivis (AUDIT_TRACKED_MODELS)
+        from utilities.audit_diff import register_tracked_models
+        register_tracked_models()
+
+        # Invalidation du cache des utilisateurs authentifiés (JWT)
+        from django.contrib.auth import get_user_model
+        from django.db.models.signals import post_delete, post_save
+        from utilities.auth_cache import invalidate_user
+        post_save.connect(invalidate_user, sender=get_user_model(), dispatch_uid='auth_user_cache_save')
+        post_delete.connect(invalidate_user, sender=get_user_model(), dispatch_uid='auth_user_cache_delete')
+
+        # Matrice RBAC compilée: reconstruite à chaque modification des droits
+        from user_app.modules.permission.matrix import register_matrix_signals
+        register_matrix_signals()
+
+        # Versions des ressources (ETags des GET): incrémentées à chaque écriture
+        from utilities.resource_versions import register_resource_signals
+        register_resource_signals()
@@ -0,0 +1,23 @@
+"""
+Commande Django pour renseigner la colonne de recherche des logs d'audit existants.
+Usage: python manage.py backfill_audit_search [--batch-size N]
+"""
+from django.core.management.base import BaseCommand
+
+from utilities.audit_search import backfill_search_text
+
+
+class Command(BaseCommand):
+    help = "Renseigne search_text des logs d'audit créés avant l'index de recherche"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50_000,
+            help="Taille des tranches d'identifiants mises à jour par requête (défaut: 50000)",
+        )
+
+    def handle(self, *args, **options):
+        updated = backfill_search_text(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"✅ {updated} logs d'audit indexés"))
@@ -0,0 +1,124 @@
+"""
+Benchmark de la recherche dans les logs d'audit sur un jeu synthétique.
+Usage: python manage.py benchmark_audit_search [--rows 10000000] [--users 5000] [--keep]
+
+Compare, sur des tables dédiées (bench_audit_*), la recherche historique
+(icontains joint sur les utilisateurs) et la colonne search_text indexée
+par pg_trgm. Les données sont générées côté serveur (generate_series).
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from utilities.audit_search import SEARCH_SEPARATOR
+
+QUERIES = {
+    'email': 'user4242@',
+    'resource': 'entree_paie',
+    'path': '/api/user/employees/1234',
+}
+
+
+class Command(BaseCommand):
+    help = "Mesure la latence de recherche des logs d'audit (avant / après index trigramme)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000_000, help='Nombre de logs synthétiques')
+        parser.add_argument('--users', type=int, default=5_000, help="Nombre d'utilisateurs synthétiques")
+        parser.add_argument('--runs', type=int, default=5, help='Exécutions par requête')
+        parser.add_argument('--keep', action='store_true', help='Conserve les tables de benchmark')
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            self._generate(cursor, options['rows'], options['users'])
+
+            self.stdout.write('\n' + '=' * 60)
+            self.stdout.write(f"🔎 RECHERCHE AUDIT - {options['rows']:,} lignes")
+            self.stdout.write('=' * 60)
+            for label, term in QUERIES.items():
+                legacy = self._measure(cursor, self._legacy_sql(), term, options['runs'])
+                indexed = self._measure(cursor, self._indexed_sql(), term.lower(), options['runs'])
+                self.stdout.write(
+                    f"{label:<10} icontains+join: {legacy:9.1f} ms | "
+                    f"search_text trgm: {indexed:8.1f} ms | x{legacy / max(indexed, 0.001):.0f}"
+                )
+
+            if not options['keep']:
+                cursor.execute('DROP TABLE IF EXISTS bench_audit_log, bench_audit_user')
+
+    def _generate(self, cursor, rows, users):
+        self.stdout.write(f'🏗️  Génération de {rows:,} logs synthétiques...')
+        start = time.perf_counter()
+        cursor.execute('DROP TABLE IF EXISTS bench_audit_log, bench_audit_user')
+        cursor.execute(
+            """
+            CREATE TABLE bench_audit_user AS
+            SELECT n AS id, 'user' || n || '@example.com' AS email,
+                   'Nom' || n AS nom, 'Prenom' || n AS prenom
+            FROM generate_series(1, %s) AS n
+            """,
+            [users],
+        )
+        cursor.execute('ALTER TABLE bench_audit_user ADD PRIMARY KEY (id)')
+        cursor.execute(
+            """
+            CREATE TABLE bench_audit_log AS
+            SELECT n AS id,
+                   1 + (n * 7919) %% %s AS user_id,
+                   (ARRAY['employees', 'entree_paie', 'periode_paie', 'demande_conge'])[1 + n %% 4]
+                       AS type_ressource,
+                   (n %% 100000)::text AS id_ressource,
+                   '/api/user/employees/' || (n %% 100000) AS request_path,
+                   (ARRAY['VIEW', 'CREATE', 'UPDATE', 'DELETE'])[1 + n %% 4] AS action
+            FROM generate_series(1, %s) AS n
+            """,
+            [users, rows],
+        )
+        cursor.execute('ALTER TABLE bench_audit_log ADD COLUMN search_text text')
+        cursor.execute(
+            """
+            UPDATE bench_audit_log AS a SET search_text = lower(concat_ws(%s,
+                u.email, u.nom || ' ' || u.prenom, a.type_ressource, a.id_ressource,
+                a.request_path, a.action))
+            FROM bench_audit_user AS u WHERE u.id = a.user_id
+            """,
+            [SEARCH_SEPARATOR],
+        )
+        cursor.execute(
+            'CREATE INDEX bench_audit_search_trgm ON bench_audit_log USING gin (search_text gin_trgm_ops)'
+        )
+        cursor.execute('ANALYZE bench_audit_log')
+        cursor.execute('ANALYZE bench_audit_user')
+        self.stdout.write(f'✅ Données prêtes en {time.perf_counter() - start:.1f}s')
+
+    @staticmethod
+    def _legacy_sql():
+        return """
+            SELECT a.id FROM bench_audit_log AS a
+            LEFT JOIN bench_audit_user AS u ON u.id = a.user_id
+            WHERE u.email ILIKE %(term)s OR u.nom ILIKE %(term)s OR u.prenom ILIKE %(term)s
+               OR a.type_ressource ILIKE %(term)s OR a.id_ressource ILIKE %(term)s
+               OR a.request_path ILIKE %(term)s
+            ORDER BY a.id DESC LIMIT 50
+        """
+
+    @staticmethod
+    def _indexed_sql():
+        return """
+            SELECT a.id FROM bench_audit_log AS a
+            WHERE a.search_text LIKE %(term)s
+            ORDER BY a.id DESC LIMIT 50
+        """
+
+    @staticmethod
+    def _measure(cursor, sql, term, runs):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            cursor.execute(sql, {'term': f'%{term}%'})
+            cursor.fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
@@ -0,0 +1,76 @@
+"""
+Benchmark de la sérialisation des listes (chemin ADRF / chemin compilé).
+Usage: python manage.py benchmark_serializers [--rows 500] [--runs 5] [--serializer employe]
+
+Sérialise les mêmes lignes avec les serializers de lecture (J_*) par le
+chemin ADRF habituel puis par la fonction de ligne compilée
+(adrf_flex_fields.row_serializer), et vérifie que les sorties sont
+identiques. Les lignes existantes sont répétées jusqu'à --rows.
+"""
+import itertools
+import statistics
+import time
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+
+SERIALIZERS = {
+    'employe': 'user_app.modules.employe.serializers.J_employeSerializers',
+    'contrat': 'user_app.modules.contrat.serializers.J_contratSerializers',
+    'demande_conge': 'conge_app.modules.demande_conge.serializers.J_demande_congeSerializers',
+    'solde_conge': 'conge_app.modules.solde_conge.serializers.J_solde_congeSerializers',
+    'audit_log': 'user_app.modules.audit_log.serializers.J_audit_logSerializers',
+}
+
+
+class Command(BaseCommand):
+    help = "Mesure le temps de sérialisation des listes avec et sans fonction de ligne compilée"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500, help='Lignes par réponse')
+        parser.add_argument('--runs', type=int, default=5, help='Exécutions par mode')
+        parser.add_argument('--serializer', choices=sorted(SERIALIZERS), action='append',
+                            help='Serializer à mesurer (tous par défaut)')
+
+    def handle(self, *args, **options):
+        from adrf_flex_fields.serializers import import_lazy_serializer
+
+        self.stdout.write('\n' + '=' * 60)
+        self.stdout.write(f"🧪 SÉRIALISATION DES LISTES - {options['rows']} lignes")
+        self.stdout.write('=' * 60)
+
+        for name in options['serializer'] or sorted(SERIALIZERS):
+            serializer_class = import_lazy_serializer(SERIALIZERS[name])
+            rows = self._load_rows(serializer_class.Meta.model, options['rows'])
+            if not rows:
+                self.stdout.write(f"{name:<14} ⚠️  aucune ligne en base, ignoré")
+                continue
+
+            regular, regular_data = self._measure(serializer_class, rows, False, options['runs'])
+            compiled, compiled_data = self._measure(serializer_class, rows, True, options['runs'])
+            eligible = serializer_class(many=True).child._get_row_function() is not None
+            status = '✅' if regular_data == compiled_data else '❌ sorties différentes'
+            self.stdout.write(
+                f"{name:<14} ADRF: {regular:8.1f} ms | compilé: {compiled:8.1f} ms | "
+                f"x{regular / max(compiled, 0.001):.1f} | "
+                f"{'compilable' if eligible else 'repli ADRF'} {status}"
+            )
+
+    @staticmethod
+    def _load_rows(model, count):
+        rows = list(model.objects.all()[:count])
+        if not rows:
+            return []
+        return list(itertools.islice(itertools.cycle(rows), count))
+
+    @staticmethod
+    def _measure(serializer_class, rows, compiled_read, runs):
+        timings = []
+        data = None
+        for _ in range(runs):
+            serializer = serializer_class(rows, many=True)
+            serializer.child.compiled_read = compiled_read
+            start = time.perf_counter()
+            data = async_to_sync(serializer.ato_representation)(rows)
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings), [dict(item) for item in data]
@@ -2,6 +2,9 @@ from django.db import models
 from django.core.validators import RegexValidator
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Upper
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 import hashlib
 
@@ -237,6 +240,13 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     class Meta:
         db_table = 'user'
+        # Filtres icontains des logs d'audit (user_email, user_name): Django
+        # génère UPPER(col) LIKE UPPER('%...%'), d'où l'index sur l'expression
+        indexes = [
+            GinIndex(OpClass(Upper('email'), name='gin_trgm_ops'), name='user_email_trgm'),
+            GinIndex(OpClass(Upper('nom'), name='gin_trgm_ops'), name='user_nom_trgm'),
+            GinIndex(OpClass(Upper('prenom'), name='gin_trgm_ops'), name='user_prenom_trgm'),
+        ]
 
     def __str__(self):
         return self.email
@@ -504,6 +514,7 @@ class audit_log(models.Model):
         ('DELETE', 'Supprimer'),
         ('LOGIN', 'Connexion'),
         ('LOGOUT', 'Déconnexion'),
+        ('SESSION_SEEN', 'Session active'),
         ('VIEW', 'Voir'),
         ('EXPORT', 'Exporter'),
         ('BULK_OPERATION', 'Opération en lot'),
@@ -521,7 +532,8 @@ class audit_log(models.Model):
     nouvelles_valeurs = models.JSONField(null=True, blank=True, help_text="État après modification")
     adresse_ip = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Heure de l'événement (pas de l'insertion): les logs sont écrits par lots
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
 
     # Nouveaux champs pour un audit plus complet
     session_key = models.CharField(max_length=40, blank=True, help_text="Clé de session utilisateur")
@@ -530,7 +542,15 @@ class audit_log(models.Model):
     response_status = models.IntegerField(null=True, blank=True, help_text="Code de statut HTTP")
     execution_time = models.FloatField(null=True, blank=True, help_text="Temps d'exécution en secondes")
 
+    # Identifiant de corrélation partagé par toutes les entrées d'une même requête
+    correlation_id = models.CharField(max_length=64, blank=True, db_index=True)
+
+    # Texte de recherche dénormalisé (utilisateur, ressource, chemin), voir utilities.audit_search
+    search_text = models.TextField(blank=True, default='', editable=False)
+
     class Meta:
+        # Table partitionnée par mois sur timestamp (PK SQL: id, timestamp),
+        # voir utilities.partitioning et la commande manage_partitions
         db_table = 'auth_audit_log'
         ordering = ['-timestamp']
         indexes = [
@@ -538,8 +558,26 @@ class audit_log(models.Model):
             models.Index(fields=['action', 'timestamp']),
             models.Index(fields=['type_ressource', 'timestamp']),
             models.Index(fields=['adresse_ip', 'timestamp']),
+            models.Index(fields=['timestamp', 'id']),
+            GinIndex(fields=['search_text'], name='audit_search_trgm', opclasses=['gin_trgm_ops']),
+            # Filtres icontains type_ressource / id_ressource (UPPER(col) LIKE ...)
+            GinIndex(OpClass(Upper('type_ressource'), name='gin_trgm_ops'), name='audit_type_trgm'),
+            GinIndex(OpClass(Upper('id_ressource'), name='gin_trgm_ops'), name='audit_id_trgm'),
         ]
 
+    def save(self, *args, **kwargs):
+        if not self.search_text:
+            from utilities.audit_search import build_search_text
+            self.search_text = build_search_text(
+                user=self.user_id,
+                type_ressource=self.type_ressource,
+                id_ressource=self.id_ressource,
+                request_path=self.request_path,
+                adresse_ip=self.adresse_ip,
+                action=self.action,
+            )
+        super().save(*args, **kwargs)
+
     def __str__(self):
         user_display = self.user_id.email if self.user_id else "Anonyme"
         return f"{user_display} - {self.action} - {self.type_ressource} - {self.timestamp}"
@@ -1,13 +1,53 @@
 """
 Utility functions for manual audit logging.
 These can be used directly in views when decorators are not suitable.
+
+They enrich the request's audit event (one entry per request, see
+utilities.audit_context) and only use values already loaded on the
+instances (foreign key ids), so they never trigger extra queries.
+Outside an audited request, the event goes to the buffered pipeline.
 """
 from typing import Optional, Dict, Any
-from django.contrib.auth import get_user_model
-from user_app.models import audit_log, UserGroup, GroupPermission
+from user_app.models import UserGroup, GroupPermission
+from utilities.audit_context import enrich_event
+from utilities.audit_pipeline import AuditPipeline
 from .services import UserManagementAuditService
 
-User = get_user_model()
+
+def record_user_management_event(
+    request,
+    action: str,
+    resource_type: str,
+    resource_id: Any = None,
+    old_values: Optional[Dict[str, Any]] = None,
+    new_values: Optional[Dict[str, Any]] = None
+) -> bool:
+    """
+    Attach a user management action to the request's audit entry.
+
+    Returns:
+        bool: True if the event was recorded or queued
+    """
+    details = {
+        'action': action,
+        'resource_type': resource_type,
+        'resource_id': resource_id,
+        'old_values': old_values,
+        'new_values': new_values,
+    }
+    if enrich_event(**details):
+        return True
+
+    return AuditPipeline.enqueue({
+        'user_id': request.user.pk if request.user.is_authenticated else None,
+        'action': action,
+        'type_ressource': resource_type,
+        'id_ressource': resource_id,
+        'anciennes_valeurs': old_values,
+        'nouvelles_valeurs': new_values,
+        'adresse_ip': UserManagementAuditService.get_client_ip(request),
+        'user_agent': UserManagementAuditService.get_user_agent(request),
+    })
 
 
 async def log_user_group_assignment_manual(
@@ -16,7 +56,7 @@ async def log_user_group_assignment_manual(
     request,
     old_values: Optional[Dict[str, Any]] = None,
     new_values: Optional[Dict[str, Any]] = None
-) -> Optional[audit_log]:
+) -> bool:
     """
     Manually log user-group assignment operations.
 
@@ -28,21 +68,25 @@ async def log_user_group_assignment_manual(
         new_values: New values (for creates/updates)
 
     Returns:
-        audit_log: The created audit log entry or None if failed
+        bool: True if the event was recorded, False if audit logging failed
     """
     try:
-        return await UserManagementAuditService.log_user_group_assignment(
-            user_group=user_group,
+        current = {
+            'user_id': user_group.user_id,
+            'group_id': user_group.group_id,
+            'is_active': user_group.is_active,
+        }
+        return record_user_management_event(
+            request,
             action=action,
-            performed_by=request.user,
-            ip_address=UserManagementAuditService.get_client_ip(request),
-            user_agent=UserManagementAuditService.get_user_agent(request),
-            old_values=old_values,
-            new_values=new_values
+            resource_type='UserGroup',
+            resource_id=f"user:{user_group.user_id}->group:{user_group.group_id}",
+            old_values=old_values if old_values is not None else (current if action == 'DELETE' else None),
+            new_values=new_values if new_values is not None else (current if action != 'DELETE' else None),
         )
     except Exception:
         # Don't fail the request if audit logging fails
-        return None
+        return False
 
 
 async def log_group_permission_change_manual(
@@ -51,7 +95,7 @@ async def log_group_permission_change_manual(
     request,
     old_values: Optional[Dict[str, Any]] = None,
     new_values: Optional[Dict[str, Any]] = None
-) -> Optional[audit_log]:
+) -> bool:
     """
     Manually log group permission changes.
 
@@ -63,28 +107,32 @@ async def log_group_permission_change_manual(
         new_values: New values (for creates/updates)
 
     Returns:
-        audit_log: The created audit log entry or None if failed
+        bool: True if the event was recorded, False if audit logging failed
     """
     try:
-        return await UserManagementAuditService.log_group_permission_change(
-            group_permission=group_permission,
+        current = {
+            'group_id': group_permission.group_id,
+            'permission_id': group_permission.permission_id,
+            'granted': group_permission.granted,
+        }
+        return record_user_management_event(
+            request,
             action=action,
-            performed_by=request.user,
-            ip_address=UserManagementAuditService.get_client_ip(request),
-            user_agent=UserManagementAuditService.get_user_agent(request),
-            old_values=old_values,
-            new_values=new_values
+            resource_type='GroupPermission',
+            resource_id=f"group:{group_permission.group_id}->permission:{group_permission.permission_id}",
+            old_values=old_values if old_values is not None else (current if action == 'DELETE' else None),
+            new_values=new_values if new_values is not None else (current if action != 'DELETE' else None),
         )
     except Exception:
         # Don't fail the request if audit logging fails
-        return None
+        return False
 
 
 async def log_bulk_operation_manual(
     operation_type: str,
     request,
     summary_data: Dict[str, Any]
-) -> Optional[audit_log]:
+) -> bool:
     """
     Manually log bulk operations.
 
@@ -94,18 +142,15 @@ async def log_bulk_operation_manual(
         summary_data: Summary data about the bulk operation
 
     Returns:
-        audit_log: The created audit log entry or None if failed
+        bool: True if the event was recorded, False if audit logging failed
     """
     try:
-        return await audit_log.objects.acreate(
-            user_id=request.user,
+        return record_user_management_event(
+            request,
             action='BULK_OPERATION',
-            type_ressource=f'bulk_{operation_type}',
-            id_ressource='',
-            nouvelles_valeurs=summary_data,
-            adresse_ip=UserManagementAuditService.get_client_ip(request),
-            user_agent=UserManagementAuditService.get_user_agent(request)
+            resource_type=f'bulk_{operation_type}',
+            new_values=summary_data,
         )
     except Exception:
         # Don't fail the request if audit logging fails
-        return None
+        return False
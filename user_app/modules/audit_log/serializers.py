@@ -28,7 +28,7 @@ class J_audit_logSerializers(FlexFieldsModelSerializer):
 
     class Meta:
         model = audit_log
-        fields = '__all__'
+        exclude = ['search_text']
         expandable_fields = {
             'user_id': I_userSerializers,
         }
@@ -8,12 +8,18 @@ This module provides comprehensive audit log querying functionality with:
 - Permission-based access control for audit data
 """
 
+from datetime import datetime, time, timedelta
+
 import django_filters
+from django.db.models import Q
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
 from adrf.viewsets import ModelViewSet
 
 from user_app.models import audit_log
+from utilities.audit_search import AuditSearchFilter
+from utilities.pagination import KeysetPagination
 from utilities.permissions import CanViewAuditLogs
 from .serializers import J_audit_logSerializers, I_audit_logSerializers
 
@@ -38,15 +44,14 @@ class AuditLogFilter(django_filters.FilterSet):
         help_text='Filter audit logs before this timestamp (inclusive)'
     )
 
-    # Date filtering (without time)
+    # Date filtering (without time). Expressed as timestamp ranges rather than
+    # timestamp::date casts so PostgreSQL can prune monthly partitions.
     date_after = django_filters.DateFilter(
-        field_name='timestamp__date',
-        lookup_expr='gte',
+        method='filter_date_after',
         help_text='Filter audit logs after this date (inclusive)'
     )
     date_before = django_filters.DateFilter(
-        field_name='timestamp__date',
-        lookup_expr='lte',
+        method='filter_date_before',
         help_text='Filter audit logs before this date (inclusive)'
     )
 
@@ -56,13 +61,15 @@ class AuditLogFilter(django_filters.FilterSet):
         help_text='Filter by one or more actions'
     )
 
-    # Resource type filtering
+    # Field filters apply their own predicate only: search_text may be empty
+    # (rows written before the backfill) or hold a stale user email / name,
+    # so it is used by ?search= alone. Their icontains lookups are served by
+    # trigram indexes on UPPER(column) (see audit_log.Meta and User.Meta).
     type_ressource = django_filters.CharFilter(
         lookup_expr='icontains',
         help_text='Filter by resource type (case-insensitive partial match)'
     )
 
-    # User filtering with related field lookups
     user_email = django_filters.CharFilter(
         field_name='user_id__email',
         lookup_expr='icontains',
@@ -88,8 +95,19 @@ class AuditLogFilter(django_filters.FilterSet):
             'type_ressource': ['exact', 'icontains'],
             'id_ressource': ['exact', 'icontains'],
             'adresse_ip': ['exact'],
+            'correlation_id': ['exact'],
         }
 
+    @staticmethod
+    def _start_of_day(value):
+        return timezone.make_aware(datetime.combine(value, time.min))
+
+    def filter_date_after(self, queryset, name, value):  # pylint: disable=unused-argument
+        return queryset.filter(timestamp__gte=self._start_of_day(value))
+
+    def filter_date_before(self, queryset, name, value):  # pylint: disable=unused-argument
+        return queryset.filter(timestamp__lt=self._start_of_day(value + timedelta(days=1)))
+
     def filter_user_name(self, queryset, name, value):  # pylint: disable=unused-argument
         """
         Custom filter method to search across user's nom and prenom fields.
@@ -98,11 +116,20 @@ class AuditLogFilter(django_filters.FilterSet):
             return queryset
 
         return queryset.filter(
-            django_filters.Q(user_id__nom__icontains=value) |
-            django_filters.Q(user_id__prenom__icontains=value)
+            Q(user_id__nom__icontains=value) |
+            Q(user_id__prenom__icontains=value)
         )
 
 
+class AuditLogPagination(KeysetPagination):
+    """
+    Keyset pagination on (timestamp, id) with an approximate total count.
+    """
+    page_size = 50
+    ordering = ('-timestamp', '-id')
+    count_mode = 'auto'
+
+
 class AuditLogViewSet(ModelViewSet):
     """
     ViewSet for querying audit logs with comprehensive filtering and search.
@@ -114,7 +141,7 @@ class AuditLogViewSet(ModelViewSet):
     Features:
     - Filter by user, action, resource type, date ranges
     - Search across user details, actions, and resource information
-    - Order by timestamp, action, resource type
+    - Order by timestamp (ascending or descending)
     - Permission-based access control (superuser only)
     - Flexible field selection via ADRF flex_fields
     - Advanced date range filtering
@@ -127,12 +154,15 @@ class AuditLogViewSet(ModelViewSet):
     serializer_class_read = J_audit_logSerializers
     serializer_class_write = I_audit_logSerializers
     permission_classes = [CanViewAuditLogs]
+    pagination_class = AuditLogPagination
+    query_budget = {'list': 5, 'retrieve': 4}
 
     # Filtering and search configuration
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, AuditSearchFilter, OrderingFilter]
     filterset_class = AuditLogFilter
 
-    # Search fields for text-based searching
+    # Search fields (documentation / schema); ?search= matches the denormalized
+    # search_text column, which covers the user, resource, path, IP and action
     search_fields = [
         'user_id__email',
         'user_id__nom',
@@ -141,17 +171,11 @@ class AuditLogViewSet(ModelViewSet):
         'type_ressource',
         'id_ressource',
         'adresse_ip',
-        'user_agent'
     ]
 
-    # Ordering fields
-    ordering_fields = [
-        'timestamp',
-        'action',
-        'type_ressource',
-        'user_id__email',
-        'user_id__nom'
-    ]
+    # Ordering fields: keyset pagination on (timestamp, id) can only
+    # reverse its direction; other orderings are rejected with a 400
+    ordering_fields = ['timestamp']
 
     # Default ordering
     ordering = ['-timestamp']
@@ -4,6 +4,8 @@ from adrf_flex_fields import FlexFieldsModelSerializer
 from user_app.modules.employe.serializers import J_employeSerializers
 
 class J_contratSerializers(FlexFieldsModelSerializer):
+    # Chemin de lecture compilé (mesuré par benchmark_serializers)
+    compiled_read = True
     employe_id = serializers.PrimaryKeyRelatedField(read_only=True)
     class Meta:
         model=contrat
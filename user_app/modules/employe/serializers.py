@@ -4,6 +4,8 @@ from user_app.models import employe
 
 
 class J_employeSerializers(FlexFieldsModelSerializer):
+    # Chemin de lecture compilé (mesuré par benchmark_serializers)
+    compiled_read = True
     poste_id = serializers.PrimaryKeyRelatedField(read_only=True)
     user_account = serializers.PrimaryKeyRelatedField(read_only=True)
 
@@ -10,6 +10,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from adrf.viewsets import ModelViewSet
+from utilities.response_cache import ConditionalGetMixin
 from adrf_flex_fields.views import FlexFieldsMixin, SerializerMethodMixin
 from user_app.models import employe
 from user_app.modules.contrat.serializers import I_contratSerializers
@@ -20,7 +21,7 @@ logger = logging.getLogger(__name__)
 UserModel = get_user_model()
 
 
-class EmployeViewSet(FlexFieldsMixin, SerializerMethodMixin, ModelViewSet):
+class EmployeViewSet(ConditionalGetMixin, FlexFieldsMixin, SerializerMethodMixin, ModelViewSet):
     queryset = employe.objects.all().order_by('-id')
     serializer_class_read = J_employeSerializers
     serializer_class_write = I_employeSerializers
@@ -40,21 +41,8 @@ class EmployeViewSet(FlexFieldsMixin, SerializerMethodMixin, ModelViewSet):
         'user_account',
         'user_account.user_groups'
     ]
-
-    def get_queryset(self):
-        """
-        Override to provide queryset with optimizations using select_related
-        and prefetch_related for better performance with expansions
-        """
-        return employe.objects.select_related(
-            'poste_id',
-            'poste_id__service',
-            'poste_id__group',
-            'user_account'
-        ).prefetch_related(
-            'user_account__user_groups',
-            'user_account__user_groups__group'
-        ).all().order_by('-id')
+    # Nombre maximal de requêtes SQL par action (voir utilities.query_monitor)
+    query_budget = {'list': 8, 'retrieve': 8, 'default': 20}
 
     async def acreate(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
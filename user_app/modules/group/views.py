@@ -9,10 +9,11 @@ from rest_framework.response import Response
 from rest_framework import status
 from asgiref.sync import sync_to_async
 from django.db import transaction
-from utilities.auth import JWT_AUTH
+from utilities.auth import AsyncJWTAuthentication
+from utilities.response_cache import CachedListMixin, ConditionalGetMixin
 
 
-class GroupViewSet(FlexFieldsMixin, SerializerMethodMixin, ModelViewSet):
+class GroupViewSet(ConditionalGetMixin, CachedListMixin, FlexFieldsMixin, SerializerMethodMixin, ModelViewSet):
     """
     Async ViewSet for Group management with ADRF and FlexFields
 
@@ -25,8 +26,9 @@ class GroupViewSet(FlexFieldsMixin, SerializerMethodMixin, ModelViewSet):
     queryset = Group.objects.all().order_by('code')
     serializer_class_read = J_GroupSerializers
     serializer_class_write = I_GroupSerializers
-    authentication_classes = [JWT_AUTH]
+    authentication_classes = [AsyncJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    cache_list = True
 
     # FlexFields configuration
     permit_list_expands = ['service_groups', 'user_groups', 'group_permissions']
@@ -58,11 +60,11 @@ class GroupViewSet(FlexFieldsMixin, SerializerMethodMixin, ModelViewSet):
 
         return queryset
 
-    async def list(self, request, *args, **kwargs):
+    async def list_uncached(self, request, *args, **kwargs):
         """
-        Override list to add custom response data
+        Override list to add custom response data (cached with the list)
         """
-        response = await super().list(request, *args, **kwargs)
+        response = await super().list_uncached(request, *args, **kwargs)
 
         # Add metadata to response
         if hasattr(response, 'data') and isinstance(response.data, dict):
@@ -5,6 +5,7 @@ This module provides services and permission classes for group-based access cont
 """
 
 from .services import PermissionService
+from .matrix import PermissionMatrix
 from .permissions import (
     HasGroupPermission,
     CanManageUserGroups,
@@ -23,6 +24,7 @@ from .serializers import (
 
 __all__ = [
     'PermissionService',
+    'PermissionMatrix',
     'HasGroupPermission',
     'CanManageUserGroups',
     'HasSpecificPermission',
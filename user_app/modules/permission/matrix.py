@@ -0,0 +1,198 @@
+"""
+Compiled RBAC permission matrix.
+
+Each permission codename (``resource.action``) is mapped to a bit index; a
+group's granted permissions become an integer bitset and a user's effective
+permissions the OR of their active groups. The matrix lives in process
+memory and is versioned in Redis: any change to ``Permission``, ``Group``,
+``GroupPermission`` or ``UserGroup`` bumps the version (signals), and each
+process checks it at most once per ``SYNC_INTERVAL`` before rebuilding
+(three queries for the whole matrix).
+
+A permission check is then a dictionary lookup and a bitwise AND.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+logger = logging.getLogger('paie_app.services')
+
+RBAC_MATRIX = {
+    'VERSION_KEY': 'rbac:matrix:version',
+    'SYNC_INTERVAL': 1.0,
+    **getattr(settings, 'RBAC_MATRIX', {}),
+}
+
+
+@dataclass(frozen=True)
+class CompiledMatrix:
+    version: int
+    # codename -> bit mask (1 << index)
+    bits: Dict[str, int] = field(default_factory=dict)
+    # group id -> bitset of granted permissions (active groups only)
+    group_masks: Dict[int, int] = field(default_factory=dict)
+    # user id -> OR of the bitsets of their active groups
+    user_masks: Dict[int, int] = field(default_factory=dict)
+    # user id -> codes of their active groups
+    user_groups: Dict[int, FrozenSet[str]] = field(default_factory=dict)
+    # user id -> ids of their active groups
+    user_group_ids: Dict[int, FrozenSet[int]] = field(default_factory=dict)
+
+    def mask_for(self, codenames: Iterable[str]) -> Optional[int]:
+        """Bitset of several permissions; None if one of them does not exist."""
+        mask = 0
+        for codename in codenames:
+            bit = self.bits.get(codename)
+            if bit is None:
+                return None
+            mask |= bit
+        return mask
+
+    def has(self, user_id: int, codename: str) -> bool:
+        bit = self.bits.get(codename)
+        return bit is not None and bool(self.user_masks.get(user_id, 0) & bit)
+
+    def codenames(self, mask: int) -> Set[str]:
+        return {codename for codename, bit in self.bits.items() if mask & bit}
+
+    def allowed_pairs(self, user_id: int, pairs: Iterable[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+        """Subset of (resource, action) pairs granted to the user."""
+        mask = self.user_masks.get(user_id, 0)
+        return {
+            (resource, action) for resource, action in pairs
+            if mask & self.bits.get(f"{resource}.{action}", 0)
+        }
+
+    def granting_groups(self, user_id: int, codename: str) -> FrozenSet[int]:
+        """The user's groups that grant a permission (group-scoped access)."""
+        bit = self.bits.get(codename, 0)
+        return frozenset(
+            group_id for group_id in self.user_group_ids.get(user_id, ())
+            if self.group_masks.get(group_id, 0) & bit
+        )
+
+
+def compile_matrix(version: int) -> CompiledMatrix:
+    """Builds the whole matrix from the database (three queries)."""
+    from user_app.models import GroupPermission, Permission, UserGroup
+
+    bits = {
+        codename: 1 << index
+        for index, codename in enumerate(Permission.objects.order_by('id').values_list('codename', flat=True))
+    }
+
+    group_masks: Dict[int, int] = {}
+    granted = GroupPermission.objects.filter(
+        granted=True, group__is_active=True
+    ).values_list('group_id', 'permission__codename')
+    for group_id, codename in granted:
+        group_masks[group_id] = group_masks.get(group_id, 0) | bits.get(codename, 0)
+
+    user_masks: Dict[int, int] = {}
+    user_groups: Dict[int, Set[str]] = {}
+    user_group_ids: Dict[int, Set[int]] = {}
+    memberships = UserGroup.objects.filter(
+        is_active=True, group__is_active=True
+    ).values_list('user_id', 'group_id', 'group__code')
+    for user_id, group_id, code in memberships:
+        user_masks[user_id] = user_masks.get(user_id, 0) | group_masks.get(group_id, 0)
+        user_groups.setdefault(user_id, set()).add(code)
+        user_group_ids.setdefault(user_id, set()).add(group_id)
+
+    return CompiledMatrix(
+        version=version,
+        bits=bits,
+        group_masks=group_masks,
+        user_masks=user_masks,
+        user_groups={user_id: frozenset(codes) for user_id, codes in user_groups.items()},
+        user_group_ids={user_id: frozenset(ids) for user_id, ids in user_group_ids.items()},
+    )
+
+
+class PermissionMatrix:
+    """Process-wide compiled matrix, rebuilt when the Redis version changes."""
+
+    _matrix: Optional[CompiledMatrix] = None
+    _stale = True
+    _next_sync = 0.0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def remote_version() -> int:
+        return int(cache.get(RBAC_MATRIX['VERSION_KEY']) or 0)
+
+    @classmethod
+    def sync_due(cls) -> bool:
+        return cls._stale or cls._matrix is None or time.monotonic() >= cls._next_sync
+
+    @classmethod
+    def current(cls) -> CompiledMatrix:
+        """Compiled matrix, checking the Redis version at most once per interval."""
+        if not cls.sync_due():
+            return cls._matrix
+
+        with cls._lock:
+            if not cls.sync_due():
+                return cls._matrix
+            try:
+                version = cls.remote_version()
+            except Exception as e:
+                logger.error(f"❌ RBAC matrix: version unavailable ({e})")
+                version = cls._matrix.version if cls._matrix else 0
+
+            if cls._stale or cls._matrix is None or cls._matrix.version != version:
+                cls._matrix = compile_matrix(version)
+                logger.info(f"🔐 RBAC matrix v{version} compiled: {len(cls._matrix.bits)} permissions, "
+                            f"{len(cls._matrix.user_masks)} users")
+            cls._stale = False
+            cls._next_sync = time.monotonic() + RBAC_MATRIX['SYNC_INTERVAL']
+            return cls._matrix
+
+    @classmethod
+    async def acurrent(cls) -> CompiledMatrix:
+        """Async variant: no thread hop unless a version check is due."""
+        if not cls.sync_due():
+            return cls._matrix
+        return await sync_to_async(cls.current)()
+
+    @classmethod
+    def snapshot(cls) -> Optional[CompiledMatrix]:
+        """Compiled matrix if it is up to date, without any I/O; None otherwise."""
+        return None if cls.sync_due() else cls._matrix
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Marks the matrix stale here and bumps the shared version."""
+        cls._stale = True
+        try:
+            if cache.add(RBAC_MATRIX['VERSION_KEY'], 1, timeout=None):
+                return
+            cache.incr(RBAC_MATRIX['VERSION_KEY'])
+        except Exception as e:
+            logger.error(f"❌ RBAC matrix: version bump failed ({e})")
+
+
+def _on_rbac_change(sender, **kwargs) -> None:
+    # Marked stale here and bumped for other processes only after commit:
+    # compiling earlier could read rows that a rollback discards, and the
+    # matrix would keep them until the next change. Inside the writing
+    # transaction, checks still see the last committed matrix.
+    transaction.on_commit(PermissionMatrix.invalidate)
+
+
+def register_matrix_signals() -> None:
+    """Connects the invalidation of the matrix to the RBAC models."""
+    from user_app.models import Group, GroupPermission, Permission, UserGroup
+
+    for model in (Permission, Group, GroupPermission, UserGroup):
+        uid = f'rbac_matrix:{model._meta.label_lower}'
+        post_save.connect(_on_rbac_change, sender=model, dispatch_uid=uid)
+        post_delete.connect(_on_rbac_change, sender=model, dispatch_uid=uid)
@@ -113,6 +113,12 @@ class HasSpecificPermission(BasePermission):
         if request.user.is_superuser:
             return True
 
+        # Several permissions, all required: evaluated in one batch
+        if hasattr(view, 'required_permissions'):
+            required = {tuple(permission) for permission in view.required_permissions}
+            allowed = await PermissionService.authorize_many(request.user, required)
+            return bool(required) and allowed == required
+
         # Get required permission from view
         if not hasattr(view, 'required_permission'):
             return False
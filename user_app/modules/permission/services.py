@@ -5,11 +5,12 @@ This module provides services for calculating and checking user permissions
 based on their group assignments and the permissions granted to those groups.
 """
 
-from typing import List, Set, Dict, Any
+from typing import Iterable, List, Optional, Set, Dict, Any, Tuple
 from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
-from django.core.cache import cache
+from django.db.models import Exists, OuterRef, Q
 from user_app.models import UserGroup, GroupPermission
+from .matrix import CompiledMatrix, PermissionMatrix
 
 User = get_user_model()
 
@@ -19,9 +20,6 @@ class PermissionService:
     Service class for managing user permissions and group-based access control.
     """
 
-    CACHE_TIMEOUT = 300  # 5 minutes cache timeout
-    CACHE_PREFIX = "user_permissions"
-
     @classmethod
     async def get_user_permissions(cls, user: User) -> Set[str]:
         """
@@ -30,40 +28,8 @@ class PermissionService:
         if not user or not user.is_active:
             return set()
 
-        # Check cache first
-        cache_key = f"{cls.CACHE_PREFIX}:{user.id}"
-        cached_permissions = cache.get(cache_key)
-        if cached_permissions is not None:
-            return cached_permissions
-
-        # Get user's active groups
-        user_groups = await sync_to_async(list)(
-            UserGroup.objects.filter(
-                user=user,
-                is_active=True,
-                group__is_active=True
-            ).select_related('group')
-        )
-
-        if not user_groups:
-            return set()
-
-        # Get all permissions for these groups
-        group_ids = [ug.group.id for ug in user_groups]
-        group_permissions = await sync_to_async(list)(
-            GroupPermission.objects.filter(
-                group_id__in=group_ids,
-                granted=True
-            ).select_related('permission')
-        )
-
-        # Extract permission codenames
-        permissions = {gp.permission.codename for gp in group_permissions}
-
-        # Cache the result
-        cache.set(cache_key, permissions, cls.CACHE_TIMEOUT)
-
-        return permissions
+        matrix = await PermissionMatrix.acurrent()
+        return matrix.codenames(matrix.user_masks.get(user.id, 0))
 
     @classmethod
     async def check_permission(cls, user: User, resource: str, action: str) -> bool:
@@ -77,12 +43,67 @@ class PermissionService:
         if user.is_superuser:
             return True
 
-        # Get user permissions
-        user_permissions = await cls.get_user_permissions(user)
+        # Single bitwise AND against the compiled matrix
+        matrix = await PermissionMatrix.acurrent()
+        return matrix.has(user.id, f"{resource}.{action}")
 
-        # Check for specific permission
-        permission_codename = f"{resource}.{action}"
-        return permission_codename in user_permissions
+    @classmethod
+    async def authorize_many(cls, user: User, pairs: Iterable[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+        """
+        Evaluate many (resource, action) pairs at once and return the allowed subset.
+        """
+        pairs = set(pairs)
+        if not user or not user.is_active:
+            return set()
+        if user.is_superuser:
+            return pairs
+
+        matrix = await PermissionMatrix.acurrent()
+        return matrix.allowed_pairs(user.id, pairs)
+
+    @classmethod
+    def allowed_q(cls, user: User, resource: str, action: str, group_field: Optional[str] = None,
+                  matrix: Optional[CompiledMatrix] = None) -> Q:
+        """
+        Queryset filter restricting rows to those the user may access.
+
+        Without ``group_field`` the permission is global (all rows or none).
+        With ``group_field`` (lookup path to the owning ``Group``, e.g.
+        ``'poste_id__group'``), access is group-scoped: only rows owned by one
+        of the user's groups granting the permission are kept. The group ids
+        come from the compiled matrix; without one, the same rule is pushed
+        down as a SQL subquery.
+        """
+        if not user or not user.is_active:
+            return Q(pk__in=[])
+        if user.is_superuser:
+            return Q()
+
+        codename = f"{resource}.{action}"
+        if matrix is not None:
+            if group_field is None:
+                return Q() if matrix.has(user.id, codename) else Q(pk__in=[])
+            return Q(**{f"{group_field}__in": matrix.granting_groups(user.id, codename)})
+
+        granting = GroupPermission.objects.filter(
+            granted=True,
+            permission__codename=codename,
+            group__is_active=True,
+            group__user_groups__user=user,
+            group__user_groups__is_active=True,
+        )
+        if group_field is None:
+            return Q(Exists(granting))
+        return Q(Exists(granting.filter(group_id=OuterRef(group_field))))
+
+    @classmethod
+    async def filter_allowed(cls, user: User, queryset, resource: str, action: str = 'READ',
+                             group_field: Optional[str] = None):
+        """
+        Restrict a queryset to the rows the user may access (single SQL query).
+        """
+        matrix = await PermissionMatrix.acurrent()
+        return queryset.filter(cls.allowed_q(user, resource, action, group_field, matrix=matrix))
 
     @classmethod
     async def get_effective_permissions(cls, user: User) -> Dict[str, Any]:
@@ -157,31 +178,23 @@ class PermissionService:
         if not user or not user.is_active or not group_codes:
             return False
 
-        user_group_codes = await sync_to_async(list)(
-            UserGroup.objects.filter(
-                user=user,
-                is_active=True,
-                group__is_active=True,
-                group__code__in=group_codes
-            ).values_list('group__code', flat=True)
-        )
-
-        return len(user_group_codes) > 0
+        matrix = await PermissionMatrix.acurrent()
+        return not matrix.user_groups.get(user.id, frozenset()).isdisjoint(group_codes)
 
     @classmethod
     def invalidate_user_cache(cls, user_id: int) -> None:
         """
         Invalidate cached permissions for a specific user.
         """
-        cache_key = f"{cls.CACHE_PREFIX}:{user_id}"
-        cache.delete(cache_key)
+        # Memberships are compiled for all users at once
+        PermissionMatrix.invalidate()
 
     @classmethod
     def invalidate_all_cache(cls) -> None:
         """
         Invalidate all cached permissions.
         """
-        cache.clear()
+        PermissionMatrix.invalidate()
 
     @classmethod
     async def can_manage_user_groups(cls, user: User, target_user: User) -> bool:
@@ -9,6 +9,7 @@ from asgiref.sync import sync_to_async
 
 from user_app.models import GroupPermission, Permission
 from utilities.auth import JWT_AUTH
+from utilities.response_cache import CachedListMixin, ConditionalGetMixin
 from .serializers import (
     GroupPermissionReadSerializer,
     GroupPermissionWriteSerializer,
@@ -19,7 +20,7 @@ from .services import PermissionService
 from user_app.modules.audit.utils import log_group_permission_change_manual
 
 
-class GroupPermissionViewSet(ModelViewSet):
+class GroupPermissionViewSet(ConditionalGetMixin, ModelViewSet):
     """
     Async ViewSet for GroupPermission management
     """
@@ -155,14 +156,8 @@ class GroupPermissionViewSet(ModelViewSet):
         # Override update to add cache invalidation and audit logging
         instance = await sync_to_async(self.get_object)()
         old_data = {
-            'group_id': instance.group.id,
-            'group_code': instance.group.code,
-            'group_name': instance.group.name,
-            'permission_id': instance.permission.id,
-            'permission_codename': instance.permission.codename,
-            'permission_name': instance.permission.name,
-            'permission_resource': instance.permission.resource,
-            'permission_action': instance.permission.action,
+            'group_id': instance.group_id,
+            'permission_id': instance.permission_id,
             'granted': instance.granted
         }
 
@@ -175,18 +170,11 @@ class GroupPermissionViewSet(ModelViewSet):
 
             # Manual audit logging
             try:
-                # Refresh instance to get updated values
-                await sync_to_async(instance.refresh_from_db)()
+                # New values come from the response: no re-fetch for auditing
                 new_data = {
-                    'group_id': instance.group.id,
-                    'group_code': instance.group.code,
-                    'group_name': instance.group.name,
-                    'permission_id': instance.permission.id,
-                    'permission_codename': instance.permission.codename,
-                    'permission_name': instance.permission.name,
-                    'permission_resource': instance.permission.resource,
-                    'permission_action': instance.permission.action,
-                    'granted': instance.granted
+                    key: response.data[key]
+                    for key in ('group', 'permission', 'granted')
+                    if key in response.data
                 }
                 await log_group_permission_change_manual(
                     group_permission=instance,
@@ -204,14 +192,8 @@ class GroupPermissionViewSet(ModelViewSet):
         # Override destroy to add cache invalidation and audit logging
         instance = await sync_to_async(self.get_object)()
         old_data = {
-            'group_id': instance.group.id,
-            'group_code': instance.group.code,
-            'group_name': instance.group.name,
-            'permission_id': instance.permission.id,
-            'permission_codename': instance.permission.codename,
-            'permission_name': instance.permission.name,
-            'permission_resource': instance.permission.resource,
-            'permission_action': instance.permission.action,
+            'group_id': instance.group_id,
+            'permission_id': instance.permission_id,
             'granted': instance.granted
         }
 
@@ -236,7 +218,7 @@ class GroupPermissionViewSet(ModelViewSet):
         return response
 
 
-class PermissionViewSet(ModelViewSet):
+class PermissionViewSet(ConditionalGetMixin, CachedListMixin, ModelViewSet):
     """
     Read-only ViewSet for Permission model
     """
@@ -244,6 +226,7 @@ class PermissionViewSet(ModelViewSet):
     serializer_class = PermissionSerializer
     # authentication_classes = [JWT_AUTH]
     # permission_classes = [CanManagePermissions]
+    cache_list = True
 
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['resource', 'action', 'content_type']
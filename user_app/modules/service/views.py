@@ -3,14 +3,16 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from .serializers import I_serviceSerializers
 from user_app.models import service
+from utilities.response_cache import CachedListMixin, ConditionalGetMixin
 
 
-class ServiceViewSet(ModelViewSet):
+class ServiceViewSet(ConditionalGetMixin, CachedListMixin, ModelViewSet):
     """
     ViewSet for Service management
     """
     queryset = service.objects.all().order_by('-id')
     serializer_class = I_serviceSerializers
+    cache_list = True
 
     # Filtering and search configuration
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
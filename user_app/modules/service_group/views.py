@@ -8,14 +8,15 @@ from .serializers import J_ServiceGroupSerializer, I_ServiceGroupSerializer
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
-from utilities.auth import JWT_AUTH
+from utilities.auth import AsyncJWTAuthentication
+from utilities.response_cache import CachedListMixin, ConditionalGetMixin
 from rest_framework.response import Response
 from rest_framework import status
 from django.db import transaction
 from asgiref.sync import sync_to_async
 
 
-class ServiceGroupViewSet(FlexFieldsMixin, SerializerMethodMixin, ModelViewSet):
+class ServiceGroupViewSet(ConditionalGetMixin, CachedListMixin, FlexFieldsMixin, SerializerMethodMixin, ModelViewSet):
     """
     Async ViewSet for ServiceGroup management with ADRF and FlexFields
 
@@ -28,8 +29,9 @@ class ServiceGroupViewSet(FlexFieldsMixin, SerializerMethodMixin, ModelViewSet):
     queryset = ServiceGroup.objects.all()
     serializer_class_read = J_ServiceGroupSerializer
     serializer_class_write = I_ServiceGroupSerializer
-    authentication_classes = [JWT_AUTH]
+    authentication_classes = [AsyncJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    cache_list = True
 
     # FlexFields configuration
     permit_list_expands = ['service', 'group']
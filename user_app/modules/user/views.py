@@ -10,6 +10,7 @@ from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
 from utilities.jwt_utils import create_access_token, create_refresh_token, verify_token
 from utilities.auth import *
+from utilities.revocation import RevocationList
 from utilities.audit_service import AuditService
 from drf_spectacular.utils import (
     extend_schema,
@@ -33,6 +34,7 @@ from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
 from utilities.jwt_utils import create_access_token, create_refresh_token, verify_token
 from utilities.auth import *
+from utilities.revocation import RevocationList
 from utilities.audit_service import AuditService
 from drf_spectacular.utils import (
     extend_schema,
@@ -247,21 +249,23 @@ class RefreshTokenView(APIView):
             return Response({'error': 'Refresh token requis'},status=status.HTTP_400_BAD_REQUEST)
         try:
             payload = verify_token(refresh_token, 'refresh')
+            if await RevocationList.ais_revoked(payload):
+                raise ValueError('Token révoqué')
             new_access_token = create_access_token(payload['user_id'])
             return Response({'access_token': new_access_token})
         except ValueError as e:
             return Response({'error': str(e)},status=status.HTTP_401_UNAUTHORIZED)
 
 class LogoutView(APIView):
-    authentication_classes = [JWT_AUTH]
+    authentication_classes = [AsyncJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     @extend_schema(
         summary="Déconnexion utilisateur",
         description="""
         Déconnecte l'utilisateur authentifié.
-        Note: Les tokens JWT sont stateless, donc la déconnexion effective
-        doit être gérée côté client en supprimant les tokens.
+        Le token d'accès utilisé (et le token de rafraîchissement fourni, le cas
+        échéant) est révoqué jusqu'à son expiration.
         """,
         tags=["Authentification"],
         responses={
@@ -278,6 +282,15 @@ class LogoutView(APIView):
         }
     )
     async def post(self, request):
+        # Révocation du token d'accès courant et du token de rafraîchissement
+        await RevocationList.arevoke_token(verify_token(request.auth, 'access'))
+        refresh_token = request.data.get('refresh_token')
+        if refresh_token:
+            try:
+                await RevocationList.arevoke_token(verify_token(refresh_token, 'refresh'))
+            except ValueError:
+                pass
+
         # Log logout action
         if hasattr(request, 'user') and request.user.is_authenticated:
             AuditService.log_logout(request.user, request)
@@ -285,7 +298,7 @@ class LogoutView(APIView):
         return Response({'message': 'Déconnecté avec succès. Supprimez les tokens côté client.'})
 
 class ProtectedView(APIView):
-    authentication_classes = [JWT_AUTH]
+    authentication_classes = [AsyncJWTAuthentication]
     # permission_classes = [IsAuthenticated]
 
     @extend_schema(
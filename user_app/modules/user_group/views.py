@@ -14,12 +14,25 @@ from rest_framework.decorators import action
 from asgiref.sync import sync_to_async
 from django.db import transaction
 from utilities.auth import JWT_AUTH
+from user_app.modules.permission.matrix import PermissionMatrix
 from user_app.modules.audit.utils import (
     log_user_group_assignment_manual,
     log_bulk_operation_manual
 )
 
 
+def deactivate_assignment(user, group) -> int:
+    """Deactivates a user's active assignment to a group."""
+    with transaction.atomic():
+        updated = UserGroup.objects.filter(
+            user=user, group=group, is_active=True
+        ).update(is_active=False)
+        if updated:
+            # update() sends no post_save: invalidate the RBAC matrix here
+            transaction.on_commit(PermissionMatrix.invalidate)
+    return updated
+
+
 class UserGroupViewSet(ModelViewSet):
     """
     Async ViewSet for UserGroup management with ADRF
@@ -229,11 +242,7 @@ class UserGroupViewSet(ModelViewSet):
                             UserGroup.objects.get
                         )(user=user, group=group, is_active=True)
 
-                        updated = await sync_to_async(
-                            UserGroup.objects.filter(
-                                user=user, group=group, is_active=True
-                            ).update
-                        )(is_active=False)
+                        updated = await sync_to_async(deactivate_assignment)(user, group)
 
                         if updated:
                             results.append({
@@ -241,8 +250,6 @@ class UserGroupViewSet(ModelViewSet):
                                 'user_email': user.email,
                                 'status': 'removed'
                             })
-                            # Refresh assignment for audit
-                            await sync_to_async(assignment.refresh_from_db)()
                             audit_assignments.append(assignment)
                         else:
                             results.append({
@@ -257,6 +264,25 @@ class UserGroupViewSet(ModelViewSet):
                             'status': 'not_assigned'
                         })
 
+            summary = {
+                'total_users': len(user_ids),
+                'processed': len(results),
+                'successful': len([r for r in results if r['status'] in ['assigned', 'removed']]),
+                'failed': len([r for r in results if r['status'] in ['already_assigned', 'not_assigned']])
+            }
+
+            # Manual audit logging: one summary on the request's audit entry
+            await log_bulk_operation_manual(
+                operation_type='user_group_assignment',
+                request=request,
+                summary_data={
+                    'action': action_type,
+                    'group_id': group.id,
+                    'assignment_ids': [assignment.id for assignment in audit_assignments],
+                    **summary
+                }
+            )
+
             return Response({
                 'message': f'Opération {action_type} terminée',
                 'group': {
@@ -265,12 +291,7 @@ class UserGroupViewSet(ModelViewSet):
                     'name': group.name
                 },
                 'results': results,
-                'summary': {
-                    'total_users': len(user_ids),
-                    'processed': len(results),
-                    'successful': len([r for r in results if r['status'] in ['assigned', 'removed']]),
-                    'failed': len([r for r in results if r['status'] in ['already_assigned', 'not_assigned']])
-                }
+                'summary': summary
             })
 
         except Group.DoesNotExist:
@@ -0,0 +1,85 @@
+"""
+Tests pour la politique de capture du middleware d'audit.
+"""
+from unittest.mock import MagicMock
+from django.http import HttpResponse
+from django.test import TestCase, RequestFactory, override_settings
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from utilities.audit_capture import capture, get_capture_policy
+from utilities.middleware import AuditMiddleware
+
+POLICY = {
+    'DEFAULT': {'mode': 'changes', 'max_bytes': 200},
+    'SKIP_BODY_PATTERNS': ('export', 'bulk'),
+    'RESOURCES': {'documents': {'mode': 'none'}},
+}
+
+
+@override_settings(AUDIT_CAPTURE_POLICY=POLICY)
+class TestCapturePolicy(TestCase):
+    """Tests de résolution et d'application de la politique"""
+
+    def test_skips_bulk_and_export_endpoints(self):
+        """Les endpoints bulk / export ne capturent aucun corps"""
+        self.assertFalse(get_capture_policy('/api/user/user-group/bulk-assign/').captures_body)
+        self.assertFalse(get_capture_policy('/api/paie/export/').captures_body)
+        self.assertTrue(get_capture_policy('/api/user/employees/3/').captures_body)
+
+    def test_resource_override(self):
+        """La politique d'une ressource remplace la politique par défaut"""
+        self.assertEqual(get_capture_policy('/api/user/documents/1/').mode, 'none')
+
+    def test_only_changed_fields(self):
+        """En mode changes, seuls les champs envoyés sont conservés"""
+        policy = get_capture_policy('/api/user/employees/3/')
+        data = {'nom': 'Doe', 'prenom': 'John', 'email': 'j@d.com'}
+
+        self.assertEqual(capture(data, policy, ['nom']), {'nom': 'Doe'})
+
+    def test_lists_are_summarized(self):
+        """Les réponses de liste sont résumées"""
+        policy = get_capture_policy('/api/user/employees/')
+        page = {'count': 1000, 'results': [{'id': index} for index in range(50)]}
+
+        self.assertEqual(capture(page, policy), {'_list': True, 'count': 1000, 'page_size': 50})
+
+    def test_large_payload_is_capped(self):
+        """Une charge trop volumineuse est remplacée par un résumé"""
+        policy = get_capture_policy('/api/user/employees/3/')
+        captured = capture({'notes': 'x' * 1000}, policy)
+
+        self.assertTrue(captured['_truncated'])
+        self.assertEqual(captured['_fields'], ['notes'])
+
+
+@override_settings(AUDIT_CAPTURE_POLICY=POLICY)
+class TestMiddlewareCapture(TestCase):
+    """Tests de réutilisation des données déjà parsées"""
+
+    def setUp(self):
+        self.middleware = AuditMiddleware(lambda request: None)
+        self.factory = RequestFactory()
+
+    def test_reuses_drf_parsed_data(self):
+        """request.data et response.data de DRF sont réutilisés"""
+        request = self.factory.patch('/api/user/employees/3/')
+        drf_request = Request(request)
+        drf_request._full_data = {'nom': 'Doe'}
+        response = Response({'id': 3, 'nom': 'Doe', 'prenom': 'John'})
+        response.renderer_context = {'request': drf_request}
+
+        old_values, new_values = self.middleware._determine_data_changes(request, response, 'UPDATE')
+
+        self.assertEqual(old_values, {'nom': 'Doe'})
+        self.assertEqual(new_values, {'nom': 'Doe'})
+
+    def test_never_decodes_rendered_content(self):
+        """Le contenu rendu d'une réponse non DRF n'est jamais décodé"""
+        request = self.factory.post('/api/user/employees/')
+        response = MagicMock(spec=HttpResponse)
+
+        self.middleware._determine_data_changes(request, response, 'CREATE')
+
+        response.content.decode.assert_not_called()
@@ -0,0 +1,67 @@
+"""
+Tests pour l'entrée d'audit unique par requête et la corrélation.
+"""
+from unittest.mock import MagicMock, patch
+from asgiref.sync import async_to_sync
+from django.test import TestCase, RequestFactory
+from rest_framework.response import Response
+
+from utilities.audit_context import (
+    AuditEvent, current_event, end_event, enrich_event, new_correlation_id, start_event
+)
+from utilities.decorators import audit_action
+
+
+class TestCorrelationId(TestCase):
+    """Tests de l'identifiant de corrélation"""
+
+    def test_reuses_valid_incoming_id(self):
+        """Un X-Request-ID entrant valide est conservé"""
+        self.assertEqual(new_correlation_id('req-1234abcd'), 'req-1234abcd')
+
+    def test_rejects_invalid_incoming_id(self):
+        """Un X-Request-ID invalide est remplacé"""
+        generated = new_correlation_id('bad id; DROP TABLE')
+        self.assertEqual(len(generated), 32)
+
+
+class TestAuditActionDecorator(TestCase):
+    """Tests du décorateur audit_action"""
+
+    def setUp(self):
+        self.request = RequestFactory().post('/api/paie/periode_paie/')
+        self.request.user = MagicMock(is_authenticated=True, pk=1)
+        self.event = start_event(AuditEvent(request=self.request))
+        self.addCleanup(end_event)
+
+    def _view(self):
+        class View:
+            @audit_action('APPROVE', 'periode_paie')
+            async def approve(self, request, pk=None):
+                return Response({'id': pk})
+        return View()
+
+    @patch('utilities.decorators.AuditPipeline')
+    def test_enriches_request_event_without_writing(self, mock_pipeline):
+        """Le décorateur enrichit l'événement de la requête au lieu d'écrire une ligne"""
+        async_to_sync(self._view().approve)(self.request, pk=7)
+
+        self.assertEqual(self.event.action, 'APPROVE')
+        self.assertEqual(self.event.resource_type, 'periode_paie')
+        self.assertEqual(self.event.resource_id, '7')
+        mock_pipeline.enqueue.assert_not_called()
+
+    @patch('utilities.decorators.AuditPipeline')
+    def test_falls_back_to_pipeline_outside_requests(self, mock_pipeline):
+        """Hors requête auditée, l'action part dans le pipeline"""
+        end_event()
+        self.assertIsNone(current_event())
+
+        async_to_sync(self._view().approve)(self.request, pk=7)
+
+        mock_pipeline.enqueue.assert_called_once()
+
+    def test_enrich_event_without_event(self):
+        """enrich_event signale l'absence d'événement"""
+        end_event()
+        self.assertFalse(enrich_event(action='UPDATE'))
@@ -0,0 +1,241 @@
+"""
+Tests pour le pipeline d'audit bufferisé.
+"""
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+from django.db import IntegrityError, OperationalError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from user_app.models import audit_log
+from utilities import audit_pipeline
+from utilities.audit_pipeline import AuditPipeline, LocalAuditBuffer, RedisAuditBuffer
+from utilities.resource_versions import ResourceVersions
+
+User = get_user_model()
+
+
+class ManualBuffer(LocalAuditBuffer):
+    """Buffer en mémoire sans thread de vidage (vidage explicite dans les tests)"""
+
+    def _ensure_flusher(self):
+        pass
+
+
+@pytest.mark.django_db
+@patch('utilities.audit_pipeline.MetricsStore')
+class TestAuditPipeline(TestCase):
+    """Tests de la mise en buffer et de l'écriture par lots"""
+
+    def setUp(self):
+        self.buffer = ManualBuffer()
+        patcher = patch.object(AuditPipeline, '_buffer', self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(email='pipeline@example.com', password='testpass123')
+
+    def _record(self, action='UPDATE', **extra):
+        record = {'user_id': self.user.id, 'action': action, 'type_ressource': 'employe',
+                  'id_ressource': 7, 'nouvelles_valeurs': {'salaire': '1200.50'}}
+        record.update(extra)
+        return record
+
+    def test_drain_writes_buffered_events(self, _mock_metrics):
+        """Les événements bufferisés sont insérés au vidage"""
+        for _ in range(3):
+            self.assertTrue(AuditPipeline.enqueue(self._record()))
+        self.assertEqual(audit_log.objects.count(), 0)
+
+        self.assertEqual(AuditPipeline.drain(), 3)
+
+        entry = audit_log.objects.first()
+        self.assertEqual(audit_log.objects.count(), 3)
+        self.assertEqual(entry.user_id, self.user)
+        self.assertEqual(entry.id_ressource, '7')
+        self.assertEqual(AuditPipeline.pending(), 0)
+
+    def test_drain_uses_one_insert_per_batch(self, _mock_metrics):
+        """Un lot est inséré en une seule requête (plus une lecture des utilisateurs)"""
+        for _ in range(5):
+            AuditPipeline.enqueue(self._record())
+
+        with CaptureQueriesContext(connection) as ctx:
+            AuditPipeline.drain()
+
+        # Les SAVEPOINT du lot (transaction de test) ne sont pas des allers-retours utiles
+        queries = [q['sql'] for q in ctx.captured_queries if 'SAVEPOINT' not in q['sql']]
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(sum(sql.startswith('INSERT') for sql in queries), 1)
+
+    def test_drain_bumps_audit_log_version(self, _mock_metrics):
+        """L'insertion en lot (sans signaux) change la version de audit_log"""
+        before = ResourceVersions.get_many(['user_app.audit_log'])['user_app.audit_log']
+        AuditPipeline.enqueue(self._record())
+        AuditPipeline.drain()
+
+        after = ResourceVersions.get_many(['user_app.audit_log'])['user_app.audit_log']
+        self.assertGreater(after, before)
+
+    def test_event_time_is_preserved(self, _mock_metrics):
+        """L'horodatage est celui de l'événement, pas celui de l'insertion"""
+        event_time = (timezone.now() - timedelta(minutes=5)).replace(microsecond=0)
+        AuditPipeline.enqueue(self._record(timestamp=event_time))
+        AuditPipeline.drain()
+
+        self.assertEqual(audit_log.objects.get().timestamp, event_time)
+
+    def test_failed_batch_is_requeued(self, _mock_metrics):
+        """Un lot en échec est remis dans le buffer"""
+        AuditPipeline.enqueue(self._record())
+
+        with patch('utilities.audit_pipeline.write_batch', side_effect=RuntimeError('db down')):
+            with self.assertRaises(RuntimeError):
+                AuditPipeline.drain()
+
+        self.assertEqual(AuditPipeline.pending(), 1)
+
+    def test_poison_event_is_dead_lettered(self, mock_metrics):
+        """Un événement refusé par la base est isolé; le reste du lot est écrit"""
+        for index in range(5):
+            AuditPipeline.enqueue(self._record(id_ressource=index))
+        real_write = audit_pipeline.write_batch
+
+        def write(records):
+            if any(record['id_ressource'] == 3 for record in records):
+                raise IntegrityError('violates foreign key constraint')
+            return real_write(records)
+
+        with patch('utilities.audit_pipeline.write_batch', side_effect=write):
+            self.assertEqual(AuditPipeline.drain(), 4)
+
+        self.assertEqual(AuditPipeline.pending(), 0)
+        self.assertEqual(audit_log.objects.count(), 4)
+        self.assertFalse(audit_log.objects.filter(id_ressource='3').exists())
+        self.assertEqual(len(self.buffer.dead_letters), 1)
+        self.assertIn('"id_ressource":3', self.buffer.dead_letters[0].replace(' ', ''))
+        mock_metrics.incr.assert_any_call('audit_dead_letter', 'UPDATE')
+
+        # Le buffer n'est plus bloqué: les événements suivants passent
+        AuditPipeline.enqueue(self._record())
+        self.assertEqual(AuditPipeline.drain(), 1)
+
+    def test_connection_loss_during_split_requeues_unwritten_only(self, _mock_metrics):
+        """Après un découpage, seuls les événements non écrits sont remis en tête"""
+        for index in range(4):
+            AuditPipeline.enqueue(self._record(id_ressource=index))
+        real_write = audit_pipeline.write_batch
+
+        def write(records):
+            ids = {record['id_ressource'] for record in records}
+            if 0 in ids:
+                raise IntegrityError('violates foreign key constraint')
+            if 2 in ids:
+                raise OperationalError('connection lost')
+            return real_write(records)
+
+        with patch('utilities.audit_pipeline.write_batch', side_effect=write):
+            with self.assertRaises(OperationalError):
+                AuditPipeline.drain()
+
+        # 0 en lettres mortes, 1 écrit, 2 et 3 remis en tête
+        self.assertEqual(len(self.buffer.dead_letters), 1)
+        self.assertEqual(list(audit_log.objects.values_list('id_ressource', flat=True)), ['1'])
+        self.assertEqual(AuditPipeline.pending(), 2)
+
+        self.assertEqual(AuditPipeline.drain(), 2)
+        self.assertEqual(audit_log.objects.count(), 3)
+        self.assertEqual(len(self.buffer.dead_letters), 1)
+
+    @patch.object(audit_pipeline, 'SOFT_LIMIT', 2)
+    @patch.object(audit_pipeline, 'HARD_LIMIT', 3)
+    def test_backpressure_drops_low_priority_first(self, mock_metrics):
+        """Sous contre-pression, les consultations sont abandonnées avant le reste"""
+        AuditPipeline.enqueue(self._record())
+        AuditPipeline.enqueue(self._record())
+
+        self.assertFalse(AuditPipeline.enqueue(self._record(action='VIEW')))
+        self.assertTrue(AuditPipeline.enqueue(self._record(action='DELETE')))
+        self.assertFalse(AuditPipeline.enqueue(self._record(action='DELETE')))
+
+        self.assertEqual(AuditPipeline.pending(), 3)
+        mock_metrics.incr.assert_any_call('audit_dropped', 'VIEW')
+        mock_metrics.incr.assert_any_call('audit_dropped', 'DELETE')
+
+
+class FakeRedis:
+    """Liste Redis minimale (rpush, llen, ltrim, lrange, pipeline)"""
+
+    def __init__(self):
+        self.items = []
+        self.llen_calls = 0
+
+    def rpush(self, key, *values):
+        self.items.extend(values)
+        return len(self.items)
+
+    def llen(self, key):
+        self.llen_calls += 1
+        return len(self.items)
+
+    def ltrim(self, key, start, end):
+        self.items = self.items[start:] if end == -1 else self.items[start:end + 1]
+
+    def lrange(self, key, start, end):
+        return self.items[start:end + 1]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, args))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args) for name, args in self.calls]
+
+
+class TestRedisAuditBuffer(TestCase):
+    """Tests de la limite souple du buffer Redis"""
+
+    @patch.object(audit_pipeline, 'SOFT_LIMIT', 2)
+    @patch.object(audit_pipeline, 'LENGTH_REFRESH', 0)
+    def test_low_priority_resumes_after_drain(self):
+        """Les consultations sont de nouveau acceptées une fois le buffer vidé ailleurs"""
+        client = FakeRedis()
+        buffer = RedisAuditBuffer(client)
+        buffer.push('a', False)
+        buffer.push('b', False)
+        self.assertFalse(buffer.push('view', True))
+
+        # Vidage par un autre processus: la longueur mémorisée est relue
+        client.items = []
+        self.assertTrue(buffer.push('view', True))
+        self.assertEqual(client.items, ['view'])
+
+    @patch.object(audit_pipeline, 'SOFT_LIMIT', 2)
+    def test_length_is_not_read_on_every_push(self):
+        """Sous la limite souple, aucun LLEN n'est émis"""
+        client = FakeRedis()
+        buffer = RedisAuditBuffer(client)
+        buffer.push('a', True)
+        buffer.push('b', True)
+        self.assertEqual(client.llen_calls, 0)
+
+    @patch.object(audit_pipeline, 'SOFT_LIMIT', 2)
+    def test_pop_batch_refreshes_length(self):
+        """Le vidage met à jour la longueur mémorisée"""
+        client = FakeRedis()
+        buffer = RedisAuditBuffer(client)
+        buffer.push('a', False)
+        buffer.push('b', False)
+
+        self.assertEqual(buffer.pop_batch(10), ['a', 'b'])
+        self.assertTrue(buffer.push('view', True))
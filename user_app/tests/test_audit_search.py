@@ -0,0 +1,85 @@
+"""
+Tests pour la recherche dans les logs d'audit.
+"""
+import pytest
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from user_app.models import audit_log
+from user_app.modules.audit_log.views import AuditLogFilter
+from utilities.audit_search import build_search_text, search_filter
+
+User = get_user_model()
+
+
+class TestSearchText(TestCase):
+    """Tests de construction du texte de recherche"""
+
+    def test_normalized_and_skips_empty_parts(self):
+        """Le texte est en minuscules et ignore les valeurs vides"""
+        text = build_search_text(
+            user_email='Jane@Example.com', type_ressource='Employees',
+            id_ressource='', request_path='/api/user/employees/3/', action='UPDATE'
+        )
+
+        self.assertEqual(text, 'jane@example.com | employees | /api/user/employees/3/ | update')
+
+
+@pytest.mark.django_db
+class TestAuditSearch(TestCase):
+    """Tests de recherche via la colonne dénormalisée"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='search@example.com', password='testpass123', nom='Kabila', prenom='Marie'
+        )
+        audit_log.objects.create(user_id=self.user, action='UPDATE', type_ressource='employees',
+                                 id_ressource='12')
+        audit_log.objects.create(action='VIEW', type_ressource='periode_paie', id_ressource='3')
+
+    def test_search_text_populated_on_save(self):
+        """La colonne de recherche est renseignée à l'enregistrement"""
+        entry = audit_log.objects.get(user_id=self.user)
+        self.assertIn('search@example.com', entry.search_text)
+        self.assertIn('kabila marie', entry.search_text)
+
+    def test_search_matches_user_and_resource(self):
+        """Une recherche couvre l'utilisateur et la ressource"""
+        self.assertEqual(search_filter(audit_log.objects.all(), 'KABILA').count(), 1)
+        self.assertEqual(search_filter(audit_log.objects.all(), 'periode').count(), 1)
+
+    def test_filterset_keeps_field_semantics(self):
+        """Le filtre par email ne correspond pas à un autre champ"""
+        filterset = AuditLogFilter({'user_email': 'employees'}, queryset=audit_log.objects.all())
+
+        self.assertEqual(filterset.qs.count(), 0)
+
+    def test_filters_do_not_depend_on_search_text(self):
+        """Les filtres par champ trouvent les entrées sans texte de recherche"""
+        audit_log.objects.filter(user_id=self.user).update(search_text='')
+
+        for params in ({'user_email': 'search@'}, {'user_name': 'kabila'},
+                       {'type_ressource': 'employ'}, {'type_ressource__icontains': 'employ'},
+                       {'id_ressource__icontains': '12'}):
+            filterset = AuditLogFilter(params, queryset=audit_log.objects.all())
+            self.assertEqual(filterset.qs.count(), 1, params)
+
+    def test_filters_follow_current_user_details(self):
+        """Le filtre par email suit l'email actuel de l'utilisateur"""
+        User.objects.filter(pk=self.user.pk).update(email='renamed@example.com')
+
+        filterset = AuditLogFilter({'user_email': 'renamed@'}, queryset=audit_log.objects.all())
+        self.assertEqual(filterset.qs.count(), 1)
+
+    def test_icontains_filters_use_trigram_indexes(self):
+        """Les filtres icontains peuvent utiliser les index trigrammes"""
+        from django.db import connection, transaction
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            for params, index in (({'type_ressource': 'employ'}, 'audit_type_trgm'),
+                                  ({'user_name': 'kabila'}, 'user_nom_trgm'),
+                                  ({'user_email': 'search@'}, 'user_email_trgm')):
+                filterset = AuditLogFilter(params, queryset=audit_log.objects.all())
+                self.assertIn(index, filterset.qs.explain(), params)
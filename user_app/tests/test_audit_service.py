@@ -45,12 +45,9 @@ class TestAuditService(TestCase):
         self.assertEqual(result.action, 'CREATE')
         self.assertEqual(result.user_id, self.user)
 
-    @patch('utilities.audit_service.CELERY_AVAILABLE', True)
-    @patch('utilities.audit_service.create_audit_log_async')
-    def test_log_action_asynchronous(self, mock_celery_task):
+    @patch('utilities.audit_service.AuditPipeline')
+    def test_log_action_asynchronous(self, mock_pipeline):
         """Test de création d'un log d'audit en mode asynchrone"""
-        mock_celery_task.delay = MagicMock()
-
         # Créer un log en mode asynchrone
         result = AuditService.log_action(
             user=self.user,
@@ -62,8 +59,11 @@ class TestAuditService(TestCase):
             async_mode=True
         )
 
-        # Vérifier que la tâche Celery a été appelée
-        mock_celery_task.delay.assert_called_once()
+        # Vérifier que l'événement a été bufferisé (pas de tâche par événement)
+        mock_pipeline.enqueue.assert_called_once()
+        record = mock_pipeline.enqueue.call_args[0][0]
+        self.assertEqual(record['user_id'], self.user.id)
+        self.assertEqual(record['action'], 'UPDATE')
 
         # En mode async, retourne None
         self.assertIsNone(result)
@@ -1,12 +1,21 @@
 """
 Tests pour le système d'authentification JWT unifié.
 """
+import inspect
+import time
 import pytest
+from unittest.mock import MagicMock, patch
 from django.test import TestCase, RequestFactory
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from asgiref.sync import async_to_sync
 from rest_framework.exceptions import AuthenticationFailed
-from utilities.auth import JWT_AUTH
-from utilities.jwt_utils import generate_token
+from utilities.auth import AsyncJWTAuthentication, JWT_AUTH
+from utilities.auth_cache import UserCache, user_key
+from utilities.jwt_utils import generate_token, verify_token
+from utilities.revocation import (
+    TOKEN_REVOCATION, TOKENS_KEY, BloomFilter, RedisRevocationBackend, RevocationList,
+)
 
 User = get_user_model()
 
@@ -89,14 +98,16 @@ class TestJWTAuthentication(TestCase):
         result = self.auth.authenticate(request)
         self.assertIsNone(result)
 
-    def test_authenticate_logs_audit(self):
-        """Test que l'authentification crée un log d'audit"""
+    @patch('utilities.auth.AuditPipeline')
+    @patch('utilities.auth.cache')
+    def test_authenticate_logs_session_seen_once(self, mock_cache, mock_pipeline):
+        """Test qu'une session n'est journalisée qu'une fois par fenêtre, sans insertion"""
         from user_app.models import audit_log
 
-        # Compter les logs avant
+        # Premier passage: clé absente, puis présente
+        mock_cache.add.side_effect = [True, False]
         initial_count = audit_log.objects.count()
 
-        # Générer un token et authentifier
         token = generate_token(self.user, 'access')
         request = self.factory.get('/api/test/')
         request.META['HTTP_AUTHORIZATION'] = f'Bearer {token}'
@@ -104,13 +115,159 @@ class TestJWTAuthentication(TestCase):
         request.META['HTTP_USER_AGENT'] = 'TestAgent/1.0'
 
         self.auth.authenticate(request)
+        self.auth.authenticate(request)
+
+        # Aucune insertion dans la requête, un seul événement bufferisé
+        self.assertEqual(audit_log.objects.count(), initial_count)
+        mock_pipeline.enqueue.assert_called_once()
+        record = mock_pipeline.enqueue.call_args[0][0]
+        self.assertEqual(record['action'], 'SESSION_SEEN')
+        self.assertEqual(record['user_id'], self.user.id)
+        self.assertEqual(record['adresse_ip'], '127.0.0.1')
+
+
+@pytest.mark.django_db
+class TestAsyncJWTAuthentication(TestCase):
+    """Tests pour AsyncJWTAuthentication et le cache des utilisateurs"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.auth = AsyncJWTAuthentication()
+        UserCache._users.clear()
+        RevocationList.reset()
+
+        self.user = User.objects.create_user(email='async@example.com', password='testpass123')
+        self.token = generate_token(self.user, 'access')
+
+    def _request(self, token):
+        request = self.factory.get('/api/test/')
+        request.META['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        return request
+
+    def test_cache_hit_skips_database(self):
+        """Test qu'une authentification répétée ne touche plus la base"""
+        authenticate = self.auth.authenticate
+        user, token = authenticate(self._request(self.token))
+        self.assertEqual(user.id, self.user.id)
+        self.assertEqual(token, self.token)
+
+        with self.assertNumQueries(0):
+            user, _ = authenticate(self._request(self.token))
+        self.assertEqual(user.id, self.user.id)
+
+        # Le niveau Redis suffit lorsque le cache du processus est vide
+        UserCache._users.clear()
+        with self.assertNumQueries(0):
+            authenticate(self._request(self.token))
+
+    def test_authenticate_runs_in_caller_thread(self):
+        """Test que l'authentification est synchrone (pas de saut async_to_sync sous ADRF)"""
+        self.assertFalse(inspect.iscoroutinefunction(self.auth.authenticate))
+
+        user, _ = async_to_sync(self.auth.aauthenticate)(self._request(self.token))
+        self.assertEqual(user.id, self.user.id)
+
+    def test_password_hash_is_not_cached(self):
+        """Test que le hash du mot de passe n'est jamais mis en cache"""
+        self.auth.authenticate(self._request(self.token))
+
+        self.assertNotIn('password', cache.get(user_key(self.user.id)))
+        UserCache._users.clear()
+        user, _ = self.auth.authenticate(self._request(self.token))
+        self.assertIn('password', user.get_deferred_fields())
+        self.assertEqual(user.email, 'async@example.com')
+
+    def test_user_update_invalidates_cache(self):
+        """Test qu'une modification de l'utilisateur invalide le cache"""
+        authenticate = self.auth.authenticate
+        authenticate(self._request(self.token))
+
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            authenticate(self._request(self.token))
+
+    def test_revoked_token_is_rejected(self):
+        """Test qu'un token révoqué est refusé, les autres restent valides"""
+        authenticate = self.auth.authenticate
+        authenticate(self._request(self.token))
+
+        self.assertTrue(RevocationList.revoke_token(verify_token(self.token, 'access')))
+        with self.assertRaises(AuthenticationFailed):
+            authenticate(self._request(self.token))
+
+        other = generate_token(self.user, 'access')
+        user, _ = authenticate(self._request(other))
+        self.assertEqual(user.id, self.user.id)
+
+    def test_disabled_user_tokens_are_revoked(self):
+        """Test que la désactivation révoque les tokens déjà émis"""
+        authenticate = self.auth.authenticate
+        payload = verify_token(self.token, 'access')
+        payload['iat'] -= 1  # émis avant la désactivation
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertTrue(RevocationList.is_revoked(payload))
+
+        with self.assertRaises(AuthenticationFailed):
+            authenticate(self._request(self.token))
+
+
+class TestRevocationBloomFilter(TestCase):
+    """Tests pour le filtre de Bloom de la liste de révocation"""
+
+    def test_no_false_negative(self):
+        """Test que tout élément ajouté est reconnu"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [f'jti-{i}' for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+        self.assertTrue(all(item in bloom for item in items))
+
+    def test_false_positive_rate_is_bounded(self):
+        """Test que le taux de faux positifs reste proche de la cible"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+        false_positives = sum(f'other-{i}' in bloom for i in range(10_000))
+        self.assertLess(false_positives, 300)
+
+
+class TestRevocationOutage(TestCase):
+    """Tests du comportement de la révocation quand Redis est injoignable"""
+
+    def setUp(self):
+        RevocationList.reset()
+        self.payload = {'jti': 'jti-outage', 'exp': time.time() + 60, 'user_id': 1, 'iat': int(time.time())}
+
+    def tearDown(self):
+        RevocationList.reset()
+
+    def test_redis_is_retried_and_local_revocations_replayed(self):
+        """Test que le repli n'est pas définitif et que ses révocations sont publiées"""
+        with patch.object(RevocationList, '_redis_client', side_effect=ConnectionError('down')):
+            self.assertIs(RevocationList.backend(), RevocationList._fallback)
+            RevocationList.revoke_token(self.payload)
+
+        client = MagicMock()
+        with patch.object(RevocationList, '_redis_client', return_value=client):
+            # Délai de nouvel essai pas encore écoulé
+            self.assertIs(RevocationList.backend(), RevocationList._fallback)
+            RevocationList._retry_at = 0.0
+            self.assertIsInstance(RevocationList.backend(), RedisRevocationBackend)
+
+        client.pipeline.return_value.zadd.assert_called_once_with(
+            TOKENS_KEY, {'jti-outage': self.payload['exp']}
+        )
 
-        # Vérifier qu'un log a été créé
-        final_count = audit_log.objects.count()
-        self.assertEqual(final_count, initial_count + 1)
+    @patch.dict(TOKEN_REVOCATION, {'MAX_STALENESS': 60.0})
+    def test_stale_copy_fails_closed(self):
+        """Test que la copie locale n'est crue que MAX_STALENESS secondes"""
+        with patch.object(RevocationList, '_redis_client', side_effect=ConnectionError('down')):
+            RevocationList._synced_at = time.monotonic()
+            self.assertFalse(RevocationList.is_revoked(self.payload))
 
-        # Vérifier le contenu du log
-        log = audit_log.objects.latest('timestamp')
-        self.assertEqual(log.action, 'LOGIN')
-        self.assertEqual(log.user_id, self.user)
-        self.assertEqual(log.type_ressource, 'authentication')
+            RevocationList._synced_at = time.monotonic() - 61
+            self.assertTrue(RevocationList.is_revoked(self.payload))
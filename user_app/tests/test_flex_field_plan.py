@@ -0,0 +1,54 @@
+"""
+Tests pour le cache des plans de champs d'adrf_flex_fields.
+"""
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from adrf_flex_fields.serializers import FieldPlan, clear_field_plans
+from user_app.modules.group.serializers import J_GroupSerializers
+from user_app.modules.service_group.serializers import J_ServiceGroupSerializer
+
+
+class TestFieldPlanCache(SimpleTestCase):
+    """Tests pour la compilation et la réutilisation des plans de champs"""
+
+    def setUp(self):
+        clear_field_plans()
+
+    def test_same_shape_reuses_compiled_plan(self):
+        """Test qu'une forme de requête identique ne recompile pas le plan"""
+        options = {'expand': ['service_groups'], 'fields': [], 'omit': []}
+
+        with patch.object(
+            J_GroupSerializers, '_compile_field_plan', autospec=True,
+            side_effect=J_GroupSerializers._compile_field_plan,
+        ) as compile_plan:
+            for _ in range(3):
+                serializer = J_GroupSerializers()
+                serializer.apply_flex_fields(serializer.fields, options)
+
+        compile_plan.assert_called_once()
+        self.assertEqual(serializer.expanded_fields, ['service_groups'])
+
+    def test_plan_resolves_lazy_serializer_and_removals(self):
+        """Test que le plan contient la classe résolue et les champs retirés"""
+        serializer = J_GroupSerializers()
+        plan = serializer.get_field_plan(
+            serializer.fields,
+            {'expand': ['service_groups'], 'fields': ['id', 'code', 'service_groups'], 'omit': []},
+        )
+
+        self.assertIsInstance(plan, FieldPlan)
+        self.assertNotIn('code', plan.to_remove)
+        self.assertIn('name', plan.to_remove)
+        self.assertEqual(plan.expansions[0].serializer_class, J_ServiceGroupSerializer)
+        self.assertEqual(plan.expansions[0].settings, {'many': True})
+
+    def test_expanded_fields_get_request_context(self):
+        """Test que chaque instance étendue reçoit le contexte de sa requête"""
+        options = {'expand': ['service_groups'], 'fields': [], 'omit': []}
+        for marker in ('first', 'second'):
+            serializer = J_GroupSerializers(context={'marker': marker})
+            fields = serializer.apply_flex_fields(serializer.fields, options)
+            self.assertEqual(fields['service_groups'].child.context['marker'], marker)
@@ -0,0 +1,169 @@
+"""
+Tests pour les ETags par version de ressource et la compression des réponses.
+"""
+import gzip
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.urls import resolve
+from rest_framework.test import APIClient
+
+from user_app.models import service
+from user_app.modules.employe.views import EmployeViewSet
+from user_app.modules.service.views import ServiceViewSet
+from utilities.jwt_utils import generate_token
+from utilities.middleware import CompressionMiddleware, ResourceETagMiddleware
+from utilities.resource_versions import ResourceVersions, version_key, view_resources
+
+User = get_user_model()
+
+
+def get_response(request):
+    return HttpResponse('{}', content_type='application/json')
+
+
+@pytest.mark.django_db
+class TestResourceETags(TestCase):
+    """Tests du GET conditionnel par version de ressource"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = ResourceETagMiddleware(get_response)
+        cache.delete(version_key('user_app.service'))
+
+    def _get(self, **headers):
+        request = self.factory.get('/api/service/', **headers)
+        request.resolver_match = resolve('/api/service/')
+        return request
+
+    def _etag(self):
+        request = self._get()
+        self.assertIsNone(self.middleware.process_view(request, None, (), {}))
+        response = self.middleware.process_response(request, get_response(request))
+        return response['ETag']
+
+    def test_view_resources_include_model_and_rbac(self):
+        """Le modèle de la vue et les modèles RBAC composent l'ETag"""
+        resources = view_resources(ServiceViewSet, 'list')
+
+        self.assertIn('user_app.service', resources)
+        self.assertIn('user_app.grouppermission', resources)
+        self.assertIsNone(view_resources(ServiceViewSet, 'custom_action'))
+
+    def test_view_resources_include_serialized_reverse_relations(self):
+        """Une relation inverse exposée par le serializer (user_account) compose l'ETag"""
+        resources = view_resources(EmployeViewSet, 'list')
+
+        self.assertIn('user_app.employe', resources)
+        self.assertIn('user_app.user', resources)
+
+    def test_if_none_match_is_evaluated_after_the_view_checks(self):
+        """Sans ConditionalGetMixin, seul un 200 (permissions passées) devient 304"""
+        etag = self._etag()
+        request = self._get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertIsNone(self.middleware.process_view(request, None, (), {}))
+        response = self.middleware.process_response(request, get_response(request))
+        denied = self.middleware.process_response(request, HttpResponse(status=403))
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertEqual(denied.status_code, 403)
+
+    def test_wildcard_never_matches(self):
+        """If-None-Match: * ne donne jamais de 304 (existence inconnue)"""
+        request = self._get(HTTP_IF_NONE_MATCH='*')
+        self.middleware.process_view(request, None, (), {})
+
+        self.assertEqual(self.middleware.process_response(request, get_response(request)).status_code, 200)
+
+    def test_write_changes_etag(self):
+        """Une écriture sur le modèle change l'ETag, puis à nouveau après le commit"""
+        before = self._etag()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            service.objects.create(titre='Informatique', code='IT')
+            during = self._etag()
+
+        self.assertNotEqual(during, before)
+        self.assertNotEqual(self._etag(), during)
+
+    def test_etag_depends_on_client_identity(self):
+        """Deux clients différents n'obtiennent pas le même ETag"""
+        etag = self._etag()
+        request = self._get(HTTP_IF_NONE_MATCH=etag, HTTP_AUTHORIZATION='Bearer other')
+
+        self.assertIsNone(self.middleware.process_view(request, None, (), {}))
+        self.assertNotEqual(request._resource_etag, etag)
+
+    def test_bump_is_incremental(self):
+        """Les compteurs sont créés puis incrémentés"""
+        ResourceVersions.bump('user_app.service')
+        ResourceVersions.bump('user_app.service')
+
+        self.assertEqual(ResourceVersions.get_many(['user_app.service']), {'user_app.service': 2})
+
+
+@pytest.mark.django_db
+class TestConditionalGetMixin(TestCase):
+    """Tests du 304 répondu par la vue après authentification et permissions"""
+
+    def setUp(self):
+        cache.delete(version_key('user_app.group'))
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='etag@example.com', password='testpass123')
+        self.auth = f'Bearer {generate_token(self.user, "access")}'
+
+    def test_authenticated_client_gets_not_modified(self):
+        """Un client authentifié au même ETag reçoit 304"""
+        first = self.client.get('/api/group/', HTTP_AUTHORIZATION=self.auth)
+        self.assertEqual(first.status_code, 200)
+
+        second = self.client.get('/api/group/', HTTP_AUTHORIZATION=self.auth, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_anonymous_client_is_refused_despite_matching_etag(self):
+        """Un client anonyme reçoit 401/403, même avec l'ETag courant"""
+        request = RequestFactory().get('/api/group/')
+        request.resolver_match = resolve('/api/group/')
+        ResourceETagMiddleware(get_response).process_view(request, None, (), {})
+
+        response = self.client.get('/api/group/', HTTP_IF_NONE_MATCH=request._resource_etag)
+
+        self.assertIn(response.status_code, (401, 403))
+
+
+class TestCompression(TestCase):
+    """Tests de la compression des réponses"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = CompressionMiddleware(get_response)
+        self.body = ('{"salaire_net": "1402318.27"},' * 200).encode('utf-8')
+
+    def test_large_response_is_gzipped(self):
+        """Une réponse au-dessus du seuil est compressée si le client l'accepte"""
+        request = self.factory.get('/api/entree_paie/', HTTP_ACCEPT_ENCODING='gzip')
+
+        response = self.middleware.process_response(request, HttpResponse(self.body))
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.body)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_small_or_unaccepted_response_is_untouched(self):
+        """Les petites réponses et les clients sans gzip reçoivent le corps brut"""
+        small = self.middleware.process_response(
+            self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip'), HttpResponse(b'{}')
+        )
+        plain = self.middleware.process_response(self.factory.get('/'), HttpResponse(self.body))
+
+        self.assertFalse(small.has_header('Content-Encoding'))
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertEqual(plain.content, self.body)
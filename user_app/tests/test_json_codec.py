@@ -0,0 +1,79 @@
+"""
+Tests pour l'encodage JSON partagé (renderer, parser, pipeline d'audit).
+"""
+import datetime
+import io
+import json
+import uuid
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from utilities import json_codec
+
+
+class TestJsonCodec(SimpleTestCase):
+    """Tests pour utilities.json_codec"""
+
+    def test_decimal_date_and_uuid_are_encoded(self):
+        """Test que Decimal, date et UUID sont encodés sans perte"""
+        identifier = uuid.uuid4()
+        data = json.loads(json_codec.dumps({
+            'salaire_net': Decimal('1402318.27'),
+            'periode': datetime.date(2025, 6, 30),
+            'uuid': identifier,
+        }))
+
+        self.assertEqual(data, {'salaire_net': '1402318.27', 'periode': '2025-06-30', 'uuid': str(identifier)})
+
+    def test_decimal_as_number_option(self):
+        """Test que DECIMAL_AS_STRING=False rend les Decimal en nombres"""
+        with patch.dict(json_codec.JSON_CODEC, {'DECIMAL_AS_STRING': False}):
+            data = json.loads(json_codec.dumps({'montant': Decimal('52500.50')}))
+
+        self.assertEqual(data, {'montant': 52500.5})
+
+    def test_renderer_matches_drf_renderer(self):
+        """Test que le renderer produit le même document que celui de DRF"""
+        payload = {
+            'count': 2,
+            'results': [
+                {'id': 1, 'nom': 'Kabila', 'calculated_at': datetime.datetime(2025, 6, 1, 8, tzinfo=datetime.timezone.utc)},
+                {'id': 2, 'nom': 'Ilunga', 'calculated_at': None},
+            ],
+        }
+
+        self.assertEqual(
+            json.loads(json_codec.FastJSONRenderer().render(payload)),
+            json.loads(JSONRenderer().render(payload)),
+        )
+        self.assertEqual(json_codec.FastJSONRenderer().render(None), b'')
+
+    def test_renderer_escapes_line_separators(self):
+        """Test que U+2028 et U+2029 sont échappés, comme par le renderer de DRF"""
+        payload = {'raison': 'ligne\u2028suivante\u2029fin'}
+        rendered = json_codec.FastJSONRenderer().render(payload)
+
+        self.assertNotIn('\u2028'.encode('utf-8'), rendered)
+        self.assertNotIn('\u2029'.encode('utf-8'), rendered)
+        self.assertIn(b'\\u2028', rendered)
+        self.assertEqual(json.loads(rendered), payload)
+
+    def test_parser_rejects_invalid_json(self):
+        """Test qu'un corps invalide lève ParseError"""
+        parser = json_codec.FastJSONParser()
+
+        self.assertEqual(parser.parse(io.BytesIO(b'{"statut": "APPROVED"}')), {'statut': 'APPROVED'})
+        with self.assertRaises(ParseError):
+            parser.parse(io.BytesIO(b'{"statut": '))
+
+    def test_lenient_mode_stringifies_unknown_objects(self):
+        """Test que le mode lenient (capture d'audit) n'échoue pas sur un objet inconnu"""
+        marker = object()
+
+        with self.assertRaises(TypeError):
+            json_codec.dumps({'fichier': marker})
+        self.assertEqual(json.loads(json_codec.dumps({'fichier': marker}, lenient=True)), {'fichier': str(marker)})
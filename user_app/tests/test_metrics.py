@@ -0,0 +1,114 @@
+"""
+Tests pour le store de métriques de performance.
+"""
+from unittest.mock import MagicMock, patch
+from django.test import RequestFactory, SimpleTestCase
+
+from utilities.metrics import (
+    PREFIX, LocalMetricsBackend, MetricsStore, RedisMetricsBackend, bucket_index, bucket_upper_bound,
+    metrics_view,
+)
+from utilities.query_monitor import UNRESOLVED_LABEL, resolve_view
+
+
+class TestHistogramBuckets(SimpleTestCase):
+    """Tests des buckets logarithmiques"""
+
+    def test_bucket_bounds_contain_value(self):
+        """La borne supérieure du bucket encadre la valeur à ~9% près"""
+        for seconds in (0.0005, 0.012, 0.3, 4.2):
+            upper = bucket_upper_bound(bucket_index(seconds))
+            self.assertGreaterEqual(upper, seconds)
+            self.assertLess(upper, seconds * 1.1)
+
+
+@patch.object(MetricsStore, '_backend', None)
+@patch.object(MetricsStore, '_create_backend', staticmethod(LocalMetricsBackend))
+class TestMetricsStore(SimpleTestCase):
+    """Tests du store de métriques (backend local)"""
+
+    def test_percentiles(self):
+        """Les percentiles sont calculés à partir de l'histogramme"""
+        for millis in range(1, 101):
+            MetricsStore.observe('salary_calculation', millis / 1000)
+
+        summary = MetricsStore.summary('salary_calculation')
+
+        self.assertEqual(summary['total_calls'], 100)
+        self.assertAlmostEqual(summary['p50'], 0.050, delta=0.005)
+        self.assertAlmostEqual(summary['p95'], 0.095, delta=0.009)
+        self.assertAlmostEqual(summary['p99'], 0.099, delta=0.009)
+
+    def test_operations_are_discovered(self):
+        """Les opérations sont découvertes dynamiquement"""
+        MetricsStore.observe('custom_operation', 0.01, success=False)
+
+        self.assertIn('custom_operation', MetricsStore.operations())
+        self.assertEqual(MetricsStore.summary('custom_operation')['failed_calls'], 1)
+
+    def test_prometheus_export(self):
+        """L'export Prometheus contient quantiles, sommes et compteurs"""
+        MetricsStore.observe('period_processing', 0.2)
+        MetricsStore.incr('db_queries', 'EmployeViewSet.list', 7)
+
+        output = MetricsStore.render_prometheus()
+
+        self.assertIn('rhback_operation_duration_seconds{operation="period_processing",quantile="0.99"}', output)
+        self.assertIn('rhback_operation_duration_seconds_count{operation="period_processing"} 1', output)
+        self.assertIn('rhback_db_queries_total{operation="EmployeViewSet.list"} 7', output)
+
+
+@patch.object(RedisMetricsBackend, '_ensure_flusher')
+class TestRedisMetricsBackend(SimpleTestCase):
+    """Tests de l'agrégation en mémoire du backend Redis"""
+
+    def test_recording_does_no_io_until_flush(self, _mock_flusher):
+        """observe / incr n'accèdent pas à Redis; le vidage écrit tout en un pipeline"""
+        client = MagicMock()
+        backend = RedisMetricsBackend(client)
+
+        backend.observe('http:EmployeViewSet.list', 0.01)
+        backend.observe('http:EmployeViewSet.list', 0.02, success=False)
+        backend.incr('db_queries', 'EmployeViewSet.list', 7)
+        client.pipeline.assert_not_called()
+
+        backend.flush()
+
+        pipe = client.pipeline.return_value
+        client.pipeline.assert_called_once_with(transaction=False)
+        pipe.execute.assert_called_once()
+        pipe.hincrby.assert_any_call(f"{PREFIX}:t:http:EmployeViewSet.list", 'count', 2)
+        pipe.hincrby.assert_any_call(f"{PREFIX}:t:http:EmployeViewSet.list", 'errors', 1)
+        pipe.hincrby.assert_any_call(f"{PREFIX}:c:db_queries", 'EmployeViewSet.list', 7)
+
+        # Rien en attente: pas de second aller-retour
+        backend.flush()
+        client.pipeline.assert_called_once()
+
+
+class TestMetricsEndpoint(SimpleTestCase):
+    """Tests de l'accès à /metrics/ et des libellés d'opération"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    @patch.dict('utilities.metrics.METRICS_SETTINGS', {'TOKEN': None}, clear=True)
+    def test_denied_without_configured_token(self):
+        """Sans jeton configuré, l'endpoint est fermé par défaut"""
+        self.assertEqual(metrics_view(self.factory.get('/metrics/')).status_code, 403)
+
+    @patch('utilities.metrics.MetricsStore.render_prometheus', return_value='')
+    @patch.dict('utilities.metrics.METRICS_SETTINGS', {'TOKEN': 'secret'})
+    def test_token_is_required(self, _mock_render):
+        """Le jeton Bearer est exigé lorsqu'il est configuré"""
+        denied = metrics_view(self.factory.get('/metrics/', HTTP_AUTHORIZATION='Bearer other'))
+        allowed = metrics_view(self.factory.get('/metrics/', HTTP_AUTHORIZATION='Bearer secret'))
+
+        self.assertEqual(denied.status_code, 403)
+        self.assertEqual(allowed.status_code, 200)
+
+    def test_unresolved_requests_share_one_label(self):
+        """Les URL sans route ne créent pas une opération par chemin"""
+        request = self.factory.get('/wp-admin/setup.php')
+
+        self.assertEqual(resolve_view(request)[2], UNRESOLVED_LABEL)
@@ -0,0 +1,142 @@
+"""
+Tests pour la pagination keyset et le mode streaming.
+"""
+import pytest
+from unittest.mock import patch
+from django.test import TestCase, RequestFactory
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.request import Request
+
+from user_app.models import audit_log
+from utilities.pagination import GlobalPagination, KeysetPagination, resolve_count
+
+
+class AuditKeysetPagination(KeysetPagination):
+    page_size = 3
+    ordering = ('-timestamp', '-id')
+
+
+def _drf_request(url):
+    return Request(RequestFactory().get(url))
+
+
+@pytest.mark.django_db
+class TestKeysetPagination(TestCase):
+    """Tests de la pagination par curseur"""
+
+    def setUp(self):
+        for index in range(7):
+            audit_log.objects.create(action='VIEW', type_ressource='test', id_ressource=str(index))
+        self.queryset = audit_log.objects.all().order_by('-timestamp')
+
+    def _collect_pages(self):
+        url = '/api/audit_log/'
+        pages = []
+        while url:
+            paginator = AuditKeysetPagination()
+            page = paginator.paginate_queryset(self.queryset, _drf_request(url))
+            pages.append([entry.id for entry in page])
+            url = paginator.get_next_link()
+        return pages
+
+    def test_walks_all_rows_without_overlap(self):
+        """Les pages successives couvrent toutes les lignes une seule fois"""
+        pages = self._collect_pages()
+
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        ids = [entry_id for page in pages for entry_id in page]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(
+            ids, list(self.queryset.order_by('-timestamp', '-id').values_list('id', flat=True))
+        )
+
+    def test_previous_link_returns_previous_page(self):
+        """Le lien précédent ramène à la page précédente"""
+        first = AuditKeysetPagination()
+        first_page = first.paginate_queryset(self.queryset, _drf_request('/api/audit_log/'))
+
+        second = AuditKeysetPagination()
+        second.paginate_queryset(self.queryset, _drf_request(first.get_next_link()))
+
+        back = AuditKeysetPagination()
+        back_page = back.paginate_queryset(self.queryset, _drf_request(second.get_previous_link()))
+
+        self.assertEqual([e.id for e in back_page], [e.id for e in first_page])
+        self.assertIsNone(back.get_previous_link())
+
+    def test_invalid_cursor_raises_not_found(self):
+        """Un curseur invalide est rejeté"""
+        with self.assertRaises(NotFound):
+            AuditKeysetPagination().paginate_queryset(
+                self.queryset, _drf_request('/api/audit_log/?cursor=not-a-cursor')
+            )
+
+    def test_requested_direction_is_honoured(self):
+        """?ordering=timestamp inverse l'ordre keyset"""
+        page = AuditKeysetPagination().paginate_queryset(
+            self.queryset, _drf_request('/api/audit_log/?ordering=timestamp')
+        )
+
+        self.assertEqual(
+            [entry.id for entry in page],
+            list(self.queryset.order_by('timestamp', 'id').values_list('id', flat=True)[:3])
+        )
+
+    def test_unsupported_ordering_is_rejected(self):
+        """Un tri incompatible avec le keyset est refusé au lieu d'être ignoré"""
+        for ordering in ('action', 'timestamp,-id', '-id'):
+            with self.assertRaises(ValidationError):
+                AuditKeysetPagination().paginate_queryset(
+                    self.queryset, _drf_request(f'/api/audit_log/?ordering={ordering}')
+                )
+
+    def test_no_pagination_switches_to_streaming(self):
+        """no_pagination=true renvoie des pages bornées au lieu de toute la table"""
+        paginator = GlobalPagination()
+        page = paginator.paginate_queryset(
+            self.queryset, _drf_request('/api/audit_log/?no_pagination=true&page_size=5')
+        )
+        response = paginator.get_paginated_response([])
+
+        self.assertEqual(len(page), 5)
+        self.assertIsNotNone(response.data['next'])
+
+
+@pytest.mark.django_db
+class TestPaginationCounts(TestCase):
+    """Tests des stratégies de comptage"""
+
+    def setUp(self):
+        for index in range(4):
+            audit_log.objects.create(action='VIEW', type_ressource='count', id_ressource=str(index))
+        self.queryset = audit_log.objects.filter(type_ressource='count')
+
+    def test_exact_count(self):
+        """Le mode exact retourne le COUNT(*) réel"""
+        self.assertEqual(resolve_count(self.queryset, 'exact'), (4, False))
+
+    @patch('utilities.pagination.cache')
+    def test_cached_count_reuses_cached_value(self, mock_cache):
+        """Le mode cached réutilise le comptage mis en cache pour la même signature"""
+        mock_cache.get.return_value = 42
+
+        self.assertEqual(resolve_count(self.queryset, 'cached'), (42, False))
+        mock_cache.set.assert_not_called()
+
+    @patch('utilities.pagination.estimate_queryset_count', return_value=2_000_000)
+    def test_auto_uses_estimate_for_large_results(self, _mock_estimate):
+        """Le mode auto bascule sur l'estimation pour les gros résultats"""
+        self.assertEqual(resolve_count(self.queryset, 'auto'), (2_000_000, True))
+
+    @patch('utilities.pagination.cache')
+    @patch('utilities.pagination.estimate_queryset_count', return_value=None)
+    def test_response_flags_exact_count(self, _mock_estimate, mock_cache):
+        """La réponse paginée indique si le total est estimé"""
+        mock_cache.get.return_value = None
+        paginator = GlobalPagination()
+        paginator.count_mode = 'estimate'
+        paginator.paginate_queryset(self.queryset.order_by('id'), _drf_request('/api/audit_log/'))
+        response = paginator.get_paginated_response([])
+
+        self.assertEqual(response.data['count'], 4)
+        self.assertFalse(response.data['count_is_estimate'])
@@ -0,0 +1,135 @@
+"""
+Tests pour la gestion des partitions mensuelles.
+"""
+from datetime import date, datetime
+from unittest.mock import MagicMock, call, patch
+from django.test import TestCase
+
+from utilities.partitioning import (
+    PartitionManager, PartitionedTable, add_months, partition_name
+)
+
+SPEC = PartitionedTable(table='auth_audit_log', column='timestamp', retention_months=3)
+
+
+class TestPartitionHelpers(TestCase):
+    """Tests des calculs de bornes"""
+
+    def test_add_months_across_years(self):
+        """Les mois sont ajoutés et retirés au-delà des années"""
+        self.assertEqual(add_months(date(2024, 11, 1), 3), date(2025, 2, 1))
+        self.assertEqual(add_months(date(2024, 1, 1), -1), date(2023, 12, 1))
+
+    def test_partition_name(self):
+        """Les partitions sont nommées par mois"""
+        self.assertEqual(partition_name('paie_alert', date(2024, 3, 1)), 'paie_alert_p202403')
+
+
+@patch('utilities.partitioning.timezone.now')
+@patch.object(PartitionManager, 'list_detached', return_value=[])
+@patch.object(PartitionManager, 'list_partitions')
+class TestRetention(TestCase):
+    """Tests de sélection des partitions expirées"""
+
+    def test_only_fully_expired_partitions(self, mock_list, _mock_detached, mock_now):
+        """Seules les partitions entièrement hors rétention sont supprimées"""
+        mock_now.return_value = datetime(2024, 6, 15)
+        mock_list.return_value = [
+            {'name': partition_name('auth_audit_log', month), 'month': month}
+            for month in (date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1), date(2024, 6, 1))
+        ]
+
+        dropped = PartitionManager.apply_retention(SPEC, dry_run=True)
+
+        self.assertEqual(
+            [result['partition'] for result in dropped],
+            ['auth_audit_log_p202401', 'auth_audit_log_p202402']
+        )
+
+    def test_no_retention_configured(self, mock_list, _mock_detached, _mock_now):
+        """Sans rétention configurée, rien n'est supprimé"""
+        spec = PartitionedTable(table='paie_alert', column='created_at')
+
+        self.assertEqual(PartitionManager.apply_retention(spec, dry_run=True), [])
+        mock_list.assert_not_called()
+
+    @patch('utilities.partitioning.transaction')
+    @patch('utilities.partitioning.connection')
+    def test_archive_before_detach(self, mock_connection, _mock_transaction, mock_list, _mock_detached, mock_now):
+        """L'archive est écrite avant le DETACH, suivi du DROP dans la même transaction"""
+        mock_now.return_value = datetime(2024, 6, 15)
+        mock_list.return_value = [{'name': 'auth_audit_log_p202401', 'month': date(2024, 1, 1)}]
+        steps = MagicMock()
+        mock_connection.cursor.return_value.__enter__.return_value.execute = steps.execute
+
+        with patch.object(PartitionManager, 'archive_partition', side_effect=steps.archive):
+            PartitionManager.apply_retention(SPEC, archive=True)
+
+        self.assertEqual(steps.mock_calls, [
+            call.archive('auth_audit_log', 'auth_audit_log_p202401'),
+            call.execute('ALTER TABLE "auth_audit_log" DETACH PARTITION "auth_audit_log_p202401"'),
+            call.execute('DROP TABLE "auth_audit_log_p202401"'),
+        ])
+
+    @patch('utilities.partitioning.connection')
+    def test_failed_archive_keeps_partition_attached(self, mock_connection, mock_list, _mock_detached, mock_now):
+        """Un archivage en échec ne détache rien: la partition sera reprise"""
+        mock_now.return_value = datetime(2024, 6, 15)
+        mock_list.return_value = [{'name': 'auth_audit_log_p202401', 'month': date(2024, 1, 1)}]
+        cursor = mock_connection.cursor.return_value.__enter__.return_value
+
+        with patch.object(PartitionManager, 'archive_partition', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                PartitionManager.apply_retention(SPEC, archive=True)
+
+        cursor.execute.assert_not_called()
+
+    @patch('utilities.partitioning.transaction')
+    @patch('utilities.partitioning.connection')
+    def test_detached_leftovers_are_dropped(self, mock_connection, _mock_transaction, mock_list, mock_detached, mock_now):
+        """Une partition détachée par une exécution interrompue est supprimée sans DETACH"""
+        mock_now.return_value = datetime(2024, 6, 15)
+        mock_list.return_value = []
+        mock_detached.return_value = [
+            {'name': 'auth_audit_log_p202312', 'month': date(2023, 12, 1), 'detached': True}
+        ]
+        cursor = mock_connection.cursor.return_value.__enter__.return_value
+
+        dropped = PartitionManager.apply_retention(SPEC)
+
+        self.assertEqual([result['partition'] for result in dropped], ['auth_audit_log_p202312'])
+        cursor.execute.assert_called_once_with('DROP TABLE "auth_audit_log_p202312"')
+
+
+@patch('utilities.partitioning.timezone.now', return_value=datetime(2024, 6, 15))
+@patch.object(PartitionManager, 'ensure_default_partition')
+@patch.object(PartitionManager, 'list_partitions')
+class TestDefaultPartition(TestCase):
+    """Tests de la partition DEFAULT (maintenance en retard)"""
+
+    @patch('utilities.partitioning.configured_tables', return_value={'auth_audit_log': SPEC})
+    @patch.object(PartitionManager, 'default_months', return_value=[date(2024, 6, 1), date(2024, 4, 1)])
+    @patch.object(PartitionManager, 'create_partition', side_effect=lambda table, month, column: partition_name(table, month))
+    def test_months_found_in_default_get_partitions(self, mock_create, _mock_default, _mock_tables,
+                                                    mock_list, mock_ensure_default, _mock_now):
+        """Les mois présents dans DEFAULT obtiennent leur partition, avec déplacement des lignes"""
+        mock_list.return_value = [{'name': 'auth_audit_log_p202407', 'month': date(2024, 7, 1)}]
+
+        created = PartitionManager.ensure_partitions('auth_audit_log', months_ahead=1)
+
+        mock_ensure_default.assert_called_once_with('auth_audit_log')
+        self.assertEqual(created, ['auth_audit_log_p202404', 'auth_audit_log_p202406'])
+        mock_create.assert_any_call('auth_audit_log', date(2024, 6, 1), 'timestamp')
+
+    @patch('utilities.partitioning.transaction')
+    @patch('utilities.partitioning.connection')
+    def test_rows_are_moved_out_of_default(self, mock_connection, _mock_transaction, *_mocks):
+        """Les lignes du mois sont retirées de DEFAULT avant la création, puis réinsérées"""
+        cursor = mock_connection.cursor.return_value.__enter__.return_value
+
+        PartitionManager.create_partition('auth_audit_log', date(2024, 6, 1), 'timestamp')
+
+        statements = [c.args[0] for c in cursor.execute.call_args_list]
+        self.assertIn('DELETE FROM "auth_audit_log_default"', statements[0])
+        self.assertIn('PARTITION OF "auth_audit_log"', statements[1])
+        self.assertEqual(statements[2], 'INSERT INTO "auth_audit_log" SELECT * FROM "auth_audit_log_p202406_moved"')
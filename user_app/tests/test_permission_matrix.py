@@ -0,0 +1,176 @@
+"""
+Tests pour la matrice RBAC compilée (bitsets de permissions).
+"""
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from user_app.models import Group, GroupPermission, Permission, UserGroup
+from user_app.modules.permission.matrix import PermissionMatrix, compile_matrix
+from user_app.modules.permission.services import PermissionService
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestPermissionMatrix(TestCase):
+    """Tests pour la compilation et l'utilisation de la matrice"""
+
+    def setUp(self):
+        content_type = ContentType.objects.get_for_model(User)
+        self.user = User.objects.create_user(email='matrix@example.com', password='testpass123')
+        self.group = Group.objects.create(code='RRH', name='Ressources humaines')
+        self.other_group = Group.objects.create(code='CPT', name='Comptabilité')
+
+        self.read = Permission.objects.create(
+            codename='employe.READ', name='Lire', content_type=content_type,
+            resource='employe', action='READ'
+        )
+        self.update = Permission.objects.create(
+            codename='employe.UPDATE', name='Modifier', content_type=content_type,
+            resource='employe', action='UPDATE'
+        )
+        self.delete = Permission.objects.create(
+            codename='employe.DELETE', name='Supprimer', content_type=content_type,
+            resource='employe', action='DELETE'
+        )
+        GroupPermission.objects.create(group=self.group, permission=self.read)
+        GroupPermission.objects.create(group=self.other_group, permission=self.update)
+        GroupPermission.objects.create(group=self.other_group, permission=self.delete, granted=False)
+        UserGroup.objects.create(user=self.user, group=self.group)
+        UserGroup.objects.create(user=self.user, group=self.other_group)
+
+    def test_user_mask_is_union_of_granted_group_permissions(self):
+        """Test que le masque utilisateur est le OU des groupes (droits accordés seulement)"""
+        matrix = compile_matrix(version=1)
+
+        self.assertEqual(
+            matrix.user_masks[self.user.id],
+            matrix.bits['employe.READ'] | matrix.bits['employe.UPDATE'],
+        )
+        self.assertTrue(matrix.has(self.user.id, 'employe.READ'))
+        self.assertFalse(matrix.has(self.user.id, 'employe.DELETE'))
+        self.assertFalse(matrix.has(self.user.id, 'inconnu.READ'))
+        self.assertEqual(matrix.user_groups[self.user.id], frozenset({'RRH', 'CPT'}))
+
+    def test_checks_use_no_queries_once_compiled(self):
+        """Test qu'une vérification ne coûte aucune requête"""
+        check = async_to_sync(PermissionService.check_permission)
+        self.assertTrue(check(self.user, 'employe', 'READ'))
+
+        with self.assertNumQueries(0):
+            self.assertTrue(check(self.user, 'employe', 'UPDATE'))
+            self.assertFalse(check(self.user, 'employe', 'DELETE'))
+            self.assertTrue(async_to_sync(PermissionService.has_any_group)(self.user, ['RRH']))
+
+    def test_rbac_change_triggers_rebuild(self):
+        """Test qu'une modification des droits est prise en compte"""
+        check = async_to_sync(PermissionService.check_permission)
+        self.assertFalse(check(self.user, 'employe', 'DELETE'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            GroupPermission.objects.filter(permission=self.delete).get().delete()
+            GroupPermission.objects.create(group=self.group, permission=self.delete)
+        self.assertTrue(check(self.user, 'employe', 'DELETE'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            UserGroup.objects.get(user=self.user, group=self.group).delete()
+        self.assertFalse(check(self.user, 'employe', 'READ'))
+        self.assertFalse(async_to_sync(PermissionService.has_any_group)(self.user, ['RRH']))
+
+    def test_bulk_removal_revokes_group_permissions(self):
+        """Test qu'un retrait en masse retire les droits du groupe"""
+        check = async_to_sync(PermissionService.check_permission)
+        self.assertTrue(check(self.user, 'employe', 'READ'))
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post('/api/user-group/bulk-assign/', {
+                'user_ids': [self.user.id], 'group_id': self.group.id, 'action': 'remove'
+            }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['summary']['successful'], 1)
+        self.assertFalse(check(self.user, 'employe', 'READ'))
+
+    def test_uncommitted_change_is_not_compiled(self):
+        """Test qu'une modification annulée n'est jamais compilée"""
+        check = async_to_sync(PermissionService.check_permission)
+        self.assertFalse(check(self.user, 'employe', 'DELETE'))
+        # Pas de vérification de version Redis pendant le test
+        PermissionMatrix._next_sync = time.monotonic() + 60
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            try:
+                with transaction.atomic():
+                    GroupPermission.objects.create(group=self.group, permission=self.delete)
+                    self.assertFalse(check(self.user, 'employe', 'DELETE'))
+                    raise RuntimeError('rollback')
+            except RuntimeError:
+                pass
+
+        self.assertEqual(callbacks, [])
+        self.assertFalse(check(self.user, 'employe', 'DELETE'))
+
+    def test_invalidate_marks_matrix_stale(self):
+        """Test que l'invalidation force une reconstruction"""
+        PermissionMatrix.current()
+        PermissionMatrix.invalidate()
+        self.assertTrue(PermissionMatrix.sync_due())
+
+
+@pytest.mark.django_db
+class TestBatchAuthorization(TestCase):
+    """Tests pour l'autorisation en lot et le filtrage des querysets"""
+
+    def setUp(self):
+        content_type = ContentType.objects.get_for_model(User)
+        self.user = User.objects.create_user(email='batch@example.com', password='testpass123')
+        self.other = User.objects.create_user(email='other@example.com', password='testpass123')
+        self.group = Group.objects.create(code='RRH', name='Ressources humaines')
+        self.foreign_group = Group.objects.create(code='CPT', name='Comptabilité')
+
+        read = Permission.objects.create(
+            codename='user.READ', name='Lire', content_type=content_type,
+            resource='user', action='READ'
+        )
+        Permission.objects.create(
+            codename='user.DELETE', name='Supprimer', content_type=content_type,
+            resource='user', action='DELETE'
+        )
+        GroupPermission.objects.create(group=self.group, permission=read)
+        GroupPermission.objects.create(group=self.foreign_group, permission=read)
+        UserGroup.objects.create(user=self.user, group=self.group)
+        UserGroup.objects.create(user=self.other, group=self.foreign_group)
+
+    def test_authorize_many_returns_allowed_subset(self):
+        """Test que seules les paires accordées sont retournées"""
+        pairs = [('user', 'READ'), ('user', 'DELETE'), ('inconnu', 'READ')]
+        allowed = async_to_sync(PermissionService.authorize_many)(self.user, pairs)
+        self.assertEqual(allowed, {('user', 'READ')})
+
+    def test_group_scoped_filter_matches_sql_fallback(self):
+        """Test que le filtre par groupe est identique via la matrice et via SQL"""
+        queryset = UserGroup.objects.all()
+        matrix = PermissionMatrix.current()
+
+        compiled = queryset.filter(PermissionService.allowed_q(self.user, 'user', 'READ', 'group', matrix=matrix))
+        pushed_down = queryset.filter(PermissionService.allowed_q(self.user, 'user', 'READ', 'group'))
+
+        expected = {UserGroup.objects.get(user=self.user).pk}
+        self.assertEqual(set(compiled.values_list('pk', flat=True)), expected)
+        self.assertEqual(set(pushed_down.values_list('pk', flat=True)), expected)
+
+    def test_global_filter_without_permission_is_empty(self):
+        """Test qu'une permission absente ne laisse passer aucune ligne"""
+        matrix = PermissionMatrix.current()
+        for kwargs in ({'matrix': matrix}, {}):
+            queryset = User.objects.filter(PermissionService.allowed_q(self.user, 'user', 'DELETE', **kwargs))
+            self.assertFalse(queryset.exists())
@@ -0,0 +1,109 @@
+"""
+Tests pour l'instrumentation des requêtes SQL et les budgets de requêtes.
+"""
+import pytest
+from unittest.mock import patch
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, TestCase
+
+from user_app.models import audit_log
+from user_app.modules.audit_log.views import AuditLogViewSet
+from utilities.query_monitor import (
+    QueryBudgetExceeded, assert_query_budget, fingerprint,
+    get_view_budget, report_collector, track_queries
+)
+
+
+class TestFingerprint(TestCase):
+    """Tests de normalisation des requêtes"""
+
+    def test_collapses_in_lists_and_literals(self):
+        """Les listes IN et les littéraux sont normalisés"""
+        first = fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s) AND x = 1')
+        second = fingerprint('SELECT  *  FROM t WHERE id IN (%s) AND x = 42')
+
+        self.assertEqual(first, second)
+        self.assertIn('IN (...)', first)
+
+
+@pytest.mark.django_db
+@patch('utilities.query_monitor.MetricsStore')
+class TestQueryCollector(TestCase):
+    """Tests du collecteur de requêtes"""
+
+    def test_counts_queries(self, _mock_metrics):
+        """Chaque requête exécutée est comptée"""
+        with track_queries('count') as collector:
+            audit_log.objects.count()
+            list(audit_log.objects.all()[:1])
+
+        self.assertEqual(collector.count, 2)
+        self.assertGreaterEqual(collector.duration, 0)
+
+    def test_detects_n_plus_one(self, _mock_metrics):
+        """Une même forme exécutée plus de K fois est signalée"""
+        with track_queries('n_plus_one') as collector:
+            for index in range(collector.n_plus_one_threshold + 1):
+                audit_log.objects.filter(id=index).exists()
+
+        repeated = collector.repeated_queries()
+        self.assertEqual(len(repeated), 1)
+        self.assertEqual(repeated[0][1], collector.n_plus_one_threshold + 1)
+
+    def test_nested_collectors_both_count(self, _mock_metrics):
+        """Les collecteurs imbriqués comptent tous les deux"""
+        with track_queries('outer') as outer:
+            with track_queries('inner') as inner:
+                audit_log.objects.count()
+
+        self.assertEqual(inner.count, 1)
+        self.assertEqual(outer.count, 1)
+
+    async def test_counts_queries_run_in_worker_threads(self, _mock_metrics):
+        """Sous ASGI, les requêtes exécutées dans sync_to_async sont comptées"""
+        with track_queries('async') as collector:
+            await sync_to_async(audit_log.objects.count)()
+            await audit_log.objects.acount()
+
+        self.assertEqual(collector.count, 2)
+
+    def test_budget_assertion(self, _mock_metrics):
+        """Le dépassement de budget lève une erreur en mode strict"""
+        with self.assertRaises(QueryBudgetExceeded):
+            with assert_query_budget(1):
+                audit_log.objects.count()
+                audit_log.objects.count()
+
+    def test_budget_not_raised_outside_strict_mode(self, _mock_metrics):
+        """En production, le dépassement est seulement rapporté"""
+        with track_queries('lenient') as collector:
+            audit_log.objects.count()
+            audit_log.objects.count()
+
+        report = report_collector(collector, budget=1, strict=False)
+        self.assertTrue(report['budget_exceeded'])
+
+
+@pytest.mark.django_db
+class TestQueryInstrumentationMiddleware(TestCase):
+    """Tests du middleware sur le chemin ASGI"""
+
+    @patch('utilities.middleware.MetricsStore')
+    @patch('utilities.middleware.report_collector')
+    async def test_async_request_reports_queries(self, mock_report, _mock_metrics):
+        """Une requête servie par AsyncClient rapporte ses requêtes SQL"""
+        response = await AsyncClient().get('/api/demande_conge/')
+
+        self.assertEqual(response.status_code, 200)
+        collector = mock_report.call_args[0][0]
+        self.assertEqual(collector.label, 'demande_congeAPIView.list')
+        self.assertGreater(collector.count, 0)
+
+
+class TestViewBudget(TestCase):
+    """Tests de lecture des budgets déclarés sur les vues"""
+
+    def test_budget_per_action(self):
+        """Le budget est lu par action"""
+        self.assertEqual(get_view_budget(AuditLogViewSet, 'list'), 5)
+        self.assertIsNone(get_view_budget(AuditLogViewSet, 'destroy'))
@@ -0,0 +1,53 @@
+"""
+Tests pour la planification des requêtes à partir des chemins d'expansion.
+"""
+from django.test import SimpleTestCase
+
+from adrf_flex_fields.query_plan import build_query_plan, clear_query_plans
+from user_app.models import Group, contrat, employe
+from user_app.modules.contrat.serializers import J_contratSerializers
+from user_app.modules.employe.serializers import J_employeSerializers
+from user_app.modules.group.serializers import J_GroupSerializers
+
+
+class TestQueryPlan(SimpleTestCase):
+    """Tests pour build_query_plan (select_related, Prefetch, only)"""
+
+    def setUp(self):
+        clear_query_plans()
+
+    def test_forward_chain_is_joined_with_restricted_columns(self):
+        """Test qu'une chaîne de FK avant devient select_related + only()"""
+        plan = build_query_plan(J_contratSerializers, contrat, expand=['employe_id.poste_id.service'])
+
+        self.assertEqual(
+            plan.select_related,
+            ('employe_id', 'employe_id__poste_id', 'employe_id__poste_id__service'),
+        )
+        self.assertIn('employe_id__nom', plan.only)
+        self.assertIn('employe_id__poste_id__service__titre', plan.only)
+        self.assertIn('salaire_base', plan.only)
+
+    def test_reverse_one_to_one_pk_is_prefetched_with_parent_fk(self):
+        """Test que la clé de la relation inverse est préchargée avec la FK de dispatch"""
+        plan = build_query_plan(J_employeSerializers, employe)
+
+        prefetch = next(p for p in plan.prefetches if p.path == 'user_account')
+        self.assertEqual(prefetch.plan.only, ('id', 'employe_id'))
+
+    def test_method_fields_disable_column_restriction(self):
+        """Test qu'un champ calculé charge le niveau entier"""
+        plan = build_query_plan(J_GroupSerializers, Group, expand=['service_groups'])
+
+        self.assertIsNone(plan.only)
+        prefetch = next(p for p in plan.prefetches if p.path == 'service_groups')
+        self.assertIn('group', prefetch.plan.only)
+
+    def test_plan_is_cached_per_signature(self):
+        """Test que le plan est compilé une seule fois par forme de requête"""
+        first = build_query_plan(J_contratSerializers, contrat, expand=['employe_id'])
+        second = build_query_plan(J_contratSerializers, contrat, expand=['employe_id'])
+        other = build_query_plan(J_contratSerializers, contrat)
+
+        self.assertIs(first, second)
+        self.assertEqual(other.select_related, ())
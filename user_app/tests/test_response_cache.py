@@ -0,0 +1,52 @@
+"""
+Tests pour le cache déclaratif des réponses de liste (cache_list = True).
+"""
+import pytest
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from conge_app.models import type_conge
+from utilities.resource_versions import ResourceVersions
+from utilities.response_cache import clear_local_responses
+
+
+@pytest.mark.django_db
+class TestCachedList(TestCase):
+    """Tests du cache de liste sur les types de congé"""
+
+    url = '/api/type_conge/'
+
+    def setUp(self):
+        self.client = APIClient()
+        clear_local_responses()
+        # Clés neuves: les entrées laissées par d'autres tests ne sont pas lues
+        ResourceVersions.bump('conge_app.type_conge')
+        type_conge.objects.create(nom='Congé annuel', code='CA', nb_jours_max_par_an=20)
+
+    def test_second_call_is_served_without_queries(self):
+        """Une liste identique est servie depuis le cache, sans requête SQL"""
+        first = self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.json(), first.json())
+
+    def test_write_invalidates_cached_list(self):
+        """Une écriture sur le modèle change la clé du cache"""
+        before = self.client.get(self.url).json()
+
+        type_conge.objects.create(nom='Congé maladie', code='CM', nb_jours_max_par_an=30)
+        after = self.client.get(self.url).json()
+
+        self.assertEqual(len(after['results']), len(before['results']) + 1)
+
+    def test_query_params_are_part_of_the_key(self):
+        """Deux pages différentes ne partagent pas la même entrée"""
+        type_conge.objects.create(nom='Congé maladie', code='CM', nb_jours_max_par_an=30)
+
+        ordered = self.client.get(self.url, {'ordering': 'code'}).json()
+        default = self.client.get(self.url).json()
+
+        self.assertNotEqual(ordered, default)
@@ -0,0 +1,115 @@
+"""
+Tests pour le chemin de lecture compilé d'adrf_flex_fields.
+"""
+from datetime import date, datetime, timezone
+
+from django.test import SimpleTestCase
+
+from adrf_flex_fields.row_serializer import RowNotLoaded
+from conge_app.models import demande_conge
+from conge_app.modules.demande_conge.serializers import J_demande_congeSerializers
+from user_app.models import employe
+from user_app.modules.audit_log.serializers import J_audit_logSerializers
+from user_app.modules.employe.serializers import J_employeSerializers
+
+
+def make_demande(**overrides):
+    values = {
+        'id': 7,
+        'employe_id_id': 3,
+        'type_conge_id_id': 2,
+        'date_debut': date(2025, 7, 1),
+        'date_fin': date(2025, 7, 10),
+        'nb_jours_total': 8,
+        'raison': 'Vacances',
+        'statut': 'APPROVED',
+        'documents': ['certificat.pdf'],
+        'approuve_par_id_id': None,
+        'date_approbation': datetime(2025, 6, 20, 9, 30, tzinfo=timezone.utc),
+        'created_at': datetime(2025, 6, 18, 8, 0, tzinfo=timezone.utc),
+        'updated_at': datetime(2025, 6, 20, 9, 30, tzinfo=timezone.utc),
+    }
+    values.update(overrides)
+    return demande_conge(**values)
+
+
+class TestCompiledRead(SimpleTestCase):
+    """Tests pour la fonction de ligne compilée des serializers J_*"""
+
+    def _regular(self, serializer_class, instance):
+        serializer = serializer_class()
+        serializer.compiled_read = False
+        return serializer.to_representation(instance)
+
+    def test_compiled_output_matches_regular_path(self):
+        """Test que la sortie compilée est identique à celle d'ADRF"""
+        instance = make_demande()
+        serializer = J_demande_congeSerializers()
+
+        self.assertIsNotNone(serializer._get_row_function())
+        self.assertEqual(serializer.to_representation(instance), self._regular(J_demande_congeSerializers, instance))
+
+    def test_sparse_fields_are_compiled(self):
+        """Test que le paramètre fields restreint la fonction de ligne"""
+        serializer = J_demande_congeSerializers(fields=['id', 'statut', 'date_debut'])
+
+        self.assertEqual(
+            serializer.to_representation(make_demande()),
+            {'id': 7, 'statut': 'APPROVED', 'date_debut': '2025-07-01'},
+        )
+
+    def test_custom_field_falls_back_to_regular_path(self):
+        """Test qu'un champ calculé désactive le chemin compilé"""
+        serializer = J_audit_logSerializers()
+
+        self.assertIsNone(serializer._get_row_function())
+
+    def test_expanded_field_falls_back_to_regular_path(self):
+        """Test qu'un champ étendu désactive le chemin compilé"""
+        serializer = J_demande_congeSerializers(expand=['type_conge_id'])
+
+        self.assertIsNone(serializer._get_row_function())
+
+    def test_deferred_column_is_reported(self):
+        """Test qu'une colonne non chargée renvoie vers le chemin ADRF"""
+        instance = make_demande()
+        del instance.__dict__['raison']
+        row = J_demande_congeSerializers()._get_row_function()
+
+        with self.assertRaises(RowNotLoaded):
+            row(instance)
+
+    def test_reverse_one_to_one_uses_loaded_relation(self):
+        """Test que la relation inverse user_account est lue depuis le cache de l'instance"""
+        instance = employe(id=5, nom='Kabila', prenom='Jean')
+        row = J_employeSerializers()._get_row_function()
+
+        with self.assertRaises(RowNotLoaded):
+            row(instance)
+
+        instance._state.fields_cache['user_account'] = None
+        self.assertNotIn('user_account', row(instance))
+
+    def test_setting_disables_compiled_read(self):
+        """Test que compiled_read=False conserve le chemin ADRF"""
+        serializer = J_demande_congeSerializers()
+        serializer.compiled_read = False
+
+        self.assertIsNone(serializer._get_row_function())
+
+    def test_compiled_read_is_opt_in(self):
+        """Test que seuls les serializers déclarant compiled_read utilisent le chemin compilé"""
+        from rest_framework import serializers as drf_serializers
+        from adrf_flex_fields import FlexFieldsModelSerializer
+
+        class PlainSerializer(FlexFieldsModelSerializer):
+            employe_id = drf_serializers.PrimaryKeyRelatedField(read_only=True)
+            type_conge_id = drf_serializers.PrimaryKeyRelatedField(read_only=True)
+            approuve_par_id = drf_serializers.PrimaryKeyRelatedField(read_only=True)
+
+            class Meta:
+                model = demande_conge
+                fields = '__all__'
+
+        self.assertIsNone(PlainSerializer()._get_row_function())
+        self.assertIsNotNone(J_demande_congeSerializers()._get_row_function())
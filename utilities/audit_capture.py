@@ -0,0 +1,107 @@
+"""
+Politique de capture des données d'audit par ressource.
+
+Le middleware d'audit ne décode plus les corps de requête / réponse: il
+réutilise ``request.data`` et ``response.data`` déjà parsés par DRF et
+applique la politique de la ressource:
+- ``mode``: 'changes' (champs modifiés uniquement), 'full' ou 'none'
+- ``max_bytes``: taille maximale d'une charge capturée (au-delà: résumé)
+- les endpoints d'export / bulk ne capturent aucun corps
+- les réponses de liste sont résumées (nombre d'éléments)
+"""
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from django.conf import settings
+
+from utilities import json_codec
+
+CAPTURE_MODES = ('changes', 'full', 'none')
+
+_DEFAULTS = {
+    'DEFAULT': {'mode': 'changes', 'max_bytes': 4096},
+    'SKIP_BODY_PATTERNS': ('export', 'bulk', 'batch', 'download', 'pdf'),
+    'RESOURCES': {},
+}
+
+
+@dataclass(frozen=True)
+class CapturePolicy:
+    mode: str = 'changes'
+    max_bytes: int = 4096
+
+    @property
+    def captures_body(self) -> bool:
+        return self.mode != 'none'
+
+
+NO_CAPTURE = CapturePolicy(mode='none', max_bytes=0)
+
+
+def _config() -> dict:
+    return {**_DEFAULTS, **getattr(settings, 'AUDIT_CAPTURE_POLICY', {})}
+
+
+def get_capture_policy(path: str) -> CapturePolicy:
+    """
+    Politique applicable à un chemin: le segment le plus spécifique présent
+    dans RESOURCES l'emporte, sinon la politique par défaut.
+    """
+    config = _config()
+    segments = [segment for segment in path.strip('/').split('/') if segment and segment != 'api']
+
+    if any(pattern in segment for segment in segments for pattern in config['SKIP_BODY_PATTERNS']):
+        return NO_CAPTURE
+
+    options = dict(config['DEFAULT'])
+    for segment in reversed(segments):
+        if segment in config['RESOURCES']:
+            options.update(config['RESOURCES'][segment])
+            break
+
+    if options.get('mode') not in CAPTURE_MODES:
+        options['mode'] = 'changes'
+    return CapturePolicy(mode=options['mode'], max_bytes=options.get('max_bytes', 4096))
+
+
+def summarize_payload(data: Any) -> Any:
+    """Les listes (paginées ou non) sont résumées au lieu d'être capturées."""
+    if isinstance(data, (list, tuple)):
+        return {'_list': True, 'count': len(data)}
+    if isinstance(data, dict) and isinstance(data.get('results'), list):
+        return {'_list': True, 'count': data.get('count'), 'page_size': len(data['results'])}
+    return data
+
+
+def restrict_to_fields(data: Any, fields) -> Any:
+    """Ne conserve que les champs modifiés (clés présentes dans la requête)."""
+    if not isinstance(data, dict) or not fields:
+        return data
+    return {key: data[key] for key in fields if key in data}
+
+
+def cap_payload(data: Any, max_bytes: int) -> Optional[Any]:
+    """Remplace une charge trop volumineuse par un résumé borné."""
+    if data is None:
+        return None
+    try:
+        size = len(json_codec.dumps(data, lenient=True))
+    except (TypeError, ValueError):
+        return {'_note': 'Unserializable data'}
+    if size <= max_bytes:
+        return data
+
+    summary = {'_truncated': True, '_size': size}
+    if isinstance(data, dict):
+        summary['_fields'] = sorted(str(key) for key in data)[:50]
+    return summary
+
+
+def capture(data: Any, policy: CapturePolicy, fields=None) -> Optional[Any]:
+    """Applique la politique complète à une charge déjà parsée."""
+    if data is None or not policy.captures_body:
+        return None
+    data = summarize_payload(data)
+    if policy.mode == 'changes' and fields is not None:
+        data = restrict_to_fields(data, fields)
+    return cap_payload(data, policy.max_bytes)
@@ -0,0 +1,113 @@
+"""
+Contexte d'audit de la requête courante.
+
+Le middleware d'audit ouvre un ``AuditEvent`` par requête (ContextVar, donc
+compatible sync et async). Les composants appelés pendant la requête (moteur
+de diff, décorateurs...) y lisent l'utilisateur et les métadonnées HTTP et y
+enregistrent ce qu'ils ont audité, au lieu de relire la requête.
+
+Une requête produit ainsi une seule entrée d'audit (plus les diffs de
+modèles), toutes reliées par le même identifiant de corrélation.
+"""
+import re
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+_current_event: ContextVar = ContextVar('audit_event', default=None)
+
+_CORRELATION_ID_RE = re.compile(r'^[A-Za-z0-9._-]{8,64}$')
+
+
+def new_correlation_id(candidate: Optional[str] = None) -> str:
+    """Réutilise un X-Request-ID entrant valide, sinon en génère un."""
+    if candidate and _CORRELATION_ID_RE.match(candidate):
+        return candidate
+    return uuid.uuid4().hex
+
+
+@dataclass
+class AuditEvent:
+    user_id: Optional[int] = None
+    ip_address: Optional[str] = None
+    user_agent: str = ''
+    request_method: str = ''
+    request_path: str = ''
+    session_key: str = ''
+    correlation_id: str = field(default_factory=new_correlation_id)
+    # Requête Django: l'authentification JWT a lieu dans la vue DRF,
+    # l'utilisateur est donc résolu au moment de l'écriture
+    request: Any = field(default=None, repr=False)
+    # Modifications de modèles déjà journalisées pendant la requête
+    changes: List[Dict[str, Any]] = field(default_factory=list)
+    # Précisions apportées par les vues / décorateurs (action métier,
+    # ressource, valeurs) pour l'entrée unique de la requête
+    action: Optional[str] = None
+    resource_type: Optional[str] = None
+    resource_id: Optional[str] = None
+    old_values: Any = None
+    new_values: Any = None
+
+    def enrich(self, action: Optional[str] = None, resource_type: Optional[str] = None,
+               resource_id: Any = None, old_values: Any = None, new_values: Any = None) -> None:
+        if action:
+            self.action = action
+        if resource_type:
+            self.resource_type = resource_type
+        if resource_id not in (None, ''):
+            self.resource_id = str(resource_id)
+        if old_values is not None:
+            self.old_values = old_values
+        if new_values is not None:
+            self.new_values = new_values
+
+    def resolve_user_id(self) -> Optional[int]:
+        if self.user_id is None and self.request is not None:
+            user = getattr(self.request, 'user', None)
+            if user is not None and user.is_authenticated:
+                self.user_id = user.pk
+        return self.user_id
+
+    def record_metadata(self) -> Dict[str, Any]:
+        """Métadonnées HTTP au format des événements du pipeline d'audit."""
+        return {
+            'user_id': self.resolve_user_id(),
+            'adresse_ip': self.ip_address,
+            'user_agent': self.user_agent,
+            'request_method': self.request_method,
+            'request_path': self.request_path,
+            'session_key': self.session_key,
+            'correlation_id': self.correlation_id,
+        }
+
+
+def start_event(event: AuditEvent) -> AuditEvent:
+    """Active l'événement pour le contexte courant."""
+    _current_event.set(event)
+    return event
+
+
+def end_event() -> None:
+    # Pas de reset par jeton: en ASGI, process_request et process_response
+    # peuvent s'exécuter dans des copies distinctes du contexte.
+    _current_event.set(None)
+
+
+def current_event() -> Optional[AuditEvent]:
+    return _current_event.get()
+
+
+def enrich_event(**details) -> bool:
+    """
+    Précise l'entrée d'audit de la requête courante.
+
+    Returns:
+        False s'il n'y a pas de requête auditée en cours (l'appelant
+        journalise alors lui-même via le pipeline)
+    """
+    event = current_event()
+    if event is None:
+        return False
+    event.enrich(**details)
+    return True
@@ -0,0 +1,248 @@
+"""
+Moteur de diff d'audit pour les modèles suivis.
+
+Les champs suivis sont photographiés au chargement (``post_init``, donc
+aussi pour les instances issues de ``from_db``) et comparés après
+sauvegarde (``post_save``), la photographie étant alors renouvelée.
+La photographie au chargement ne garde que des références: les champs
+JSON, modifiables en place, n'y figurent pas et leur état de référence est
+relu en base au moment de la sauvegarde (``pre_save``), ce qui évite une
+copie profonde par instance chargée.
+Seuls les champs modifiés sont journalisés, sous forme de patchs JSON
+(RFC 6902) compacts:
+- ``nouvelles_valeurs``: patch avant (ancien état -> nouvel état)
+- ``anciennes_valeurs``: patch inverse (nouvel état -> ancien état)
+
+Les champs JSON sont comparés récursivement (chemins imbriqués).
+``audited_bulk_update`` couvre les mises à jour en lot.
+"""
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import JSONField
+from django.db.models.fields.files import FieldFile
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+
+from utilities.audit_context import current_event
+from utilities.audit_pipeline import AuditPipeline
+from utilities.resource_versions import ResourceVersions
+
+logger = logging.getLogger('paie_app.audit')
+
+# Champs jamais suivis (horodatages techniques)
+IGNORED_FIELDS = {'created_at', 'updated_at'}
+
+SNAPSHOT_ATTR = '_audit_snapshot'
+
+# Modèle -> tuple des attnames suivis
+_tracked: Dict[type, Tuple[str, ...]] = {}
+# Modèle -> attnames suivis hors champs JSON (photographiés au chargement)
+_scalar: Dict[type, Tuple[str, ...]] = {}
+# Modèle -> attnames JSON suivis (relus en base avant sauvegarde)
+_json: Dict[type, Tuple[str, ...]] = {}
+
+
+# ============================================================================
+# PATCHS JSON
+# ============================================================================
+
+def _pointer(path: Iterable[str]) -> str:
+    return ''.join('/' + str(part).replace('~', '~0').replace('/', '~1') for part in path)
+
+
+def json_diff(old: Any, new: Any, path: Tuple = ()) -> List[Dict[str, Any]]:
+    """Patch JSON transformant ``old`` en ``new`` (dictionnaires imbriqués)."""
+    if old == new:
+        return []
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old.keys() - new.keys():
+            ops.append({'op': 'remove', 'path': _pointer(path + (key,))})
+        for key, value in new.items():
+            if key not in old:
+                ops.append({'op': 'add', 'path': _pointer(path + (key,)), 'value': value})
+            else:
+                ops.extend(json_diff(old[key], value, path + (key,)))
+        return ops
+    return [{'op': 'replace', 'path': _pointer(path), 'value': new}]
+
+
+def diff_snapshots(old: Dict[str, Any], new: Dict[str, Any]) -> Tuple[List, List]:
+    """Retourne (patch avant, patch inverse) entre deux photographies."""
+    return json_diff(old, new), json_diff(new, old)
+
+
+# ============================================================================
+# PHOTOGRAPHIES
+# ============================================================================
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, FieldFile):
+        return value.name or None
+    return value
+
+
+def tracked_fields(model) -> Optional[Tuple[str, ...]]:
+    return _tracked.get(model)
+
+
+def snapshot(instance, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Valeurs courantes des champs suivis déjà chargés (les champs différés
+    ne sont jamais lus, pour ne pas déclencher de requête).
+    """
+    fields = fields if fields is not None else _tracked.get(type(instance), ())
+    loaded = instance.__dict__
+    return {name: _normalize(loaded[name]) for name in fields if name in loaded}
+
+
+def stored_json(model, pks: List, fields: Iterable[str]) -> Dict[Any, Dict[str, Any]]:
+    """État en base des champs JSON de plusieurs instances: une requête."""
+    fields = tuple(fields)
+    if not fields or not pks:
+        return {}
+    rows = model._base_manager.filter(pk__in=pks).values_list('pk', *fields)
+    return {row[0]: dict(zip(fields, row[1:])) for row in rows}
+
+
+def build_change_record(instance, action: str, forward: List, inverse: List) -> Dict[str, Any]:
+    """Événement d'audit au format du pipeline, enrichi du contexte de requête."""
+    record = {
+        'action': action,
+        'type_ressource': instance._meta.model_name,
+        'id_ressource': instance.pk,
+        'anciennes_valeurs': inverse or None,
+        'nouvelles_valeurs': forward or None,
+    }
+    event = current_event()
+    if event is not None:
+        record.update(event.record_metadata())
+        event.changes.append({
+            'type_ressource': record['type_ressource'],
+            'id_ressource': str(instance.pk),
+            'action': action,
+        })
+    return record
+
+
+def emit_change(instance, action: str, old: Dict[str, Any], new: Dict[str, Any]) -> bool:
+    """Journalise la différence entre deux états; rien si aucun champ n'a changé."""
+    forward, inverse = diff_snapshots(old, new)
+    if not forward and action == 'UPDATE':
+        return False
+    return AuditPipeline.enqueue(build_change_record(instance, action, forward, inverse))
+
+
+# ============================================================================
+# SIGNAUX
+# ============================================================================
+
+def _on_post_init(sender, instance, **kwargs):
+    # Références seulement: aucune copie à chaque chargement
+    setattr(instance, SNAPSHOT_ATTR, snapshot(instance, _scalar.get(sender, ())))
+
+
+def _on_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    fields = [name for name in _json.get(sender, ()) if name in instance.__dict__]
+    if update_fields:
+        names = {sender._meta.get_field(name).attname for name in update_fields}
+        fields = [name for name in fields if name in names]
+    if not fields:
+        return
+    try:
+        stored = stored_json(sender, [instance.pk], fields).get(instance.pk, {})
+    except Exception as e:
+        logger.error(f"❌ Audit diff failed for {sender.__name__}: {e}")
+        return
+    setattr(instance, SNAPSHOT_ATTR, {**getattr(instance, SNAPSHOT_ATTR, {}), **stored})
+
+
+def _on_post_save(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    old = {} if created else getattr(instance, SNAPSHOT_ATTR, {})
+    new = snapshot(instance)
+    if update_fields and not created:
+        # Seuls les champs réellement écrits peuvent avoir changé
+        names = {sender._meta.get_field(name).attname for name in update_fields}
+        old = {name: value for name, value in old.items() if name in names}
+        new = {name: value for name, value in new.items() if name in names}
+
+    try:
+        emit_change(instance, 'CREATE' if created else 'UPDATE', old, new)
+    except Exception as e:
+        # ⚠️ Ne JAMAIS faire planter l'application à cause de l'audit
+        logger.error(f"❌ Audit diff failed for {sender.__name__}: {e}")
+    setattr(instance, SNAPSHOT_ATTR, {**getattr(instance, SNAPSHOT_ATTR, {}), **new})
+
+
+def _on_post_delete(sender, instance, **kwargs):
+    try:
+        # Champs JSON: valeur courante de l'instance (absents de la photographie)
+        emit_change(instance, 'DELETE', {**snapshot(instance), **getattr(instance, SNAPSHOT_ATTR, {})}, {})
+    except Exception as e:
+        logger.error(f"❌ Audit diff failed for {sender.__name__}: {e}")
+
+
+def register_tracked_models() -> None:
+    """
+    Connecte le moteur de diff aux modèles déclarés dans AUDIT_TRACKED_MODELS:
+    ``{'app_label.model': '__all__' | ['champ', ...]}``.
+    """
+    for label, fields in getattr(settings, 'AUDIT_TRACKED_MODELS', {}).items():
+        model = apps.get_model(label)
+        concrete = [f for f in model._meta.concrete_fields if not f.primary_key]
+        if fields != '__all__':
+            concrete = [f for f in concrete if f.name in fields]
+        concrete = [f for f in concrete if f.name not in IGNORED_FIELDS]
+        _tracked[model] = tuple(f.attname for f in concrete)
+        _scalar[model] = tuple(f.attname for f in concrete if not isinstance(f, JSONField))
+        _json[model] = tuple(f.attname for f in concrete if isinstance(f, JSONField))
+
+        uid = f'audit_diff:{label}'
+        post_init.connect(_on_post_init, sender=model, dispatch_uid=uid)
+        pre_save.connect(_on_pre_save, sender=model, dispatch_uid=uid)
+        post_save.connect(_on_post_save, sender=model, dispatch_uid=uid)
+        post_delete.connect(_on_post_delete, sender=model, dispatch_uid=uid)
+
+
+# ============================================================================
+# OPÉRATIONS EN LOT
+# ============================================================================
+
+def audited_bulk_update(model, objs: List, fields: List[str], batch_size: Optional[int] = None) -> int:
+    """
+    ``bulk_update`` avec journalisation des champs réellement modifiés
+    (une entrée d'audit par instance modifiée, écrites par lots par le pipeline).
+    L'état de référence des champs JSON est relu en une requête avant la mise
+    à jour.
+    """
+    if model not in _tracked:
+        updated = model.objects.bulk_update(objs, fields, batch_size=batch_size)
+        # bulk_update n'envoie pas post_save
+        ResourceVersions.bump_for_write(model._meta.label_lower)
+        return updated
+
+    attnames = tuple(
+        attname for attname in (model._meta.get_field(name).attname for name in fields)
+        if attname in _tracked[model]
+    )
+    json_names = [name for name in attnames if name in _json[model]]
+    stored = stored_json(model, [obj.pk for obj in objs], json_names)
+    updated = model.objects.bulk_update(objs, fields, batch_size=batch_size)
+    ResourceVersions.bump_for_write(model._meta.label_lower)
+
+    for obj in objs:
+        old_full = {**getattr(obj, SNAPSHOT_ATTR, {}), **stored.get(obj.pk, {})}
+        old = {name: old_full[name] for name in attnames if name in old_full}
+        new = snapshot(obj, attnames)
+        try:
+            emit_change(obj, 'UPDATE', old, new)
+        except Exception as e:
+            logger.error(f"❌ Audit diff failed for {model.__name__}: {e}")
+        setattr(obj, SNAPSHOT_ATTR, {**old_full, **new})
+    return updated
@@ -0,0 +1,346 @@
+"""
+Pipeline d'audit bufferisé.
+
+Les événements d'audit ne sont plus envoyés un par un à Celery: ils sont
+poussés dans un buffer (liste Redis, ou ring buffer en mémoire à défaut)
+puis vidés par lots avec ``bulk_create`` - une seule insertion par lot,
+l'identifiant utilisateur étant porté directement par l'événement.
+
+Contre-pression et politique de perte bornée:
+- au-delà de ``SOFT_LIMIT`` événements en attente, les événements de faible
+  priorité (consultations) sont abandonnés;
+- au-delà de ``HARD_LIMIT``, tout nouvel événement est abandonné.
+Chaque abandon est compté dans le store de métriques (``audit_dropped``).
+
+Un lot refusé par la base pour ses données (clé étrangère vers un
+utilisateur supprimé, adresse IP invalide...) est découpé par dichotomie:
+les lignes valides sont écrites, celles qui échouent seules partent dans
+une file de lettres mortes bornée (``DEAD_LETTER_KEY``) au lieu de bloquer
+le buffer. Une erreur de connexion remet le lot en tête du buffer.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import DataError, IntegrityError, transaction
+from django.utils import timezone
+
+from utilities import json_codec
+from utilities.metrics import MetricsStore
+from utilities.resource_versions import ResourceVersions
+
+logger = logging.getLogger('paie_app.audit')
+
+PIPELINE_SETTINGS = getattr(settings, 'AUDIT_PIPELINE', {})
+
+BUFFER_KEY = PIPELINE_SETTINGS.get('BUFFER_KEY', 'rhback:audit:buffer')
+BATCH_SIZE = PIPELINE_SETTINGS.get('BATCH_SIZE', 500)
+SOFT_LIMIT = PIPELINE_SETTINGS.get('SOFT_LIMIT', 50_000)
+HARD_LIMIT = PIPELINE_SETTINGS.get('HARD_LIMIT', 200_000)
+FLUSH_INTERVAL = PIPELINE_SETTINGS.get('FLUSH_INTERVAL', 2.0)
+DEAD_LETTER_KEY = PIPELINE_SETTINGS.get('DEAD_LETTER_KEY', f'{BUFFER_KEY}:dead')
+DEAD_LETTER_LIMIT = PIPELINE_SETTINGS.get('DEAD_LETTER_LIMIT', 10_000)
+# Durée (secondes) pendant laquelle une longueur observée au-dessus de
+# SOFT_LIMIT est réutilisée avant d'être relue (LLEN)
+LENGTH_REFRESH = PIPELINE_SETTINGS.get('LENGTH_REFRESH', 1.0)
+
+# Erreurs dues aux données d'un lot (découpé), par opposition aux erreurs
+# de connexion (lot remis dans le buffer)
+POISON_ERRORS = (DataError, IntegrityError, ValidationError, ValueError, TypeError)
+
+# Actions abandonnées en premier sous contre-pression
+LOW_PRIORITY_ACTIONS = {'VIEW', 'VIEW_FAILED'}
+
+# Champs d'un événement, dans le format de audit_log
+RECORD_FIELDS = (
+    'user_id', 'action', 'type_ressource', 'id_ressource', 'anciennes_valeurs',
+    'nouvelles_valeurs', 'adresse_ip', 'user_agent', 'session_key',
+    'request_method', 'request_path', 'response_status', 'execution_time', 'timestamp',
+    'correlation_id',
+)
+
+
+def build_audit_entries(records: List[Dict]) -> List:
+    """Construit les instances audit_log (non sauvegardées) d'un lot d'événements."""
+    from user_app.models import audit_log
+    from utilities.audit_search import build_search_text, users_by_id
+
+    users = users_by_id(record.get('user_id') for record in records)
+    entries = []
+    for record in records:
+        data = {field: record.get(field) for field in RECORD_FIELDS}
+        data['user_id_id'] = data.pop('user_id')
+        data['type_ressource'] = data['type_ressource'] or 'unknown'
+        data['id_ressource'] = str(data['id_ressource']) if data['id_ressource'] else ''
+        for field in ('user_agent', 'session_key', 'request_method', 'request_path', 'correlation_id'):
+            data[field] = data[field] or ''
+        data['timestamp'] = data['timestamp'] or timezone.now()
+        data['search_text'] = build_search_text(
+            user=users.get(data['user_id_id']),
+            type_ressource=data['type_ressource'],
+            id_ressource=data['id_ressource'],
+            request_path=data['request_path'],
+            adresse_ip=data['adresse_ip'],
+            action=data['action'],
+        )
+        entries.append(audit_log(**data))
+    return entries
+
+
+def write_batch(records: List[Dict]) -> int:
+    """Insère un lot d'événements en une seule requête."""
+    from user_app.models import audit_log
+
+    if not records:
+        return 0
+    audit_log.objects.bulk_create(build_audit_entries(records), batch_size=BATCH_SIZE)
+    # bulk_create n'envoie pas post_save: ETags et caches des vues d'audit
+    ResourceVersions.bump_for_write(audit_log._meta.label_lower)
+    return len(records)
+
+
+class RedisAuditBuffer:
+    """Buffer partagé entre processus: liste Redis (RPUSH / LRANGE+LTRIM)."""
+
+    def __init__(self, client):
+        self.client = client
+        self._last_length = 0
+        self._length_at = 0.0
+
+    def _set_length(self, length: int) -> None:
+        self._last_length = length
+        self._length_at = time.monotonic()
+
+    def _over_soft_limit(self) -> bool:
+        # Longueur observée au dernier aller-retour: évite un LLEN par push,
+        # relue après LENGTH_REFRESH secondes (le buffer a pu être vidé
+        # par un autre processus)
+        if self._last_length < SOFT_LIMIT:
+            return False
+        if time.monotonic() - self._length_at >= LENGTH_REFRESH:
+            self._set_length(self.client.llen(BUFFER_KEY))
+        return self._last_length >= SOFT_LIMIT
+
+    def push(self, payload: str, low_priority: bool) -> bool:
+        if low_priority and self._over_soft_limit():
+            return False
+
+        length = self.client.rpush(BUFFER_KEY, payload)
+        self._set_length(length)
+        if length > HARD_LIMIT:
+            # Politique drop-newest: on retire ce qui dépasse la borne
+            self.client.ltrim(BUFFER_KEY, 0, HARD_LIMIT - 1)
+            return False
+        return True
+
+    def pop_batch(self, size: int) -> List[str]:
+        pipe = self.client.pipeline(transaction=True)
+        pipe.lrange(BUFFER_KEY, 0, size - 1)
+        pipe.ltrim(BUFFER_KEY, size, -1)
+        pipe.llen(BUFFER_KEY)
+        items, _, length = pipe.execute()
+        self._set_length(length)
+        return [item.decode('utf-8') if isinstance(item, bytes) else item for item in items]
+
+    def requeue(self, payloads: List[str]) -> None:
+        if payloads:
+            self.client.lpush(BUFFER_KEY, *reversed(payloads))
+
+    def dead_letter(self, payloads: List[str]) -> None:
+        if payloads:
+            pipe = self.client.pipeline(transaction=True)
+            pipe.rpush(DEAD_LETTER_KEY, *payloads)
+            pipe.ltrim(DEAD_LETTER_KEY, -DEAD_LETTER_LIMIT, -1)
+            pipe.execute()
+
+    def __len__(self):
+        return self.client.llen(BUFFER_KEY)
+
+
+class LocalAuditBuffer:
+    """
+    Ring buffer en mémoire (repli sans Redis), vidé par un thread de fond.
+    """
+
+    def __init__(self):
+        self._items = deque()
+        self.dead_letters = deque(maxlen=DEAD_LETTER_LIMIT)
+        self._lock = threading.Lock()
+        self._flusher = None
+
+    def push(self, payload: str, low_priority: bool) -> bool:
+        with self._lock:
+            length = len(self._items)
+            if length >= HARD_LIMIT or (low_priority and length >= SOFT_LIMIT):
+                return False
+            self._items.append(payload)
+        self._ensure_flusher()
+        return True
+
+    def pop_batch(self, size: int) -> List[str]:
+        with self._lock:
+            return [self._items.popleft() for _ in range(min(size, len(self._items)))]
+
+    def requeue(self, payloads: List[str]) -> None:
+        with self._lock:
+            self._items.extendleft(reversed(payloads))
+
+    def dead_letter(self, payloads: List[str]) -> None:
+        self.dead_letters.extend(payloads)
+
+    def __len__(self):
+        return len(self._items)
+
+    def _ensure_flusher(self):
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name='audit-flusher', daemon=True
+            )
+            self._flusher.start()
+
+    def _flush_loop(self):
+        from django.db import close_old_connections
+
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            try:
+                AuditPipeline.drain()
+            except Exception as e:
+                logger.error(f"❌ Audit flush failed: {e}")
+            finally:
+                close_old_connections()
+
+
+class AuditPipeline:
+    """Point d'entrée du pipeline d'audit bufferisé."""
+
+    _buffer = None
+    _buffer_lock = threading.Lock()
+
+    @classmethod
+    def buffer(cls):
+        if cls._buffer is None:
+            with cls._buffer_lock:
+                if cls._buffer is None:
+                    cls._buffer = cls._create_buffer()
+        return cls._buffer
+
+    @staticmethod
+    def _create_buffer():
+        try:
+            client = cache._cache.get_client(write=True)
+            client.ping()
+            return RedisAuditBuffer(client)
+        except Exception as e:
+            logger.warning(f"⚠️  Audit buffer: Redis indisponible ({e}), buffer en mémoire")
+            return LocalAuditBuffer()
+
+    @classmethod
+    def enqueue(cls, record: Dict) -> bool:
+        """
+        Ajoute un événement au buffer. Ne lève jamais.
+
+        Returns:
+            True si l'événement a été accepté, False s'il a été abandonné
+        """
+        record.setdefault('timestamp', timezone.now())
+        action = record.get('action') or ''
+        try:
+            payload = json_codec.dumps_str(record)
+            accepted = cls.buffer().push(payload, low_priority=action in LOW_PRIORITY_ACTIONS)
+        except Exception as e:
+            logger.error(f"❌ Failed to buffer audit event: {e}")
+            accepted = False
+
+        if not accepted:
+            MetricsStore.incr('audit_dropped', action or 'unknown')
+        return accepted
+
+    @classmethod
+    def drain(cls, max_batches: int = 20) -> int:
+        """
+        Vide le buffer par lots de BATCH_SIZE (une insertion par lot).
+
+        Un lot refusé pour ses données est découpé (voir ``_write_or_split``);
+        en cas d'erreur de connexion, ses événements non écrits sont remis en
+        tête du buffer.
+        """
+        buffer = cls.buffer()
+        written = 0
+
+        for _ in range(max_batches):
+            payloads = buffer.pop_batch(BATCH_SIZE)
+            if not payloads:
+                break
+
+            items = cls._decode(payloads)
+            handled: List[str] = []
+            try:
+                written += cls._write_or_split(buffer, items, handled)
+            except Exception:
+                # Les moitiés déjà écrites ou en lettres mortes (un préfixe du
+                # lot) ne sont pas remises en tête
+                buffer.requeue([payload for payload, _ in items[len(handled):]])
+                raise
+
+            if len(payloads) < BATCH_SIZE:
+                break
+
+        if written:
+            MetricsStore.incr('audit_written', 'bulk', written)
+            logger.debug(f"✅ {written} audit logs written in batches")
+        return written
+
+    @classmethod
+    def _write_or_split(cls, buffer, items: List[tuple], handled: List[str]) -> int:
+        """
+        Écrit des couples (payload, événement); un lot refusé pour ses
+        données est coupé en deux jusqu'à isoler les événements fautifs,
+        envoyés en lettres mortes. ~log2(BATCH_SIZE) insertions par
+        événement fautif.
+
+        Les moitiés sont traitées dans l'ordre: ``handled`` reçoit les
+        payloads écrits ou en lettres mortes, toujours un préfixe de items.
+        """
+        if not items:
+            return 0
+        try:
+            with transaction.atomic():
+                written = write_batch([record for _, record in items])
+        except POISON_ERRORS as e:
+            if len(items) == 1:
+                payload, record = items[0]
+                buffer.dead_letter([payload])
+                handled.append(payload)
+                MetricsStore.incr('audit_dead_letter', record.get('action') or 'unknown')
+                logger.error(f"❌ Audit event dead-lettered: {type(e).__name__}: {e}")
+                return 0
+            middle = len(items) // 2
+            written = cls._write_or_split(buffer, items[:middle], handled)
+            return written + cls._write_or_split(buffer, items[middle:], handled)
+        handled.extend(payload for payload, _ in items)
+        return written
+
+    @staticmethod
+    def _decode(payloads: List[str]) -> List[tuple]:
+        items = []
+        for payload in payloads:
+            try:
+                items.append((payload, json_codec.loads(payload)))
+            except ValueError:
+                # Événement illisible: abandonné plutôt que de bloquer le buffer
+                MetricsStore.incr('audit_dropped', 'malformed')
+        return items
+
+    @classmethod
+    def pending(cls) -> int:
+        """Nombre d'événements en attente."""
+        try:
+            return len(cls.buffer())
+        except Exception:
+            return 0
@@ -0,0 +1,99 @@
+"""
+Recherche rapide dans les logs d'audit.
+
+Chaque entrée porte une colonne dénormalisée ``search_text`` (email et nom de
+l'utilisateur, ressource, chemin, IP, action), en minuscules, indexée par un
+index GIN ``gin_trgm_ops`` (extension pg_trgm). Les recherches ``icontains``
+passent par cette colonne: l'index trigramme restreint les candidats au lieu
+d'un parcours séquentiel avec jointure sur les utilisateurs.
+"""
+from typing import Dict, Iterable, Optional
+
+from django.db import connection
+from rest_framework.filters import SearchFilter
+
+SEARCH_SEPARATOR = ' | '
+
+
+def build_search_text(user=None, user_email: str = '', user_name: str = '',
+                      type_ressource: str = '', id_ressource: str = '',
+                      request_path: str = '', adresse_ip: Optional[str] = None,
+                      action: str = '') -> str:
+    """Texte de recherche normalisé d'une entrée d'audit."""
+    if user is not None:
+        user_email = user.email
+        user_name = f"{user.nom} {user.prenom}".strip()
+    parts = (user_email, user_name, type_ressource, id_ressource, request_path, adresse_ip, action)
+    return SEARCH_SEPARATOR.join(str(part) for part in parts if part).lower()
+
+
+def users_by_id(user_ids: Iterable) -> Dict:
+    """Utilisateurs d'un lot d'événements, en une seule requête."""
+    from django.contrib.auth import get_user_model
+
+    ids = {user_id for user_id in user_ids if user_id}
+    if not ids:
+        return {}
+    return get_user_model().objects.only('email', 'nom', 'prenom').in_bulk(ids)
+
+
+def ensure_trigram_extension(sender=None, using='default', **kwargs) -> None:
+    """Receveur pre_migrate: installe pg_trgm avant la création des index."""
+    from django.db import connections
+
+    target = connections[using]
+    if target.vendor != 'postgresql':
+        return
+    with target.cursor() as cursor:
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+
+def search_filter(queryset, value: str):
+    """Préfiltre indexé: chaque terme doit apparaître dans search_text."""
+    for term in value.lower().split():
+        queryset = queryset.filter(search_text__contains=term)
+    return queryset
+
+
+class AuditSearchFilter(SearchFilter):
+    """
+    ``?search=`` sur la colonne dénormalisée (index trigramme) au lieu d'un
+    OR de ``icontains`` joint sur les utilisateurs.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return search_filter(queryset, ' '.join(terms))
+
+
+def backfill_search_text(batch_size: int = 50_000) -> int:
+    """
+    Renseigne search_text des entrées existantes, par tranches d'identifiants
+    (une requête UPDATE ... FROM par tranche).
+    """
+    updated = 0
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT min(id), max(id) FROM auth_audit_log')
+        first, last = cursor.fetchone()
+        if first is None:
+            return 0
+
+        for start in range(first, last + 1, batch_size):
+            cursor.execute(
+                f"""
+                UPDATE auth_audit_log AS a
+                SET search_text = lower(concat_ws(%s,
+                    NULLIF(u.email, ''), NULLIF(trim(concat_ws(' ', u.nom, u.prenom)), ''),
+                    NULLIF(a.type_ressource, ''), NULLIF(a.id_ressource, ''),
+                    NULLIF(a.request_path, ''), host(a.adresse_ip), NULLIF(a.action, '')))
+                FROM auth_audit_log AS base
+                LEFT JOIN "user" AS u ON u.id = base.user_id_id
+                WHERE a.id = base.id AND a.timestamp = base.timestamp
+                  AND a.id >= %s AND a.id < %s AND a.search_text = ''
+                """,
+                [SEARCH_SEPARATOR, start, start + batch_size],
+            )
+            updated += cursor.rowcount
+    return updated
@@ -1,10 +1,15 @@
 """
 Service d'audit global ASYNCHRONE pour capturer toutes les actions du système.
-Utilise Celery pour l'exécution en arrière-plan sans bloquer le serveur.
+Les événements passent par un pipeline bufferisé (utilities.audit_pipeline)
+et sont insérés par lots, sans bloquer le serveur.
 """
 import time
 from django.contrib.auth import get_user_model
 from user_app.models import audit_log
+from utilities.audit_pipeline import AuditPipeline
+from utilities.audit_diff import (
+    IGNORED_FIELDS, SNAPSHOT_ATTR, diff_snapshots, snapshot, stored_json, tracked_fields
+)
 import logging
 
 User = get_user_model()
@@ -44,6 +49,9 @@ if CELERY_AVAILABLE:
         """
         Tâche Celery asynchrone pour créer un log d'audit en arrière-plan.
         Ne bloque JAMAIS le serveur principal.
+
+        Conservée pour les messages déjà en file: le chemin nominal est
+        désormais le pipeline bufferisé (AuditPipeline).
         """
         try:
             # Récupérer l'utilisateur si user_id est fourni
@@ -83,7 +91,7 @@ if CELERY_AVAILABLE:
 class AuditService:
     """
     Service centralisé pour l'audit ASYNCHRONE de toutes les actions du système.
-    Par défaut, toutes les opérations sont exécutées en arrière-plan via Celery.
+    Par défaut, les événements sont bufferisés puis insérés par lots.
     """
 
     @staticmethod
@@ -101,6 +109,7 @@ class AuditService:
         response_status=None,
         execution_time=None,
         session_key=None,
+        correlation_id=None,
         async_mode=True  # Par défaut ASYNCHRONE
     ):
         """
@@ -122,42 +131,37 @@ class AuditService:
             response_status: Code de statut HTTP
             execution_time: Temps d'exécution en secondes
             session_key: Clé de session
-            async_mode: Si True, utilise Celery (recommandé)
+            correlation_id: Identifiant de corrélation de la requête
+            async_mode: Si True, utilise le pipeline bufferisé (recommandé)
         """
         try:
             # Sanitiser les données sensibles
             old_values = AuditService._sanitize_data(old_values)
             new_values = AuditService._sanitize_data(new_values)
 
-            # Préparer les données pour l'audit
-            audit_data = {
-                'user_id': user.id if user else None,
-                'action': action,
-                'resource_type': resource_type,
-                'resource_id': resource_id,
-                'old_values': old_values,
-                'new_values': new_values,
-                'ip_address': ip_address,
-                'user_agent': user_agent,
-                'request_method': request_method,
-                'request_path': request_path,
-                'response_status': response_status,
-                'execution_time': execution_time,
-                'session_key': session_key
-            }
-
-            # ⚡ Mode asynchrone avec Celery (RECOMMANDÉ - ne bloque pas le serveur)
-            if async_mode and CELERY_AVAILABLE:
-                # Envoyer la tâche à Celery en arrière-plan
-                create_audit_log_async.delay(**audit_data)
-                logger.debug(f"📤 Audit log queued: {action} on {resource_type}")
+            # ⚡ Mode asynchrone: buffer + insertion par lots (RECOMMANDÉ)
+            if async_mode:
+                AuditPipeline.enqueue({
+                    'user_id': user.id if user else None,
+                    'action': action,
+                    'type_ressource': resource_type,
+                    'id_ressource': resource_id,
+                    'anciennes_valeurs': old_values,
+                    'nouvelles_valeurs': new_values,
+                    'adresse_ip': ip_address,
+                    'user_agent': user_agent,
+                    'request_method': request_method,
+                    'request_path': request_path,
+                    'response_status': response_status,
+                    'execution_time': execution_time,
+                    'session_key': session_key,
+                    'correlation_id': correlation_id
+                })
+                logger.debug(f"📤 Audit log buffered: {action} on {resource_type}")
                 return None  # Retourne None car l'audit est asynchrone
 
-            # Mode synchrone (fallback si Celery n'est pas disponible)
+            # Mode synchrone
             else:
-                if not CELERY_AVAILABLE:
-                    logger.warning("⚠️  Celery not available, using synchronous audit")
-
                 audit_entry = audit_log.objects.create(
                     user_id=user,
                     action=action,
@@ -171,7 +175,8 @@ class AuditService:
                     request_method=request_method or '',
                     request_path=request_path or '',
                     response_status=response_status,
-                    execution_time=execution_time
+                    execution_time=execution_time,
+                    correlation_id=correlation_id or ''
                 )
 
                 logger.info(f"✅ Audit log created synchronously: {audit_entry}")
@@ -224,23 +229,36 @@ class AuditService:
     def log_model_change(user, instance, action, old_values=None, request=None):
         """
         Enregistre les modifications sur les modèles Django EN ARRIÈRE-PLAN.
+
+        Seuls les champs modifiés sont journalisés, sous forme de patchs JSON
+        (voir utilities.audit_diff). L'état de référence est ``old_values``
+        ou, à défaut, la photographie prise au chargement de l'instance.
         """
-        # Extraire les nouvelles valeurs de l'instance
-        new_values = None
-        if hasattr(instance, '__dict__'):
-            new_values = {
-                field.name: getattr(instance, field.name, None)
-                for field in instance._meta.fields
-                if not field.name.endswith('_ptr')
-            }
+        fields = tracked_fields(type(instance)) or tuple(
+            field.attname for field in instance._meta.concrete_fields
+            if not field.primary_key and field.name not in IGNORED_FIELDS
+        )
+        current = snapshot(instance, fields)
+        if action == 'CREATE':
+            reference = {}
+        elif old_values is not None:
+            reference = {name: value for name, value in old_values.items() if name in current}
+        else:
+            reference = getattr(instance, SNAPSHOT_ATTR, None) or {}
+            # Champs JSON hors photographie: état de référence relu en base
+            missing = [name for name in current if name not in reference]
+            if reference and missing and instance.pk is not None:
+                stored = stored_json(type(instance), [instance.pk], missing).get(instance.pk, {})
+                reference = {**reference, **stored}
+        new_values, old_values = diff_snapshots(reference, current)
 
         return AuditService.log_action(
             user=user,
             action=action,
             resource_type=instance._meta.model_name,
             resource_id=str(instance.pk) if instance.pk else None,
-            old_values=old_values,
-            new_values=new_values,
+            old_values=old_values or None,
+            new_values=new_values or None,
             ip_address=AuditService._get_client_ip(request) if request else None,
             user_agent=request.META.get('HTTP_USER_AGENT', '') if request else None,
             request_method=request.method if request else None,
@@ -1,11 +1,24 @@
+import time
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
+from .audit_pipeline import AuditPipeline
+from .auth_cache import AUTH_CACHE, UserCache, LocalTTLCache
 from .jwt_utils import verify_token
+from .revocation import RevocationList
 
 
 User = get_user_model()
 
+# One SESSION_SEEN audit event per user / IP within this window (seconds)
+SESSION_SEEN_WINDOW = getattr(settings, 'CACHE_TIMEOUTS', {}).get('session_seen', 900)
+
+# Session keys already handled by this process (skips the cache round-trip)
+_sessions_seen = LocalTTLCache(SESSION_SEEN_WINDOW, AUTH_CACHE['L1_MAX_ENTRIES'])
+
 
 class JWT_AUTH(BaseAuthentication):
     """
@@ -13,56 +26,112 @@ class JWT_AUTH(BaseAuthentication):
     Supports both synchronous and asynchronous authentication automatically.
     """
 
-    def authenticate(self, request):
-        """
-        Synchronous authentication for regular views.
-        """
+    def _decode(self, request):
+        """Return (token, payload), or None when there is no Bearer header."""
         auth_header = request.headers.get('Authorization')
         if not auth_header or not auth_header.startswith('Bearer '):
             return None
 
         token = auth_header[7:]
-
         try:
-            payload = verify_token(token, 'access')
-            user = User.objects.get(id=payload['user_id'])
+            return token, verify_token(token, 'access')
+        except ValueError as exc:
+            raise AuthenticationFailed('Token invalide') from exc
 
-            # Check if user is active
-            if not user.is_active:
-                raise AuthenticationFailed('User account is disabled')
+    def _check_user(self, request, user):
+        # Check if user is active
+        if not user.is_active:
+            raise AuthenticationFailed('User account is disabled')
 
-            # Log authentication for audit
-            self._log_authentication(request, user)
+        # Aggregated authentication audit (no per-request insert)
+        self._log_authentication(request, user)
 
-            return (user, token)
-        except ValueError as exc:
-            raise AuthenticationFailed('Token invalide') from exc
+    def authenticate(self, request):
+        """
+        Synchronous authentication for regular views.
+        """
+        decoded = self._decode(request)
+        if decoded is None:
+            return None
+        token, payload = decoded
+
+        if RevocationList.is_revoked(payload):
+            raise AuthenticationFailed('Token révoqué')
+        try:
+            user = UserCache.get(payload['user_id'])
         except User.DoesNotExist as exc:
             raise AuthenticationFailed('Token invalide') from exc
 
+        self._check_user(request, user)
+        return (user, token)
+
     def _log_authentication(self, request, user):
         """
-        Log authentication attempt for audit purposes.
+        Record a "session seen" audit event at most once per user / IP / window.
+
+        Nothing is written in the request: the first authentication of the
+        window is deduplicated through the cache and sent to the buffered
+        audit pipeline; the others are answered from process memory.
         """
         try:
-            from user_app.models import audit_log
-
             # Get client IP
             x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
             if x_forwarded_for:
-                ip = x_forwarded_for.split(',')[0]
+                ip = x_forwarded_for.split(',')[0].strip()
             else:
                 ip = request.META.get('REMOTE_ADDR')
 
-            # Create audit log entry
-            audit_log.objects.create(
-                user_id=user,
-                action='LOGIN',
-                type_ressource='authentication',
-                id_ressource=str(user.id),
-                adresse_ip=ip,
-                user_agent=request.META.get('HTTP_USER_AGENT', ''),
-            )
+            window = int(time.time() // SESSION_SEEN_WINDOW)
+            key = f"audit:session_seen:{user.id}:{ip}:{window}"
+            if _sessions_seen.get(key):
+                return
+            _sessions_seen.set(key, True)
+            if not cache.add(key, 1, SESSION_SEEN_WINDOW):
+                return
+
+            AuditPipeline.enqueue({
+                'user_id': user.id,
+                'action': 'SESSION_SEEN',
+                'type_ressource': 'authentication',
+                'id_ressource': str(user.id),
+                'adresse_ip': ip,
+                'user_agent': request.META.get('HTTP_USER_AGENT', ''),
+                'request_path': request.path,
+            })
         except Exception:
             # Don't fail authentication if audit logging fails
             pass
+
+
+class AsyncJWTAuthentication(JWT_AUTH):
+    """
+    JWT authentication for ADRF views.
+
+    ADRF runs ``initial()`` (and therefore authentication) in a worker thread
+    through ``sync_to_async``, and wraps coroutine authenticators in
+    ``async_to_sync``: an async ``authenticate`` would add a second thread
+    hop per request. ``authenticate`` is therefore synchronous and runs in
+    that worker thread.
+
+    The token is verified in-process (HS256, memoized per token) and checked
+    against the local copy of the revocation list (``utilities.revocation``);
+    the user comes from the two-level user cache (``utilities.auth_cache``).
+    On an in-process hit there is no database query and no I/O at all.
+    """
+
+    async def aauthenticate(self, request):
+        """Coroutine variant for callers already running in the event loop."""
+        decoded = self._decode(request)
+        if decoded is None:
+            return None
+        token, payload = decoded
+
+        if await RevocationList.ais_revoked(payload):
+            raise AuthenticationFailed('Token révoqué')
+        try:
+            user = await UserCache.aget(payload['user_id'])
+        except User.DoesNotExist as exc:
+            raise AuthenticationFailed('Token invalide') from exc
+
+        self._check_user(request, user)
+        return (user, token)
@@ -0,0 +1,163 @@
+"""
+Cache des utilisateurs authentifiés (JWT), en deux niveaux.
+
+Le niveau L1 (mémoire du processus, TTL de quelques secondes) évite tout
+aller-retour réseau sur les requêtes rapprochées; le niveau L2 (Redis) évite
+la base de données entre processus. Seuls les champs utiles à
+l'authentification sont mis en cache (jamais le hash du mot de passe):
+l'instance est reconstruite avec ``from_db`` et le mot de passe reste un
+champ différé. Les signaux post_save / post_delete de
+User invalident L2 (et L1 du processus courant); la durée de vie L1 borne le
+délai de prise en compte dans les autres processus. La désactivation d'un
+utilisateur révoque en plus ses tokens (``utilities.revocation``), ce qui
+prend effet sans attendre l'expiration de L1.
+"""
+import copy
+import logging
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_delete
+
+from .revocation import RevocationList
+
+logger = logging.getLogger('paie_app.services')
+
+AUTH_CACHE = {
+    'USER_L1_TTL': 5,
+    'USER_L2_TTL': 300,
+    'L1_MAX_ENTRIES': 10_000,
+    **getattr(settings, 'AUTH_CACHE', {}),
+}
+
+
+def user_key(user_id) -> str:
+    return f"auth:user:fields:{user_id}"
+
+
+def cached_fields() -> Tuple[str, ...]:
+    """Champs de User mis en cache: tous les champs concrets sauf le mot de passe."""
+    return tuple(
+        field.attname for field in get_user_model()._meta.concrete_fields
+        if field.name != 'password'
+    )
+
+
+def _dump(user) -> Dict[str, Any]:
+    return {name: getattr(user, name) for name in cached_fields()}
+
+
+def _load(values: Dict[str, Any]):
+    # Instance « chargée de la base »: save() n'écrit que ces champs
+    return get_user_model().from_db('default', list(values), list(values.values()))
+
+
+class LocalTTLCache:
+    """Dictionnaire borné à expiration, propre au processus."""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data: Dict[Any, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return default
+        return entry[1]
+
+    def set(self, key, value) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._data) >= self.max_entries:
+                self._data = {k: v for k, v in self._data.items() if v[0] >= now}
+                while len(self._data) >= self.max_entries:
+                    # Les entrées les plus anciennes sont les premières insérées
+                    self._data.pop(next(iter(self._data)))
+            self._data[key] = (now + self.ttl, value)
+
+    def delete(self, key) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data = {}
+
+
+class UserCache:
+    """Utilisateurs authentifiés: L1 mémoire puis L2 Redis puis base."""
+
+    _users = LocalTTLCache(AUTH_CACHE['USER_L1_TTL'], AUTH_CACHE['L1_MAX_ENTRIES'])
+
+    @staticmethod
+    def _copy(user):
+        # Chaque requête reçoit sa propre instance (les vues peuvent la modifier)
+        return copy.copy(user)
+
+    @classmethod
+    def get_local(cls, user_id):
+        user = cls._users.get(user_id)
+        return cls._copy(user) if user is not None else None
+
+    @classmethod
+    def store(cls, user) -> None:
+        cls._users.set(user.pk, user)
+
+    @classmethod
+    def invalidate(cls, user_id) -> None:
+        cls._users.delete(user_id)
+        cache.delete(user_key(user_id))
+
+    @classmethod
+    def get(cls, user_id):
+        """Version synchrone de ``aget``."""
+        user = cls.get_local(user_id)
+        if user is not None:
+            return user
+
+        values = cache.get(user_key(user_id))
+        if values is None:
+            user = get_user_model().objects.only(*cached_fields()).get(pk=user_id)
+            cache.set(user_key(user_id), _dump(user), AUTH_CACHE['USER_L2_TTL'])
+        else:
+            user = _load(values)
+        cls.store(user)
+        return cls._copy(user)
+
+    @classmethod
+    async def aget(cls, user_id):
+        """
+        Utilisateur d'un token; aucune entrée/sortie sur un succès L1.
+
+        Raises:
+            User.DoesNotExist
+        """
+        user = cls.get_local(user_id)
+        if user is not None:
+            return user
+
+        values = await cache.aget(user_key(user_id))
+        if values is None:
+            user = await get_user_model().objects.only(*cached_fields()).aget(pk=user_id)
+            await cache.aset(user_key(user_id), _dump(user), AUTH_CACHE['USER_L2_TTL'])
+        else:
+            user = _load(values)
+        cls.store(user)
+        return cls._copy(user)
+
+
+def invalidate_user(sender, instance, **kwargs) -> None:
+    """Receveur post_save / post_delete de User."""
+    UserCache.invalidate(instance.pk)
+    deleted = kwargs.get('signal') is post_delete
+    if deleted or (not instance.is_active and not kwargs.get('created')):
+        # Désactivation / suppression: tokens déjà émis refusés immédiatement
+        try:
+            RevocationList.revoke_user(instance.pk)
+        except Exception as e:
+            logger.error(f"❌ Révocation des tokens de l'utilisateur {instance.pk} impossible: {e}")
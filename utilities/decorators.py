@@ -6,7 +6,8 @@ from django.http import JsonResponse
 from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.response import Response
-from user_app.models import audit_log
+from utilities.audit_context import enrich_event
+from utilities.audit_pipeline import AuditPipeline
 
 User = get_user_model()
 
@@ -45,33 +46,44 @@ def audit_action(action_type, resource_type):
     """
     Decorator to automatically log actions for audit purposes.
 
+    Enriches the request's audit event (opened by AuditMiddleware) with the
+    business action and resource instead of writing a separate row. Outside
+    an audited request, the action is sent to the buffered audit pipeline.
+    Works on function views and on view methods.
+
     Args:
         action_type: Type of action ('CREATE', 'UPDATE', 'DELETE', 'VIEW', 'PROCESS')
         resource_type: Type of resource being acted upon
     """
     def decorator(view_func):
         @wraps(view_func)
-        async def wrapper(request, *args, **kwargs):
+        async def wrapper(*args, **kwargs):
             # Execute the view function
-            response = await view_func(request, *args, **kwargs)
+            response = await view_func(*args, **kwargs)
+
+            request = _extract_request(args)
+            user = getattr(request, 'user', None)
 
             # Log the action if user is authenticated and operation was successful
-            if (request.user and request.user.is_authenticated and
+            if (user is not None and user.is_authenticated and
                 hasattr(response, 'status_code') and response.status_code < 400):
 
                 try:
                     # Extract resource ID from kwargs or response
-                    resource_id = kwargs.get('pk', kwargs.get('id', ''))
-
-                    # Create audit log entry
-                    await audit_log.objects.acreate(
-                        user_id=request.user,
-                        action=action_type,
-                        type_ressource=resource_type,
-                        id_ressource=str(resource_id),
-                        adresse_ip=get_client_ip(request),
-                        user_agent=request.META.get('HTTP_USER_AGENT', ''),
-                    )
+                    resource_id = kwargs.get('pk', kwargs.get('id'))
+                    if resource_id is None and isinstance(getattr(response, 'data', None), dict):
+                        resource_id = response.data.get('id')
+
+                    if not enrich_event(action=action_type, resource_type=resource_type,
+                                        resource_id=resource_id):
+                        AuditPipeline.enqueue({
+                            'user_id': user.pk,
+                            'action': action_type,
+                            'type_ressource': resource_type,
+                            'id_ressource': resource_id,
+                            'adresse_ip': get_client_ip(request),
+                            'user_agent': request.META.get('HTTP_USER_AGENT', ''),
+                        })
                 except Exception:
                     # Don't fail the request if audit logging fails
                     pass
@@ -81,6 +93,14 @@ def audit_action(action_type, resource_type):
     return decorator
 
 
+def _extract_request(args):
+    """Return the request from (request, ...) or (view, request, ...) arguments."""
+    for arg in args[:2]:
+        if hasattr(arg, 'META'):
+            return arg
+    return None
+
+
 def require_payroll_permission(permission_type):
     """
     Decorator to require specific payroll permissions.
@@ -0,0 +1,132 @@
+"""
+Encodage JSON partagé par l'API et le pipeline d'audit.
+
+Avec orjson (dépendance du projet), l'encodage est fait en Rust et produit directement
+des bytes UTF-8: dates, datetimes, UUID et dataclasses sont natifs, les
+Decimal passent par un hook (chaîne par défaut, comme
+``COERCE_DECIMAL_TO_STRING`` de DRF, ou nombre). Les autres types
+(QuerySet, chaînes paresseuses, timedelta...) sont délégués à l'encodeur
+de DRF. Sans orjson (ou avec ``USE_ORJSON`` à False), le module retombe
+sur ``json`` + l'encodeur de DRF, avec la même sortie aux espaces près.
+
+Comme le JSONRenderer de DRF, le renderer échappe U+2028 et U+2029: valides
+en JSON, ces séparateurs terminent une ligne en JavaScript et cassent un
+document inséré dans un <script> ou évalué comme JSONP.
+
+Usage:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = ['utilities.json_codec.FastJSONRenderer']
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'] = ['utilities.json_codec.FastJSONParser', ...]
+"""
+import decimal
+import json
+import logging
+from typing import Any
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+logger = logging.getLogger('paie_app.services')
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+JSON_CODEC = {
+    # Decimal en chaîne (précision conservée) ou en nombre
+    'DECIMAL_AS_STRING': getattr(settings, 'REST_FRAMEWORK', {}).get('COERCE_DECIMAL_TO_STRING', True),
+    # Permet de comparer les deux implémentations (benchmark_json)
+    'USE_ORJSON': True,
+    **getattr(settings, 'JSON_CODEC', {}),
+}
+
+_drf_encoder = JSONEncoder()
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, decimal.Decimal):
+        return str(obj) if JSON_CODEC['DECIMAL_AS_STRING'] else float(obj)
+    return _drf_encoder.default(obj)
+
+
+def _lenient_default(obj: Any) -> Any:
+    try:
+        return _default(obj)
+    except TypeError:
+        return str(obj)
+
+
+class _StdlibEncoder(JSONEncoder):
+    def default(self, obj):
+        return _default(obj)
+
+
+class _LenientStdlibEncoder(JSONEncoder):
+    def default(self, obj):
+        return _lenient_default(obj)
+
+
+def use_orjson() -> bool:
+    return ORJSON_AVAILABLE and JSON_CODEC['USE_ORJSON']
+
+
+if ORJSON_AVAILABLE:
+    _ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(obj: Any, indent: bool = False, lenient: bool = False) -> bytes:
+    """
+    Objet Python -> JSON UTF-8 (bytes).
+
+    Args:
+        indent: sortie indentée (2 espaces)
+        lenient: les objets non encodables deviennent ``str(obj)`` au lieu
+            de lever TypeError
+    """
+    if use_orjson():
+        options = _ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=_lenient_default if lenient else _default, option=options)
+    return json.dumps(
+        obj, cls=_LenientStdlibEncoder if lenient else _StdlibEncoder, ensure_ascii=False, allow_nan=False,
+        indent=2 if indent else None, separators=None if indent else (',', ':'),
+    ).encode('utf-8')
+
+
+def dumps_str(obj: Any) -> str:
+    """Comme ``dumps``, en str (buffers Redis, champs texte)."""
+    return dumps(obj).decode('utf-8')
+
+
+def loads(data) -> Any:
+    """JSON (bytes ou str) -> objet Python. Lève ValueError si invalide."""
+    if use_orjson():
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """Renderer JSON de DRF encodé par ``dumps`` (orjson si disponible)."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        # Échappement de U+2028 / U+2029, comme JSONRenderer de DRF
+        return dumps(data, indent=bool(indent)).replace(
+            b'\xe2\x80\xa8', b'\\u2028'
+        ).replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class FastJSONParser(JSONParser):
+    """Parser JSON de DRF décodé par ``loads`` (orjson si disponible)."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return loads(stream.read())
+        except ValueError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
@@ -1,16 +1,27 @@
 """
 Utilitaires JWT pour l'authentification.
 """
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 import jwt
 from django.conf import settings
 
+# Payloads déjà vérifiés, par empreinte du token, jusqu'à leur expiration
+VERIFIED_TOKENS_MAX = getattr(settings, 'JWT_VERIFIED_CACHE_SIZE', 10_000)
+_verified = OrderedDict()
+_verified_lock = threading.Lock()
+
 
 def create_access_token(user_id):
     """Crée un token d'accès JWT"""
     payload = {
         'user_id': user_id,
         'type': 'access',
+        'jti': uuid.uuid4().hex,  # identifiant pour la révocation
         'exp': datetime.now(timezone.utc) + timedelta(minutes=120),
         'iat': datetime.now(timezone.utc),
     }
@@ -22,16 +33,40 @@ def create_refresh_token(user_id):
     payload = {
         'user_id': user_id,
         'type': 'refresh',
+        'jti': uuid.uuid4().hex,  # identifiant pour la révocation
         'exp': datetime.now(timezone.utc) + timedelta(days=7),
         'iat': datetime.now(timezone.utc),
     }
     return jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
 
 
+def _decode(token):
+    """
+    Décode un token, la signature n'étant vérifiée qu'une fois par token:
+    les payloads valides sont mémorisés (LRU borné) jusqu'à leur ``exp``.
+    """
+    key = hashlib.sha256(token.encode('utf-8')).digest()
+    entry = _verified.get(key)
+    if entry is not None and entry['exp'] > time.time():
+        with _verified_lock:
+            if key in _verified:
+                _verified.move_to_end(key)
+        return dict(entry)
+
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
+    if 'exp' in payload:
+        with _verified_lock:
+            _verified[key] = payload
+            _verified.move_to_end(key)
+            while len(_verified) > VERIFIED_TOKENS_MAX:
+                _verified.popitem(last=False)
+    return dict(payload)
+
+
 def verify_token(token, token_type='access'):
     """Vérifie et décode un token JWT"""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
+        payload = _decode(token)
         if payload.get('type') != token_type:
             raise ValueError('Type de token incorrect')
         return payload
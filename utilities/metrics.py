@@ -0,0 +1,427 @@
+"""
+Persistent, percentile-aware performance metrics store.
+
+Each operation gets a log-bucketed latency histogram per rolling time
+window, stored in Redis hashes updated with atomic HINCRBY (no
+read-modify-write, no lost updates between workers). Observations are
+aggregated in process memory and flushed by a background thread every
+``FLUSH_INTERVAL`` seconds in one pipeline: recording a metric never
+performs network I/O, so it is safe on the event loop of async views. Operations are
+discovered dynamically from a Redis set and the whole store can be
+exported in Prometheus text format from ``/metrics/``.
+
+Falls back to an in-process store when the cache backend is not Redis.
+"""
+import atexit
+import hmac
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger('paie_app.services')
+
+METRICS_SETTINGS = getattr(settings, 'METRICS', {})
+
+PREFIX = METRICS_SETTINGS.get('PREFIX', 'rhback:metrics')
+WINDOW_SECONDS = METRICS_SETTINGS.get('WINDOW_SECONDS', 60)
+RETENTION_WINDOWS = METRICS_SETTINGS.get('RETENTION_WINDOWS', 60)
+FLUSH_INTERVAL = METRICS_SETTINGS.get('FLUSH_INTERVAL', 1.0)
+
+# Log buckets: 8 buckets per power of two (~9% relative error), in microseconds
+BUCKETS_PER_OCTAVE = 8
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def bucket_index(seconds: float) -> int:
+    """Index of the log bucket holding a duration."""
+    micros = max(seconds * 1_000_000, 1.0)
+    return int(math.floor(math.log2(micros) * BUCKETS_PER_OCTAVE))
+
+
+def bucket_upper_bound(index: int) -> float:
+    """Upper bound (seconds) of a log bucket."""
+    return (2 ** ((index + 1) / BUCKETS_PER_OCTAVE)) / 1_000_000
+
+
+def current_window(now: Optional[float] = None) -> int:
+    return int((now or time.time()) // WINDOW_SECONDS)
+
+
+def summarize(histogram: Dict[str, int], windows: int) -> Dict:
+    """Builds the summary of a merged histogram hash."""
+    count = int(histogram.get('count', 0))
+    errors = int(histogram.get('errors', 0))
+    total = int(histogram.get('sum_us', 0)) / 1_000_000
+
+    buckets = sorted(
+        (int(field[1:]), int(value)) for field, value in histogram.items()
+        if field.startswith('b')
+    )
+
+    summary = {
+        'total_calls': count,
+        'successful_calls': count - errors,
+        'failed_calls': errors,
+        'total_time': total,
+        'avg_time': total / count if count else 0.0,
+        'min_time': bucket_upper_bound(buckets[0][0] - 1) if buckets else 0.0,
+        'max_time': bucket_upper_bound(buckets[-1][0]) if buckets else 0.0,
+        'warning_count': int(histogram.get('warning', 0)),
+        'critical_count': int(histogram.get('critical', 0)),
+        'window_seconds': windows * WINDOW_SECONDS,
+    }
+
+    for quantile in QUANTILES:
+        summary[f'p{int(quantile * 100)}'] = _quantile(buckets, count, quantile)
+
+    return summary
+
+
+def _quantile(buckets: List, count: int, quantile: float) -> float:
+    if not count:
+        return 0.0
+    rank = quantile * count
+    seen = 0
+    for index, value in buckets:
+        seen += value
+        if seen >= rank:
+            return bucket_upper_bound(index)
+    return bucket_upper_bound(buckets[-1][0])
+
+
+class RedisMetricsBackend:
+    """Histograms in Redis hashes, one per (operation, window)."""
+
+    def __init__(self, client):
+        self.client = client
+        self._lock = threading.Lock()
+        self._pending = self._empty()
+        self._flusher = None
+        atexit.register(self.flush)
+
+    @staticmethod
+    def _empty() -> Dict:
+        return {
+            'histograms': defaultdict(lambda: defaultdict(int)),
+            'totals': defaultdict(lambda: defaultdict(int)),
+            'counters': defaultdict(lambda: defaultdict(int)),
+        }
+
+    def observe(self, operation: str, seconds: float, success: bool = True,
+                level: Optional[str] = None) -> None:
+        micros = int(seconds * 1_000_000)
+        with self._lock:
+            histogram = self._pending['histograms'][(operation, current_window())]
+            histogram[f"b{bucket_index(seconds)}"] += 1
+            histogram['count'] += 1
+            histogram['sum_us'] += micros
+            if not success:
+                histogram['errors'] += 1
+            if level in ('WARNING', 'CRITICAL'):
+                histogram[level.lower()] += 1
+
+            # Lifetime totals for Prometheus counters
+            totals = self._pending['totals'][operation]
+            totals['count'] += 1
+            totals['sum_us'] += micros
+            if not success:
+                totals['errors'] += 1
+        self._ensure_flusher()
+
+    def incr(self, name: str, label: str, value: int = 1) -> None:
+        with self._lock:
+            self._pending['counters'][name][label] += value
+        self._ensure_flusher()
+
+    def flush(self) -> None:
+        """Writes the aggregated observations in one pipeline (HINCRBY)."""
+        with self._lock:
+            pending, self._pending = self._pending, self._empty()
+        if not any(pending.values()):
+            return
+
+        pipe = self.client.pipeline(transaction=False)
+        for (operation, window), fields in pending['histograms'].items():
+            key = f"{PREFIX}:h:{operation}:{window}"
+            for field, value in fields.items():
+                pipe.hincrby(key, field, value)
+            pipe.expire(key, WINDOW_SECONDS * (RETENTION_WINDOWS + 1))
+        for operation, fields in pending['totals'].items():
+            for field, value in fields.items():
+                pipe.hincrby(f"{PREFIX}:t:{operation}", field, value)
+        if pending['totals']:
+            pipe.sadd(f"{PREFIX}:operations", *pending['totals'])
+        for name, values in pending['counters'].items():
+            for label, value in values.items():
+                pipe.hincrby(f"{PREFIX}:c:{name}", label, value)
+        if pending['counters']:
+            pipe.sadd(f"{PREFIX}:counters", *pending['counters'])
+        pipe.execute()
+
+    def _ensure_flusher(self):
+        if self._flusher is None or not self._flusher.is_alive():
+            with self._lock:
+                if self._flusher is None or not self._flusher.is_alive():
+                    self._flusher = threading.Thread(
+                        target=self._flush_loop, name='metrics-flusher', daemon=True
+                    )
+                    self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except Exception as e:
+                # Best effort: the aggregated window is dropped
+                logger.error(f"❌ Metrics flush failed: {e}")
+
+    def histogram(self, operation: str, windows: int) -> Dict[str, int]:
+        self.flush()
+        latest = current_window()
+        pipe = self.client.pipeline(transaction=False)
+        for window in range(latest - windows + 1, latest + 1):
+            pipe.hgetall(f"{PREFIX}:h:{operation}:{window}")
+
+        merged: Dict[str, int] = defaultdict(int)
+        for histogram in pipe.execute():
+            for field, value in histogram.items():
+                merged[_decode(field)] += int(value)
+        return merged
+
+    def totals(self, operation: str) -> Dict[str, int]:
+        self.flush()
+        return {_decode(k): int(v) for k, v in self.client.hgetall(f"{PREFIX}:t:{operation}").items()}
+
+    def operations(self) -> List[str]:
+        self.flush()
+        return sorted(_decode(op) for op in self.client.smembers(f"{PREFIX}:operations"))
+
+    def counters(self) -> Dict[str, Dict[str, int]]:
+        self.flush()
+        result = {}
+        for name in self.client.smembers(f"{PREFIX}:counters"):
+            name = _decode(name)
+            values = self.client.hgetall(f"{PREFIX}:c:{name}")
+            result[name] = {_decode(k): int(v) for k, v in values.items()}
+        return result
+
+    def clear(self, operation: Optional[str] = None) -> None:
+        self.flush()
+        operations = [operation] if operation else self.operations()
+        keys = []
+        for op in operations:
+            keys.extend(self.client.scan_iter(match=f"{PREFIX}:h:{op}:*"))
+            keys.append(f"{PREFIX}:t:{op}")
+        if keys:
+            self.client.delete(*keys)
+        if operation:
+            self.client.srem(f"{PREFIX}:operations", operation)
+        else:
+            counter_keys = [f"{PREFIX}:c:{_decode(n)}" for n in self.client.smembers(f"{PREFIX}:counters")]
+            self.client.delete(f"{PREFIX}:operations", f"{PREFIX}:counters", *counter_keys)
+
+
+class LocalMetricsBackend:
+    """In-process fallback with the same semantics (single process only)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict = defaultdict(lambda: defaultdict(int))
+        self._totals: Dict = defaultdict(lambda: defaultdict(int))
+        self._counters: Dict = defaultdict(lambda: defaultdict(int))
+
+    def observe(self, operation, seconds, success=True, level=None):
+        window = current_window()
+        micros = int(seconds * 1_000_000)
+        with self._lock:
+            histogram = self._histograms[(operation, window)]
+            histogram[f"b{bucket_index(seconds)}"] += 1
+            histogram['count'] += 1
+            histogram['sum_us'] += micros
+            if not success:
+                histogram['errors'] += 1
+            if level in ('WARNING', 'CRITICAL'):
+                histogram[level.lower()] += 1
+
+            totals = self._totals[operation]
+            totals['count'] += 1
+            totals['sum_us'] += micros
+            if not success:
+                totals['errors'] += 1
+
+            oldest = window - RETENTION_WINDOWS
+            for key in [k for k in self._histograms if k[1] < oldest]:
+                del self._histograms[key]
+
+    def incr(self, name, label, value=1):
+        with self._lock:
+            self._counters[name][label] += value
+
+    def histogram(self, operation, windows):
+        latest = current_window()
+        merged: Dict[str, int] = defaultdict(int)
+        with self._lock:
+            for window in range(latest - windows + 1, latest + 1):
+                for field, value in self._histograms.get((operation, window), {}).items():
+                    merged[field] += value
+        return merged
+
+    def totals(self, operation):
+        with self._lock:
+            return dict(self._totals.get(operation, {}))
+
+    def operations(self):
+        with self._lock:
+            return sorted(self._totals)
+
+    def counters(self):
+        with self._lock:
+            return {name: dict(values) for name, values in self._counters.items()}
+
+    def clear(self, operation=None):
+        with self._lock:
+            if operation:
+                self._totals.pop(operation, None)
+                for key in [k for k in self._histograms if k[0] == operation]:
+                    del self._histograms[key]
+            else:
+                self._histograms.clear()
+                self._totals.clear()
+                self._counters.clear()
+
+
+def _decode(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+class MetricsStore:
+    """Point d'entrée du store de métriques (backend Redis ou local)."""
+
+    _backend = None
+    _backend_lock = threading.Lock()
+
+    @classmethod
+    def backend(cls):
+        if cls._backend is None:
+            with cls._backend_lock:
+                if cls._backend is None:
+                    cls._backend = cls._create_backend()
+        return cls._backend
+
+    @staticmethod
+    def _create_backend():
+        try:
+            client = cache._cache.get_client(write=True)
+            client.ping()
+            return RedisMetricsBackend(client)
+        except Exception as e:
+            logger.info(f"Metrics store: Redis indisponible ({e}), utilisation du store local")
+            return LocalMetricsBackend()
+
+    @classmethod
+    def observe(cls, operation: str, seconds: float, success: bool = True,
+                level: Optional[str] = None) -> None:
+        """Enregistre une durée pour une opération (ne lève jamais)."""
+        try:
+            cls.backend().observe(operation, seconds, success, level)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'enregistrement de la métrique {operation}: {e}")
+
+    @classmethod
+    def incr(cls, name: str, label: str, value: int = 1) -> None:
+        """Incrémente un compteur étiqueté (ne lève jamais)."""
+        try:
+            cls.backend().incr(name, label, value)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'incrément du compteur {name}: {e}")
+
+    @classmethod
+    def summary(cls, operation: str, windows: int = None) -> Dict:
+        """Résumé (compteurs, moyenne, p50/p95/p99) sur les N dernières fenêtres."""
+        windows = windows or RETENTION_WINDOWS
+        histogram = cls.backend().histogram(operation, windows)
+        if not histogram:
+            return {}
+        return summarize(histogram, windows)
+
+    @classmethod
+    def operations(cls) -> List[str]:
+        return cls.backend().operations()
+
+    @classmethod
+    def clear(cls, operation: Optional[str] = None) -> None:
+        cls.backend().clear(operation)
+
+    @classmethod
+    def render_prometheus(cls, windows: int = None) -> str:
+        """Export au format texte Prometheus."""
+        backend = cls.backend()
+        lines = [
+            '# HELP rhback_operation_duration_seconds Operation latency over the rolling window',
+            '# TYPE rhback_operation_duration_seconds summary',
+        ]
+        errors = []
+
+        for operation in backend.operations():
+            label = _escape(operation)
+            summary = cls.summary(operation, windows)
+            totals = backend.totals(operation)
+            for quantile in QUANTILES:
+                value = summary.get(f'p{int(quantile * 100)}', 0.0) if summary else 0.0
+                lines.append(
+                    f'rhback_operation_duration_seconds{{operation="{label}",quantile="{quantile}"}} {value:.6f}'
+                )
+            lines.append(
+                f'rhback_operation_duration_seconds_sum{{operation="{label}"}} '
+                f'{totals.get("sum_us", 0) / 1_000_000:.6f}'
+            )
+            lines.append(
+                f'rhback_operation_duration_seconds_count{{operation="{label}"}} {totals.get("count", 0)}'
+            )
+            errors.append(f'rhback_operation_errors_total{{operation="{label}"}} {totals.get("errors", 0)}')
+
+        lines.append('# HELP rhback_operation_errors_total Failed operations')
+        lines.append('# TYPE rhback_operation_errors_total counter')
+        lines.extend(errors)
+
+        for name, values in sorted(backend.counters().items()):
+            metric = f"rhback_{name}_total"
+            lines.append(f'# TYPE {metric} counter')
+            for label, value in sorted(values.items()):
+                lines.append(f'{metric}{{operation="{_escape(label)}"}} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def metrics_view(request):
+    """
+    Endpoint Prometheus ``/metrics/``.
+
+    Protégé par ``METRICS['TOKEN']`` (en-tête ``Authorization: Bearer``).
+    Sans jeton configuré, l'accès est refusé sauf si ``METRICS['PUBLIC']``
+    est activé explicitement (développement).
+    """
+    token = METRICS_SETTINGS.get('TOKEN')
+    if token:
+        provided = request.META.get('HTTP_AUTHORIZATION', '')
+        if not hmac.compare_digest(provided.encode('utf-8'), f'Bearer {token}'.encode('utf-8')):
+            return HttpResponseForbidden()
+    elif not METRICS_SETTINGS.get('PUBLIC', False):
+        return HttpResponseForbidden()
+
+    return HttpResponse(
+        MetricsStore.render_prometheus(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
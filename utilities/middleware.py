@@ -1,14 +1,46 @@
 """
 Enhanced audit middleware for comprehensive system activity logging.
 """
-import json
+import re
 import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
 from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_string
 from django.contrib.auth import get_user_model
+from rest_framework.request import Empty
+from adrf_flex_fields import EXPAND_PARAM
+from utilities.audit_capture import capture, get_capture_policy
+from utilities.audit_context import AuditEvent, end_event, new_correlation_id, start_event
 from utilities.audit_service import AuditService
+from utilities.metrics import MetricsStore
+from utilities.query_monitor import (
+    get_view_budget, report_collector, resolve_view, track_queries
+)
+from utilities.resource_versions import (
+    ResourceVersions, compute_etag, etag_matches, set_etag_validators, view_resources,
+)
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
 
 User = get_user_model()
 
+HTTP_CACHE = {
+    'ETAGS': True,
+    'COMPRESS_MIN_SIZE': 1024,
+    'BROTLI_QUALITY': 5,
+    **getattr(settings, 'HTTP_CACHE', {}),
+}
+
+_GZIP_RE = re.compile(r'\bgzip\b')
+_BR_RE = re.compile(r'\bbr\b')
+
 
 class AuditMiddleware(MiddlewareMixin):
     """
@@ -21,6 +53,18 @@ class AuditMiddleware(MiddlewareMixin):
     - User context (IP, User-Agent)
     - System-wide activities
     - Performance metrics
+
+    Request and response bodies are never re-decoded: the already parsed
+    DRF ``request.data`` / ``response.data`` are reused and reduced
+    according to the resource capture policy (see utilities.audit_capture).
+
+    A request-scoped AuditEvent (utilities.audit_context) exposes the user
+    and request metadata to the model diff engine; when it already logged
+    field-level changes, the request entry carries no payload.
+
+    Audit decorators enrich this event (business action, resource, values)
+    instead of writing their own rows: one entry per request, linked to the
+    model diffs by a correlation id echoed in the X-Request-ID header.
     """
 
     def __init__(self, get_response):
@@ -44,16 +88,15 @@ class AuditMiddleware(MiddlewareMixin):
             'content_type': request.content_type,
         }
 
-        # Store request body for POST/PUT/PATCH operations (for before/after comparison)
-        if request.method in ['POST', 'PUT', 'PATCH'] and hasattr(request, 'body'):
-            try:
-                if request.content_type == 'application/json':
-                    request._audit_data['request_data'] = json.loads(request.body.decode('utf-8'))
-                elif request.content_type == 'application/x-www-form-urlencoded':
-                    request._audit_data['request_data'] = dict(request.POST)
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                # If we can't parse the body, just note that data was sent
-                request._audit_data['request_data'] = {'_note': 'Binary or unparseable data'}
+        request._audit_event = start_event(AuditEvent(
+            request=request,
+            correlation_id=new_correlation_id(request.META.get('HTTP_X_REQUEST_ID')),
+            ip_address=request._audit_data['ip_address'],
+            user_agent=request._audit_data['user_agent'],
+            request_method=request.method,
+            request_path=request.path,
+            session_key=(request.session.session_key or '') if hasattr(request, 'session') else '',
+        ))
 
         return None
 
@@ -61,6 +104,11 @@ class AuditMiddleware(MiddlewareMixin):
         """
         Process response and create comprehensive audit log entries.
         """
+        end_event()
+        event = getattr(request, '_audit_event', None)
+        if event is not None:
+            response['X-Request-ID'] = event.correlation_id
+
         # Skip non-auditable requests
         if not self._should_audit_request(request):
             return response
@@ -81,11 +129,23 @@ class AuditMiddleware(MiddlewareMixin):
         # Extract resource info from path
         resource_type, resource_id = self.extract_resource_info(request.path)
 
-        # Extract response data for audit trail
-        response_data = self._extract_response_data(response)
-
-        # Determine old and new values for UPDATE operations
-        old_values, new_values = self._determine_data_changes(request, response_data, action)
+        # Determine old and new values according to the resource capture policy,
+        # unless the diff engine already recorded field-level changes
+        if event is not None and event.changes:
+            old_values, new_values = None, None
+        else:
+            old_values, new_values = self._determine_data_changes(request, response, action)
+
+        # Details provided by the view / audit decorators take precedence
+        if event is not None:
+            if event.action and response.status_code < 400:
+                action = event.action
+            resource_type = event.resource_type or resource_type
+            resource_id = event.resource_id or resource_id
+            if event.old_values is not None:
+                old_values = event.old_values
+            if event.new_values is not None:
+                new_values = event.new_values
 
         # Use AuditService to log the action asynchronously
         AuditService.log_action(
@@ -101,7 +161,8 @@ class AuditMiddleware(MiddlewareMixin):
             request_path=request.path,
             response_status=response.status_code,
             execution_time=execution_time,
-            session_key=request.session.session_key if hasattr(request, 'session') else None
+            session_key=request.session.session_key if hasattr(request, 'session') else None,
+            correlation_id=event.correlation_id if event is not None else None
         )
 
         return response
@@ -185,43 +246,58 @@ class AuditMiddleware(MiddlewareMixin):
 
         return resource_type, resource_id
 
+    def _extract_request_data(self, request, response):
+        """
+        Return the request payload already parsed by DRF (or Django forms).
+        Never reads nor decodes the raw body.
+        """
+        renderer_context = getattr(response, 'renderer_context', None) or {}
+        drf_request = renderer_context.get('request')
+        if drf_request is not None:
+            data = getattr(drf_request, '_full_data', Empty)
+            return None if data is Empty else data
+
+        # Plain Django views: only reuse POST if it was already parsed
+        post = getattr(request, '_post', None)
+        return dict(post) if post else None
+
     def _extract_response_data(self, response):
         """
         Extract relevant data from response for audit logging.
+        Only DRF responses expose parsed data; rendered content is never decoded.
         """
-        try:
-            if hasattr(response, 'data'):
-                # DRF Response object
-                return response.data
-            elif hasattr(response, 'content'):
-                # Try to parse JSON content
-                content_type = response.get('Content-Type', '')
-                if 'application/json' in content_type:
-                    return json.loads(response.content.decode('utf-8'))
-        except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
-            pass
+        return getattr(response, 'data', None)
 
-        return None
-
-    def _determine_data_changes(self, request, response_data, action):
+    def _determine_data_changes(self, request, response, action):
         """
         Determine old and new values for data change tracking.
         """
+        base_action = action.replace('_FAILED', '')
+        if base_action not in ('CREATE', 'UPDATE', 'DELETE'):
+            return None, None
+
+        policy = get_capture_policy(request.path)
+        if not policy.captures_body:
+            return None, None
+
+        request_data = self._extract_request_data(request, response)
+        changed_fields = list(request_data) if isinstance(request_data, dict) else None
+
         old_values = None
         new_values = None
 
         if action == 'CREATE':
             # For creation, new values are the created data
-            new_values = response_data
+            new_values = capture(self._extract_response_data(response), policy)
 
         elif action == 'UPDATE':
             # For updates, old values are from request, new values from response
-            old_values = request._audit_data.get('request_data')
-            new_values = response_data
+            old_values = capture(request_data, policy)
+            new_values = capture(self._extract_response_data(response), policy, changed_fields)
 
         elif action == 'DELETE':
             # For deletion, old values are what was deleted
-            old_values = response_data
+            old_values = capture(self._extract_response_data(response), policy)
 
         return old_values, new_values
 
@@ -248,3 +324,135 @@ class JWTAuthenticationMiddleware(MiddlewareMixin):
             request._jwt_token = auth_header[7:]
 
         return None
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Counts SQL queries and database time per request via execute_wrapper,
+    flags N+1 patterns and checks the ``query_budget`` declared on the view.
+    Request latency is recorded in the metrics store.
+
+    Production-safe: does not depend on DEBUG / connection.queries.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        start = time.perf_counter()
+        with track_queries(request.path) as collector:
+            response = self.get_response(request)
+        return self._finalize(request, response, collector, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        with track_queries(request.path) as collector:
+            response = await self.get_response(request)
+        return self._finalize(request, response, collector, time.perf_counter() - start)
+
+    def _finalize(self, request, response, collector, elapsed):
+        view_class, action, label = resolve_view(request)
+        collector.label = label
+        report_collector(collector, budget=get_view_budget(view_class, action))
+        MetricsStore.observe(f"http:{label}", elapsed, success=response.status_code < 500)
+
+        if settings.DEBUG:
+            response['X-Query-Count'] = str(collector.count)
+            response['X-Query-Time'] = f"{collector.duration:.6f}"
+        return response
+
+
+class ResourceETagMiddleware(MiddlewareMixin):
+    """
+    Conditional GET from per-resource version counters.
+
+    The weak ETag of a GET is computed from the versions of the models the
+    view reads (see utilities.resource_versions), before the view runs.
+    ``If-None-Match`` is only evaluated once authentication and permissions
+    have passed (RFC 9110 §13.2.1): views with ``ConditionalGetMixin``
+    answer 304 right after ``initial()``, without touching the queryset;
+    for the others, a matching 200 is turned into a 304 here. Successful
+    writes bump the version of the view's model (bulk updates do not send
+    model signals).
+    """
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not HTTP_CACHE['ETAGS'] or request.method not in ('GET', 'HEAD'):
+            return None
+
+        view_class, action, label = resolve_view(request)
+        if view_class is None:
+            return None
+        expand = [path for path in request.GET.get(EXPAND_PARAM, '').split(',') if path]
+        resources = view_resources(view_class, action, expand)
+        if not resources:
+            return None
+
+        try:
+            versions = ResourceVersions.get_many(resources)
+        except Exception:
+            return None
+        request._resource_etag = compute_etag(versions, request)
+        return None
+
+    def process_response(self, request, response):
+        if request.method in ('GET', 'HEAD'):
+            etag = getattr(request, '_resource_etag', None)
+            if etag and response.status_code == 200 and not response.has_header('ETag'):
+                if etag_matches(etag, request.META.get('HTTP_IF_NONE_MATCH')):
+                    _, _, label = resolve_view(request)
+                    MetricsStore.incr('http_not_modified', label)
+                    response = HttpResponseNotModified()
+                set_etag_validators(response, etag)
+        elif 200 <= response.status_code < 300:
+            view_class, _, _ = resolve_view(request)
+            queryset = getattr(view_class, 'queryset', None)
+            if queryset is not None:
+                ResourceVersions.bump_for_write(queryset.model._meta.label_lower)
+        return response
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Brotli (if installed and accepted) or gzip compression of responses
+    larger than ``HTTP_CACHE['COMPRESS_MIN_SIZE']`` bytes.
+
+    Like Django's GZipMiddleware, gzip output is padded with random bytes
+    (BREACH mitigation) and strong ETags are weakened.
+    """
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if len(response.content) < HTTP_CACHE['COMPRESS_MIN_SIZE']:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+
+        if BROTLI_AVAILABLE and _BR_RE.search(accept_encoding):
+            encoding = 'br'
+            compressed = brotli.compress(response.content, quality=HTTP_CACHE['BROTLI_QUALITY'])
+        elif _GZIP_RE.search(accept_encoding):
+            encoding = 'gzip'
+            compressed = compress_string(response.content, max_random_bytes=100)
+        else:
+            return response
+
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
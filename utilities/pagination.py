@@ -1,15 +1,377 @@
 """
 Pagination utilities for the application.
 """
-from rest_framework.pagination import PageNumberPagination
-class GlobalPagination(PageNumberPagination):
-    page_size = 5
+import base64
+import binascii
+import hashlib
+import json
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from functools import reduce
+from operator import and_, or_
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+logger = logging.getLogger('paie_app.services')
+
+
+def estimate_queryset_count(queryset):
+    """
+    Estimate the number of rows of a queryset from PostgreSQL statistics.
+
+    Unfiltered querysets read ``pg_class.reltuples`` (summed over partitions);
+    filtered ones use the planner row estimate from ``EXPLAIN``. Returns None
+    when no estimate is available (non-PostgreSQL backend, error).
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    try:
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                table = queryset.model._meta.db_table
+                cursor.execute(
+                    "SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0) FROM pg_class c "
+                    "WHERE c.oid = to_regclass(%s) "
+                    "OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(%s))",
+                    [table, table]
+                )
+                return int(cursor.fetchone()[0])
+
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
+    except Exception as e:
+        logger.warning(f"⚠️  Count estimation failed for {queryset.model.__name__}: {e}")
+        return None
+
+
+# Counting strategies
+#   exact    - COUNT(*) on every request
+#   cached   - exact COUNT(*) cached per filter signature for a short TTL
+#   estimate - PostgreSQL statistics, falls back to cached exact count
+#   auto     - estimate when the result is large, cached exact count otherwise
+COUNT_MODES = ('exact', 'cached', 'estimate', 'auto')
+COUNT_CACHE_PREFIX = 'pagination_count'
+ESTIMATE_THRESHOLD = 100_000
+
+
+def count_signature(queryset):
+    """Stable signature of a queryset's filters, used as the count cache key."""
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.md5(f"{sql}|{params!r}".encode('utf-8')).hexdigest()
+    return f"{COUNT_CACHE_PREFIX}:{queryset.model._meta.label_lower}:{digest}"
+
+
+def cached_exact_count(queryset):
+    """Exact COUNT(*) cached per filter signature."""
+    try:
+        key = count_signature(queryset)
+    except Exception:
+        # EmptyResultSet and other compilation edge cases
+        return queryset.count()
+
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.CACHE_TIMEOUTS.get('pagination_count', 30))
+    return count
+
+
+def resolve_count(queryset, mode='exact'):
+    """
+    Count a queryset according to the counting strategy.
+
+    Returns:
+        tuple: (count, is_estimate)
+    """
+    if mode == 'exact':
+        return queryset.count(), False
+    if mode == 'cached':
+        return cached_exact_count(queryset), False
+
+    estimate = estimate_queryset_count(queryset)
+    if estimate is not None and (mode == 'estimate' or estimate >= ESTIMATE_THRESHOLD):
+        return estimate, True
+    return cached_exact_count(queryset), False
+
+
+class CountingPaginator(DjangoPaginator):
+    """Django paginator whose ``count`` follows a counting strategy."""
+
+    def __init__(self, *args, count_mode='exact', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_mode = count_mode
+        self.count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        count, self.count_is_estimate = resolve_count(self.object_list, self.count_mode)
+        return count
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination on an indexed, unique column tuple.
+
+    Each page is a ``WHERE (ts, id) < (last_ts, last_id) ORDER BY ts DESC, id DESC
+    LIMIT n`` query: constant cost whatever the depth, no OFFSET scan and no
+    COUNT(*). Cursors are opaque base64 tokens; the ordering columns must be
+    non-nullable and unique as a tuple (end with the primary key).
+
+    Views may override the ordering with a ``keyset_ordering`` attribute.
+    """
+    page_size = 50
+    max_page_size = 500
     page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+
+    # None: no count in the response, otherwise one of COUNT_MODES
+    count_mode = None
 
     def paginate_queryset(self, queryset, request, view=None):
-        no_pagination = (
-            request.query_params.get('no_pagination', 'false').lower() == 'true'
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset, view)
+        self.count_mode = getattr(view, 'count_mode', None) or self.count_mode
+        self.count, self.count_is_estimate = (
+            resolve_count(queryset, self.count_mode) if self.count_mode else (None, False)
         )
-        if no_pagination:
+
+        position, reverse = self.decode_cursor(request)
+
+        order = self._reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*order)
+        if position is not None:
+            queryset = queryset.filter(self._position_filter(order, position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.next_position = self._get_position(results[-1]) if self.has_next and results else None
+        self.previous_position = self._get_position(results[0]) if self.has_previous and results else None
+        return results
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                size = int(request.query_params[self.page_size_query_param])
+                if size > 0:
+                    return min(size, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_ordering(self, queryset, view):
+        """
+        Keyset ordering of the view, in the direction requested by
+        ``?ordering=`` (e.g. ``?ordering=timestamp``).
+
+        Only a prefix of the keyset columns, all in the keyset direction or
+        all reversed, can be honoured; any other requested ordering is a
+        400 instead of being silently replaced by the keyset order.
+        """
+        ordering = tuple(getattr(view, 'keyset_ordering', None) or self.ordering)
+        param = getattr(view, 'ordering_param', None) or api_settings.ORDERING_PARAM
+        value = self.request.query_params.get(param) if getattr(self, 'request', None) is not None else None
+        if not value:
+            return ordering
+
+        requested = [term.strip() for term in value.split(',') if term.strip()]
+        names = [field.lstrip('-') for field in ordering]
+        primary_key = queryset.model._meta.pk.name
+        flips = {
+            term.startswith('-') != field.startswith('-')
+            for term, field in zip(requested, ordering)
+        }
+        if (
+            len(requested) > len(ordering)
+            or [self._column(term, primary_key) for term in requested]
+            != [self._column(name, primary_key) for name in names[:len(requested)]]
+            or len(flips) != 1
+        ):
+            allowed = f"{names[0]}, -{names[0]}"
+            raise ValidationError({
+                param: f"Unsupported ordering for cursor pagination; use one of: {allowed}"
+            })
+        return self._reverse_ordering(ordering) if flips.pop() else ordering
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.count_mode:
+            payload = {'count': self.count, 'count_is_estimate': self.count_is_estimate, **payload}
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        properties = {
+            'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+            'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+            'results': schema,
+        }
+        if self.count_mode:
+            properties['count'] = {'type': 'integer', 'nullable': True}
+            properties['count_is_estimate'] = {'type': 'boolean'}
+        return {'type': 'object', 'required': ['results'], 'properties': properties}
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.encode_cursor(self.next_position, False)
+        )
+
+    def get_previous_link(self):
+        if self.previous_position is None:
             return None
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.encode_cursor(self.previous_position, True)
+        )
+
+    # ------------------------------------------------------------------
+    # Cursor handling
+    # ------------------------------------------------------------------
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            position = payload['p']
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError('cursor arity')
+            return position, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, binascii.Error, UnicodeDecodeError):
+            raise NotFound('Invalid cursor')
+
+    def _get_position(self, instance):
+        return [self._serialize_value(getattr(instance, field.lstrip('-'))) for field in self.ordering]
+
+    @staticmethod
+    def _serialize_value(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    @staticmethod
+    def _column(field, primary_key):
+        name = field.lstrip('-')
+        return primary_key if name == 'pk' else name
+
+    @staticmethod
+    def _reverse_ordering(ordering):
+        return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+    @staticmethod
+    def _position_filter(ordering, position):
+        """
+        Row-value comparison expanded as
+        ``a < x OR (a = x AND b < y) OR ...`` so each branch can use the index.
+        """
+        branches = []
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equals = [Q(**{ordering[i].lstrip('-'): position[i]}) for i in range(index)]
+            branches.append(reduce(and_, equals + [Q(**{f'{name}__{lookup}': position[index]})]))
+        return reduce(or_, branches)
+
+
+class StreamingPagination(KeysetPagination):
+    """
+    Enforced streaming mode: bounded keyset pages on the primary key unless
+    the view declares a ``keyset_ordering``.
+    """
+    page_size = 500
+    max_page_size = 500
+    ordering = ('-pk',)
+
+
+class GlobalPagination(PageNumberPagination):
+    """
+    Default page-number pagination.
+
+    ``no_pagination=true`` (or ``stream=true``) and ``cursor`` switch the
+    request to keyset streaming: the client follows ``next`` links through
+    bounded pages instead of loading the whole table at once.
+
+    The total count follows ``count_mode`` (see COUNT_MODES), overridable per
+    view with a ``count_mode`` attribute; the response tells the client
+    whether it is an estimate.
+    """
+    page_size = 5
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    streaming_class = StreamingPagination
+    count_mode = 'cached'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self._streaming = None
+        self._count_mode = getattr(view, 'count_mode', None) or self.count_mode
+        if self._wants_streaming(request):
+            self._streaming = self.streaming_class()
+            return self._streaming.paginate_queryset(queryset, request, view)
         return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, object_list, per_page):
+        return CountingPaginator(object_list, per_page, count_mode=self._count_mode)
+
+    def get_paginated_response(self, data):
+        if self._streaming is not None:
+            return self._streaming.get_paginated_response(data)
+        return Response({
+            'count': self.page.paginator.count,
+            'count_is_estimate': self.page.paginator.count_is_estimate,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_estimate'] = {'type': 'boolean'}
+        return response_schema
+
+    def _wants_streaming(self, request):
+        params = request.query_params
+        if self.streaming_class.cursor_query_param in params:
+            return True
+        return any(
+            params.get(flag, 'false').lower() == 'true'
+            for flag in ('no_pagination', 'stream')
+        )
@@ -0,0 +1,336 @@
+"""
+Partitionnement mensuel déclaratif (PostgreSQL) des tables à forte croissance.
+
+- ``convert``: transforme une table existante en table partitionnée par mois
+  (RANGE sur la colonne temporelle), en recopiant les données existantes;
+- ``ensure_partitions``: crée les partitions des mois à venir, ainsi que
+  celles des mois dont des lignes sont tombées dans la partition DEFAULT
+  (maintenance en retard), et y déplace ces lignes;
+- ``apply_retention``: archive si demandé (CSV compressé), puis détache et
+  supprime dans une même transaction les partitions entièrement hors de la
+  période de rétention.
+
+La partition DEFAULT (``<table>_default``) reçoit les lignes d'un mois sans
+partition: une insertion n'échoue jamais parce que la maintenance
+quotidienne a pris du retard.
+
+La rétention ne coûte ainsi qu'un DETACH / DROP par mois, sans DELETE massif
+ni VACUUM; les requêtes filtrées sur la colonne temporelle bénéficient de
+l'élagage de partitions (partition pruning).
+"""
+import gzip
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger('paie_app.services')
+
+PARTITIONING = getattr(settings, 'PARTITIONING', {})
+
+_PARTITION_RE = re.compile(r'_p(\d{4})(\d{2})$')
+
+
+@dataclass(frozen=True)
+class PartitionedTable:
+    table: str
+    column: str
+    retention_months: Optional[int] = None
+    archive: bool = False
+
+
+def configured_tables() -> Dict[str, PartitionedTable]:
+    return {
+        table: PartitionedTable(table=table, **options)
+        for table, options in PARTITIONING.get('TABLES', {}).items()
+    }
+
+
+def add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month.year:04d}{month.month:02d}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+class PartitionManager:
+    """Gestion des partitions mensuelles des tables configurées."""
+
+    @staticmethod
+    def is_partitioned(table: str) -> bool:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT relkind FROM pg_class WHERE relname = %s", [table])
+            row = cursor.fetchone()
+        return bool(row) and row[0] == 'p'
+
+    @staticmethod
+    def list_partitions(table: str) -> List[Dict]:
+        """Partitions mensuelles attachées, triées par mois."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT child.relname
+                FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE parent.relname = %s
+                """,
+                [table],
+            )
+            names = [row[0] for row in cursor.fetchall()]
+
+        partitions = []
+        for name in names:
+            match = _PARTITION_RE.search(name)
+            if match:
+                month = date(int(match.group(1)), int(match.group(2)), 1)
+                partitions.append({'name': name, 'month': month})
+        return sorted(partitions, key=lambda partition: partition['month'])
+
+    @staticmethod
+    def list_detached(table: str) -> List[Dict]:
+        """
+        Partitions mensuelles détachées mais non supprimées (reliquats d'une
+        rétention interrompue), triées par mois.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT relname FROM pg_class
+                WHERE relkind = 'r' AND relname LIKE %s
+                AND NOT EXISTS (SELECT 1 FROM pg_inherits WHERE inhrelid = pg_class.oid)
+                """,
+                [f"{table}\\_p%"],
+            )
+            names = [row[0] for row in cursor.fetchall()]
+
+        partitions = []
+        for name in names:
+            match = _PARTITION_RE.search(name)
+            if match and name == partition_name(table, date(int(match.group(1)), int(match.group(2)), 1)):
+                month = date(int(match.group(1)), int(match.group(2)), 1)
+                partitions.append({'name': name, 'month': month, 'detached': True})
+        return sorted(partitions, key=lambda partition: partition['month'])
+
+    @staticmethod
+    def ensure_default_partition(table: str) -> str:
+        name = default_partition_name(table)
+        with connection.cursor() as cursor:
+            cursor.execute(f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" DEFAULT')
+        return name
+
+    @staticmethod
+    def default_months(table: str, column: str) -> List[date]:
+        """Mois des lignes présentes dans la partition DEFAULT."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT DISTINCT date_trunc(\'month\', "{column}")::date '
+                f'FROM "{default_partition_name(table)}" ORDER BY 1'
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    @classmethod
+    def create_partition(cls, table: str, month: date, column: Optional[str] = None) -> str:
+        """
+        Crée la partition d'un mois. Avec ``column``, les lignes de ce mois
+        présentes dans la partition DEFAULT y sont d'abord retirées puis
+        réinsérées dans la nouvelle partition, dans la même transaction
+        (PostgreSQL refuse la création tant que DEFAULT contient des lignes
+        du mois).
+        """
+        name = partition_name(table, month)
+        bounds = [month, add_months(month, 1)]
+        with transaction.atomic(), connection.cursor() as cursor:
+            if column:
+                cursor.execute(
+                    f'CREATE TEMP TABLE "{name}_moved" ON COMMIT DROP AS '
+                    f'WITH moved AS (DELETE FROM "{default_partition_name(table)}" '
+                    f'WHERE "{column}" >= %s AND "{column}" < %s RETURNING *) SELECT * FROM moved',
+                    bounds,
+                )
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" '
+                f"FOR VALUES FROM ('{bounds[0].isoformat()}') TO ('{bounds[1].isoformat()}')"
+            )
+            if column:
+                cursor.execute(f'INSERT INTO "{table}" SELECT * FROM "{name}_moved"')
+                if cursor.rowcount:
+                    logger.info(f"🗂️  {table}: {cursor.rowcount} ligne(s) déplacée(s) de DEFAULT vers {name}")
+        return name
+
+    @classmethod
+    def ensure_partitions(cls, table: str, months_ahead: Optional[int] = None) -> List[str]:
+        """
+        Crée la partition DEFAULT, celles du mois courant et des
+        ``months_ahead`` mois suivants, et celles des mois présents dans
+        DEFAULT (lignes déplacées).
+        """
+        if months_ahead is None:
+            months_ahead = PARTITIONING.get('PREMAKE_MONTHS', 3)
+        spec = configured_tables().get(table)
+        current = timezone.now().date().replace(day=1)
+        existing = {partition['month'] for partition in cls.list_partitions(table)}
+        cls.ensure_default_partition(table)
+
+        months = {add_months(current, offset) for offset in range(months_ahead + 1)}
+        if spec is not None:
+            months.update(cls.default_months(table, spec.column))
+
+        created = []
+        for month in sorted(months - existing):
+            created.append(cls.create_partition(table, month, spec.column if spec else None))
+
+        if created:
+            logger.info(f"🗂️  {table}: partitions créées {created}")
+        return created
+
+    @classmethod
+    def convert(cls, spec: PartitionedTable, batch_months: int = 1) -> Dict:
+        """
+        Convertit une table classique en table partitionnée par mois.
+
+        La clé primaire devient (id, colonne de partitionnement): PostgreSQL
+        exige que toute contrainte d'unicité contienne la clé de partition.
+        L'ancienne table est conservée sous le nom ``<table>_legacy``.
+        """
+        table, column = spec.table, spec.column
+        legacy = f"{table}_legacy"
+        if cls.is_partitioned(table):
+            return {'table': table, 'status': 'already_partitioned'}
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'LOCK TABLE "{table}" IN ACCESS EXCLUSIVE MODE')
+            cursor.execute(f'SELECT min("{column}"), max("{column}") FROM "{table}"')
+            first, last = cursor.fetchone()
+
+            # Index et clés étrangères à recréer sur la table partitionnée
+            cursor.execute(
+                "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s "
+                "AND indexdef NOT LIKE 'CREATE UNIQUE%%'",
+                [table],
+            )
+            indexes = cursor.fetchall()
+            cursor.execute(
+                "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                "WHERE conrelid = %s::regclass AND contype = 'f'",
+                [table],
+            )
+            foreign_keys = cursor.fetchall()
+            cursor.execute(
+                "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'",
+                [table],
+            )
+            primary_key = cursor.fetchone()
+
+            cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{legacy}"')
+            # Les noms d'index sont uniques par schéma: on libère les noms d'origine
+            for name, _ in indexes:
+                cursor.execute(f'ALTER INDEX "{name}" RENAME TO "{name}_legacy"')
+            if primary_key:
+                cursor.execute(
+                    f'ALTER TABLE "{legacy}" RENAME CONSTRAINT "{primary_key[0]}" TO "{primary_key[0]}_legacy"'
+                )
+
+            cursor.execute(
+                f'CREATE TABLE "{table}" (LIKE "{legacy}" INCLUDING ALL EXCLUDING INDEXES) '
+                f'PARTITION BY RANGE ("{column}")'
+            )
+            cursor.execute(f'ALTER TABLE "{table}" ADD PRIMARY KEY ("id", "{column}")')
+            for _, definition in indexes:
+                # Index partitionné: créé automatiquement sur chaque partition
+                cursor.execute(definition)
+            for name, definition in foreign_keys:
+                cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}')
+
+            # Partitions couvrant l'historique puis les mois à venir
+            today = timezone.now().date().replace(day=1)
+            month = (first.date() if first else today).replace(day=1)
+            end = max(today, last.date().replace(day=1) if last else today)
+            while month <= end:
+                cls.create_partition(table, month)
+                month = add_months(month, 1)
+            cls.ensure_default_partition(table)
+            cls.ensure_partitions(table)
+
+            # Recopie par tranches de mois (bornes alignées sur les partitions)
+            month = (first.date() if first else today).replace(day=1)
+            while first and month <= end:
+                upper = add_months(month, batch_months)
+                cursor.execute(
+                    f'INSERT INTO "{table}" SELECT * FROM "{legacy}" '
+                    f'WHERE "{column}" >= %s AND "{column}" < %s',
+                    [month, upper],
+                )
+                month = upper
+
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+                f'COALESCE((SELECT max(id) FROM "{table}"), 0) + 1, false)',
+                [table],
+            )
+
+        logger.info(f"🗂️  {table}: converted to monthly partitions on {column}")
+        return {'table': table, 'status': 'converted', 'legacy_table': legacy}
+
+    @classmethod
+    def apply_retention(cls, spec: PartitionedTable, retention_months: Optional[int] = None,
+                        archive: Optional[bool] = None, dry_run: bool = False) -> List[Dict]:
+        """
+        Supprime les partitions dont tout le mois est antérieur à la
+        rétention; les archive d'abord en CSV gzip si demandé.
+
+        L'archive est écrite pendant que la partition est encore attachée,
+        puis DETACH et DROP sont exécutés dans une même transaction: un échec
+        laisse la partition attachée, et elle est reprise au passage suivant.
+        Les partitions détachées par une exécution interrompue sont reprises
+        de la même façon.
+        """
+        retention_months = retention_months if retention_months is not None else spec.retention_months
+        archive = spec.archive if archive is None else archive
+        if not retention_months:
+            return []
+
+        cutoff = add_months(timezone.now().date().replace(day=1), -retention_months)
+        expired = [
+            p for p in cls.list_partitions(spec.table) + cls.list_detached(spec.table)
+            if add_months(p['month'], 1) <= cutoff
+        ]
+
+        results = []
+        for partition in expired:
+            result = {'partition': partition['name'], 'archived_to': None}
+            if not dry_run:
+                if archive:
+                    result['archived_to'] = str(cls.archive_partition(spec.table, partition['name']))
+                with transaction.atomic(), connection.cursor() as cursor:
+                    if not partition.get('detached'):
+                        cursor.execute(f'ALTER TABLE "{spec.table}" DETACH PARTITION "{partition["name"]}"')
+                    cursor.execute(f'DROP TABLE "{partition["name"]}"')
+                logger.info(f"🗑️  {spec.table}: partition {partition['name']} dropped")
+            results.append(result)
+        return results
+
+    @staticmethod
+    def archive_partition(table: str, partition: str) -> Path:
+        """Exporte une partition en CSV compressé (COPY TO STDOUT)."""
+        archive_dir = Path(PARTITIONING.get('ARCHIVE_DIR', 'archives')) / table
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        path = archive_dir / f"{partition}.csv.gz"
+
+        with connection.cursor() as cursor, gzip.open(path, 'wb') as output:
+            with cursor.cursor.copy(f'COPY "{partition}" TO STDOUT (FORMAT csv, HEADER)') as copy:
+                for chunk in copy:
+                    output.write(chunk)
+        return path
@@ -0,0 +1,289 @@
+"""
+Instrumentation des requêtes SQL basée sur connection.execute_wrapper.
+
+Fonctionne en production (indépendant de DEBUG / connection.queries):
+- comptage des requêtes et du temps SQL par requête HTTP et par tâche Celery
+- empreintes (fingerprints) des requêtes pour détecter les motifs N+1
+- budgets de requêtes déclarés sur les ViewSets (``query_budget``)
+
+Les connexions sont propres à chaque thread: sous ASGI, l'ORM s'exécute
+dans les threads de sync_to_async, pas dans celui de la boucle
+d'événements. Un seul execute_wrapper (``_dispatch``) est donc installé sur
+chaque connexion à sa création (signal connection_created), quel que soit
+son thread; il transmet chaque requête aux collecteurs actifs du contexte
+courant, que sync_to_async propage aux threads de travail.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from utilities.metrics import MetricsStore
+
+logger = logging.getLogger('paie_app.services')
+
+# Collecteurs actifs dans le contexte courant (imbrication possible)
+_active_collectors: ContextVar = ContextVar('query_collectors', default=())
+
+# Nombre d'exécutions d'une même forme de requête à partir duquel on signale un N+1
+N_PLUS_ONE_THRESHOLD = getattr(settings, 'QUERY_N_PLUS_ONE_THRESHOLD', 5)
+SLOW_QUERY_THRESHOLD = getattr(settings, 'QUERY_SLOW_THRESHOLD', 1.0)
+
+_IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*%s\s*,?)+\)', re.IGNORECASE)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_SPACES_RE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Levée lorsqu'une vue dépasse son budget de requêtes en mode strict."""
+
+
+def fingerprint(sql: str) -> str:
+    """
+    Normalise une requête SQL en forme canonique (littéraux et listes IN
+    remplacés) pour regrouper les exécutions d'une même requête.
+    """
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    return _SPACES_RE.sub(' ', sql).strip()
+
+
+class QueryCollector:
+    """Collecteur installé comme execute_wrapper sur les connexions."""
+
+    def __init__(self, label: str, n_plus_one_threshold: int = None):
+        self.label = label
+        self.n_plus_one_threshold = n_plus_one_threshold or N_PLUS_ONE_THRESHOLD
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints: Counter = Counter()
+        self.slow_queries: List[Tuple[str, float]] = []
+
+    def record(self, sql: str, elapsed: float) -> None:
+        self.count += 1
+        self.duration += elapsed
+        self.fingerprints[fingerprint(sql)] += 1
+        if elapsed >= SLOW_QUERY_THRESHOLD:
+            self.slow_queries.append((sql[:200], elapsed))
+
+    def repeated_queries(self) -> List[Tuple[str, int]]:
+        """Formes de requêtes exécutées plus de K fois (motifs N+1 probables)."""
+        return [
+            (shape, count) for shape, count in self.fingerprints.most_common()
+            if count > self.n_plus_one_threshold
+        ]
+
+    def report(self) -> Dict:
+        return {
+            'label': self.label,
+            'query_count': self.count,
+            'query_time': round(self.duration, 6),
+            'n_plus_one': [
+                {'sql': shape[:200], 'count': count}
+                for shape, count in self.repeated_queries()
+            ],
+            'slow_queries': len(self.slow_queries),
+        }
+
+
+def _dispatch(execute, sql, params, many, context):
+    """execute_wrapper permanent: mesure la requête pour les collecteurs du contexte."""
+    collectors = _active_collectors.get()
+    if not collectors:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        for collector in collectors:
+            collector.record(sql, elapsed)
+
+
+def install_dispatcher(connection) -> None:
+    """Installe ``_dispatch`` sur une connexion (idempotent)."""
+    if _dispatch not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_dispatch)
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    install_dispatcher(connection)
+
+
+connection_created.connect(_on_connection_created, dispatch_uid='query_monitor_dispatch')
+
+
+@contextmanager
+def track_queries(label: str, using: Optional[List[str]] = None):
+    """
+    Context manager qui compte les requêtes exécutées dans le contexte
+    courant, y compris dans les threads de sync_to_async.
+
+    Usage:
+        with track_queries('period_processing') as collector:
+            ...
+        collector.count, collector.duration, collector.repeated_queries()
+    """
+    # Connexions de ce thread ouvertes avant l'import du module
+    for alias in (using or connections):
+        install_dispatcher(connections[alias])
+
+    collector = QueryCollector(label)
+    token = _active_collectors.set(_active_collectors.get() + (collector,))
+    try:
+        yield collector
+    finally:
+        _active_collectors.reset(token)
+
+
+def current_collector() -> Optional[QueryCollector]:
+    """Collecteur le plus interne actif dans le contexte courant (ou None)."""
+    active = _active_collectors.get()
+    return active[-1] if active else None
+
+
+# ============================================================================
+# BUDGETS DE REQUÊTES
+# ============================================================================
+
+def get_view_budget(view_class, action: Optional[str]) -> Optional[int]:
+    """
+    Budget déclaré sur une vue: ``query_budget = 10`` ou
+    ``query_budget = {'list': 5, 'retrieve': 3, 'default': 10}``.
+    """
+    budget = getattr(view_class, 'query_budget', None)
+    if isinstance(budget, dict):
+        return budget.get(action, budget.get('default'))
+    return budget
+
+
+# Libellé commun des requêtes sans route (404, scanners): le chemin brut
+# donnerait une série de métriques par URL inventée par un client
+UNRESOLVED_LABEL = 'unresolved'
+
+
+def resolve_view(request) -> Tuple[Optional[type], Optional[str], str]:
+    """Résout (classe de vue, action, libellé) à partir de resolver_match."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None, None, UNRESOLVED_LABEL
+
+    view_class = getattr(match.func, 'cls', None) or getattr(match.func, 'view_class', None)
+    actions = getattr(match.func, 'actions', None) or {}
+    action = actions.get(request.method.lower())
+
+    if view_class is None:
+        return None, None, match.view_name or UNRESOLVED_LABEL
+
+    label = view_class.__name__ + (f'.{action}' if action else f'.{request.method.lower()}')
+    return view_class, action, label
+
+
+def report_collector(collector: QueryCollector, budget: Optional[int] = None,
+                     strict: Optional[bool] = None) -> Dict:
+    """
+    Publie le rapport d'un collecteur: logs, compteurs de métriques et,
+    en mode strict (tests), exception si le budget est dépassé.
+    """
+    report = collector.report()
+    report['budget'] = budget
+    report['budget_exceeded'] = budget is not None and collector.count > budget
+
+    if report['n_plus_one']:
+        logger.warning(
+            f"🔁 N+1 probable: {collector.label} - "
+            f"{len(report['n_plus_one'])} forme(s) répétée(s), "
+            f"max {report['n_plus_one'][0]['count']} exécutions",
+            extra={'query_report': report}
+        )
+
+    if report['budget_exceeded']:
+        logger.warning(
+            f"⚠️  Query budget exceeded: {collector.label} - "
+            f"{collector.count} queries (budget {budget})",
+            extra={'query_report': report}
+        )
+    else:
+        logger.debug(
+            f"DB: {collector.label} - {collector.count} queries in {collector.duration:.3f}s",
+            extra={'query_report': report}
+        )
+
+    _increment_counters(collector.label, report)
+
+    if strict is None:
+        strict = getattr(settings, 'QUERY_BUDGET_STRICT', False)
+    if strict and report['budget_exceeded']:
+        raise QueryBudgetExceeded(_format_budget_error(collector, budget))
+
+    return report
+
+
+def _increment_counters(label: str, report: Dict) -> None:
+    """Compteurs atomiques par vue / tâche dans le store de métriques."""
+    MetricsStore.observe(f"sql:{label}", report['query_time'])
+    MetricsStore.incr('db_queries', label, report['query_count'])
+    if report['n_plus_one']:
+        MetricsStore.incr('n_plus_one', label)
+    if report['budget_exceeded']:
+        MetricsStore.incr('query_budget_exceeded', label)
+
+
+def _format_budget_error(collector: QueryCollector, budget: int) -> str:
+    lines = [f"{collector.label}: {collector.count} queries executed, budget is {budget}"]
+    for shape, count in collector.fingerprints.most_common(5):
+        lines.append(f"  {count}x {shape[:160]}")
+    return '\n'.join(lines)
+
+
+@contextmanager
+def assert_query_budget(budget: int, label: str = 'test'):
+    """
+    Assertion de budget pour les tests.
+
+    Usage:
+        with assert_query_budget(EmployeViewSet.query_budget['list']):
+            client.get('/api/employees/')
+    """
+    with track_queries(label) as collector:
+        yield collector
+    report_collector(collector, budget=budget, strict=True)
+
+
+# ============================================================================
+# INTÉGRATION CELERY
+# ============================================================================
+
+try:
+    from celery.signals import task_prerun, task_postrun
+
+    _task_stacks: Dict[str, ExitStack] = {}
+
+    @task_prerun.connect
+    def _start_task_tracking(task_id=None, task=None, **kwargs):
+        stack = ExitStack()
+        stack.enter_context(track_queries(f"task:{task.name}"))
+        _task_stacks[task_id] = stack
+
+    @task_postrun.connect
+    def _stop_task_tracking(task_id=None, task=None, **kwargs):
+        stack = _task_stacks.pop(task_id, None)
+        if stack is None:
+            return
+        collector = current_collector()
+        stack.close()
+        if collector is not None:
+            report_collector(collector, budget=getattr(task, 'query_budget', None), strict=False)
+
+except ImportError:
+    pass
@@ -0,0 +1,199 @@
+"""
+Compteurs de version par ressource (modèle) et ETags faibles des GET.
+
+Chaque modèle des applications suivies a un compteur dans le cache
+(``resource:version:<app_label>.<model>``), incrémenté à chaque écriture
+puis de nouveau après son commit (signaux post_save / post_delete), ainsi
+qu'après toute requête d'écriture réussie sur la vue (mises à jour en masse
+sans signaux).
+
+L'ETag d'une réponse GET est dérivé des versions des modèles qu'elle lit,
+de l'URL complète, de l'en-tête Accept et de l'identité du client
+(en-tête Authorization): le comparer à ``If-None-Match`` coûte une lecture
+groupée du cache, sans exécuter la vue ni sérialiser quoi que ce soit.
+La comparaison n'a lieu qu'après l'authentification et les permissions de
+la vue (``ConditionalGetMixin``, utilities.response_cache); ``*`` n'est
+jamais accepté (l'existence de la ressource n'est pas connue avant la vue).
+
+Modèles lus par une vue: le modèle de son ``queryset``, les modèles liés
+par clé étrangère (champs calculés), les relations inverses que son
+serializer de lecture expose (``user_account`` d'un employé...) et ceux des
+chemins ``expand``, plus les modèles RBAC (les listes sont filtrées par les
+droits). Une vue dont la sortie dépend d'autres modèles (champs calculés
+par requête) doit les déclarer avec
+``etag_resources = ['paie_app.periode_paie', ...]`` (ou
+``etag_resources = ()`` pour ne jamais produire d'ETag).
+
+Les écritures sans signaux (``update()``, ``bulk_create``) incrémentent
+elles-mêmes la version du modèle (``bump_for_write``).
+"""
+import functools
+import hashlib
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+logger = logging.getLogger('paie_app.services')
+
+RESOURCE_VERSIONS = {
+    'PREFIX': 'resource:version',
+    'APPS': ('user_app', 'paie_app', 'conge_app'),
+    # Actions de ViewSet pour lesquelles le modèle de la vue suffit
+    'ACTIONS': ('list', 'retrieve'),
+    **getattr(settings, 'RESOURCE_VERSIONS', {}),
+}
+
+# Les droits filtrent les listes: toute modification RBAC change les ETags
+RBAC_RESOURCES = ('user_app.group', 'user_app.usergroup', 'user_app.grouppermission', 'user_app.permission')
+
+
+def version_key(label: str) -> str:
+    return f"{RESOURCE_VERSIONS['PREFIX']}:{label}"
+
+
+class ResourceVersions:
+    """Lecture et incrément des compteurs (cache partagé)."""
+
+    @staticmethod
+    def get_many(labels: Iterable[str]) -> Dict[str, int]:
+        labels = list(labels)
+        found = cache.get_many([version_key(label) for label in labels])
+        return {label: int(found.get(version_key(label)) or 0) for label in labels}
+
+    @staticmethod
+    async def aget_many(labels: Iterable[str]) -> Dict[str, int]:
+        labels = list(labels)
+        found = await cache.aget_many([version_key(label) for label in labels])
+        return {label: int(found.get(version_key(label)) or 0) for label in labels}
+
+    @staticmethod
+    def bump(*labels: str) -> None:
+        """Incrémente les compteurs (ne lève jamais)."""
+        for label in labels:
+            try:
+                if not cache.add(version_key(label), 1, timeout=None):
+                    cache.incr(version_key(label))
+            except Exception as e:
+                logger.error(f"❌ Version de ressource {label}: incrément impossible ({e})")
+
+    @classmethod
+    def bump_for_write(cls, *labels: str) -> None:
+        """
+        Incrémente tout de suite (lectures de la transaction en cours) puis
+        après le commit: une lecture concurrente faite entre les deux a pu
+        associer les données d'avant le commit à la première version.
+        """
+        cls.bump(*labels)
+        transaction.on_commit(lambda: cls.bump(*labels))
+
+
+def _related_labels(model, expand: Iterable[str]) -> List[str]:
+    labels = [
+        field.related_model._meta.label_lower
+        for field in model._meta.concrete_fields
+        if field.is_relation and field.related_model is not None
+    ]
+    for path in expand:
+        current = model
+        for name in path.split('.'):
+            try:
+                field = current._meta.get_field(name)
+            except FieldDoesNotExist:
+                break
+            if not field.is_relation or field.related_model is None:
+                break
+            current = field.related_model
+            labels.append(current._meta.label_lower)
+    return labels
+
+
+@functools.lru_cache(maxsize=None)
+def _serializer_reverse_labels(model, serializer_class) -> tuple:
+    """Modèles des relations inverses exposées par un serializer de lecture."""
+    names = set()
+    for name, field in getattr(serializer_class, '_declared_fields', {}).items():
+        source = getattr(field, 'source', None)
+        names.add((source if source and source != '*' else name).split('.')[0])
+    meta_fields = getattr(getattr(serializer_class, 'Meta', None), 'fields', None)
+    if isinstance(meta_fields, (list, tuple)):
+        names.update(meta_fields)
+
+    labels = []
+    for name in names:
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue
+        if field.auto_created and not field.concrete and field.related_model is not None:
+            labels.append(field.related_model._meta.label_lower)
+    return tuple(labels)
+
+
+def _read_serializer(view_class):
+    return getattr(view_class, 'serializer_class_read', None) or getattr(view_class, 'serializer_class', None)
+
+
+def view_resources(view_class, action: Optional[str], expand: Iterable[str] = ()) -> Optional[List[str]]:
+    """Modèles lus par une vue GET, ou None si la vue n'est pas éligible."""
+    declared = getattr(view_class, 'etag_resources', None)
+    if declared is not None:
+        return sorted(set(declared) | set(RBAC_RESOURCES)) if declared else None
+
+    if action not in RESOURCE_VERSIONS['ACTIONS']:
+        return None
+    queryset = getattr(view_class, 'queryset', None)
+    if queryset is None:
+        return None
+    model = queryset.model
+    labels = {model._meta.label_lower, *_related_labels(model, expand), *RBAC_RESOURCES}
+    serializer_class = _read_serializer(view_class)
+    if serializer_class is not None:
+        labels.update(_serializer_reverse_labels(model, serializer_class))
+    return sorted(labels)
+
+
+def compute_etag(versions: Dict[str, int], request) -> str:
+    """ETag faible d'une requête GET pour un état des versions."""
+    identity = request.META.get('HTTP_AUTHORIZATION', '')
+    parts = [
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', ''),
+        hashlib.sha256(identity.encode('utf-8')).hexdigest() if identity else '',
+        *(f"{label}={version}" for label, version in sorted(versions.items())),
+    ]
+    digest = hashlib.blake2b('\n'.join(parts).encode('utf-8'), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """Comparaison faible (RFC 9110): le préfixe W/ est ignoré, ``*`` refusé."""
+    if not if_none_match or if_none_match.strip() == '*':
+        return False
+    return etag.removeprefix('W/') in {tag.removeprefix('W/') for tag in parse_etags(if_none_match)}
+
+
+def set_etag_validators(response, etag: str):
+    response['ETag'] = etag
+    # Revalidation systématique, jamais dans un cache partagé
+    if not response.has_header('Cache-Control'):
+        response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ('Accept', 'Authorization'))
+    return response
+
+
+def _on_model_change(sender, **kwargs) -> None:
+    if sender._meta.app_label in RESOURCE_VERSIONS['APPS']:
+        ResourceVersions.bump_for_write(sender._meta.label_lower)
+
+
+def register_resource_signals() -> None:
+    """Incrémente la version d'un modèle suivi à chaque écriture."""
+    post_save.connect(_on_model_change, dispatch_uid='resource_versions_save')
+    post_delete.connect(_on_model_change, dispatch_uid='resource_versions_delete')
@@ -0,0 +1,148 @@
+"""
+Cache déclaratif des réponses de liste pour les ViewSets ADRF.
+
+Pour les endpoints de référence (types de congé, services, groupes,
+permissions...), modifiés quelques fois par an mais lus à chaque
+chargement de page::
+
+    class ServiceViewSet(CachedListMixin, ModelViewSet):
+        cache_list = True
+
+La clé couvre:
+- les versions des modèles lus par la vue (utilities.resource_versions):
+  toute écriture invalide les entrées sans suppression explicite;
+- la portée des droits de l'utilisateur (version de la matrice RBAC et
+  groupes actifs): des utilisateurs aux mêmes groupes partagent l'entrée;
+- les paramètres de requête et l'hôte (liens de pagination).
+
+Les données sérialisées (``response.data``) sont gardées en mémoire du
+processus (L1) et dans Redis (L2). L'authentification et les permissions
+de la vue s'appliquent avant toute lecture du cache. À réserver aux listes
+dont le contenu ne dépend que des droits de l'utilisateur, pas de son
+identité.
+"""
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponseNotModified
+from rest_framework.response import Response
+
+from adrf_flex_fields import EXPAND_PARAM
+from utilities.auth_cache import LocalTTLCache
+from utilities.metrics import MetricsStore
+from utilities.query_monitor import resolve_view
+from utilities.resource_versions import ResourceVersions, etag_matches, set_etag_validators, view_resources
+
+logger = logging.getLogger('paie_app.services')
+
+RESPONSE_CACHE = {
+    'L1_TTL': 60,
+    'L1_MAX_ENTRIES': 2_000,
+    'L2_TTL': 3600,
+    **getattr(settings, 'RESPONSE_CACHE', {}),
+}
+
+_responses = LocalTTLCache(RESPONSE_CACHE['L1_TTL'], RESPONSE_CACHE['L1_MAX_ENTRIES'])
+
+
+async def permission_scope(user) -> str:
+    """Portée des droits d'un utilisateur: version RBAC + groupes actifs."""
+    if user is None or not user.is_authenticated:
+        return 'anonymous'
+    if user.is_superuser:
+        return 'superuser'
+    from user_app.modules.permission.matrix import PermissionMatrix
+
+    matrix = await PermissionMatrix.acurrent()
+    groups = ','.join(str(group_id) for group_id in sorted(matrix.user_group_ids.get(user.pk, ())))
+    return f"v{matrix.version}:{groups}"
+
+
+def clear_local_responses() -> None:
+    """Vide le niveau mémoire (tests)."""
+    _responses.clear()
+
+
+class CachedListMixin:
+    """
+    Ajoute un cache de réponse à l'action ``list`` d'un ViewSet ADRF.
+
+    Les vues qui enrichissent la liste surchargent ``list_uncached`` (et non
+    ``list``) pour que l'enrichissement soit lui aussi mis en cache.
+    """
+
+    cache_list = False
+
+    async def list(self, request, *args, **kwargs):
+        if not self.cache_list:
+            return await self.list_uncached(request, *args, **kwargs)
+
+        try:
+            key = await self.get_list_cache_key(request)
+        except Exception as e:
+            logger.error(f"❌ Cache de liste {type(self).__name__}: versions indisponibles ({e})")
+            return await self.list_uncached(request, *args, **kwargs)
+
+        view_name = type(self).__name__
+        data = _responses.get(key)
+        if data is None:
+            try:
+                data = await cache.aget(key)
+            except Exception as e:
+                logger.error(f"❌ Cache de liste {view_name}: lecture impossible ({e})")
+            if data is not None:
+                _responses.set(key, data)
+        if data is not None:
+            MetricsStore.incr('response_cache_hit', view_name)
+            return Response(dict(data) if isinstance(data, dict) else list(data))
+
+        MetricsStore.incr('response_cache_miss', view_name)
+        response = await self.list_uncached(request, *args, **kwargs)
+        if response.status_code == 200:
+            # Sans la référence au serializer de ReturnDict / ReturnList
+            data = dict(response.data) if isinstance(response.data, dict) else list(response.data)
+            _responses.set(key, data)
+            try:
+                await cache.aset(key, data, RESPONSE_CACHE['L2_TTL'])
+            except Exception as e:
+                logger.error(f"❌ Cache de liste {view_name}: écriture impossible ({e})")
+        return response
+
+    async def list_uncached(self, request, *args, **kwargs):
+        return await super().list(request, *args, **kwargs)
+
+    async def get_list_cache_key(self, request) -> str:
+        expand = [path for path in request.query_params.get(EXPAND_PARAM, '').split(',') if path]
+        resources = view_resources(type(self), 'list', expand) or []
+        versions = await ResourceVersions.aget_many(resources)
+        parts = [
+            request.get_host(),
+            await permission_scope(request.user),
+            *(f"{name}={value}" for name, values in sorted(request.query_params.lists()) for value in values),
+            *(f"{label}={version}" for label, version in sorted(versions.items())),
+        ]
+        digest = hashlib.blake2b('\n'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+        return f"response:{type(self).__module__}.{type(self).__name__}:list:{digest}"
+
+
+class ConditionalGetMixin:
+    """
+    Répond 304 à un GET conditionnel juste après ``initial()``
+    (authentification, permissions, throttling), sans évaluer le queryset.
+
+    L'ETag est calculé par ResourceETagMiddleware avant la vue; un client
+    non authentifié ou un token révoqué obtient donc 401/403, jamais 304.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        etag = getattr(request._request, '_resource_etag', None)
+        if etag and request.method in ('GET', 'HEAD') and etag_matches(etag, request.META.get('HTTP_IF_NONE_MATCH')):
+            # Le handler de l'action est remplacé pour cette instance seulement
+            setattr(self, request.method.lower(), self.not_modified)
+
+    async def not_modified(self, request, *args, **kwargs):
+        MetricsStore.incr('http_not_modified', resolve_view(request._request)[2])
+        return set_etag_validators(HttpResponseNotModified(), request._request._resource_etag)
@@ -0,0 +1,384 @@
+"""
+Révocation des tokens JWT sans accès base ni Redis par requête.
+
+Redis porte la liste de référence:
+- ``<prefix>:tokens``: ensemble trié des ``jti`` révoqués (score = expiration
+  du token, les entrées expirées sont purgées à chaque synchronisation);
+- ``<prefix>:users``: utilisateurs révoqués (désactivation), avec la date de
+  révocation: tout token émis avant cette date est refusé;
+- ``<prefix>:version``: incrémentée à chaque révocation.
+
+Chaque processus en garde une copie compacte: un filtre de Bloom des ``jti``
+et le petit dictionnaire des utilisateurs révoqués. La version est relue au
+plus une fois par ``SYNC_INTERVAL``; la copie n'est reconstruite que si elle
+a changé. Un ``jti`` absent du filtre n'est jamais révoqué; un ``jti``
+présent (révoqué, ou faux positif) est confirmé dans Redis. Une révocation
+est immédiate dans le processus qui l'émet et se propage aux autres en
+moins de ``SYNC_INTERVAL`` secondes.
+
+Redis injoignable: le processus garde sa dernière copie et enregistre ses
+révocations dans une liste en mémoire, rejouée dans Redis au retour de
+celui-ci (nouvel essai toutes les ``RETRY_INTERVAL`` secondes). La copie
+reste acceptée ``MAX_STALENESS`` secondes après la dernière synchronisation
+réussie (fail-open borné); au-delà, ou si Redis n'a jamais été joint, tout
+token est refusé (fail-closed). ``MAX_STALENESS = None`` garde le
+fail-open sans limite. Un cache sans Redis (développement) utilise la liste
+en mémoire sans cette limite.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger('paie_app.services')
+
+TOKEN_REVOCATION = {
+    'PREFIX': 'rhback:auth:revoked',
+    'SYNC_INTERVAL': 1.0,
+    'BLOOM_CAPACITY': 100_000,
+    'BLOOM_ERROR_RATE': 0.001,
+    # Durée de vie maximale d'un token (rafraîchissement): au-delà, une
+    # révocation d'utilisateur n'a plus d'objet
+    'USER_REVOCATION_TTL': 7 * 24 * 3600,
+    'RETRY_INTERVAL': 5.0,
+    'MAX_STALENESS': 60.0,
+    **getattr(settings, 'TOKEN_REVOCATION', {}),
+}
+
+TOKENS_KEY = f"{TOKEN_REVOCATION['PREFIX']}:tokens"
+USERS_KEY = f"{TOKEN_REVOCATION['PREFIX']}:users"
+VERSION_KEY = f"{TOKEN_REVOCATION['PREFIX']}:version"
+
+
+class BloomFilter:
+    """Filtre de Bloom à double hachage (Kirsch-Mitzenmacher)."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _indexes(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for index in self._indexes(item):
+            self.bits[index >> 3] |= 1 << (index & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[index >> 3] & (1 << (index & 7)) for index in self._indexes(item))
+
+
+def _decode(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+class RedisRevocationBackend:
+    """Liste de référence partagée entre processus."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def add_token(self, jti: str, expires_at: float) -> None:
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zadd(TOKENS_KEY, {jti: expires_at})
+        pipe.incr(VERSION_KEY)
+        pipe.execute()
+
+    def add_user(self, user_id: int, revoked_at: float) -> None:
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hset(USERS_KEY, str(user_id), revoked_at)
+        pipe.incr(VERSION_KEY)
+        pipe.execute()
+
+    def version(self) -> int:
+        return int(self.client.get(VERSION_KEY) or 0)
+
+    def snapshot(self):
+        now = time.time()
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zremrangebyscore(TOKENS_KEY, '-inf', now)
+        pipe.zrange(TOKENS_KEY, 0, -1)
+        pipe.hgetall(USERS_KEY)
+        pipe.get(VERSION_KEY)
+        _, tokens, users, version = pipe.execute()
+        return (
+            [_decode(jti) for jti in tokens],
+            {int(_decode(user_id)): float(revoked_at) for user_id, revoked_at in users.items()},
+            int(version or 0),
+        )
+
+    def remove_users(self, user_ids) -> None:
+        if user_ids:
+            self.client.hdel(USERS_KEY, *[str(user_id) for user_id in user_ids])
+
+    def has_token(self, jti: str) -> bool:
+        return self.client.zscore(TOKENS_KEY, jti) is not None
+
+
+class LocalRevocationBackend:
+    """Repli sans Redis: liste propre au processus."""
+
+    def __init__(self):
+        self.tokens: Dict[str, float] = {}
+        self.users: Dict[int, float] = {}
+        self._version = 0
+
+    def add_token(self, jti: str, expires_at: float) -> None:
+        self.tokens[jti] = expires_at
+        self._version += 1
+
+    def add_user(self, user_id: int, revoked_at: float) -> None:
+        self.users[user_id] = revoked_at
+        self._version += 1
+
+    def version(self) -> int:
+        return self._version
+
+    def snapshot(self):
+        now = time.time()
+        self.tokens = {jti: exp for jti, exp in self.tokens.items() if exp > now}
+        return list(self.tokens), dict(self.users), self._version
+
+    def remove_users(self, user_ids) -> None:
+        for user_id in user_ids:
+            self.users.pop(user_id, None)
+
+    def has_token(self, jti: str) -> bool:
+        return self.tokens.get(jti, 0) > time.time()
+
+
+class RevocationList:
+    """Point d'entrée de la révocation (copie locale synchronisée)."""
+
+    _backend: Optional[RedisRevocationBackend] = None
+    _fallback = LocalRevocationBackend()
+    _shared = True              # False: cache sans Redis, liste en mémoire seule
+    _retry_at = 0.0
+    _synced_at: Optional[float] = None
+    _backend_lock = threading.Lock()
+    _sync_lock = threading.Lock()
+
+    _bloom = BloomFilter(TOKEN_REVOCATION['BLOOM_CAPACITY'], TOKEN_REVOCATION['BLOOM_ERROR_RATE'])
+    _users: Dict[int, float] = {}
+    _version: Optional[int] = None
+    _next_sync = 0.0
+
+    @classmethod
+    def backend(cls):
+        """Backend Redis, ou la liste en mémoire tant que Redis est injoignable."""
+        if cls._backend is not None:
+            return cls._backend
+        with cls._backend_lock:
+            if cls._backend is None and cls._shared and time.monotonic() >= cls._retry_at:
+                cls._backend = cls._connect()
+            return cls._backend or cls._fallback
+
+    @staticmethod
+    def _redis_client():
+        """Client Redis du cache, None si le cache n'est pas Redis."""
+        get_client = getattr(getattr(cache, '_cache', None), 'get_client', None)
+        return get_client(write=True) if get_client is not None else None
+
+    @classmethod
+    def _connect(cls) -> Optional[RedisRevocationBackend]:
+        try:
+            client = cls._redis_client()
+            if client is None:
+                cls._shared = False
+                logger.warning("⚠️  Révocation JWT: cache sans Redis, liste en mémoire")
+                return None
+            client.ping()
+            backend = RedisRevocationBackend(client)
+            cls._replay(backend)
+        except Exception as e:
+            cls._retry_at = time.monotonic() + TOKEN_REVOCATION['RETRY_INTERVAL']
+            logger.warning(
+                f"⚠️  Révocation JWT: Redis indisponible ({e}), "
+                f"nouvel essai dans {TOKEN_REVOCATION['RETRY_INTERVAL']}s"
+            )
+            return None
+        logger.info("✅ Révocation JWT: Redis joint")
+        return backend
+
+    @classmethod
+    def _replay(cls, backend: RedisRevocationBackend) -> None:
+        """Publie dans Redis les révocations enregistrées pendant la coupure."""
+        fallback = cls._fallback
+        for jti, expires_at in list(fallback.tokens.items()):
+            backend.add_token(jti, expires_at)
+        for user_id, revoked_at in list(fallback.users.items()):
+            backend.add_user(user_id, revoked_at)
+        cls._fallback = LocalRevocationBackend()
+
+    @classmethod
+    def _disconnect(cls, error: Exception) -> None:
+        """Redis perdu en cours de route: repli et nouvel essai différé."""
+        with cls._backend_lock:
+            cls._backend = None
+            cls._retry_at = time.monotonic() + TOKEN_REVOCATION['RETRY_INTERVAL']
+        logger.error(f"❌ Révocation JWT: Redis injoignable ({error}), liste en mémoire")
+
+    @classmethod
+    def unverifiable(cls) -> bool:
+        """True si la copie locale est trop ancienne pour être crue (fail-closed)."""
+        limit = TOKEN_REVOCATION['MAX_STALENESS']
+        if limit is None or not cls._shared:
+            return False
+        return cls._synced_at is None or time.monotonic() - cls._synced_at > limit
+
+    # ------------------------------------------------------------------
+    # Synchronisation
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def sync_due(cls) -> bool:
+        return time.monotonic() >= cls._next_sync
+
+    @classmethod
+    def sync(cls, force: bool = False) -> None:
+        """Recharge la copie locale si la version Redis a changé."""
+        if not force and not cls.sync_due():
+            return
+        with cls._sync_lock:
+            if not force and not cls.sync_due():
+                return
+            cls._next_sync = time.monotonic() + TOKEN_REVOCATION['SYNC_INTERVAL']
+            backend = cls.backend()
+            if cls._shared and backend is cls._fallback:
+                # Redis injoignable: copie gardée, révocations locales déjà appliquées
+                return
+            try:
+                unchanged = not force and backend.version() == cls._version
+                if not unchanged:
+                    tokens, users, version = backend.snapshot()
+            except Exception as e:
+                # Copie locale conservée en attendant la prochaine synchronisation
+                cls._disconnect(e)
+                return
+            if cls._shared:
+                cls._synced_at = time.monotonic()
+            if unchanged:
+                return
+
+            bloom = BloomFilter(TOKEN_REVOCATION['BLOOM_CAPACITY'], TOKEN_REVOCATION['BLOOM_ERROR_RATE'])
+            for jti in tokens:
+                bloom.add(jti)
+
+            horizon = time.time() - TOKEN_REVOCATION['USER_REVOCATION_TTL']
+            expired = [user_id for user_id, revoked_at in users.items() if revoked_at < horizon]
+            if expired:
+                backend.remove_users(expired)
+
+            cls._bloom = bloom
+            cls._users = {user_id: at for user_id, at in users.items() if at >= horizon}
+            cls._version = version
+
+    @classmethod
+    def reset(cls) -> None:
+        """Vide la copie locale et le backend (tests); la prochaine vérification resynchronise."""
+        with cls._sync_lock:
+            cls._bloom = BloomFilter(TOKEN_REVOCATION['BLOOM_CAPACITY'], TOKEN_REVOCATION['BLOOM_ERROR_RATE'])
+            cls._users = {}
+            cls._version = None
+            cls._next_sync = 0.0
+            cls._synced_at = None
+        with cls._backend_lock:
+            cls._backend = None
+            cls._fallback = LocalRevocationBackend()
+            cls._shared = True
+            cls._retry_at = 0.0
+
+    # ------------------------------------------------------------------
+    # Révocation
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def revoke_token(cls, payload: Dict) -> bool:
+        """Révoque un token décodé jusqu'à son expiration."""
+        jti = payload.get('jti')
+        if not jti:
+            return False
+        expires_at = float(payload.get('exp', time.time()))
+        try:
+            cls.backend().add_token(jti, expires_at)
+        except Exception as e:
+            cls._disconnect(e)
+            cls._fallback.add_token(jti, expires_at)
+        cls._bloom.add(jti)
+        return True
+
+    @classmethod
+    def revoke_user(cls, user_id: int) -> None:
+        """
+        Révoque les tokens émis avant la seconde courante pour un utilisateur
+        (``iat`` est à la seconde; les tokens émis ensuite restent valides,
+        après une réactivation par exemple).
+        """
+        revoked_at = int(time.time())
+        try:
+            cls.backend().add_user(user_id, revoked_at)
+        except Exception as e:
+            cls._disconnect(e)
+            cls._fallback.add_user(user_id, revoked_at)
+        cls._users = {**cls._users, user_id: revoked_at}
+
+    @classmethod
+    async def arevoke_token(cls, payload: Dict) -> bool:
+        return await sync_to_async(cls.revoke_token)(payload)
+
+    # ------------------------------------------------------------------
+    # Vérification
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def _check_locally(cls, payload: Dict) -> Optional[bool]:
+        """True / False si la copie locale suffit, None si Redis doit confirmer."""
+        revoked_at = cls._users.get(payload.get('user_id'))
+        if revoked_at is not None and payload.get('iat', 0) < revoked_at:
+            return True
+        jti = payload.get('jti')
+        if not jti or jti not in cls._bloom:
+            return False
+        return None
+
+    @classmethod
+    def _confirm(cls, jti: str) -> bool:
+        backend = cls.backend()
+        if cls._shared and backend is cls._fallback:
+            # Redis injoignable: un jti du filtre ne peut être infirmé
+            return True
+        try:
+            return backend.has_token(jti)
+        except Exception as e:
+            cls._disconnect(e)
+            return True
+
+    @classmethod
+    def is_revoked(cls, payload: Dict) -> bool:
+        cls.sync()
+        if cls.unverifiable():
+            return True
+        local = cls._check_locally(payload)
+        return cls._confirm(payload['jti']) if local is None else local
+
+    @classmethod
+    async def ais_revoked(cls, payload: Dict) -> bool:
+        """Version async: aucune entrée/sortie hors synchronisation ou confirmation."""
+        if cls.sync_due():
+            await sync_to_async(cls.sync)()
+        if cls.unverifiable():
+            return True
+        local = cls._check_locally(payload)
+        if local is None:
+            return await sync_to_async(cls._confirm)(payload['jti'])
+        return local
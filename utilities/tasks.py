@@ -2,4 +2,48 @@
 Tâches Celery pour l'audit asynchrone.
 Permet de créer les logs d'audit en arrière-plan sans bloquer les requêtes.
 """
-from celery impo
+from celery import shared_task
+import logging
+
+from utilities.audit_pipeline import AuditPipeline
+from utilities.partitioning import PartitionManager, configured_tables
+
+logger = logging.getLogger('paie_app.audit')
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=5, ignore_result=True)
+def drain_audit_buffer(self, max_batches=20):
+    """
+    Vide le buffer d'audit par lots (planifiée par celery beat).
+
+    Args:
+        max_batches: Nombre maximal de lots insérés par exécution
+    """
+    try:
+        written = AuditPipeline.drain(max_batches=max_batches)
+        if written:
+            logger.info(f"✅ {written} audit logs flushed, {AuditPipeline.pending()} pending")
+        return written
+    except Exception as e:
+        logger.error(f"❌ Audit buffer drain failed: {str(e)}")
+        raise self.retry(exc=e)
+
+
+@shared_task(bind=True, ignore_result=True)
+def maintain_partitions(self):
+    """
+    Maintenance quotidienne des tables partitionnées: création des
+    partitions à venir puis rétention (DETACH / DROP, archivage optionnel).
+    """
+    results = {}
+    for table, spec in configured_tables().items():
+        try:
+            if not PartitionManager.is_partitioned(table):
+                continue
+            created = PartitionManager.ensure_partitions(table)
+            dropped = PartitionManager.apply_retention(spec)
+            results[table] = {'created': created, 'dropped': [r['partition'] for r in dropped]}
+        except Exception as e:
+            logger.error(f"❌ Partition maintenance failed for {table}: {str(e)}")
+            results[table] = {'error': str(e)}
+    return results